@@ -0,0 +1,125 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from typing import Optional
+import os
+import secrets
+from services.data_service import data_service
+from services.recommendation_service import recommendation_service
+from services.llm_service import llm_service
+from services.semantic_index import semantic_index
+from services.review_theme_service import review_theme_service
+from services.session_store import session_store, InMemorySessionStore
+from services.job_service import job_service
+from services.job_store import InMemoryJobStore
+from services.memory_profiler import memory_profiler, structure_sizes, process_memory
+from models.schemas import BaseResponse
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin routes need the ADMIN_TOKEN value in the X-Admin-Token header; without ADMIN_TOKEN they don't exist"""
+    token = os.getenv('ADMIN_TOKEN')
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+def _resident_structures():
+    """(name, object) pairs for the long-lived catalog data, indexes and caches of this worker"""
+    structures = [
+        ('catalog.dataframe', data_service.df),
+        ('catalog.features', data_service.features),
+        ('catalog.spec_summaries', data_service.spec_summaries),
+        ('catalog.records', data_service.catalog),
+        ('catalog.keys', (data_service.laptop_keys, data_service.rows_by_key)),
+        ('index.partitions', data_service.catalog_partitions),
+        ('index.facets', data_service.facets),
+        ('index.suggestions', data_service.suggestions),
+        ('index.fuzzy', data_service.fuzzy_index),
+        ('index.offers', data_service.offers),
+        ('index.sort', data_service.sort_index),
+        ('index.price_history', data_service.price_history),
+        ('index.availability', data_service.availability),
+        ('index.tfidf_matrix', recommendation_service.tfidf_matrix),
+        ('index.tfidf_vectorizer', recommendation_service.vectorizer),
+        ('index.semantic', semantic_index),
+        ('index.review_themes', review_theme_service.index),
+        ('cache.llm_answers', llm_service.answer_cache),
+        ('cache.query_log', llm_service.query_log),
+    ]
+    # Redis-backed stores hold nothing in this process worth sizing
+    if isinstance(session_store, InMemorySessionStore):
+        structures.append(('cache.chat_sessions', session_store))
+    if isinstance(job_service.store, InMemoryJobStore):
+        structures.append(('cache.jobs', job_service.store))
+    return structures
+
+@router.get("/memory", response_model=BaseResponse)
+async def memory_status():
+    """Tracing state, traced memory and RSS of the worker that serves the request"""
+    return BaseResponse(success=True, message="Memory profiler status", data=memory_profiler.status())
+
+@router.post("/memory/start", response_model=BaseResponse)
+async def start_memory_profiler(
+    frames: Optional[int] = Query(None, ge=1, le=100, description="Frames stored per allocation traceback"),
+    sample_rate: Optional[float] = Query(None, ge=0, le=1, description="Fraction of requests sampled per endpoint")
+):
+    """Start tracemalloc, take a baseline snapshot and reset the per-endpoint samples"""
+    try:
+        return BaseResponse(success=True, message="Memory profiler started",
+                            data=memory_profiler.start(frames, sample_rate))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/memory/stop", response_model=BaseResponse)
+async def stop_memory_profiler():
+    """Stop tracemalloc and drop the baseline and samples"""
+    return BaseResponse(success=True, message="Memory profiler stopped", data=memory_profiler.stop())
+
+@router.post("/memory/baseline", response_model=BaseResponse)
+async def take_memory_baseline():
+    """Replace the baseline snapshot with one taken now"""
+    try:
+        memory_profiler.take_baseline()
+        return BaseResponse(success=True, message="Baseline snapshot taken", data=memory_profiler.status())
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/memory/diff", response_model=BaseResponse)
+async def memory_diff(
+    top: int = Query(20, ge=1, le=500, description="Call sites to return"),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$",
+                          description="Group allocations by line, file or full traceback")
+):
+    """Snapshot now and diff against the baseline: the call sites whose memory grew most"""
+    try:
+        return BaseResponse(success=True, message="Allocation growth since baseline",
+                            data=memory_profiler.diff(top, group_by))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/memory/endpoints", response_model=BaseResponse)
+async def memory_by_endpoint(top: int = Query(10, ge=1, le=100, description="Call sites per endpoint")):
+    """Retained and peak allocations of sampled requests, with the top call sites per endpoint"""
+    return BaseResponse(success=True, message="Allocations by endpoint",
+                        data=memory_profiler.endpoint_report(top))
+
+@router.get("/memory/structures", response_model=BaseResponse)
+async def memory_structures():
+    """Sizes of the resident catalog, index and cache structures (works without tracing)"""
+    try:
+        sizes = structure_sizes(_resident_structures())
+        return BaseResponse(success=True, message="Resident structure sizes", data={
+            'pid': os.getpid(),
+            'total_bytes': sum(entry['bytes'] for entry in sizes),
+            'total_mapped_bytes': sum(entry['mapped_bytes'] for entry in sizes),
+            'structures': sizes,
+            **process_memory()
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -2,99 +2,226 @@
 # All rights reserved. This code is proprietary and confidential.
 # Unauthorized copying, distribution, or use is strictly prohibited.
 
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+import json
+import math
+import os
+import time
+from fastapi import APIRouter, HTTPException, Depends, Path, Request
+from fastapi.responses import StreamingResponse
 from services.llm_service import llm_service
-from models.schemas import ChatRequest, ChatResponse, RecommendationRequest, RecommendationResponse, CompareRequest, CompareResponse
+from services.job_service import job_service, JobQueueFullError, FINISHED_STATES
+from services.admission import AdmissionSlot, admit_llm, rate_limit_llm, llm_admission, llm_rate_limiter, client_id
+from models.schemas import ChatRequest, ChatResponse, BatchChatRequest, RecommendationRequest, RecommendationResponse, CompareRequest, CompareResponse, JobResponse
 from services.data_service import data_service
+from services.session_store import session_store, new_session, public_view
 
 router = APIRouter()
 
-@router.post("/query", response_model=ChatResponse)
-async def chat_query(request: ChatRequest):
-    """Handle chat queries about laptops"""
+JOB_STREAM_POLL_SECONDS = float(os.getenv('LLM_JOB_STREAM_POLL_SECONDS', '0.5'))
+JOB_STREAM_TIMEOUT_SECONDS = float(os.getenv('LLM_JOB_STREAM_TIMEOUT_SECONDS', '120'))
+BATCH_MAX_PARALLELISM = int(os.getenv('LLM_BATCH_PARALLELISM', '4'))
+
+def _recommendation_job(payload):
+    response = llm_service.get_recommendations(payload["constraints"])
+    return {
+        "constraints": payload["constraints"],
+        "recommendations": response["recommendations"],
+        "laptops_considered": response["laptops_considered"],
+        "timestamp": response["timestamp"],
+        "degraded": response["degraded"]
+    }
+
+def _compare_job(payload):
+    return llm_service.compare_laptops(payload["laptop_ids"])
+
+job_service.register("recommend", _recommendation_job)
+job_service.register("compare", _compare_job)
+
+@router.post("/query", response_model=ChatResponse, dependencies=[Depends(rate_limit_llm)])
+async def chat_query(request: ChatRequest, lane: AdmissionSlot = Depends(admit_llm)):
+    """Handle chat queries about laptops; pass the returned session_id to continue the conversation"""
     try:
-        response = llm_service.chat_query(request.query, request.context or "")
+        # Unknown or expired sessions start over rather than failing the question
+        session = (session_store.get(request.session_id) if request.session_id else None) or new_session()
+        response = await lane.run(llm_service.chat_query, request.query, request.context or "", None, session)
+        session_store.put(session)
         
         return ChatResponse(
             data={
                 "query": request.query,
                 "response": response["response"],
                 "context_used": response["context_used"],
-                "timestamp": response["timestamp"]
+                "timestamp": response["timestamp"],
+                "degraded": response["degraded"],
+                "cached": response["cached"],
+                "session_id": session["session_id"],
+                "turn": session["turn_count"]
             }
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/recommend", response_model=RecommendationResponse)
-async def get_recommendations(request: RecommendationRequest):
+@router.get("/sessions/{session_id}", response_model=ChatResponse)
+async def get_session(session_id: str = Path(..., description="Chat session ID")):
+    """Compact state of a chat session: its laptops, rolling summary and recent turns"""
+    session = session_store.get(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return ChatResponse(data=public_view(session))
+
+@router.delete("/sessions/{session_id}", response_model=ChatResponse)
+async def delete_session(session_id: str = Path(..., description="Chat session ID")):
+    """End a chat session"""
+    if not session_store.delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return ChatResponse(message="Session deleted", data={"session_id": session_id})
+
+@router.post("/batch")
+async def chat_batch(request: BatchChatRequest, http_request: Request):
+    """Answer many chat queries concurrently, streaming one NDJSON line per query as it completes"""
+    # Every query is charged to the client's and the global rate limit, just before its LLM call
+    client = client_id(http_request)
+    # One catalog snapshot shared by every query in the batch
+    laptops = data_service.get_all_laptops()
+    parallelism = min(request.parallelism or BATCH_MAX_PARALLELISM, BATCH_MAX_PARALLELISM)
+    semaphore = asyncio.Semaphore(parallelism)
+    
+    async def answer(index: int, item: ChatRequest):
+        result = {"index": index, "query": item.query}
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                granted, wait = llm_rate_limiter.check(client)
+                if not granted:
+                    raise HTTPException(status_code=429, detail="Too many chat requests, slow down",
+                                        headers={"Retry-After": str(max(1, math.ceil(wait)))})
+                slot = await llm_admission.admit()
+                try:
+                    response = await slot.run(llm_service.chat_query, item.query, item.context or "", laptops)
+                finally:
+                    # A cancelled item keeps its slot until its LLM call returns
+                    slot.close()
+                result.update(success=True, response=response["response"], degraded=response["degraded"],
+                              cached=response["cached"])
+            except HTTPException as e:
+                result.update(success=False, error=e.detail, status_code=e.status_code,
+                              retry_after=(e.headers or {}).get("Retry-After"))
+            except Exception as e:
+                result.update(success=False, error=str(e), status_code=500)
+            result["seconds"] = round(time.monotonic() - started, 3)
+        return result
+    
+    async def stream():
+        started = time.monotonic()
+        tasks = [asyncio.create_task(answer(i, item)) for i, item in enumerate(request.queries)]
+        failed = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                result = await finished
+                failed += not result["success"]
+                yield json.dumps(result) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+        yield json.dumps({
+            "done": True,
+            "count": len(tasks),
+            "failed": failed,
+            "parallelism": parallelism,
+            "seconds": round(time.monotonic() - started, 3)
+        }) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.post("/recommend", response_model=RecommendationResponse, dependencies=[Depends(rate_limit_llm)])
+async def get_recommendations(request: RecommendationRequest, lane: AdmissionSlot = Depends(admit_llm)):
     """Get laptop recommendations based on constraints"""
     try:
-        response = llm_service.get_recommendations(request.constraints)
+        response = await lane.run(llm_service.get_recommendations, request.constraints)
         
         return RecommendationResponse(
             data={
                 "constraints": request.constraints,
                 "recommendations": response["recommendations"],
                 "laptops_considered": response["laptops_considered"],
-                "timestamp": response["timestamp"]
+                "timestamp": response["timestamp"],
+                "degraded": response["degraded"]
             }
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/compare", response_model=CompareResponse)
-async def compare_laptops(request: CompareRequest):
+@router.post("/compare", response_model=CompareResponse, dependencies=[Depends(rate_limit_llm)])
+async def compare_laptops(request: CompareRequest, lane: AdmissionSlot = Depends(admit_llm)):
     """Compare multiple laptops"""
     try:
-        # Get laptop details
-        laptops = []
-        for laptop_id in request.laptop_ids:
-            laptop = data_service.get_laptop_by_id(laptop_id)
-            if laptop:
-                # Convert all values to strings to avoid JSON serialization issues
-                safe_laptop = {}
-                for key, value in laptop.items():
-                    if value is not None:
-                        if isinstance(value, (int, float)):
-                            # Handle special float values that aren't JSON compliant
-                            if str(value) in ['inf', '-inf', 'nan']:
-                                safe_laptop[key] = str(value)
-                            else:
-                                safe_laptop[key] = value
-                        else:
-                            safe_laptop[key] = str(value)
-                    else:
-                        safe_laptop[key] = None
-                laptops.append(safe_laptop)
-        
-        if len(laptops) < 2:
-            raise HTTPException(status_code=404, detail="Could not find enough laptops for comparison")
-        
-        # Create comparison context
-        comparison_context = "Compare these laptops:\n"
-        for i, laptop in enumerate(laptops):
-            comparison_context += f"Laptop {i+1}: {laptop.get('Brand', '')} {laptop.get('Model', '')}\n"
-            comparison_context += f"Processor: {laptop.get('Processor', '')}\n"
-            comparison_context += f"Memory: {laptop.get('Memory (RAM)', '')}\n"
-            comparison_context += f"Storage: {laptop.get('Storage', '')}\n"
-            comparison_context += f"Display: {laptop.get('Display', '')}\n"
-            comparison_context += f"Price: {laptop.get('Price Details', '')}\n"
-            comparison_context += "---\n"
-        
-        # Use LLM to generate comparison
-        comparison_query = f"Please provide a detailed comparison of these laptops, highlighting key differences, pros and cons, and which would be best for different use cases: {comparison_context}"
+        comparison = await lane.run(llm_service.compare_laptops, request.laptop_ids)
         
-        response = llm_service.chat_query(comparison_query)
-        
-        return CompareResponse(
-            data={
-                "laptops": laptops,
-                "comparison": response["response"],
-                "laptop_ids": request.laptop_ids
-            }
-        )
+        return CompareResponse(data=comparison)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+def _submit_job(kind: str, payload):
+    try:
+        job = job_service.submit(kind, payload)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail="Too many pending jobs, retry later",
+                            headers={"Retry-After": str(e.retry_after)})
+    
+    data = job_service.public_view(job)
+    data["status_url"] = f"/api/v1/chat/jobs/{job['job_id']}"
+    data["events_url"] = f"/api/v1/chat/jobs/{job['job_id']}/events"
+    return JobResponse(message="Job accepted", data=data)
+
+@router.post("/jobs/recommend", response_model=JobResponse, status_code=202, dependencies=[Depends(rate_limit_llm)])
+async def submit_recommendation_job(request: RecommendationRequest):
+    """Queue an LLM recommendation and return a job id immediately"""
+    return _submit_job("recommend", {"constraints": request.constraints})
+
+@router.post("/jobs/compare", response_model=JobResponse, status_code=202, dependencies=[Depends(rate_limit_llm)])
+async def submit_compare_job(request: CompareRequest):
+    """Queue an LLM comparison and return a job id immediately"""
+    return _submit_job("compare", {"laptop_ids": request.laptop_ids})
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str = Path(..., description="Job ID")):
+    """Poll a job's status and, once finished, its result"""
+    job = job_service.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return JobResponse(data=job_service.public_view(job))
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job(job_id: str = Path(..., description="Job ID")):
+    """Server-sent events: a status event on every state change, then the final job record"""
+    if not job_service.get(job_id):
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    
+    async def events():
+        last_status = None
+        waited = 0.0
+        while waited <= JOB_STREAM_TIMEOUT_SECONDS:
+            job = job_service.get(job_id)
+            if not job:
+                yield "event: expired\ndata: {}\n\n"
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                view = job_service.public_view(job)
+                event = "result" if last_status in FINISHED_STATES else "status"
+                if event == "status":
+                    view = {key: view[key] for key in ("job_id", "kind", "status", "started_at")}
+                yield f"event: {event}\ndata: {json.dumps(view, default=str)}\n\n"
+                if event == "result":
+                    return
+            await asyncio.sleep(JOB_STREAM_POLL_SECONDS)
+            waited += JOB_STREAM_POLL_SECONDS
+        yield "event: timeout\ndata: {}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
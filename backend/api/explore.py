@@ -1,10 +1,23 @@
-from fastapi import APIRouter, HTTPException, Query, Path
+import asyncio
+import json
+import os
+from fastapi import APIRouter, HTTPException, Query, Path, Request
+from fastapi.responses import StreamingResponse
 from typing import List, Dict, Any, Optional
 from services.data_service import data_service
-from models.schemas import BaseResponse
+from services.semantic_index import semantic_index
+from services.sort_index import RELEVANCE, SORT_FIELDS
+from services.catalog_export import ARROW_STREAM, NDJSON, CatalogExport, negotiate_format, pa
+from models.schemas import BaseResponse, OfferListResponse, PriceHistoryResponse, SearchSuggestionsResponse
 
 router = APIRouter()
 
+AVAILABILITY_STREAM_POLL_SECONDS = float(os.getenv('AVAILABILITY_STREAM_POLL_SECONDS', '2'))
+AVAILABILITY_STREAM_TIMEOUT_SECONDS = float(os.getenv('AVAILABILITY_STREAM_TIMEOUT_SECONDS', '300'))
+AVAILABILITY_HEARTBEAT_SECONDS = 15
+AVAILABILITY_EVENT_MAX_CHANGES = 500
+BATCH_MAX_IDS = 100
+
 @router.get("/", response_model=BaseResponse)
 async def get_all_laptops():
     """Get all laptops for exploration"""
@@ -12,7 +25,7 @@ async def get_all_laptops():
         laptops = data_service.get_all_laptops()
         
         return BaseResponse(data={
-            "laptops": laptops,
+            "laptops": [laptop.to_dict() for laptop in laptops],
             "count": len(laptops)
         })
     except Exception as e:
@@ -22,75 +35,201 @@ async def get_all_laptops():
 async def get_filter_options():
     """Get available filter options"""
     try:
-        laptops = data_service.get_all_laptops()
+        return BaseResponse(data=data_service.get_filter_options())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/facets", response_model=BaseResponse)
+async def get_facets(
+    brand: Optional[List[str]] = Query(None, description="Selected brands"),
+    processor_family: Optional[List[str]] = Query(None, description="Selected processor families"),
+    os: Optional[List[str]] = Query(None, description="Selected operating systems"),
+    ram_tier: Optional[List[str]] = Query(None, description="Selected RAM tiers"),
+    storage_tier: Optional[List[str]] = Query(None, description="Selected storage tiers"),
+    display_size: Optional[List[str]] = Query(None, description="Selected display sizes")
+):
+    """Get facet value counts that react to the filters already applied"""
+    try:
+        selections = {
+            'brand': brand,
+            'processor_family': processor_family,
+            'os': os,
+            'ram_tier': ram_tier,
+            'storage_tier': storage_tier,
+            'display_size': display_size
+        }
+        selections = {facet: values for facet, values in selections.items() if values}
         
-        # Extract unique values for each filter
-        brands = list(set([laptop.get('Brand', '') for laptop in laptops if laptop.get('Brand')]))
-        processors = list(set([laptop.get('Processor', '') for laptop in laptops if laptop.get('Processor')]))
-        memory = list(set([laptop.get('Memory (RAM)', '') for laptop in laptops if laptop.get('Memory (RAM)')]))
-        storage = list(set([laptop.get('Storage', '') for laptop in laptops if laptop.get('Storage')]))
-        displays = list(set([laptop.get('Display', '') for laptop in laptops if laptop.get('Display')]))
+        result = data_service.get_facet_counts(selections)
         
         return BaseResponse(data={
-            "brands": sorted(brands),
-            "processors": sorted(processors),
-            "memory": sorted(memory),
-            "storage": sorted(storage),
-            "displays": sorted(displays)
+            "facets": result['facets'],
+            "count": result['total'],
+            "filters_applied": selections
         })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/price-trends", response_model=BaseResponse)
-async def get_price_trends():
-    """Get price trends for laptops"""
+@router.get("/suggest", response_model=SearchSuggestionsResponse)
+async def get_suggestions(
+    prefix: str = Query(..., min_length=1, max_length=100, description="Text typed so far"),
+    limit: int = Query(10, ge=1, le=20, description="Maximum number of suggestions")
+):
+    """Get autocomplete suggestions for the search box"""
     try:
-        laptops = data_service.get_all_laptops()
+        return SearchSuggestionsResponse(data=data_service.get_suggestions(prefix, limit))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/semantic-search", response_model=BaseResponse)
+async def semantic_search(
+    q: str = Query(..., min_length=1, max_length=500, description="Natural-language description of the laptop you want"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
+    brand: Optional[str] = Query(None, description="Brand filter")
+):
+    """Search laptops by meaning rather than exact words"""
+    try:
+        # Over-fetch when filtering so the brand filter still leaves `limit` results
+        fetch = limit * 5 if brand else limit
+        matches = semantic_index.search(q, fetch)
+        
+        laptops = data_service.get_laptop_records([row for row, _ in matches])
+        results = []
+        for laptop, (_, score) in zip(laptops, matches):
+            if brand and brand.lower() not in str(laptop.get('Brand', '')).lower():
+                continue
+            laptop['semantic_score'] = score
+            results.append(laptop.to_dict())
+        results = results[:limit]
+        
+        return BaseResponse(data={
+            "laptops": results,
+            "count": len(results),
+            "query": q
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/export")
+async def export_catalog(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|arrow)$", description="Overrides the Accept header")
+):
+    """Stream the whole catalog as NDJSON or an Arrow IPC stream, chosen by the Accept header"""
+    export_format = format or negotiate_format(request.headers.get('accept'))
+    if export_format is None:
+        raise HTTPException(status_code=406, detail=f"Supported export types: {NDJSON}, {ARROW_STREAM}")
+    if export_format == 'arrow' and pa is None:
+        raise HTTPException(status_code=406, detail="Arrow export requires the pyarrow package")
+    
+    export = CatalogExport(data_service.df, data_service.features, data_service.laptop_ids)
+    headers = {"X-Catalog-Rows": str(export.rows), "Vary": "Accept"}
+    if export_format == 'arrow':
+        return StreamingResponse(export.arrow(), media_type=ARROW_STREAM, headers=headers)
+    return StreamingResponse(export.ndjson(), media_type=NDJSON, headers=headers)
+
+@router.get("/offers", response_model=OfferListResponse)
+async def get_offers(
+    brand: Optional[str] = Query(None, description="Only deals from this brand"),
+    max_price: Optional[float] = Query(None, gt=0, description="Only laptops at or under this price"),
+    min_discount: Optional[float] = Query(None, ge=0, description="Minimum deal size in percent"),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Get current deals, biggest discount first"""
+    try:
+        offers = data_service.get_offers(brand=brand, max_price=max_price, min_discount=min_discount, limit=limit)
+        
+        return OfferListResponse(data=offers, count=len(offers))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/price-trends", response_model=PriceHistoryResponse)
+async def get_price_trends(
+    days: int = Query(30, ge=1, le=3650, description="Look-back window in days"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of laptops")
+):
+    """Get the largest price moves over a window, from the recorded price history"""
+    try:
+        trends = data_service.get_price_trends(days=days, limit=limit)
         
-        # Generate price trends data
-        trends = []
-        for i, laptop in enumerate(laptops[:10]):  # Limit to 10 for demo
-            import random
-            price_change = random.uniform(-15, 15)  # Random price change between -15% and +15%
-            
-            trends.append({
-                "laptop_id": i,
-                "brand": laptop.get('brand', laptop.get('Brand', 'Unknown')),
-                "model": laptop.get('model', laptop.get('Model', 'Unknown')),
-                "price_change": round(price_change, 1),
-                "current_price": random.randint(500, 3000)
-            })
-        
-        return BaseResponse(data={"trends": trends})
+        return PriceHistoryResponse(data={"trends": trends, "days": days})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/price-history/{laptop_id}", response_model=PriceHistoryResponse)
+async def get_price_history(
+    laptop_id: int = Path(..., ge=0),
+    days: int = Query(365, ge=1, le=3650, description="Look-back window in days"),
+    bucket: str = Query("day", pattern="^(hour|day|week|month)$", description="Downsampling bucket")
+):
+    """Get a laptop's price history downsampled to min/max/avg/last per bucket"""
+    try:
+        history = data_service.get_price_history(laptop_id, days=days, bucket=bucket)
+        if history is None:
+            raise HTTPException(status_code=404, detail="Laptop not found")
+        
+        return PriceHistoryResponse(data=history)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/availability", response_model=BaseResponse)
 async def get_availability():
-    """Get availability status for laptops"""
+    """Current availability of every laptop, with the change-feed version it reflects"""
     try:
-        laptops = data_service.get_all_laptops()
-        
-        # Generate availability data
-        availability = []
-        statuses = ['Available', 'Available Soon']
-        
-        for i, laptop in enumerate(laptops):
-            import random
-            status = random.choice(statuses)
-            
-            availability.append({
-                "laptop_id": i,
-                "brand": laptop.get('brand', laptop.get('Brand', 'Unknown')),
-                "model": laptop.get('model', laptop.get('Model', 'Unknown')),
-                "status": status,
-                "last_updated": "2024-01-15T10:30:00Z"
-            })
-        
-        return BaseResponse(data={"availability": availability})
+        return BaseResponse(data=data_service.get_availability())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/availability/changes")
+async def stream_availability_changes(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="Last availability version the client has")
+):
+    """Server-sent events: availability changes after `since`, then new changes as they are recorded.
+    
+    Each event's id is the last version it contains, so a reconnecting EventSource resumes
+    from its Last-Event-ID.
+    """
+    if since is None:
+        last_event_id = request.headers.get("last-event-id", "")
+        if not last_event_id.isdigit():
+            raise HTTPException(status_code=422, detail="Pass since=<version> (0 for the full history)")
+        since = int(last_event_id)
+    
+    async def events():
+        version = since
+        data_service.availability.refresh()
+        if version > data_service.availability.version:
+            # The client's version is from another history (e.g. the store was reset): resync
+            yield f"event: reset\ndata: {json.dumps({'version': data_service.availability.version})}\n\n"
+            return
+        waited = 0.0
+        idle = 0.0
+        while waited <= AVAILABILITY_STREAM_TIMEOUT_SECONDS:
+            if await request.is_disconnected():
+                return
+            changes = data_service.get_availability_changes(version, AVAILABILITY_EVENT_MAX_CHANGES)
+            if changes:
+                version = changes[-1]["version"]
+                payload = {"version": version, "changes": changes}
+                yield f"id: {version}\nevent: changes\ndata: {json.dumps(payload, default=str)}\n\n"
+                idle = 0.0
+                # More changes may be waiting beyond the per-event cap
+                if len(changes) == AVAILABILITY_EVENT_MAX_CHANGES:
+                    continue
+            elif idle >= AVAILABILITY_HEARTBEAT_SECONDS:
+                yield ": heartbeat\n\n"
+                idle = 0.0
+            await asyncio.sleep(AVAILABILITY_STREAM_POLL_SECONDS)
+            waited += AVAILABILITY_STREAM_POLL_SECONDS
+            idle += AVAILABILITY_STREAM_POLL_SECONDS
+        yield f"event: timeout\ndata: {json.dumps({'version': version})}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @router.get("/search", response_model=BaseResponse)
 async def search_laptops(
     q: Optional[str] = Query(None, description="Search query"),
@@ -101,9 +240,21 @@ async def search_laptops(
     processor: Optional[str] = Query(None, description="Processor filter"),
     memory: Optional[str] = Query(None, description="Memory filter"),
     storage: Optional[str] = Query(None, description="Storage filter"),
-    display: Optional[str] = Query(None, description="Display filter")
+    display: Optional[str] = Query(None, description="Display filter"),
+    min_ram_gb: Optional[float] = Query(None, description="Minimum RAM capacity in GB"),
+    min_storage_gb: Optional[float] = Query(None, description="Minimum SSD size in GB"),
+    min_screen_in: Optional[float] = Query(None, description="Minimum screen size in inches"),
+    max_screen_in: Optional[float] = Query(None, description="Maximum screen size in inches"),
+    max_weight_kg: Optional[float] = Query(None, description="Maximum weight in kg"),
+    min_battery_wh: Optional[float] = Query(None, description="Minimum battery capacity in Wh"),
+    fuzzy: bool = Query(False, description="Tolerate typos in the query (matches brand, model, processor and OS names)"),
+    sort_by: str = Query(RELEVANCE, pattern=f"^({'|'.join((RELEVANCE,) + SORT_FIELDS)})$",
+                         description="relevance (catalog or fuzzy match order) or a spec feature"),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Sort direction; unknown values sort last"),
+    offset: int = Query(0, ge=0, description="Matches to skip"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of laptops (default: all matches)")
 ):
-    """Search and filter laptops"""
+    """Search, filter and sort laptops"""
     try:
         filters = {}
         if brand:
@@ -123,13 +274,54 @@ async def search_laptops(
         if display:
             filters['display'] = display
         
-        results = data_service.search_laptops(q or "", filters)
+        # Numeric spec ranges
+        spec_ranges = {
+            'min_ram_gb': min_ram_gb,
+            'min_storage_gb': min_storage_gb,
+            'min_screen_in': min_screen_in,
+            'max_screen_in': max_screen_in,
+            'max_weight_kg': max_weight_kg,
+            'min_battery_wh': min_battery_wh
+        }
+        filters.update({key: value for key, value in spec_ranges.items() if value is not None})
+        
+        results, total = data_service.search_laptops(q or "", filters, fuzzy=fuzzy, sort_by=sort_by,
+                                                     sort_order=sort_order, offset=offset, limit=limit)
         
         return BaseResponse(data={
-            "laptops": results,
+            "laptops": [laptop.to_dict() for laptop in results],
             "count": len(results),
+            "total": total,
+            "offset": offset,
+            "sort_by": sort_by,
+            "sort_order": sort_order,
             "filters_applied": filters,
-            "query": q
+            "query": q,
+            "fuzzy": fuzzy
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/batch", response_model=BaseResponse)
+async def get_laptops_batch(
+    ids: Optional[List[str]] = Query(None, description="Laptop IDs, comma-separated (ids=1,2,3) or repeated (ids=1&ids=2)")
+):
+    """Get several laptops in one request, in the order asked for"""
+    try:
+        laptop_ids = [int(part) for value in ids or [] for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be integers")
+    if not laptop_ids:
+        raise HTTPException(status_code=422, detail="ids must name at least one laptop")
+    if len(laptop_ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=422, detail=f"At most {BATCH_MAX_IDS} ids per request")
+    
+    try:
+        laptops, missing = data_service.get_laptops_by_ids(laptop_ids)
+        return BaseResponse(data={
+            "laptops": [laptop.to_dict() for laptop in laptops],
+            "count": len(laptops),
+            "missing": missing
         })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -3,7 +3,7 @@
 # Unauthorized copying, distribution, or use is strictly prohibited.
 
 from fastapi import APIRouter, HTTPException, Path, Query
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import json
 import math
 from services.recommendation_service import recommendation_service
@@ -94,21 +94,12 @@ async def get_budget_recommendations(max_price: float = Path(..., description="M
         
         recommendations = recommendation_service.get_constraint_based_recommendations(constraints)
         
-        # Sort by value (rating/price ratio)
+        # Sort by value (match score / price) using the parsed price array
+        data_service = recommendation_service.data_service
+        prices = data_service.feature_array('price')
         for rec in recommendations:
-            try:
-                price_detail = rec['price_details']
-                if isinstance(price_detail, str):
-                    import ast
-                    price_dict = ast.literal_eval(price_detail)
-                    current_price = price_dict.get('Current Price', 'Not Available')
-                    if current_price != 'Not Available':
-                        price_str = str(current_price).replace('$', '').replace(',', '')
-                        if price_str.replace('.', '').isdigit():
-                            price = float(price_str)
-                            rec['value_score'] = rec['match_score'] / price if price > 0 else 0
-            except:
-                rec['value_score'] = 0
+            price = prices[data_service.row_for_id(rec['laptop_id'])]
+            rec['value_score'] = rec['match_score'] / price if price > 0 else 0
         
         recommendations.sort(key=lambda x: x.get('value_score', 0), reverse=True)
         
@@ -120,6 +111,41 @@ async def get_budget_recommendations(max_price: float = Path(..., description="M
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/best-value", response_model=BaseResponse)
+async def get_best_value_laptops(
+    max_price: Optional[float] = Query(None, description="Maximum price"),
+    min_price: Optional[float] = Query(None, description="Minimum price"),
+    brand: Optional[str] = Query(None, description="Brand filter"),
+    min_rating: Optional[float] = Query(None, description="Minimum rating"),
+    criteria: Optional[str] = Query(None, description="Comma-separated criteria, e.g. price,rating,ram_capacity_gb"),
+    limit: int = Query(20, ge=1, le=500, description="Number of results")
+):
+    """Get the Pareto frontier: laptops that no other laptop beats on every criterion"""
+    try:
+        filters = {
+            'max_price': max_price,
+            'min_price': min_price,
+            'brand': brand,
+            'min_rating': min_rating
+        }
+        filters = {key: value for key, value in filters.items() if value is not None}
+        criteria_list = [c.strip() for c in criteria.split(',') if c.strip()] if criteria else None
+        
+        result = recommendation_service.get_pareto_frontier(filters, criteria_list, limit)
+        
+        return BaseResponse(data={
+            "filters": filters,
+            "criteria": result['criteria'],
+            "recommendations": result['frontier'],
+            "count": len(result['frontier']),
+            "frontier_size": result['frontier_size'],
+            "candidates": result['candidates']
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/brand/{brand}", response_model=BaseResponse)
 async def get_brand_recommendations(brand: str = Path(..., description="Brand name")):
     """Get recommendations for a specific brand"""
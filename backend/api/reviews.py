@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
 from typing import List, Dict, Any, Optional
 from services.data_service import data_service
+from services.review_theme_service import review_theme_service
 from models.schemas import BaseResponse
 
 router = APIRouter()
@@ -13,7 +15,7 @@ async def get_all_reviews():
         
         # Extract review data from laptops
         reviews = []
-        for i, laptop in enumerate(laptops):
+        for laptop in laptops:
             # Parse rating from Review Details
             overall_rating = '0'
             try:
@@ -29,7 +31,7 @@ async def get_all_reviews():
                 pass
             
             review_data = {
-                "laptop_id": i,
+                "laptop_id": laptop['laptop_id'],
                 "brand": laptop.get('Brand', 'Unknown'),
                 "model": laptop.get('Model', 'Unknown'),
                 "overall_rating": overall_rating,
@@ -124,26 +126,14 @@ async def get_rating_trends(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/top-themes", response_model=BaseResponse)
-async def get_top_themes(brand: str = Query("all", description="Brand filter")):
-    """Get top review themes"""
+async def get_top_themes(
+    brand: str = Query("all", description="Brand filter"),
+    limit: int = Query(8, ge=1, le=50, description="Number of themes")
+):
+    """Get top review themes from the aspect index"""
     try:
-        import random
-        # Generate themes data
-        themes = [
-            {"theme": "Performance", "count": 245, "sentiment": "positive", "sentiment_score": 4.2},
-            {"theme": "Battery Life", "count": 189, "sentiment": "neutral", "sentiment_score": 3.8},
-            {"theme": "Build Quality", "count": 167, "sentiment": "positive", "sentiment_score": 4.1},
-            {"theme": "Display Quality", "count": 156, "sentiment": "positive", "sentiment_score": 4.3},
-            {"theme": "Price Value", "count": 134, "sentiment": "neutral", "sentiment_score": 3.6},
-            {"theme": "Portability", "count": 123, "sentiment": "positive", "sentiment_score": 4.0},
-            {"theme": "Keyboard", "count": 98, "sentiment": "positive", "sentiment_score": 3.9},
-            {"theme": "Trackpad", "count": 87, "sentiment": "neutral", "sentiment_score": 3.7}
-        ]
-        
-        if brand != "all":
-            # Adjust counts for specific brand
-            for theme in themes:
-                theme["count"] = int(theme["count"] * random.uniform(0.4, 0.9))
+        # Aggregation (and a first-use index build) is blocking work; keep it off the event loop
+        themes = await run_in_threadpool(review_theme_service.get_top_themes, brand, limit)
         
         return BaseResponse(data=themes)
     except Exception as e:
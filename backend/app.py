@@ -3,7 +3,9 @@
 # Unauthorized copying, distribution, or use is strictly prohibited.
 
 import os
+import threading
 from fastapi import FastAPI, HTTPException, Depends, Query, Path
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
@@ -20,6 +22,11 @@ from api.chat import router as chat_router
 from api.recommendations import router as recommendations_router
 from api.explore import router as explore_router
 from api.reviews import router as reviews_router
+from api.admin import router as admin_router
+from services.llm_service import llm_service
+from services.review_theme_service import review_theme_service
+from services.semantic_index import semantic_index
+from services.memory_profiler import MemoryProfilerMiddleware
 
 # Import models
 from models.schemas import HealthResponse, APIInfoResponse, ErrorResponse
@@ -42,11 +49,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Samples requests into the memory profiler while tracemalloc is tracing (admin routes excluded)
+app.add_middleware(MemoryProfilerMiddleware, exclude_prefixes=("/api/v1/admin",))
+
 # Include routers
 app.include_router(chat_router, prefix="/api/v1/chat", tags=["chat"])
 app.include_router(recommendations_router, prefix="/api/v1/recommendations", tags=["recommendations"])
 app.include_router(explore_router, prefix="/api/v1/explore", tags=["explore"])
 app.include_router(reviews_router, prefix="/api/v1/reviews", tags=["reviews"])
+app.include_router(admin_router, prefix="/api/v1/admin", tags=["admin"])
+
+@app.on_event("startup")
+async def load_indexes():
+    """Load (or build) the review theme and semantic search indexes before serving, off the event loop"""
+    await run_in_threadpool(review_theme_service.ensure_index)
+    await run_in_threadpool(semantic_index.ensure_index)
+
+@app.on_event("startup")
+async def warm_llm_cache():
+    """Answer the most frequent logged questions for this catalog version in the background.
+    
+    By default this runs only when the catalog version has no warm answers yet (a new
+    catalog or a first start); LLM_CACHE_WARM_ON_START=true warms on every start and
+    false never does.
+    """
+    mode = os.getenv('LLM_CACHE_WARM_ON_START', 'auto').lower()
+    if mode in ('0', 'false', 'no'):
+        return
+    if mode in ('1', 'true', 'yes') or not llm_service.cache_is_warm():
+        threading.Thread(target=llm_service.warm_cache, name="llm-cache-warm", daemon=True).start()
+
+@app.on_event("shutdown")
+async def flush_query_log():
+    llm_service.query_log.flush()
 
 @app.get("/api/v1/health", response_model=HealthResponse)
 async def health_check():
@@ -74,7 +109,8 @@ async def http_exception_handler(request, exc):
             error=exc.detail,
             detail=f"HTTP {exc.status_code} error",
             timestamp=datetime.now().isoformat()
-        ).dict()
+        ).dict(),
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(Exception)
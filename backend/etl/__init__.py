@@ -0,0 +1,3 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
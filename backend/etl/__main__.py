@@ -0,0 +1,29 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import argparse
+import time
+
+from etl.pipeline import Pipeline
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the laptop catalog CSV from the scraped data and spec sheets")
+    parser.add_argument('--source-dir', default=None, help="Directory holding the scraped CSVs (default: 'data prep')")
+    parser.add_argument('--pdf-dir', default=None, help="Spec-sheet PDFs (default: <source-dir>/spec_sheets)")
+    parser.add_argument('--output', default=None, help="Catalog CSV (default: data/processed/laptop_info_cleaned.csv)")
+    parser.add_argument('--cache-dir', default=None, help="Stage cache (default: <output dir>/etl_cache)")
+    parser.add_argument('--workers', type=int, default=None, help="Parallel readers / PDF converters")
+    parser.add_argument('--force', action='store_true', help="Rebuild every stage even if its inputs are unchanged")
+    args = parser.parse_args()
+
+    started = time.time()
+    pipeline = Pipeline(args.source_dir, args.output, args.pdf_dir, args.cache_dir, args.workers)
+    try:
+        reports = pipeline.run(force=args.force)
+    except (OSError, RuntimeError) as e:
+        parser.exit(1, f"ETL failed: {e}\n")
+
+    for report in reports:
+        print(f"{report['stage']:<8} {report['status']:<7} rows={report['rows']}  {report['seconds']:.3f}s")
+    print(f"Catalog {pipeline.output_path} up to date in {time.time() - started:.2f}s")
@@ -0,0 +1,220 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Incremental ETL pipeline that builds the catalog CSV the backend loads.
+
+Replaces the data-prep notebooks with three stages:
+
+    store    AI_scraped_data_{4,hp,len}.csv -> laptop_store_info.csv
+    specs    spec-sheet PDFs (or the checked-in laptop_tech_specs.csv) -> laptop_tech_specs.csv
+    catalog  store + specs, outer-joined on Brand/Model -> data/processed/laptop_info_cleaned.csv
+
+Each stage is keyed by a hash of its input files and its code version and is
+skipped when the key matches the cache manifest and its output is intact.
+Source files are read in parallel and PDF conversion runs in a process pool,
+with converted markdown cached per PDF content hash.
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from etl.spec_extraction import PARSER_VERSION, convert_pdf_to_markdown, specs_to_dataframe
+from utils.helpers import text_hash
+
+# Bump when a stage's transformation changes so its cached output is rebuilt
+STORE_STAGE_VERSION = 1
+CATALOG_STAGE_VERSION = 1
+MANIFEST_VERSION = 1
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Scraped store exports; the supplementary HP/Lenovo exports carry no availability column
+STORE_SOURCES = (
+    ('AI_scraped_data_4.csv', None),
+    ('AI_scraped_data_hp.csv', 'Available'),
+    ('AI_scraped_data_len.csv', 'Available'),
+)
+SPECS_FALLBACK = 'laptop_tech_specs.csv'
+JOIN_KEYS = ['Brand', 'Model']
+MISSING = '-'
+
+
+def file_digest(path: str) -> str:
+    """Content hash of a file, read in 1 MB blocks"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_csv(df: pd.DataFrame, path: str):
+    """Write atomically so the backend never reads a half-written file"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def build_store_info(paths: Sequence[str], availability: Sequence[Optional[str]],
+                     max_workers: int = None) -> pd.DataFrame:
+    """Concatenate the scraped store exports (scraped_data_prep notebook)"""
+    with ThreadPoolExecutor(max_workers=max_workers or len(paths)) as pool:
+        frames = list(pool.map(pd.read_csv, paths))
+    for frame, value in zip(frames, availability):
+        if value is not None:
+            frame['Availability'] = value
+    return pd.concat(frames, ignore_index=True).fillna(MISSING)
+
+
+def build_catalog(store: pd.DataFrame, specs: pd.DataFrame) -> pd.DataFrame:
+    """Join store info with tech specs (data_modelling notebook), ordered by brand and model"""
+    specs = specs.copy()
+    is_hp = specs['Brand'] == 'HP'
+    # Spec sheets name HP models "HP ProBook ..."; the store drops the brand
+    specs.loc[is_hp, 'Model'] = specs.loc[is_hp, 'Model'].str.replace('^HP ', '', regex=True)
+    merged = pd.merge(store, specs, on=JOIN_KEYS, how='outer').fillna(MISSING)
+    return merged.sort_values(JOIN_KEYS, kind='stable').reset_index(drop=True)
+
+
+class Pipeline:
+    """Runs the ETL stages, skipping any whose inputs are unchanged since the last run"""
+
+    def __init__(self, source_dir: str = None, output_path: str = None, pdf_dir: str = None,
+                 cache_dir: str = None, workers: int = None):
+        self.source_dir = source_dir or os.getenv('ETL_SOURCE_DIR') or os.path.join(ROOT_DIR, 'data prep')
+        self.output_path = output_path or os.getenv('ETL_OUTPUT_PATH') or os.path.join(
+            ROOT_DIR, 'data', 'processed', 'laptop_info_cleaned.csv'
+        )
+        self.pdf_dir = pdf_dir or os.path.join(self.source_dir, 'spec_sheets')
+        self.cache_dir = cache_dir or os.getenv('ETL_CACHE_DIR') or os.path.join(
+            os.path.dirname(self.output_path), 'etl_cache'
+        )
+        self.workers = workers
+        self.manifest = self._load_manifest()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.cache_dir, 'manifest.json')
+
+    def cache_path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('format') == MANIFEST_VERSION:
+                return manifest
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Warning: ignoring unreadable ETL manifest {self.manifest_path}: {e}")
+        return {'format': MANIFEST_VERSION, 'stages': {}}
+
+    def _save_manifest(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _is_fresh(self, stage: str, key: str, output: str) -> bool:
+        entry = self.manifest['stages'].get(stage)
+        return bool(entry) and entry.get('key') == key and os.path.exists(output) \
+            and file_digest(output) == entry.get('output_digest')
+
+    def _run_stage(self, stage: str, key: str, output: str, build: Callable[[], pd.DataFrame],
+                   force: bool) -> Dict[str, Any]:
+        started = time.time()
+        if not force and self._is_fresh(stage, key, output):
+            entry = self.manifest['stages'][stage]
+            return {'stage': stage, 'status': 'cached', 'rows': entry.get('rows'),
+                    'seconds': round(time.time() - started, 3)}
+
+        df = build()
+        write_csv(df, output)
+        self.manifest['stages'][stage] = {
+            'key': key,
+            'output': output,
+            'output_digest': file_digest(output),
+            'rows': len(df),
+            'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        }
+        return {'stage': stage, 'status': 'built', 'rows': len(df), 'seconds': round(time.time() - started, 3)}
+
+    def store_stage(self, force: bool = False) -> Dict[str, Any]:
+        paths = [os.path.join(self.source_dir, name) for name, _ in STORE_SOURCES]
+        key = text_hash(STORE_STAGE_VERSION, *(file_digest(p) for p in paths))
+        return self._run_stage(
+            'store', key, self.cache_path('laptop_store_info.csv'),
+            lambda: build_store_info(paths, [value for _, value in STORE_SOURCES], self.workers),
+            force
+        )
+
+    def spec_pdfs(self) -> List[str]:
+        if not os.path.isdir(self.pdf_dir):
+            return []
+        return sorted(
+            os.path.join(self.pdf_dir, name) for name in os.listdir(self.pdf_dir) if name.lower().endswith('.pdf')
+        )
+
+    def _markdown_for(self, pdfs: List[str], digests: List[str]) -> List[str]:
+        """Markdown per PDF, converting only PDFs whose content has not been seen before"""
+        markdown_dir = self.cache_path('markdown')
+        os.makedirs(markdown_dir, exist_ok=True)
+        cached = [os.path.join(markdown_dir, digest + '.md') for digest in digests]
+        missing = [i for i, path in enumerate(cached) if not os.path.exists(path)]
+
+        if missing:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                converted = pool.map(convert_pdf_to_markdown, [pdfs[i] for i in missing])
+                for i, markdown in zip(missing, converted):
+                    with open(cached[i], 'w', encoding='utf-8') as f:
+                        f.write(markdown)
+
+        texts = []
+        for path in cached:
+            with open(path, 'r', encoding='utf-8') as f:
+                texts.append(f.read())
+        return texts
+
+    def specs_stage(self, force: bool = False) -> Dict[str, Any]:
+        pdfs = self.spec_pdfs()
+        if pdfs:
+            digests = [file_digest(p) for p in pdfs]
+            key = text_hash('pdf', PARSER_VERSION, *digests)
+            build = lambda: specs_to_dataframe(list(zip(pdfs, self._markdown_for(pdfs, digests))))
+        else:
+            # No spec sheets on disk: the previously extracted table is the stage input
+            fallback = os.path.join(self.source_dir, SPECS_FALLBACK)
+            key = text_hash('csv', file_digest(fallback))
+            build = lambda: pd.read_csv(fallback)
+        return self._run_stage('specs', key, self.cache_path('laptop_tech_specs.csv'), build, force)
+
+    def catalog_stage(self, force: bool = False) -> Dict[str, Any]:
+        store_path = self.cache_path('laptop_store_info.csv')
+        specs_path = self.cache_path('laptop_tech_specs.csv')
+        key = text_hash(CATALOG_STAGE_VERSION, file_digest(store_path), file_digest(specs_path))
+        return self._run_stage(
+            'catalog', key, self.output_path,
+            lambda: build_catalog(pd.read_csv(store_path), pd.read_csv(specs_path)),
+            force
+        )
+
+    def run(self, force: bool = False) -> List[Dict[str, Any]]:
+        """Run every stage; store and specs are independent and run concurrently"""
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            store = pool.submit(self.store_stage, force)
+            specs = pool.submit(self.specs_stage, force)
+            reports = [store.result(), specs.result()]
+        reports.append(self.catalog_stage(force))
+        self._save_manifest()
+        return reports
@@ -0,0 +1,420 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Spec-sheet extraction: PDF -> markdown (docling) -> canonical spec record.
+
+Ported from the pdf_extraction notebook. The parsers are unchanged; PDF
+conversion needs the optional `docling` package, which is only imported
+when a PDF actually has to be converted.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+# Bump when the parsers change so cached spec tables are rebuilt
+PARSER_VERSION = 1
+
+CANON_COLUMNS = [
+    "Brand", "Model", "Processor", "Operating System", "Graphics", "Chipset", "Memory (RAM)", "Storage", "Display",
+    "External Monitor Support", "Audio", "Camera", "Input Devices", "Dimensions & Weight", "Case / Chassis", "Ports",
+    "Card Reader", "Wireless Networking", "Wired Networking", "Mobile Broadband", "Docking", "Battery", "Power Adapter",
+    "Biometric Security", "General Security", "Software & Management", "Warranty", "Environmental & Durability Standards"
+]
+
+
+def normalize_space(text: str) -> str:
+    return re.sub(r'\s+', ' ', text.strip()) if text else text
+
+
+def normalize_key(key: str) -> str:
+    return re.sub(r'[^a-z0-9]+', ' ', key.lower()).strip()
+
+
+def dedup_join(parts: List[str], sep='\n') -> str:
+    seen = set()
+    out = []
+    for p in parts:
+        p_strip = p.strip()
+        if not p_strip or p_strip in seen:
+            continue
+        seen.add(p_strip)
+        out.append(p_strip)
+    return sep.join(out).strip()
+
+
+def safe_append(target: Dict[str, str], key: str, value: str, sep='\n'):
+    if not value:
+        return
+    if key not in target or not target[key].strip():
+        target[key] = value.strip()
+    elif value.strip() not in target[key]:
+        target[key] = target[key].rstrip() + sep + value.strip()
+
+
+def extract_table_blocks(markdown_text: str) -> List[str]:
+    tables = []
+    current = []
+    in_table = False
+    for ln in markdown_text.splitlines():
+        if '|' in ln:
+            current.append(ln)
+            in_table = True
+        elif in_table:
+            if len(current) >= 2:
+                tables.append('\n'.join(current))
+            current = []
+            in_table = False
+    if in_table and len(current) >= 2:
+        tables.append('\n'.join(current))
+    return tables
+
+
+def parse_simple_key_value_table(table_md: str) -> List[Tuple[str, str]]:
+    """Parse 2+ column markdown tables into (key, value) pairs, skipping only separator lines"""
+    rows = []
+    lines = [l for l in table_md.split('\n') if l.strip()]
+    if not lines:
+        return rows
+
+    sep_re = re.compile(r'^\|(?:\s*-+\s*\|)+\s*$')
+    for ln in lines:
+        if sep_re.match(ln):
+            continue
+        parts = [c.strip() for c in ln.strip().strip('|').split('|')]
+        if len(parts) < 2:
+            continue
+        key = parts[0]
+        value = ' | '.join(parts[1:]).strip()
+        if key and value:
+            rows.append((key, value))
+
+    # Single-row tables (e.g. HP 'Available Operating Systems')
+    if not rows:
+        parts = [c.strip() for c in lines[0].strip().strip('|').split('|')]
+        if len(parts) >= 2:
+            rows.append((parts[0], ' | '.join(parts[1:]).strip()))
+    return rows
+
+
+LENOVO_PATTERNS = {
+    "Processor": ["processor"],
+    "Operating System": ["operating system"],
+    "Graphics": ["graphics"],
+    "Chipset": ["chipset"],
+    "Memory (RAM)": ["max memory", "memory slots", "memory type", "memory"],
+    "Storage": ["max storage support", "storage slot", "storage type", "storage"],
+    "Display": ["display"],
+    "External Monitor Support": ["monitor support"],
+    "Audio": ["audio chip", "speakers", "microphone"],
+    "Camera": ["camera"],
+    "Input Devices": ["keyboard", "keyboard backlight", "ultranav", "pen"],
+    "Dimensions & Weight": ["dimensions", "weight"],
+    "Ports": ["standard ports", "ports"],
+    "Wireless Networking": ["wlan + bluetooth", "wlan", "bluetooth"],
+    "Wired Networking": ["ethernet"],
+    "Docking": ["docking"],
+    "Battery": ["battery"],
+    "Power Adapter": ["power adapter"],
+    "Biometric Security": ["fingerprint"],
+    "General Security": ["security chip", "physical locks", "bios security", "other security"],
+    "Software & Management": ["system management"],
+    "Warranty": ["base warranty"],
+    "Environmental & Durability Standards": ["green certifications", "mil spec test", "sustainability"]
+}
+
+
+def extract_headings_lenovo(md: str) -> List[Dict]:
+    pattern = re.compile(r'^(#{1,6})\s+(.+?)\s*$', re.MULTILINE)
+    headings = []
+    for m in pattern.finditer(md):
+        title = m.group(2).strip()
+        line_end = md.find('\n', m.end())
+        headings.append({
+            'level': len(m.group(1)),
+            'raw': title,
+            'norm': normalize_key(title),
+            'start': m.start(),
+            'content_start': len(md) if line_end == -1 else line_end + 1
+        })
+    for i, h in enumerate(headings):
+        h['content_end'] = headings[i + 1]['start'] if i < len(headings) - 1 else len(md)
+        h['content'] = md[h['content_start']:h['content_end']].strip()
+    return headings
+
+
+def parse_lenovo(md: str) -> Dict[str, str]:
+    headings = extract_headings_lenovo(md)
+    data = {c: '' for c in CANON_COLUMNS}
+    data['Brand'] = 'Lenovo'
+    model = ''
+    for candidate in re.findall(r'^(?:#+\s*)?(ThinkPad[^\n]{0,80})$', md, flags=re.MULTILINE | re.IGNORECASE):
+        if re.search(r'gen\s*\d', candidate, re.I):
+            model = normalize_space(candidate)
+            break
+    data['Model'] = re.sub(r'(?i)thinkpad', 'ThinkPad', model)
+
+    for field, pats in LENOVO_PATTERNS.items():
+        blocks = []
+        for h in headings:
+            if any(p in h['norm'] for p in pats):
+                txt = f"{h['raw']}\n{h['content']}".strip()
+                if txt:
+                    blocks.append(txt)
+        if blocks:
+            data[field] = dedup_join(blocks, '\n\n')
+
+    parts = []
+    for label in ('Case Color', 'Case Material'):
+        match = re.search(label + r'[\s\S]*?(?:\n##|$)', md)
+        if match:
+            parts.append(match.group(0).strip())
+    data['Case / Chassis'] = dedup_join(parts)
+
+    m_card = re.search(r'Card Reader\n([^\n]+)', md)
+    if m_card:
+        data['Card Reader'] = m_card.group(1).strip()
+
+    m_wwan = re.search(r'WWAN\n([^\n]+)', md)
+    if m_wwan:
+        data['Mobile Broadband'] = m_wwan.group(1).strip()
+
+    if 'ir camera' in md.lower():
+        safe_append(data, 'Biometric Security', 'Optional IR camera (Windows Hello)')
+
+    if not data['External Monitor Support'] and data['Ports']:
+        if re.search(r'hdmi|displayport|usb-c', data['Ports'], re.I):
+            data['External Monitor Support'] = 'External display via HDMI / USB-C (DisplayPort)'
+
+    return data
+
+
+HP_KEY_MAP = {
+    'available operating systems': ('Operating System', None),
+    'processor family': ('Processor', 'family'),
+    'available processors': ('Processor', 'models'),
+    'maximummemory': ('Memory (RAM)', 'max'),
+    'memoryslots': ('Memory (RAM)', 'slots'),
+    'memory slots': ('Memory (RAM)', 'slots'),
+    'internal storage': ('Storage', 'internal'),
+    'display size diagonal metric': ('Display', 'size'),
+    'display': ('Display', 'panels'),
+    'available graphics': ('Graphics', None),
+    'audio': ('Audio', None),
+    'ports and connectors': ('Ports', None),
+    'input devices': ('Input Devices', None),
+    'communications': ('_communications', None),
+    'camera': ('Camera', None),
+    'software': ('Software & Management', 'software'),
+    'securitymanagement': ('General Security', 'mgmt'),
+    'security management': ('General Security', 'mgmt'),
+    'security software licenses': ('Software & Management', 'licenses'),
+    'fingerprint reader': ('Biometric Security', 'fingerprint'),
+    'management features': ('Software & Management', 'mgmtfeatures'),
+    'memorycarddevice': ('Card Reader', None),
+    'memory card device': ('Card Reader', None),
+    'power': ('Power Adapter', None),
+    'battery type': ('Battery', None),
+    'dimensions': ('Dimensions & Weight', 'dims'),
+    'weight': ('Dimensions & Weight', 'weight'),
+    'ecolabels': ('Environmental & Durability Standards', 'ecolabels'),
+    'energy star certified': ('Environmental & Durability Standards', 'energystar'),
+    'certification and compliance': ('Environmental & Durability Standards', 'compliance'),
+    'sustainable impact specifications': ('Environmental & Durability Standards', 'sustainability'),
+    'warranty': ('Warranty', None)
+}
+
+
+def _resolve_hp_key(raw_key: str):
+    nkey = normalize_key(raw_key)
+    # Trailing footnote numbers ("processor family 5"), then any standalone numbers
+    footnote_stripped = re.sub(r'(?:\b\d+\b[ ,]*)+$', '', nkey).strip()
+    no_digits = re.sub(r'\b\d+\b', '', footnote_stripped).strip()
+    for candidate in (nkey, footnote_stripped, no_digits):
+        if candidate in HP_KEY_MAP:
+            return candidate
+    for map_key in HP_KEY_MAP:
+        if no_digits.startswith(map_key):
+            return map_key
+    return None
+
+
+def parse_hp(md: str) -> Dict[str, str]:
+    data = {c: '' for c in CANON_COLUMNS}
+    data['Brand'] = 'HP'
+    model_match = re.search(r'^(?:#+\s*)?(HP\s+ProBook[^\n]{0,80})$', md, flags=re.MULTILINE)
+    if model_match:
+        data['Model'] = normalize_space(model_match.group(1))
+
+    kv_pairs = []
+    for tbl in extract_table_blocks(md):
+        kv_pairs.extend(parse_simple_key_value_table(tbl))
+
+    tmp_store = {
+        'Processor': {},
+        'Memory (RAM)': {},
+        'Display': {},
+        'Dimensions & Weight': {},
+        'Environmental & Durability Standards': {},
+        'Software & Management': {}
+    }
+    communications_raw = []
+
+    for raw_key, raw_val in kv_pairs:
+        resolved_key = _resolve_hp_key(raw_key)
+        if not resolved_key:
+            continue
+
+        # Spacing fixes for jammed alphanumerics
+        val_clean = re.sub(r'(?<=\d)(?=[A-Za-z])', ' ', raw_val.strip())
+        val_clean = re.sub(r'(?<=[a-zA-Z])(?=\d)', ' ', val_clean)
+
+        canon, sub = HP_KEY_MAP[resolved_key]
+        if canon == '_communications':
+            communications_raw.append(val_clean)
+        elif sub:
+            tmp_store.setdefault(canon, {})[sub] = val_clean
+        elif canon in tmp_store:
+            tmp_store[canon]['main'] = val_clean
+        else:
+            safe_append(data, canon, val_clean)
+
+    processor = tmp_store['Processor']
+    if processor:
+        parts = []
+        if processor.get('family'):
+            parts.append('Family: ' + processor['family'])
+        if processor.get('models'):
+            parts.append('Models: ' + processor['models'])
+        data['Processor'] = dedup_join(parts)
+
+    memory = tmp_store['Memory (RAM)']
+    if memory:
+        parts = []
+        if 'max' in memory:
+            parts.append('Maximum: ' + memory['max'])
+        if 'slots' in memory:
+            parts.append('Slots: ' + memory['slots'])
+        data['Memory (RAM)'] = dedup_join(parts)
+
+    if data['Storage']:
+        data['Storage'] = data['Storage'].replace('internal storage', 'Internal Storage:')
+
+    display = tmp_store['Display']
+    if display:
+        parts = []
+        if 'size' in display:
+            parts.append('Size: ' + display['size'])
+        if 'panels' in display:
+            parts.append('Options: ' + display['panels'])
+        data['Display'] = dedup_join(parts)
+
+    dimensions = tmp_store['Dimensions & Weight']
+    if dimensions:
+        parts = []
+        if 'dims' in dimensions:
+            parts.append('Dimensions: ' + dimensions['dims'])
+        if 'weight' in dimensions:
+            parts.append('Weight: ' + dimensions['weight'])
+        data['Dimensions & Weight'] = dedup_join(parts)
+
+    env_map = tmp_store['Environmental & Durability Standards']
+    if env_map:
+        label_map = {
+            'ecolabels': 'Ecolabels',
+            'energystar': 'Energy Star',
+            'compliance': 'Compliance',
+            'sustainability': 'Sustainability'
+        }
+        parts = [f"{label}: {env_map[k]}" for k, label in label_map.items() if k in env_map]
+        if re.search(r'MIL-STD', md, re.I):
+            parts.append('MIL-STD Tested (marketing claim)')
+        data['Environmental & Durability Standards'] = dedup_join(parts)
+
+    sm = tmp_store['Software & Management']
+    if sm:
+        parts = []
+        if 'software' in sm:
+            parts.append('Software: ' + sm['software'])
+        if 'licenses' in sm:
+            parts.append('Security Licenses: ' + sm['licenses'])
+        if 'mgmtfeatures' in sm:
+            parts.append('Management Features: ' + sm['mgmtfeatures'])
+        data['Software & Management'] = dedup_join(parts)
+
+    if communications_raw:
+        comm_text = ' '.join(communications_raw)
+        wireless_matches = re.findall(r'(Wi-?Fi[^;]+Bluetooth[^;]+|Wi-?Fi[^;]+)', comm_text, flags=re.I)
+        if wireless_matches:
+            safe_append(data, 'Wireless Networking', dedup_join([normalize_space(w) for w in wireless_matches]))
+        if re.search(r'rj-?45', comm_text, re.I):
+            safe_append(data, 'Wired Networking', 'RJ-45 Ethernet (Gigabit)')
+        if re.search(r'LTE|WWAN|Cat-?M1|Cat16|5G', comm_text, re.I):
+            lte_part = ' '.join(re.findall(r'(?:Qualcomm|LTE|WWAN|Cat-?M1|4G\s*LTE|Cat16)[^;]*', comm_text, flags=re.I))
+            safe_append(data, 'Mobile Broadband', normalize_space(lte_part))
+
+    # External monitor support inferred from the ports
+    if data['Ports']:
+        ext_parts = []
+        if re.search(r'HDMI\s*2\.1', data['Ports'], re.I):
+            ext_parts.append('HDMI 2.1')
+        if re.search(r'DisplayPort', data['Ports'], re.I):
+            ext_parts.append('DisplayPort 1.4 over USB-C')
+        if ext_parts:
+            data['External Monitor Support'] = dedup_join(ext_parts, '; ')
+
+    if re.search(r'5 ?MP\s*IR', md, re.I):
+        safe_append(data, 'Biometric Security', 'Optional 5MP IR Camera (Windows Hello)')
+
+    chassis_sentences = re.findall(r'[^\n.]*aluminum[^\n.]*[\.]?', md, flags=re.I)
+    if chassis_sentences:
+        data['Case / Chassis'] = dedup_join([normalize_space(s) for s in chassis_sentences], ' ')
+
+    if re.search(r'universal docking solution', md, re.I):
+        data['Docking'] = 'Supports universal USB-C docking (two multifunction USB-C ports)'
+    elif 'USB' in data['Ports']:
+        safe_append(data, 'Docking', 'USB-C multi-function ports (PD/DP) enable docking')
+
+    if data['Card Reader'] and 'nano sim' in data['Card Reader'].lower():
+        data['Card Reader'] = data['Card Reader'] + ' (Nano SIM / WWAN option)'
+
+    return data
+
+
+def detect_vendor(markdown_text: str) -> str:
+    low = markdown_text.lower()
+    if 'thinkpad' in low or 'lenovo' in low:
+        return 'lenovo'
+    if 'hp probook' in low or re.search(r'\bhp\b', low):
+        return 'hp'
+    return 'unknown'
+
+
+def parse_spec(markdown_text: str, file: str = '') -> Dict[str, str]:
+    """Canonical spec record from one spec sheet's markdown"""
+    vendor = detect_vendor(markdown_text)
+    if vendor == 'lenovo':
+        record = parse_lenovo(markdown_text)
+    elif vendor == 'hp':
+        record = parse_hp(markdown_text)
+    else:
+        raise ValueError(f"Unknown vendor for file {file}")
+    for c in CANON_COLUMNS:
+        record.setdefault(c, '')
+    return record
+
+
+def specs_to_dataframe(markdown_docs: List[Tuple[str, str]]) -> pd.DataFrame:
+    """Spec table from [(file, markdown), ...]"""
+    return pd.DataFrame([parse_spec(md, file) for file, md in markdown_docs], columns=CANON_COLUMNS)
+
+
+def convert_pdf_to_markdown(path: str) -> str:
+    """Markdown export of a spec-sheet PDF; runs in a worker process"""
+    try:
+        from docling.document_converter import DocumentConverter
+    except ImportError as e:
+        raise RuntimeError("Converting spec PDFs requires the docling package (pip install docling)") from e
+    return DocumentConverter().convert(path).document.export_to_markdown()
@@ -0,0 +1,240 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Array-backed laptop records.
+
+A `LaptopCatalog` reads the loaded catalog straight from the DataFrame's
+column arrays (views, so the records add no copy of the data) and derives
+the display fields (`processor`, `memory`, ...) on read; only the defaults
+for missing spec cells are stored. A `Laptop` is a slotted view of one row:
+reading a field indexes the column, so passing laptops around allocates
+nothing but the field value. The nested `price_details` and
+`review_details` dicts are parsed from their column text the first time any
+view asks for them and then shared by every view of the row, so treat them
+as read-only.
+
+A `Laptop` behaves like the record dicts services used to pass around
+(`laptop['Brand']`, `laptop.get('price_details', {})`, iteration in the API
+field order). Values assigned to a view (`laptop['semantic_score'] = ...`)
+stay on that view. `to_dict()` builds the JSON-ready dict at the API edge.
+"""
+
+import ast
+import math
+from collections.abc import MutableMapping
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.helpers import is_missing, parse_review_details
+
+# Display fields derived from the parsed spec summaries, with the raw column they fall back to
+_SUMMARY_FIELDS = (('processor', 'Processor'), ('memory', 'Memory (RAM)'), ('storage', 'Storage'),
+                   ('display', 'Display'))
+
+
+def _clean(value: Any) -> Any:
+    """NaN and infinities as None, recursively (they are not valid JSON)"""
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    if isinstance(value, dict):
+        return {key: _clean(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clean(item) for item in value]
+    return value
+
+
+def _cell(values: np.ndarray, row: int) -> Any:
+    """One column value as a plain Python object (numpy scalars unboxed, NaN as None)"""
+    value = values[row]
+    if isinstance(value, np.generic):
+        value = value.item()
+    return _clean(value)
+
+
+_BUSINESS_SPEC_DEFAULTS = {'Memory (RAM)': '8GB DDR4 (upgradeable)', 'Storage': '256GB SSD (upgradeable)',
+                           'Display': '14" FHD IPS'}
+_SPEC_DEFAULTS = {'Memory (RAM)': '8GB DDR4', 'Storage': '256GB SSD', 'Display': '14" FHD'}
+
+
+def _spec_defaults(model: str) -> Dict[str, str]:
+    """Spec text shown when the scraped column is empty"""
+    if 'ThinkPad' in model or 'ProBook' in model:
+        return _BUSINESS_SPEC_DEFAULTS
+    return _SPEC_DEFAULTS
+
+
+def _processor_default(model: str) -> str:
+    if 'AMD' in model:
+        return 'AMD Ryzen (varies by model)'
+    if 'Intel' in model:
+        return 'Intel Core (varies by model)'
+    return 'Intel Core i5'
+
+
+def _price_details_dict(raw: Any) -> Dict[str, Any]:
+    """'Price Details' column text as a dict; a bare price string becomes {'Current Price': text}"""
+    if raw is None:
+        return {"Current Price": None}
+    try:
+        return ast.literal_eval(raw)
+    except Exception:
+        if raw and raw != '-':
+            return {"Current Price": raw}
+        return {"Current Price": "0"}
+
+
+class LaptopCatalog:
+    """Record fields of one loaded catalog, read from the DataFrame's own column arrays"""
+
+    __slots__ = ('size', 'keys', 'ids', 'arrays', 'fields', '_getters', '_nested')
+
+    def __init__(self, df: pd.DataFrame, spec_summaries: Sequence[Dict[str, Optional[str]]],
+                 laptop_keys: Sequence[str], laptop_ids: Sequence[int]):
+        self.size = len(df)
+        self.keys = laptop_keys
+        self.ids = laptop_ids
+        # Views of the DataFrame's column blocks, not copies
+        self.arrays: Dict[str, np.ndarray] = {str(column): df[column].to_numpy() for column in df.columns}
+        arrays = self.arrays
+
+        getters: Dict[str, Callable[[int], Any]] = {
+            column: partial(_cell, values) for column, values in arrays.items()}
+        models = arrays.get('Model')
+
+        def model_text(row: int) -> str:
+            model = None if models is None else _cell(models, row)
+            return '' if model is None else str(model)
+
+        def filled(column: str, default: Callable[[int], Any]) -> Callable[[int], Any]:
+            # Scraped spec text where it exists, the model's default otherwise (derived on read, not stored)
+            values = arrays.get(column)
+            if values is None:
+                return default
+
+            def value(row: int) -> Any:
+                cell = _cell(values, row)
+                return default(row) if is_missing(cell) else cell
+            return value
+
+        if 'Brand' not in arrays:
+            getters['Brand'] = lambda row: 'Unknown'
+        getters['Processor'] = filled('Processor', lambda row: _processor_default(model_text(row)))
+        for column in ('Memory (RAM)', 'Storage', 'Display'):
+            getters[column] = filled(column, lambda row, column=column: _spec_defaults(model_text(row))[column])
+        for column, default in (('Operating System', 'Windows 11'), ('Graphics', 'Integrated')):
+            if column not in arrays:
+                getters[column] = lambda row, default=default: default
+
+        # Field order of the API records: CSV columns, laptop_id, filled-in columns, derived fields
+        fields = list(arrays) + ['laptop_id']
+        fields += [column for column in ('Brand', 'Processor', 'Memory (RAM)', 'Storage', 'Display',
+                                         'Operating System', 'Graphics') if column not in arrays]
+
+        # Display fields prefer the parsed spec summaries
+        for field, column in _SUMMARY_FIELDS:
+            getters[field] = lambda row, field=field, column=getters[column]: \
+                spec_summaries[row][field] or column(row)
+        getters['brand'] = getters['Brand']
+        getters['model'] = getters['Model'] if 'Model' in arrays else lambda row: 'Unknown'
+        fields += [field for field, _ in _SUMMARY_FIELDS] + ['brand', 'model', 'price_details', 'review_details']
+
+        getters['laptop_id'] = laptop_ids.__getitem__
+        getters['price_details'] = self._price_details
+        getters['review_details'] = self._review_details
+
+        self.fields = tuple(fields)
+        self._getters = getters
+        self._nested = {'price_details': {}, 'review_details': {}}
+
+    def _price_details(self, row: int) -> Dict[str, Any]:
+        cached = self._nested['price_details'].get(row)
+        if cached is None:
+            values = self.arrays.get('Price Details')
+            raw = _cell(values, row) if values is not None else '{"Current Price": "0"}'
+            cached = self._nested['price_details'][row] = _clean(_price_details_dict(raw))
+        return cached
+
+    def _review_details(self, row: int) -> Dict[str, Any]:
+        cached = self._nested['review_details'].get(row)
+        if cached is None:
+            values = self.arrays.get('Review Details')
+            raw = _cell(values, row) if values is not None else '{"Overall Rating": "0"}'
+            # Unreviewed laptops ('-') get {}: no rating, the same as the rating feature the filters use
+            cached = self._nested['review_details'][row] = _clean(parse_review_details(raw))
+        return cached
+
+    def value(self, row: int, field: str) -> Any:
+        getter = self._getters.get(field)
+        if getter is None:
+            raise KeyError(field)
+        return getter(row)
+
+    def laptop(self, row: int) -> 'Laptop':
+        if not 0 <= row < self.size:
+            raise IndexError(row)
+        return Laptop(self, row)
+
+    def laptops(self, rows: Sequence[int]) -> List['Laptop']:
+        return [self.laptop(row) for row in rows]
+
+    def raw_record(self, row: int) -> Dict[str, Any]:
+        """The row's CSV columns exactly as loaded (no defaults or derived fields)"""
+        return {column: _cell(values, row) for column, values in self.arrays.items()}
+
+
+class Laptop(MutableMapping):
+    """Read view of one catalog row with the field names of the API records"""
+
+    __slots__ = ('catalog', 'row', '_extra')
+
+    def __init__(self, catalog: LaptopCatalog, row: int):
+        self.catalog = catalog
+        self.row = row
+        self._extra = None
+
+    @property
+    def key(self) -> str:
+        return self.catalog.keys[self.row]
+
+    def __getitem__(self, field: str) -> Any:
+        if self._extra is not None and field in self._extra:
+            return self._extra[field]
+        return self.catalog.value(self.row, field)
+
+    def __setitem__(self, field: str, value: Any):
+        if self._extra is None:
+            self._extra = {}
+        self._extra[field] = value
+
+    def __delitem__(self, field: str):
+        if self._extra is None or field not in self._extra:
+            raise KeyError(f"{field!r} is a catalog field and cannot be removed")
+        del self._extra[field]
+
+    def __contains__(self, field: object) -> bool:
+        return field in self.catalog._getters or (self._extra is not None and field in self._extra)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.catalog.fields
+        if self._extra:
+            yield from (field for field in self._extra if field not in self.catalog._getters)
+
+    def __len__(self) -> int:
+        extra = sum(1 for field in self._extra if field not in self.catalog._getters) if self._extra else 0
+        return len(self.catalog.fields) + extra
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The record as a plain dict, ready for JSON"""
+        row = self.row
+        getters = self.catalog._getters
+        record = {field: getters[field](row) for field in self.catalog.fields}
+        if self._extra:
+            record.update(self._extra)
+        return record
+
+    def __repr__(self) -> str:
+        return f"Laptop({self.row}, {self.get('Brand')!r}, {self.get('Model')!r})"
@@ -76,10 +76,15 @@ class SearchSuggestionsResponse(BaseResponse):
 class ChatRequest(BaseModel):
     query: str = Field(..., min_length=1, max_length=1000)
     context: Optional[str] = None
+    session_id: Optional[str] = Field(None, max_length=64)
 
 class ChatResponse(BaseResponse):
     data: Dict[str, Any]
 
+class BatchChatRequest(BaseModel):
+    queries: List[ChatRequest] = Field(..., min_items=1, max_items=50)
+    parallelism: Optional[int] = Field(None, ge=1, le=16)
+
 class RecommendationRequest(BaseModel):
     constraints: Dict[str, Any] = Field(default_factory=dict)
 
@@ -92,6 +97,9 @@ class CompareRequest(BaseModel):
 class CompareResponse(BaseResponse):
     data: Dict[str, Any]
 
+class JobResponse(BaseResponse):
+    data: Dict[str, Any]
+
 # Review models
 class ReviewResponse(BaseModel):
     laptop_id: int
@@ -127,6 +135,9 @@ class OfferResponse(BaseModel):
     current_price: Optional[str] = None
     original_price: Optional[str] = None
     discount: Optional[str] = None
+    discount_pct: Optional[float] = None
+    deal_value: Optional[float] = None
+    rewards: Optional[float] = None
 
 class OfferListResponse(BaseResponse):
     data: List[OfferResponse]
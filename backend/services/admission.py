@@ -0,0 +1,276 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Rate limiting and admission control for the LLM-backed routes.
+
+Requests first pass a per-client and a global token bucket (429 when
+empty). Admitted requests then need one of a fixed number of LLM slots;
+a short queue absorbs bursts, and anything beyond it, or waiting longer
+than the max wait, is shed with 503. Admitted work runs on a dedicated
+thread pool (the LLM lane), so blocking DeepSeek calls never occupy the
+event loop or the default thread pool the catalog routes run on. A slot is
+freed when its LLM call finishes, not when the request goes away, so a
+disconnected client cannot push more calls into the lane than there are
+slots. Background jobs take the same slots from their own workers, so
+interactive and background LLM calls share one concurrency limit.
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Tuple
+
+from fastapi import HTTPException, Request
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, now: float = None) -> Tuple[bool, float]:
+        """Take one token; returns (granted, seconds until a token is available)"""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate if self.rate > 0 else float('inf')
+
+    def refund(self):
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class RateLimiter:
+    """Per-client buckets (bounded LRU of clients) in front of one global bucket"""
+
+    def __init__(self, client_per_minute: float, client_burst: int, global_per_minute: float,
+                 global_burst: int, max_clients: int = 10000):
+        self.client_rate = client_per_minute / 60.0
+        self.client_burst = client_burst
+        self.global_bucket = TokenBucket(global_per_minute / 60.0, global_burst)
+        self.max_clients = max_clients
+        self.clients: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, client: str) -> Tuple[bool, float]:
+        with self._lock:
+            bucket = self.clients.get(client)
+            if bucket is None:
+                bucket = TokenBucket(self.client_rate, self.client_burst)
+                self.clients[client] = bucket
+                if len(self.clients) > self.max_clients:
+                    self.clients.popitem(last=False)
+            else:
+                self.clients.move_to_end(client)
+
+            granted, wait = bucket.try_acquire()
+            if not granted:
+                return False, wait
+            granted, wait = self.global_bucket.try_acquire()
+            if not granted:
+                bucket.refund()
+                return False, wait
+            return True, 0.0
+
+
+class AdmissionController:
+    """At most `max_concurrent` LLM calls in flight, `max_queue` requests waiting for at most `max_wait` seconds.
+
+    Requests take a slot with `acquire` (on the event loop); background jobs take one with
+    `acquire_blocking` (on their worker thread), so a single limit covers both. A freed slot
+    goes to a waiting request first, then to a waiting job.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, max_wait: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiting = 0
+        self.background_waiting = 0
+        self.shed = 0
+        self.avg_seconds = 5.0
+        self._lock = threading.Lock()
+        self._free = threading.Condition(self._lock)
+        # (loop, future) of requests waiting for a slot, oldest first
+        self._waiters: "deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]" = deque()
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='llm-lane')
+
+    def retry_after(self) -> int:
+        """Estimate of when a slot frees up, from the running average request time"""
+        return max(1, math.ceil(self.avg_seconds * (self.waiting + 1) / self.max_concurrent))
+
+    def _reject(self, detail: str):
+        with self._lock:
+            self.shed += 1
+        raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": str(self.retry_after())})
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.active < self.max_concurrent and not self._waiters:
+                self.active += 1
+                return
+            full = self.waiting >= self.max_queue
+            if not full:
+                future = loop.create_future()
+                self._waiters.append((loop, future))
+                self.waiting += 1
+        if full:
+            self._reject("LLM service is at capacity, retry later")
+        try:
+            await asyncio.wait_for(future, timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self._forget(loop, future)
+            self._reject("Timed out waiting for LLM capacity, retry later")
+        except BaseException:
+            self._forget(loop, future)
+            if future.done() and not future.cancelled():
+                # Granted just as the request was cancelled
+                self._release_slot()
+            raise
+
+    def _forget(self, loop: asyncio.AbstractEventLoop, future: asyncio.Future):
+        with self._lock:
+            if (loop, future) in self._waiters:
+                self._waiters.remove((loop, future))
+                self.waiting -= 1
+
+    def acquire_blocking(self):
+        """Take a slot from a worker thread, waiting as long as it takes (background work is not shed)"""
+        with self._free:
+            self.background_waiting += 1
+            while self.active >= self.max_concurrent or self._waiters:
+                self._free.wait()
+            self.background_waiting -= 1
+            self.active += 1
+
+    def _grant(self, future: asyncio.Future):
+        # Runs on the waiter's loop; a request that timed out meanwhile passes the slot on
+        if future.done():
+            self._release_slot()
+        else:
+            future.set_result(None)
+
+    def _release_slot(self):
+        with self._lock:
+            if self._waiters:
+                # The slot moves to the oldest waiting request; `active` stays the same
+                loop, future = self._waiters.popleft()
+                self.waiting -= 1
+                loop.call_soon_threadsafe(self._grant, future)
+            else:
+                self.active -= 1
+                self._free.notify()
+
+    def release(self, elapsed: float):
+        with self._lock:
+            self.avg_seconds = 0.8 * self.avg_seconds + 0.2 * elapsed
+        self._release_slot()
+
+    async def admit(self) -> 'AdmissionSlot':
+        """Acquire a slot for a request"""
+        await self.acquire()
+        return AdmissionSlot(self)
+
+    def stats(self):
+        return {
+            'active': self.active,
+            'waiting': self.waiting,
+            'background_waiting': self.background_waiting,
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'shed': self.shed,
+            'avg_seconds': round(self.avg_seconds, 3)
+        }
+
+
+class AdmissionSlot:
+    """One admitted request's slot: runs its LLM call on the lane and is freed exactly once.
+
+    Once `run` has submitted work, the slot belongs to that work and is freed
+    when it completes, even if the awaiting request is cancelled meanwhile;
+    `close` only frees a slot that never ran anything.
+    """
+
+    def __init__(self, controller: AdmissionController):
+        self.controller = controller
+        self.started = time.monotonic()
+        self.running = False
+        self.released = False
+        self._lock = threading.Lock()
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """Run blocking LLM work on the LLM lane thread pool"""
+        if self.running or self.released:
+            raise RuntimeError("An admission slot runs one call")
+        self.running = True
+        future = self.controller.executor.submit(func, *args)
+        # Also fires when the call is cancelled before it starts
+        future.add_done_callback(lambda _: self.release())
+        return await asyncio.wrap_future(future)
+
+    def release(self):
+        with self._lock:
+            if self.released:
+                return
+            self.released = True
+        self.controller.release(time.monotonic() - self.started)
+
+    def close(self):
+        """End of the request: free the slot unless a submitted call still holds it"""
+        if not self.running:
+            self.release()
+
+
+def client_id(request: Request) -> str:
+    """Client address, honouring the first X-Forwarded-For hop set by nginx"""
+    forwarded = request.headers.get('x-forwarded-for')
+    if forwarded:
+        return forwarded.split(',')[0].strip()
+    return request.client.host if request.client else 'unknown'
+
+
+# Global instances
+llm_rate_limiter = RateLimiter(
+    client_per_minute=float(os.getenv('LLM_RATE_LIMIT_PER_MINUTE', '20')),
+    client_burst=int(os.getenv('LLM_RATE_LIMIT_BURST', '5')),
+    global_per_minute=float(os.getenv('LLM_GLOBAL_RATE_LIMIT_PER_MINUTE', '120')),
+    global_burst=int(os.getenv('LLM_GLOBAL_RATE_LIMIT_BURST', '20'))
+)
+llm_admission = AdmissionController(
+    max_concurrent=int(os.getenv('LLM_MAX_CONCURRENT', '8')),
+    max_queue=int(os.getenv('LLM_MAX_QUEUE', '16')),
+    max_wait=float(os.getenv('LLM_MAX_QUEUE_WAIT_SECONDS', '5'))
+)
+
+
+async def rate_limit_llm(request: Request):
+    """Dependency: reject with 429 once the client or global LLM budget is spent"""
+    granted, wait = llm_rate_limiter.check(client_id(request))
+    if not granted:
+        raise HTTPException(status_code=429, detail="Too many chat requests, slow down",
+                            headers={"Retry-After": str(max(1, math.ceil(wait)))})
+
+
+async def admit_llm():
+    """Dependency: an LLM slot for the request, held until its LLM call finishes"""
+    slot = await llm_admission.admit()
+    try:
+        yield slot
+    finally:
+        slot.close()
@@ -0,0 +1,117 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Lexicon-based aspect and sentiment extraction for review text.
+
+This module is deliberately free of service imports so it can be loaded
+cheaply inside process-pool workers.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+# Bump when the lexicons change so persisted indexes get rebuilt
+LEXICON_VERSION = 1
+
+# Theme -> terms that signal the theme is being discussed
+ASPECT_LEXICON: Dict[str, Tuple[str, ...]] = {
+    'Performance': ('performance', 'fast', 'speed', 'speedy', 'slow', 'lag', 'laggy', 'smooth', 'smoothly',
+                    'responsive', 'powerful', 'processor', 'cpu', 'multitasking', 'workhorse', 'gaming', 'apps'),
+    'Battery Life': ('battery', 'charge', 'charging', 'charger', 'unplugged'),
+    'Build Quality': ('build', 'durable', 'durability', 'sturdy', 'chassis', 'hinge', 'plastic',
+                      'aluminum', 'flimsy', 'bulky', 'bulkiest', 'design', 'sleek', 'elegant', 'plug'),
+    'Display Quality': ('display', 'screen', 'colors', 'colours', 'brightness', 'bright', 'dim', 'resolution',
+                        'glare', 'nits', 'panel'),
+    'Price Value': ('price', 'value', 'expensive', 'cheap', 'affordable', 'cost', 'worth', 'overpriced', 'budget'),
+    'Portability': ('portable', 'portability', 'lightweight', 'light', 'heavy', 'compact', 'travel', 'traveling',
+                    'travelling', 'weight', 'thin'),
+    'Keyboard': ('keyboard', 'keys', 'typing', 'backlit', 'trackpoint'),
+    'Trackpad': ('trackpad', 'touchpad', 'clickpad'),
+    'Audio': ('audio', 'speakers', 'speaker', 'sound', 'microphone', 'mic'),
+    'Connectivity': ('ports', 'port', 'wifi', 'wi-fi', 'bluetooth', 'usb', 'hdmi', 'ethernet', 'connectivity'),
+    'Software': ('software', 'drivers', 'driver', 'bios', 'windows', 'bloatware', 'update', 'updates'),
+    'Reliability': ('reliable', 'reliability', 'stable', 'crash', 'crashes', 'failure', 'failures', 'broke',
+                    'broken', 'defective', 'issues', 'problems'),
+}
+
+POSITIVE_TERMS = frozenset((
+    'good', 'great', 'excellent', 'amazing', 'awesome', 'best', 'fast', 'solid', 'reliable', 'praised', 'praise',
+    'appreciate', 'appreciated', 'love', 'loved', 'like', 'liked', 'smooth', 'smoothly', 'responsive', 'easy',
+    'sleek', 'elegant', 'stable', 'satisfy', 'satisfied', 'durable', 'sturdy', 'powerful', 'bright', 'compact',
+    'portable', 'lightweight', 'value', 'worth', 'affordable', 'nice', 'well', 'recommended', 'impressive',
+    'comfortable', 'quiet', 'long', 'perfect', 'happy', 'benefit', 'suitable', 'modern',
+))
+
+NEGATIVE_TERMS = frozenset((
+    'bad', 'poor', 'worst', 'slow', 'lag', 'laggy', 'short', 'disappointing', 'disappointingly', 'disappointed',
+    'issues', 'issue', 'problems', 'problem', 'failure', 'failures', 'fail', 'failed', 'broke', 'broken',
+    'defective', 'flimsy', 'bulky', 'bulkiest', 'heavy', 'expensive', 'overpriced', 'noisy', 'loud', 'dim',
+    'unsatisfactory', 'limitations', 'limited', 'pain', 'concerns', 'concern', 'complaints', 'crash', 'crashes',
+    'hot', 'overheating', 'weak', 'cheap', 'glare', 'annoying', 'drains', 'drain',
+))
+
+NEGATIONS = frozenset(('not', 'no', 'never', "isn't", "wasn't", "doesn't", "don't", "didn't", 'hardly', 'without'))
+
+# Clause boundaries: sentence punctuation plus contrastive conjunctions
+_CLAUSE_SPLIT_RE = re.compile(r'[.;!?\n]+|,\s*|\b(?:but|however|although|though|while|whereas)\b', re.IGNORECASE)
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+# term -> theme lookup built once at import time
+_TERM_TO_THEMES: Dict[str, List[str]] = {}
+for _theme, _terms in ASPECT_LEXICON.items():
+    for _term in _terms:
+        _TERM_TO_THEMES.setdefault(_term, []).append(_theme)
+
+NEGATION_WINDOW = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def split_clauses(text: str) -> List[str]:
+    """Split review text into clauses so sentiment stays local to the aspect"""
+    return [clause.strip() for clause in _CLAUSE_SPLIT_RE.split(text or '') if clause and clause.strip()]
+
+
+def clause_polarity(tokens: List[str]) -> int:
+    """Net polarity of a clause, flipping terms that follow a negation"""
+    polarity = 0
+    negate_until = -1
+    for i, token in enumerate(tokens):
+        if token in NEGATIONS:
+            negate_until = i + NEGATION_WINDOW
+            continue
+        sign = 1 if token in POSITIVE_TERMS else -1 if token in NEGATIVE_TERMS else 0
+        if sign and i <= negate_until:
+            sign = -sign
+        polarity += sign
+    return polarity
+
+
+def extract_aspects(text: str) -> Dict[str, Dict[str, int]]:
+    """Count aspect mentions and clause-level sentiment in a block of review text.
+
+    Returns {theme: {"mentions": n, "positive": p, "negative": q, "neutral": r}}.
+    """
+    aspects: Dict[str, Dict[str, int]] = {}
+    for clause in split_clauses(text):
+        tokens = tokenize(clause)
+        themes = {theme for token in tokens for theme in _TERM_TO_THEMES.get(token, ())}
+        if not themes:
+            continue
+
+        polarity = clause_polarity(tokens)
+        bucket = 'positive' if polarity > 0 else 'negative' if polarity < 0 else 'neutral'
+        for theme in themes:
+            counts = aspects.setdefault(theme, {'mentions': 0, 'positive': 0, 'negative': 0, 'neutral': 0})
+            counts['mentions'] += 1
+            counts[bucket] += 1
+    return aspects
+
+
+def extract_batch(items: List[Tuple[str, str]]) -> List[Tuple[str, Dict[str, Dict[str, int]]]]:
+    """Process-pool entry point: [(key, text), ...] -> [(key, aspects), ...]"""
+    return [(key, extract_aspects(text)) for key, text in items]
@@ -0,0 +1,171 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Versioned per-laptop availability with a change log.
+
+Availability comes from the catalog's `Availability` column. Every status
+change gets the next version number and is appended as one JSON line to
+`changes.log`; the current state is the last change per laptop. Syncing a
+catalog only writes the laptops whose status differs from the stored
+state, so workers loading the same catalog add nothing, and a client that
+knows version N needs exactly the log lines after N.
+
+The log is shared through the filesystem: appends take an exclusive file
+lock, and readers pick up lines other processes appended by reading from
+their last offset.
+"""
+
+import argparse
+import ast
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Sequence
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows; appends are then only serialized per process
+    fcntl = None
+
+from utils.helpers import is_missing
+
+UNKNOWN = 'Unknown'
+# Laptops that dropped out of the catalog
+NOT_LISTED = 'Not Listed'
+
+
+def normalize_status(raw: Any) -> str:
+    """Catalog availability text ('Available', 'Not Available', a dict literal...) as one status string"""
+    if is_missing(raw):
+        return UNKNOWN
+    text = str(raw).strip()
+    if text.startswith('{'):
+        try:
+            text = str(ast.literal_eval(text).get('status', ''))
+        except (ValueError, SyntaxError, AttributeError):
+            pass
+    text = ' '.join(text.split())
+    if not text or text == '-':
+        return UNKNOWN
+    return text[0].upper() + text[1:]
+
+
+def _iso(ts: float) -> str:
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(ts))
+
+
+class AvailabilityStore:
+    """Availability state per laptop key, rebuilt from (and appended to) the change log"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.versions: List[int] = []
+        self.changes: List[Dict[str, Any]] = []
+        self.state: Dict[str, Dict[str, Any]] = {}
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    @property
+    def log_path(self) -> str:
+        return os.path.join(self.root, 'changes.log')
+
+    @property
+    def version(self) -> int:
+        return self.versions[-1] if self.versions else 0
+
+    def refresh(self):
+        """Read changes other processes appended since the last read"""
+        with self._lock:
+            try:
+                with open(self.log_path, 'rb') as f:
+                    f.seek(self._offset)
+                    data = f.read()
+            except FileNotFoundError:
+                return
+            # A partially written last line is picked up on the next read
+            end = data.rfind(b'\n') + 1
+            for line in data[:end].splitlines():
+                if not line.strip():
+                    continue
+                change = json.loads(line)
+                if change['version'] <= self.version:
+                    continue
+                self.versions.append(change['version'])
+                self.changes.append(change)
+                self.state[change['laptop_key']] = change
+            self._offset += end
+
+    def sync(self, keys: Sequence[str], statuses: Sequence[str], ts: float = None,
+             drop_missing: bool = True) -> int:
+        """Record the statuses of a catalog; returns the number of changes written.
+
+        With `drop_missing`, laptops known to the store but absent from `keys` are
+        marked as no longer listed.
+        """
+        ts = time.time() if ts is None else ts
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, '.lock'), 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Another process may have appended since we last looked
+            self.refresh()
+
+            current = dict(zip(keys, statuses))
+            if drop_missing:
+                for key, change in self.state.items():
+                    if key not in current and change['status'] != NOT_LISTED:
+                        current[key] = NOT_LISTED
+
+            lines = []
+            version = self.version
+            for key, status in current.items():
+                previous = self.state.get(key)
+                if previous is not None and previous['status'] == status:
+                    continue
+                version += 1
+                lines.append(json.dumps({
+                    'version': version,
+                    'laptop_key': key,
+                    'status': status,
+                    'previous': previous['status'] if previous else None,
+                    'updated_at': _iso(ts)
+                }) + '\n')
+            if lines:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(''.join(lines))
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.refresh()
+        return len(lines)
+
+    def changes_since(self, version: int, limit: int = None) -> List[Dict[str, Any]]:
+        """Changes with a version above `version`, oldest first"""
+        with self._lock:
+            start = bisect.bisect_right(self.versions, version)
+            end = len(self.changes) if limit is None else min(len(self.changes), start + limit)
+            return self.changes[start:end]
+
+    def status(self, key: str) -> Dict[str, Any]:
+        return self.state.get(key) or {'version': 0, 'laptop_key': key, 'status': UNKNOWN, 'updated_at': None}
+
+
+if __name__ == "__main__":
+    import pandas as pd
+    from utils.helpers import catalog_laptop_keys
+
+    default_csv = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'processed',
+                               'laptop_info_cleaned.csv')
+    parser = argparse.ArgumentParser(description="Record the availability of a catalog CSV in the change log")
+    parser.add_argument('path', nargs='?', default=default_csv, help="Catalog CSV")
+    parser.add_argument('--root', default=None, help="Availability store directory")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.path, dtype=object)
+    keys = catalog_laptop_keys(df)
+    store = AvailabilityStore(args.root or os.getenv('AVAILABILITY_DIR') or
+                              os.path.join(os.path.dirname(args.path), 'availability'))
+    changed = store.sync(keys, [normalize_status(value) for value in df.get('Availability', [None] * len(df))])
+    print(f"{changed} availability changes recorded; store is at version {store.version}")
@@ -0,0 +1,146 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Streaming bulk export of the catalog as NDJSON or an Arrow IPC stream.
+
+Rows are produced in fixed-size batches straight from the catalog columns
+(raw CSV columns plus the typed feature arrays), so an export holds one
+batch at a time however large the catalog is. Each export works on the
+DataFrames that were current when it started, so a reload mid-export does
+not mix catalogs.
+"""
+
+import os
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - Arrow export is optional
+    pa = None
+
+NDJSON = 'application/x-ndjson'
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+
+# Media types a client may ask for, mapped to the export format. The Arrow file format
+# (application/vnd.apache.arrow.file) needs a footer written after the last batch, so it
+# cannot be streamed and is answered with 406.
+MEDIA_TYPES = {
+    NDJSON: 'ndjson',
+    'application/jsonl': 'ndjson',
+    'application/json': 'ndjson',
+    ARROW_STREAM: 'arrow',
+}
+
+
+def negotiate_format(accept: Optional[str]) -> Optional[str]:
+    """Export format for an Accept header ('ndjson' or 'arrow'), None when nothing acceptable is offered.
+
+    Media ranges are tried in descending q order; wildcards get NDJSON.
+    """
+    if not accept:
+        return 'ndjson'
+    ranges: List[Tuple[float, int, str]] = []
+    for position, part in enumerate(accept.split(',')):
+        media, *params = [piece.strip() for piece in part.split(';')]
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if media and quality > 0:
+            ranges.append((-quality, position, media.lower()))
+
+    for _, _, media in sorted(ranges):
+        if media in MEDIA_TYPES:
+            if MEDIA_TYPES[media] == 'arrow' and pa is None:
+                continue
+            return MEDIA_TYPES[media]
+        if media in ('*/*', 'application/*'):
+            return 'ndjson'
+    return None
+
+
+class CatalogExport:
+    """One export over a fixed catalog snapshot"""
+
+    def __init__(self, df: pd.DataFrame, features: pd.DataFrame, laptop_ids: Sequence[int] = None,
+                 batch_rows: int = None):
+        self.df = df
+        self.features = features
+        self.laptop_ids = np.asarray(laptop_ids if laptop_ids is not None else np.arange(len(df)), dtype=np.int64)
+        self.batch_rows = batch_rows or int(os.getenv('EXPORT_BATCH_ROWS', '1000'))
+
+    @property
+    def rows(self) -> int:
+        return len(self.df)
+
+    def batches(self) -> Iterator[pd.DataFrame]:
+        """Export rows batch by batch: laptop_id, the raw columns, then the typed features"""
+        feature_columns = [column for column in self.features.columns if column not in self.df.columns]
+        for start in range(0, self.rows, self.batch_rows):
+            end = min(start + self.batch_rows, self.rows)
+            batch = self.df.iloc[start:end].reset_index(drop=True)
+            features = self.features.iloc[start:end][feature_columns].reset_index(drop=True)
+            for column in features.columns:
+                if isinstance(features[column].dtype, pd.CategoricalDtype):
+                    features[column] = features[column].astype(object)
+            batch = pd.concat([batch, features], axis=1)
+            batch.insert(0, 'laptop_id', self.laptop_ids[start:end])
+            yield batch
+
+    def ndjson(self) -> Iterator[bytes]:
+        for batch in self.batches():
+            yield batch.to_json(orient='records', lines=True, force_ascii=False).encode('utf-8') + b'\n'
+
+    def arrow_schema(self):
+        fields = [pa.field('laptop_id', pa.int64())]
+        fields.extend(pa.field(str(column), pa.string()) for column in self.df.columns)
+        for column in self.features.columns:
+            if column in self.df.columns:
+                continue
+            dtype = self.features[column].dtype
+            if isinstance(dtype, pd.CategoricalDtype) or dtype == object:
+                fields.append(pa.field(column, pa.string()))
+            else:
+                fields.append(pa.field(column, pa.from_numpy_dtype(dtype)))
+        return pa.schema(fields)
+
+    def arrow(self) -> Iterator[bytes]:
+        """Arrow IPC stream: the schema message, then one record batch message per batch"""
+        sink = _DrainableSink()
+        schema = self.arrow_schema()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            yield sink.drain()
+            for batch in self.batches():
+                writer.write_batch(pa.RecordBatch.from_pandas(batch, schema=schema, preserve_index=False))
+                yield sink.drain()
+        yield sink.drain()
+
+
+class _DrainableSink:
+    """File-like object the IPC writer writes into; drained after every batch"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
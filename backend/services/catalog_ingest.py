@@ -0,0 +1,167 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Streaming, chunked catalog ingestion.
+
+The CSV is read through a generator pipeline (read -> normalize -> extract
+features -> append) so the transient parsing state never exceeds one chunk.
+Chunk size adapts to a memory budget: after each chunk the measured bytes per
+row sets the size of the next one. Chunks are appended to per-column storage
+(raw text columns, compact typed feature arrays) and concatenated once at
+the end, which only copies column pointers and fixed-width numbers.
+"""
+
+import argparse
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from services.spec_parser import CATEGORICAL_FEATURES, NUMERIC_FEATURES, extract_spec_features
+
+# First chunk size, before the bytes per row of this file are known
+INITIAL_CHUNK_ROWS = 1000
+MIN_CHUNK_ROWS = 100
+
+
+def read_chunks(path: str, memory_mb: float) -> Iterator[pd.DataFrame]:
+    """Raw CSV chunks sized so each one holds about `memory_mb` of parsed text.
+
+    Everything is read as text (the catalog has no numeric columns; typed values
+    come from the feature parser), so chunks agree on dtypes.
+    """
+    budget = memory_mb * 1024 * 1024
+    rows = INITIAL_CHUNK_ROWS
+    with pd.read_csv(path, dtype=object, iterator=True) as reader:
+        while True:
+            try:
+                chunk = reader.get_chunk(rows)
+            except StopIteration:
+                return
+            if chunk.empty:
+                return
+            bytes_per_row = chunk.memory_usage(index=False, deep=True).sum() / len(chunk)
+            rows = max(MIN_CHUNK_ROWS, int(budget / max(bytes_per_row, 1)))
+            yield chunk
+
+
+def normalize_chunks(chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Trim header whitespace and treat blank cells as missing"""
+    for chunk in chunks:
+        chunk.columns = [str(column).strip() for column in chunk.columns]
+        yield chunk.replace(r'^\s*$', np.nan, regex=True)
+
+
+def with_features(chunks: Iterator[pd.DataFrame]) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """Pair every chunk with its typed feature table (same row index)"""
+    for chunk in chunks:
+        yield chunk, extract_spec_features(chunk)
+
+
+class ColumnarCatalog:
+    """Append-only per-column storage for ingested chunks"""
+
+    def __init__(self):
+        self.columns: Optional[List[str]] = None
+        self.text: List[np.ndarray] = []
+        self.numeric: Dict[str, List[np.ndarray]] = {name: [] for name in NUMERIC_FEATURES}
+        self.categorical: Dict[str, List[pd.Categorical]] = {name: [] for name in CATEGORICAL_FEATURES}
+        self.rows = 0
+        self.chunks = 0
+
+    def append(self, chunk: pd.DataFrame, features: pd.DataFrame):
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+        self.text.append(chunk[self.columns].to_numpy(dtype=object))
+        for name, dtype in NUMERIC_FEATURES.items():
+            self.numeric[name].append(features[name].to_numpy(dtype=dtype))
+        for name in CATEGORICAL_FEATURES:
+            self.categorical[name].append(pd.Categorical(features[name]))
+        self.rows += len(chunk)
+        self.chunks += 1
+
+    def to_frames(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """(catalog DataFrame, feature DataFrame) over all appended rows; empties the text storage"""
+        index = pd.RangeIndex(self.rows)
+        if self.columns is None:
+            return pd.DataFrame(), extract_spec_features(pd.DataFrame())
+
+        # Copy chunks into one object block, releasing each as it is copied, and hand the
+        # block to pandas without a consolidation copy
+        block = np.empty((self.rows, len(self.columns)), dtype=object)
+        start = 0
+        for i, part in enumerate(self.text):
+            block[start:start + len(part)] = part
+            start += len(part)
+            self.text[i] = None
+        self.text = []
+        df = pd.DataFrame(block, columns=self.columns, index=index, copy=False)
+        features = {name: np.concatenate(parts) for name, parts in self.numeric.items()}
+        for name, parts in self.categorical.items():
+            features[name] = union_categoricals(parts) if len(parts) > 1 else parts[0]
+        return df, pd.DataFrame(features, index=index)
+
+
+def ingest_catalog(path: str, memory_mb: float = None) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
+    """Stream a catalog CSV into (DataFrame, feature table, stats)"""
+    if memory_mb is None:
+        memory_mb = float(os.getenv('CATALOG_CHUNK_MEMORY_MB', '32'))
+
+    started = time.time()
+    store = ColumnarCatalog()
+    largest_chunk = 0
+    for chunk, features in with_features(normalize_chunks(read_chunks(path, memory_mb))):
+        store.append(chunk, features)
+        largest_chunk = max(largest_chunk, len(chunk))
+    df, features = store.to_frames()
+    seconds = time.time() - started
+
+    stats = {
+        'rows': store.rows,
+        'chunks': store.chunks,
+        'largest_chunk_rows': largest_chunk,
+        'chunk_memory_mb': memory_mb,
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(store.rows / seconds) if seconds > 0 else None
+    }
+    return df, features, stats
+
+
+def _write_synthetic_catalog(source: str, target: str, scale: int):
+    """Repeat the catalog's rows until the file has `scale` rows"""
+    df = pd.read_csv(source, dtype=object)
+    written = 0
+    with open(target, 'w', encoding='utf-8', newline='') as f:
+        while written < scale:
+            batch = df.iloc[:scale - written]
+            batch.to_csv(f, index=False, header=written == 0)
+            written += len(batch)
+
+
+if __name__ == "__main__":
+    import tempfile
+    import tracemalloc
+
+    default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'processed',
+                                'laptop_info_cleaned.csv')
+    parser = argparse.ArgumentParser(description="Stream-ingest the catalog CSV and report throughput")
+    parser.add_argument('path', nargs='?', default=default_path, help="Catalog CSV")
+    parser.add_argument('--memory-mb', type=float, default=None, help="Per-chunk memory budget (default 32)")
+    parser.add_argument('--scale', type=int, default=None, help="Ingest a synthetic copy with this many rows")
+    args = parser.parse_args()
+
+    path = args.path
+    if args.scale:
+        path = os.path.join(tempfile.mkdtemp(), 'catalog.csv')
+        _write_synthetic_catalog(args.path, path, args.scale)
+
+    tracemalloc.start()
+    df, features, stats = ingest_catalog(path, args.memory_mb)
+    resident, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(stats)
+    print(f"resident {resident / 2**20:.1f} MB, peak {peak / 2**20:.1f} MB")
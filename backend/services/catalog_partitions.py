@@ -0,0 +1,414 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Brand-partitioned catalog with scatter-gather query execution.
+
+Catalog rows are grouped by brand; a brand with more than `max_rows` rows is
+split further by laptop-key hash so partitions stay balanced. Each partition
+holds the columns that search, constraint scoring and similarity need as
+plain numpy arrays (plus its rows of the TF-IDF matrix), so it pickles
+cheaply into worker processes.
+
+A query runs per partition (in a process pool when the catalog is large
+enough, inline otherwise) and the per-partition top-k lists are merged by
+(score desc, catalog row asc), which matches a stable sort over the whole
+catalog. Partitions that cannot contribute are skipped: a brand filter skips
+other brands' partitions, and constraint scoring skips partitions whose best
+possible score is below the current k-th score.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.spec_parser import parse_capacity_gb
+
+# Range filters over the typed feature columns: constraint key -> (feature column, comparison)
+FEATURE_RANGE_CONSTRAINTS = {
+    'min_price': ('price', 'ge'),
+    'max_price': ('price', 'le'),
+    'min_rating': ('rating', 'ge'),
+    'min_ram_gb': ('ram_capacity_gb', 'ge'),
+    'max_ram_gb': ('ram_capacity_gb', 'le'),
+    'min_storage_gb': ('ssd_gb', 'ge'),
+    'min_screen_in': ('screen_in', 'ge'),
+    'max_screen_in': ('screen_in', 'le'),
+    'max_weight_kg': ('weight_kg', 'le'),
+    'min_battery_wh': ('battery_wh', 'ge'),
+    'min_cpu_generation': ('cpu_generation', 'ge'),
+}
+
+# Constraint keys already scored explicitly; everything else in FEATURE_RANGE_CONSTRAINTS is a pure range filter
+SCORED_RANGE_KEYS = ('max_price', 'min_rating')
+
+SEARCH_COLUMNS = ['Brand', 'Model', 'Processor', 'Operating System', 'Graphics', 'Memory (RAM)', 'Storage', 'Display']
+
+# Text filters of the explore search: filter key -> catalog column (case-insensitive substring)
+TEXT_FILTER_COLUMNS = {
+    'brand': 'Brand',
+    'processor': 'Processor',
+    'memory': 'Memory (RAM)',
+    'storage': 'Storage',
+    'display': 'Display',
+}
+
+# Highest score each scored constraint can add (see score_constraints)
+BRAND_POINTS = 10
+PROCESSOR_POINTS = 5
+MEMORY_POINTS = 3
+STORAGE_POINTS = 3
+
+
+def _lower_text(values) -> np.ndarray:
+    return pd.Series(values, dtype=object).astype(str).str.lower().to_numpy(dtype=object)
+
+
+def catalog_columns(df: pd.DataFrame, features: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Row-aligned arrays used by search, scoring and range filters"""
+    columns = {
+        'processor_text': _lower_text(
+            (df['Processor'].astype(str) if 'Processor' in df.columns else '') + ' ' +
+            features['cpu_vendor'].astype(str) + ' ' + features['cpu_family'].astype(str)
+        ),
+    }
+    # One string per row; \x1f keeps a match from spanning two columns
+    search_text = pd.Series('', index=df.index, dtype=object)
+    for i, column in enumerate(column for column in SEARCH_COLUMNS if column in df.columns):
+        search_text = search_text + ('\x1f' if i else '') + df[column].astype(str)
+    columns['search_text'] = _lower_text(search_text)
+    for key, column in TEXT_FILTER_COLUMNS.items():
+        name = f'text_{key}'
+        columns[name] = _lower_text(df[column]) if column in df.columns else np.full(len(df), '', dtype=object)
+    for column in {column for column, _ in FEATURE_RANGE_CONSTRAINTS.values()}:
+        columns[column] = features[column].to_numpy(dtype=np.float64)
+    return columns
+
+
+def _contains(values: np.ndarray, needle: str) -> np.ndarray:
+    return np.fromiter((needle in value for value in values), dtype=bool, count=len(values))
+
+
+def range_mask(columns: Dict[str, np.ndarray], constraints: Dict[str, Any], strict: bool = True) -> np.ndarray:
+    """Vectorized range filter over the feature arrays.
+
+    Rows with an unknown (NaN) value fail the range when strict, and pass it otherwise.
+    """
+    mask = np.ones(len(columns['price']), dtype=bool)
+    for key, value in constraints.items():
+        if key not in FEATURE_RANGE_CONSTRAINTS or value in (None, ''):
+            continue
+        column, op = FEATURE_RANGE_CONSTRAINTS[key]
+        values = columns[column]
+        limit = float(value)
+        with np.errstate(invalid='ignore'):
+            passed = values >= limit if op == 'ge' else values <= limit
+        if not strict:
+            passed |= np.isnan(values)
+        mask &= passed
+    return mask
+
+
+def score_constraints(columns: Dict[str, np.ndarray], constraints: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Score rows against the constraints: (scores, eligible) aligned with the rows of `columns`.
+
+    eligible is False for rows that break a hard constraint.
+    """
+    n = len(columns['price'])
+    scores = np.zeros(n, dtype=np.float64)
+    eligible = np.ones(n, dtype=bool)
+    if n == 0:
+        return scores, eligible
+
+    # Brand preference
+    brand_value = constraints.get('brand')
+    if brand_value:
+        scores += np.where(_contains(columns['text_brand'], str(brand_value).lower()), BRAND_POINTS, 0)
+
+    # Price constraint - must be within budget, lower prices score higher (better value)
+    max_price_value = constraints.get('max_price') or constraints.get('maxPrice')
+    if max_price_value:
+        max_price = float(max_price_value)
+        prices = columns['price']
+        with np.errstate(invalid='ignore'):
+            within = prices <= max_price
+            over = prices > max_price
+        scores[within] += np.maximum(0, 10 - (prices[within] / max_price) * 5)
+        # Laptops without a listed price are kept but not rewarded
+        eligible &= ~over
+
+    # Rating constraint - must meet minimum rating, higher rating = higher score
+    min_rating_value = constraints.get('min_rating') or constraints.get('minRating')
+    if min_rating_value:
+        ratings = columns['rating']
+        with np.errstate(invalid='ignore'):
+            meets = ratings >= float(min_rating_value)
+        scores[meets] += ratings[meets] * 2
+        eligible &= meets
+
+    # Processor preference
+    processor_value = constraints.get('processor_type') or constraints.get('processorType')
+    if processor_value:
+        scores += np.where(_contains(columns['processor_text'], str(processor_value).lower()), PROCESSOR_POINTS, 0)
+
+    # Memory preference (RAM capacity, not a substring match on the spec text)
+    if 'min_memory' in constraints and constraints['min_memory']:
+        min_memory = parse_capacity_gb(constraints['min_memory'])
+        with np.errstate(invalid='ignore'):
+            scores += np.where(columns['ram_capacity_gb'] >= min_memory, MEMORY_POINTS, 0)
+
+    # Storage preference
+    if 'storage_type' in constraints and constraints['storage_type']:
+        storage_type = str(constraints['storage_type']).lower()
+        matches = _contains(columns['text_storage'], storage_type)
+        if storage_type == 'ssd':
+            matches |= ~np.isnan(columns['ssd_gb'])
+        scores += np.where(matches, STORAGE_POINTS, 0)
+
+    # Pure range filters (min_ram_gb, max_weight_kg, min_screen_in, ...)
+    range_constraints = {k: v for k, v in constraints.items() if k not in SCORED_RANGE_KEYS}
+    eligible &= range_mask(columns, range_constraints)
+
+    return scores, eligible
+
+
+def top_k(rows: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """The k best (row, score) pairs: highest score first, lower row first on ties"""
+    order = np.lexsort((rows, -scores))[:k]
+    return rows[order], scores[order]
+
+
+class CatalogPartition:
+    """Rows of one brand (or one hash slice of a large brand) with their query columns"""
+
+    def __init__(self, pid: int, brand: str, rows: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.pid = pid
+        self.brand = brand
+        self.rows = rows
+        self.columns = {name: values[rows] for name, values in columns.items()}
+        self.vectors = None
+        prices = self.columns['price']
+        ratings = self.columns['rating']
+        self.min_price = float(np.nanmin(prices)) if np.any(~np.isnan(prices)) else np.nan
+        self.has_unpriced = bool(np.isnan(prices).any())
+        self.max_rating = float(np.nanmax(ratings)) if np.any(~np.isnan(ratings)) else np.nan
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def max_score(self, constraints: Dict[str, Any]) -> float:
+        """Upper bound of score_constraints over this partition; -inf when no row can be eligible"""
+        bound = 0.0
+        brand_value = constraints.get('brand')
+        if brand_value and str(brand_value).lower() in self.brand:
+            bound += BRAND_POINTS
+        max_price_value = constraints.get('max_price') or constraints.get('maxPrice')
+        if max_price_value:
+            max_price = float(max_price_value)
+            if not np.isnan(self.min_price) and self.min_price <= max_price:
+                bound += max(0.0, 10 - (self.min_price / max_price) * 5)
+            elif not self.has_unpriced:
+                return -np.inf
+        min_rating_value = constraints.get('min_rating') or constraints.get('minRating')
+        if min_rating_value:
+            if np.isnan(self.max_rating) or self.max_rating < float(min_rating_value):
+                return -np.inf
+            bound += self.max_rating * 2
+        if constraints.get('processor_type') or constraints.get('processorType'):
+            bound += PROCESSOR_POINTS
+        if constraints.get('min_memory'):
+            bound += MEMORY_POINTS
+        if constraints.get('storage_type'):
+            bound += STORAGE_POINTS
+        return bound
+
+
+def _score_partition(partition: CatalogPartition, constraints: Dict[str, Any], k: int):
+    scores, eligible = score_constraints(partition.columns, constraints)
+    hits = np.flatnonzero(eligible & (scores > 0))
+    return top_k(partition.rows[hits], scores[hits], k)
+
+
+def _search_partition(partition: CatalogPartition, text: Optional[str], filters: Dict[str, Any]):
+    columns = partition.columns
+    mask = range_mask(columns, filters)
+    if text:
+        mask &= _contains(columns['search_text'], text.lower())
+    for key in TEXT_FILTER_COLUMNS:
+        value = filters.get(key)
+        if value and not isinstance(value, list):
+            mask &= _contains(columns[f'text_{key}'], str(value).lower())
+        elif value:
+            wanted = {str(item).lower() for item in value}
+            mask &= np.fromiter((item in wanted for item in columns[f'text_{key}']), dtype=bool, count=len(mask))
+    return partition.rows[mask]
+
+
+def _similar_partition(partition: CatalogPartition, vector, k: int, exclude_row: int):
+    if partition.vectors is None or len(partition) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    similarities = np.asarray((partition.vectors @ vector.T).todense()).ravel().astype(np.float64)
+    keep = partition.rows != exclude_row
+    return top_k(partition.rows[keep], similarities[keep], k)
+
+
+_OPERATIONS = {
+    'score': _score_partition,
+    'search': _search_partition,
+    'similar': _similar_partition,
+}
+
+# Partitions of the catalog in a pool worker process, set once by the pool initializer
+_worker_partitions: List[CatalogPartition] = []
+
+
+def _init_worker(partitions: List[CatalogPartition]):
+    global _worker_partitions
+    _worker_partitions = partitions
+
+
+def _run_in_worker(pid: int, operation: str, args: tuple):
+    return _OPERATIONS[operation](_worker_partitions[pid], *args)
+
+
+class CatalogPartitions:
+    """Scatter-gather executor over the brand partitions of one catalog"""
+
+    def __init__(self, df: pd.DataFrame, features: pd.DataFrame, laptop_keys: Sequence[str],
+                 max_rows: int = None, workers: int = None, parallel_min_rows: int = None):
+        self.max_rows = max_rows or int(os.getenv('CATALOG_PARTITION_MAX_ROWS', '50000'))
+        self.workers = workers if workers is not None else int(os.getenv('CATALOG_PARTITION_WORKERS', '0'))
+        self.parallel_min_rows = parallel_min_rows or int(os.getenv('CATALOG_PARTITION_PARALLEL_MIN_ROWS', '20000'))
+        self.columns = catalog_columns(df, features)
+        self.rows = len(df)
+        self.partitions: List[CatalogPartition] = []
+        self._pool = None
+        self._lock = threading.Lock()
+
+        # Partition by brand, then by key hash within brands that are too large
+        brands = pd.Series(self.columns['text_brand'], dtype=object).str.strip()
+        slots = np.array([int(key[:8], 16) for key in laptop_keys], dtype=np.int64) if len(laptop_keys) else \
+            np.zeros(0, dtype=np.int64)
+        for brand, rows in sorted(brands.groupby(brands).indices.items()):
+            parts = -(-len(rows) // self.max_rows)
+            for part in range(parts):
+                part_rows = rows[slots[rows] % parts == part] if parts > 1 else rows
+                self.partitions.append(CatalogPartition(len(self.partitions), brand, part_rows.astype(np.int64),
+                                                        self.columns))
+
+    def set_vectors(self, vectors):
+        """Attach the rows of a catalog-aligned sparse matrix (e.g. TF-IDF) to each partition"""
+        for partition in self.partitions:
+            partition.vectors = vectors[partition.rows]
+        self.close()
+
+    def describe(self) -> List[Dict[str, Any]]:
+        return [{'partition': p.pid, 'brand': p.brand, 'rows': len(p)} for p in self.partitions]
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(self.partitions,))
+            return self._pool
+
+    def _scatter(self, operation: str, partitions: List[CatalogPartition], args: tuple) -> list:
+        """Run one operation on each partition, in the process pool when it is worth it"""
+        rows = sum(len(p) for p in partitions)
+        if self.workers > 0 and len(partitions) > 1 and rows >= self.parallel_min_rows:
+            pool = self._executor()
+            futures = [pool.submit(_run_in_worker, p.pid, operation, args) for p in partitions]
+            return [future.result() for future in futures]
+        return [_OPERATIONS[operation](p, *args) for p in partitions]
+
+    def _brand_partitions(self, brand: Optional[str]) -> List[CatalogPartition]:
+        if not brand:
+            return self.partitions
+        brand = str(brand).lower()
+        return [p for p in self.partitions if brand in p.brand]
+
+    def top_constraint_matches(self, constraints: Dict[str, Any], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """The k best-scoring eligible rows (score > 0) over the whole catalog, best first"""
+        bounds = {p.pid: p.max_score(constraints) for p in self.partitions}
+        candidates = [p for p in self.partitions if bounds[p.pid] > 0]
+        # Most promising partitions first; the rest only if they can still beat the k-th score
+        candidates.sort(key=lambda p: -bounds[p.pid])
+        first = [p for p in candidates if bounds[p.pid] >= bounds[candidates[0].pid]] if candidates else []
+        rows, scores = self._merge(self._scatter('score', first, (constraints, k)), k)
+        threshold = scores[-1] if len(scores) == k else 0.0
+        rest = [p for p in candidates if p not in first and bounds[p.pid] >= threshold]
+        if rest:
+            rows, scores = self._merge([(rows, scores)] + self._scatter('score', rest, (constraints, k)), k)
+        return rows, scores
+
+    def search(self, text: Optional[str], filters: Dict[str, Any]) -> np.ndarray:
+        """Rows matching the text and filters, in catalog order"""
+        parts = self._scatter('search', self._brand_partitions(filters.get('brand')), (text, filters))
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def similar(self, vector, k: int, exclude_row: int = -1) -> Tuple[np.ndarray, np.ndarray]:
+        """The k rows whose vectors have the highest dot product with `vector`"""
+        return self._merge(self._scatter('similar', self.partitions, (vector, k, exclude_row)), k)
+
+    @staticmethod
+    def _merge(results: list, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if not results:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        rows = np.concatenate([r for r, _ in results]).astype(np.int64)
+        scores = np.concatenate([s for _, s in results]).astype(np.float64)
+        return top_k(rows, scores, k)
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    import time
+
+    from services.catalog_ingest import _write_synthetic_catalog, ingest_catalog
+    from utils.helpers import catalog_laptop_keys
+
+    default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'processed',
+                                'laptop_info_cleaned.csv')
+    parser = argparse.ArgumentParser(description="Time partitioned constraint scoring and search, inline vs pooled")
+    parser.add_argument('--scale', type=int, default=200000, help="Rows in the synthetic catalog")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Process pool size")
+    parser.add_argument('--max-rows', type=int, default=None, help="Rows per partition (default 50000)")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'catalog.csv')
+    _write_synthetic_catalog(default_path, path, args.scale)
+    df, features, _ = ingest_catalog(path)
+    features['ram_capacity_gb'] = features['max_ram_gb'].fillna(features['ram_gb'])
+    # Synthetic rows repeat brand/model, so key by row to spread them over hash slices
+    keys = catalog_laptop_keys(df.assign(Model=df['Model'].astype(str) + df.index.astype(str)))
+
+    queries = [
+        ('score', {'brand': 'lenovo', 'max_price': 1500, 'min_rating': 4}),
+        ('score', {'processor_type': 'intel', 'min_memory': '16gb', 'max_price': 2000}),
+        ('search', ('thinkpad', {'min_ram_gb': 16})),
+    ]
+    for workers in (0, args.workers):
+        partitions = CatalogPartitions(df, features, keys, max_rows=args.max_rows, workers=workers,
+                                       parallel_min_rows=1)
+        for kind, query in queries:
+            # First call starts the pool
+            run = (lambda: partitions.top_constraint_matches(query, 10)) if kind == 'score' else \
+                (lambda: partitions.search(*query))
+            run()
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                run()
+            ms = (time.perf_counter() - started) / args.repeat * 1000
+            print(f"{len(partitions.partitions)} partitions, workers={workers}: {kind} {query} {ms:.1f} ms")
+        partitions.close()
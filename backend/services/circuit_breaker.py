@@ -0,0 +1,95 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+# Breaker states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Error/latency circuit breaker over a sliding window of recent calls.
+
+    Closed: calls go through; a call that fails or takes longer than
+    `slow_call_seconds` counts as a failure. Once the window holds at least
+    `min_calls` and the failure share reaches `failure_rate`, the breaker
+    opens and rejects calls for `open_seconds`. It then goes half-open and
+    lets `half_open_probes` calls through: if they all succeed it closes,
+    any failure reopens it.
+    """
+
+    def __init__(self, failure_rate: float = 0.5, window: int = 20, min_calls: int = 5,
+                 slow_call_seconds: float = 15.0, open_seconds: float = 30.0, half_open_probes: int = 1):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.outcomes = deque(maxlen=window)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.probe_successes = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _open(self, now: float):
+        self.state = OPEN
+        self.opened_at = now
+        self.probes_in_flight = 0
+        self.probe_successes = 0
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN and now - self.opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self.probes_in_flight = 0
+                self.probe_successes = 0
+
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and self.probes_in_flight < self.half_open_probes:
+                self.probes_in_flight += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, success: bool, elapsed: float):
+        """Report the outcome of a call that allow() let through"""
+        failed = not success or elapsed > self.slow_call_seconds
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                self.probes_in_flight = max(0, self.probes_in_flight - 1)
+                if failed:
+                    self._open(now)
+                else:
+                    self.probe_successes += 1
+                    if self.probe_successes >= self.half_open_probes:
+                        self.state = CLOSED
+                        self.outcomes.clear()
+                return
+            if self.state == OPEN:
+                return
+
+            self.outcomes.append(failed)
+            if len(self.outcomes) >= self.min_calls and \
+                    sum(self.outcomes) / len(self.outcomes) >= self.failure_rate:
+                self._open(now)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self.state,
+                'recent_calls': len(self.outcomes),
+                'recent_failures': sum(self.outcomes),
+                'rejected': self.rejected
+            }
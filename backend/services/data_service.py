@@ -3,232 +3,401 @@
 # Unauthorized copying, distribution, or use is strictly prohibited.
 
 import pandas as pd
+import numpy as np
 import json
 import os
-from typing import Dict, List, Optional, Any
+import time
+from typing import Dict, List, Optional, Any, Iterable, Tuple
 import ast
+import hashlib
+from services.spec_parser import extract_spec_features
+from services.catalog_ingest import ingest_catalog
+from services.price_history import PriceHistoryStore
+from services.availability_feed import AvailabilityStore, normalize_status
+from services.offer_index import build_catalog_offers
+from services.facet_index import build_catalog_facets
+from services.suggest_index import build_catalog_suggestions
+from services.fuzzy_index import build_catalog_fuzzy_index
+from services.sort_index import build_catalog_sort_index
+from services.catalog_partitions import CatalogPartitions, range_mask
+from models.laptop import Laptop, LaptopCatalog
+from utils.helpers import catalog_laptop_ids, catalog_laptop_keys
 
 class DataService:
-    def __init__(self, data_path: str = None):
+    def __init__(self, data_path: str = None, record: bool = None):
         if data_path is None:
             # Use the working CSV from notebooks
             current_dir = os.path.dirname(os.path.abspath(__file__))
             data_path = os.path.join(current_dir, '..', '..', 'data', 'processed', 'laptop_info_cleaned.csv')
         
         self.data_path = data_path
+        # Loading is read-only unless asked to record; API workers must not all append the same observations
+        if record is None:
+            record = os.getenv('CATALOG_RECORD_ON_LOAD', 'false').lower() in ('1', 'true', 'yes')
+        self.record = record
         self.df = None
+        self.features = None
+        self.spec_summaries = []
+        self.facets = None
+        self.suggestions = None
+        self.fuzzy_index = None
+        self.sort_index = None
+        self._filter_options = None
+        self.ingest_stats = None
+        self.laptop_keys = []
+        self.catalog_statuses = []
+        self.rows_by_key = {}
+        self.laptop_ids = []
+        self.rows_by_id = {}
+        self.catalog = None
+        self.catalog_partitions = None
+        self.catalog_version = None
+        self.offers = None
+        self.price_history = PriceHistoryStore(
+            os.getenv('PRICE_HISTORY_DIR') or os.path.join(os.path.dirname(data_path), 'price_history')
+        )
+        self.availability = AvailabilityStore(
+            os.getenv('AVAILABILITY_DIR') or os.path.join(os.path.dirname(data_path), 'availability')
+        )
         self.load_data()
     
     def load_data(self):
         """Load the laptop data from CSV"""
+        mode = os.getenv('CATALOG_INGEST', 'stream').lower()
         try:
-            self.df = pd.read_csv(self.data_path)
+            if mode == 'batch':
+                self.df = pd.read_csv(self.data_path)
+                self.features = extract_spec_features(self.df)
+            else:
+                # Chunked read + feature extraction with a bounded working set
+                self.df, self.features, self.ingest_stats = ingest_catalog(self.data_path)
+                print(f"Ingested {self.ingest_stats['rows']} laptops in {self.ingest_stats['chunks']} chunks "
+                      f"({self.ingest_stats['rows_per_second']} rows/s)")
         except Exception as e:
             print(f"Error loading data: {e}")
             self.df = pd.DataFrame()
+            self.features = extract_spec_features(self.df)
+        
+        self.features['ram_capacity_gb'] = self.features['max_ram_gb'].fillna(self.features['ram_gb'])
+        self.spec_summaries = [self._spec_summary(row) for _, row in self.features.iterrows()]
+        
+        # Bitmap indexes for faceted filtering and counts
+        self.facets = build_catalog_facets(self.df, self.features)
+        self.suggestions = build_catalog_suggestions(self.df, self.features)
+        self.fuzzy_index = build_catalog_fuzzy_index(self.df, self.features)
+        self._filter_options = None
+        
+        # Presorted row orders for sorted search pages
+        self.sort_index = build_catalog_sort_index(self.features)
+        
+        # Stable per-laptop keys
+        self.laptop_keys = catalog_laptop_keys(self.df)
+        self.rows_by_key = {key: row for row, key in enumerate(self.laptop_keys)}
+        
+        # Public laptop ids derive from the keys, so they don't shift when the CSV changes
+        self.laptop_ids = catalog_laptop_ids(self.laptop_keys)
+        self.rows_by_id = {laptop_id: row for row, laptop_id in enumerate(self.laptop_ids)}
+        
+        # Column-backed records; Laptop views index into it instead of copying rows into dicts
+        self.catalog = LaptopCatalog(self.df, self.spec_summaries, self.laptop_keys, self.laptop_ids)
+        
+        # Brand partitions for scatter-gather search and scoring
+        if self.catalog_partitions is not None:
+            self.catalog_partitions.close()
+        self.catalog_partitions = CatalogPartitions(self.df, self.features, self.laptop_keys)
+        
+        # Content hash of the loaded catalog; anything derived from the catalog is keyed by it
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(pd.util.hash_pandas_object(self.df, index=False).to_numpy().tobytes())
+        digest.update('\x1f'.join(map(str, self.df.columns)).encode('utf-8'))
+        self.catalog_version = digest.hexdigest()
+        
+        # Availability as the catalog states it; laptops without recorded changes are served with this
+        self.catalog_statuses = [normalize_status(value) for value in self.df.get('Availability', [None] * len(self.df))]
+        
+        # Prices and availability are recorded by the explicit record step (python -m services.data_service)
+        if self.record:
+            self.record_prices()
+            self.record_availability()
+        else:
+            self.availability.refresh()
+        
+        # Offers parsed once, against the highest price recorded over the reference window
+        reference_days = float(os.getenv('OFFER_REFERENCE_DAYS', '30'))
+        try:
+            reference_prices = self.price_history.max_price(self.laptop_keys, int(time.time() - reference_days * 86400))
+        except OSError:
+            reference_prices = None
+        self.offers = build_catalog_offers(self.df, reference_prices)
+    
+    def rows_for_keys(self, keys: Iterable[str]) -> List[int]:
+        """Current row positions of the given laptop keys; keys no longer in the catalog are skipped"""
+        return [self.rows_by_key[key] for key in keys if key in self.rows_by_key]
+    
+    def row_for_id(self, laptop_id: int) -> Optional[int]:
+        """Current row position of a laptop id, or None if no laptop has it"""
+        return self.rows_by_id.get(laptop_id)
+    
+    def rows_for_ids(self, laptop_ids: Iterable[int]) -> List[int]:
+        """Current row positions of the given laptop ids; unknown ids are skipped"""
+        return [self.rows_by_id[laptop_id] for laptop_id in laptop_ids if laptop_id in self.rows_by_id]
+    
+    def record_prices(self):
+        """Append the current catalog prices to the price history"""
+        if not self.laptop_keys:
+            return
+        try:
+            self.price_history.append(self.laptop_keys, self.feature_array('price'))
+        except OSError as e:
+            print(f"Warning: could not record price history in {self.price_history.root}: {e}")
+    
+    def record_availability(self):
+        """Write the availability of laptops whose status changed since the last sync to the change log"""
+        if not self.laptop_keys:
+            return
+        try:
+            self.availability.sync(self.laptop_keys, self.catalog_statuses)
+        except OSError as e:
+            print(f"Warning: could not record availability in {self.availability.root}: {e}")
     
-    def get_all_laptops(self) -> List[Dict]:
+    def get_availability(self) -> Dict[str, Any]:
+        """Current availability of every laptop and the version it reflects"""
+        self.availability.refresh()
+        version = self.availability.version
+        records = []
+        if not self.laptop_keys:
+            return {"version": version, "availability": records}
+        for laptop_id, key, catalog_status, brand, model in zip(self.laptop_ids, self.laptop_keys, self.catalog_statuses,
+                                                                self.df['Brand'], self.df['Model']):
+            # Laptops the change log has not seen yet show the catalog's own status
+            state = self.availability.state.get(key) or {'status': catalog_status, 'version': 0, 'updated_at': None}
+            records.append({
+                "laptop_id": laptop_id,
+                "brand": brand,
+                "model": model,
+                "status": state['status'],
+                "version": state['version'],
+                "last_updated": state['updated_at']
+            })
+        return {"version": version, "availability": records}
+    
+    def get_availability_changes(self, since: int, limit: int = None) -> List[Dict[str, Any]]:
+        """Availability changes after version `since`, oldest first"""
+        self.availability.refresh()
+        changes = []
+        for change in self.availability.changes_since(since, limit):
+            row = self.rows_by_key.get(change['laptop_key'])
+            changes.append({
+                "version": change['version'],
+                "laptop_id": self.laptop_ids[row] if row is not None else None,
+                "laptop_key": change['laptop_key'],
+                "brand": self.df['Brand'].iat[row] if row is not None else None,
+                "model": self.df['Model'].iat[row] if row is not None else None,
+                "status": change['status'],
+                "previous": change['previous'],
+                "last_updated": change['updated_at']
+            })
+        return changes
+    
+    def get_offers(self, brand: str = None, max_price: float = None, min_discount: float = None,
+                   limit: int = 20) -> List[Dict[str, Any]]:
+        """Best current deals from the presorted offer index"""
+        rows = self.offers.query(brand=brand, max_price=max_price, min_discount=min_discount, limit=limit)
+        return [self._offer_record(row, record) for row, record in zip(rows, self.get_laptop_records(rows))]
+    
+    def _offer_record(self, row: int, record: Laptop) -> Dict[str, Any]:
+        """Offer fields of one laptop in the OfferResponse shape"""
+        offer = self.offers.offer(row)
+        
+        def money(value):
+            return f"${value:,.2f}" if value is not None else None
+        
+        return {
+            "laptop_id": record['laptop_id'],
+            "brand": record['brand'],
+            "model": record['model'],
+            "price_details": record['price_details'],
+            "promos": offer['promos'],
+            "availability": {"status": record.get('Availability')},
+            "current_price": money(offer['current_price']),
+            "original_price": money(offer['original_price']),
+            "discount": f"{offer['deal_pct']:g}%",
+            "discount_pct": offer['deal_pct'],
+            "deal_value": offer['deal_value'],
+            "rewards": offer['rewards']
+        }
+    
+    def get_price_trends(self, days: int = 30, limit: int = 10) -> List[Dict[str, Any]]:
+        """Laptops with the largest price moves over the last `days`, from the price history"""
+        start = int(time.time()) - days * 86400
+        changes = self.price_history.pct_change(self.laptop_keys, start)
+        change = changes['change_pct']
+        rows = np.flatnonzero(~np.isnan(change))
+        rows = rows[np.argsort(-np.abs(change[rows]), kind='stable')][:limit]
+        
+        trends = []
+        for row, record in zip(rows, self.get_laptop_records(rows.tolist())):
+            trends.append({
+                "laptop_id": record['laptop_id'],
+                "brand": record['brand'],
+                "model": record['model'],
+                "price_change": round(float(change[row]), 1),
+                "start_price": round(float(changes['start_price'][row]), 2),
+                "current_price": round(float(changes['current_price'][row]), 2)
+            })
+        return trends
+    
+    def get_price_history(self, laptop_id: int, days: int = 365, bucket: str = 'day') -> Optional[Dict[str, Any]]:
+        """Downsampled price series of one laptop, or None if the id is unknown"""
+        row = self.row_for_id(laptop_id)
+        if row is None:
+            return None
+        end = int(time.time())
+        start = end - days * 86400
+        history = self.price_history.history(self.laptop_keys[row], start, end, bucket)
+        change = self.price_history.pct_change([self.laptop_keys[row]], start, end)['change_pct'][0]
+        record = self.get_laptop_records([row])[0]
+        return {
+            "laptop_id": laptop_id,
+            "brand": record['brand'],
+            "model": record['model'],
+            "bucket": bucket,
+            "days": days,
+            "price_change": None if np.isnan(change) else round(float(change), 1),
+            **history
+        }
+    
+    def feature_array(self, name: str) -> np.ndarray:
+        """Get a typed feature column as a numpy array aligned with the catalog rows"""
+        return self.features[name].to_numpy()
+    
+    def feature_mask(self, constraints: Dict[str, Any], strict: bool = True) -> np.ndarray:
+        """Vectorized range filter over the feature arrays.
+        
+        Rows with an unknown (NaN) value fail the range when strict, and pass it otherwise.
+        """
+        return range_mask(self.catalog_partitions.columns, constraints, strict)
+    
+    def get_all_laptops(self) -> List[Laptop]:
         """Get all laptop records with field mapping"""
         if self.df is None or self.df.empty:
             return []
         
-        # Clean NaN values for JSON serialization
-        def clean_nan_values(obj):
-            import math
-            if isinstance(obj, dict):
-                return {k: clean_nan_values(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [clean_nan_values(item) for item in obj]
-            elif isinstance(obj, float) and (math.isnan(obj) or math.isinf(obj)):
-                return None
-            else:
-                return obj
+        return self.catalog.laptops(range(len(self.df)))
+    
+    def get_laptop_records(self, indices: Iterable[int]) -> List[Laptop]:
+        """Get mapped laptop records for the given row positions only"""
+        if self.df is None or self.df.empty:
+            return []
         
-        records = self.df.to_dict('records')
+        return self.catalog.laptops(list(indices))
+    
+    @staticmethod
+    def _spec_summary(row: pd.Series) -> Dict[str, Optional[str]]:
+        """Short display strings built from one row of the parsed feature arrays"""
+        summaries = {'processor': None, 'memory': None, 'storage': None, 'display': None}
         
-        # Map field names and add missing fields
-        for index, record in enumerate(records):
-            # Add unique laptop_id
-            record['laptop_id'] = index
-            
-            # Ensure Brand field exists
-            if 'Brand' not in record:
-                record['Brand'] = 'Unknown'
-            
-            # Extract specs from model name and add technical fields
-            model = record.get('Model', '')
-            brand = record.get('Brand', '')
-            
-            # Extract processor info from model
-            if 'AMD' in model:
-                record['Processor'] = 'AMD Ryzen (varies by model)'
-            elif 'Intel' in model:
-                record['Processor'] = 'Intel Core (varies by model)'
-            else:
-                record['Processor'] = 'Intel Core i5'
-            
-            # Add reasonable defaults based on brand/model
-            if 'ThinkPad' in model:
-                record['Memory (RAM)'] = '8GB DDR4 (upgradeable)'
-                record['Storage'] = '256GB SSD (upgradeable)'
-                record['Display'] = '14" FHD IPS'
-            elif 'ProBook' in model:
-                record['Memory (RAM)'] = '8GB DDR4 (upgradeable)'
-                record['Storage'] = '256GB SSD (upgradeable)'
-                record['Display'] = '14" FHD IPS'
-            else:
-                record['Memory (RAM)'] = '8GB DDR4'
-                record['Storage'] = '256GB SSD'
-                record['Display'] = '14" FHD'
-            
-            # Add other missing fields
-            if 'Operating System' not in record:
-                record['Operating System'] = 'Windows 11'
-            if 'Graphics' not in record:
-                record['Graphics'] = 'Integrated'
-            
-            # Map to frontend expected field names
-            record['processor'] = record.get('Processor', 'Intel Core i5')
-            record['memory'] = record.get('Memory (RAM)', '8GB DDR4')
-            record['storage'] = record.get('Storage', '256GB SSD')
-            record['display'] = record.get('Display', '14" FHD')
-            record['brand'] = record.get('Brand', 'Unknown')
-            record['model'] = record.get('Model', 'Unknown')
-            
-            # Parse price_details from string to dict
-            price_details_str = record.get('Price Details', '{"Current Price": "0"}')
-            try:
-                # First try to parse as JSON/dict
-                record['price_details'] = ast.literal_eval(price_details_str)
-            except:
-                # If that fails, check if it's a plain price string
-                if price_details_str and price_details_str != '-':
-                    # Convert plain price string to the expected format
-                    record['price_details'] = {"Current Price": price_details_str}
-                else:
-                    record['price_details'] = {"Current Price": "0"}
-            
-            # Parse review_details from string to dict
-            review_details_str = record.get('Review Details', '{"Overall Rating": "0"}')
-            try:
-                # Skip if Review Details is just "-"
-                if review_details_str == '-':
-                    # Generate realistic ratings based on brand and price
-                    import random
-                    brand = record.get('Brand', '').lower()
-                    price = 0
-                    
-                    # Extract price for rating calculation
-                    try:
-                        price_details = record.get('price_details', {})
-                        if isinstance(price_details, dict) and 'Current Price' in price_details:
-                            price_str = str(price_details['Current Price']).replace('$', '').replace(',', '')
-                            price = float(price_str) if price_str.replace('.', '').isdigit() else 0
-                    except:
-                        price = 0
-                    
-                    # Generate rating based on brand reputation and price tier
-                    base_rating = 3.5  # Base rating
-                    
-                    # Brand adjustments
-                    if 'hp' in brand:
-                        base_rating += 0.2
-                    elif 'lenovo' in brand:
-                        base_rating += 0.3
-                    elif 'dell' in brand:
-                        base_rating += 0.1
-                    elif 'apple' in brand:
-                        base_rating += 0.4
-                    elif 'asus' in brand:
-                        base_rating += 0.2
-                    elif 'acer' in brand:
-                        base_rating += 0.1
-                    
-                    # Price tier adjustments (higher price = higher expected rating)
-                    if price > 2000:
-                        base_rating += 0.3
-                    elif price > 1000:
-                        base_rating += 0.1
-                    elif price < 500:
-                        base_rating -= 0.2
-                    
-                    # Add some randomness but keep it realistic
-                    rating = max(2.0, min(5.0, base_rating + random.uniform(-0.3, 0.3)))
-                    review_count = random.randint(15, 150)
-                    
-                    record['review_details'] = {
-                        'Overall Rating': f"{rating:.1f}/5 ({review_count} reviews)",
-                        'AI Summary': f"User rating: {rating:.1f}/5 stars based on {review_count} reviews. This laptop has received positive feedback from users.",
-                        'User Feedback': "Based on user reviews and ratings."
-                    }
-                else:
-                    # Try to parse as JSON first
-                    try:
-                        record['review_details'] = ast.literal_eval(review_details_str)
-                    except:
-                        # If JSON parsing fails, check if it's a simple rating string
-                        if 'out of 5 stars' in review_details_str:
-                            # Extract rating from strings like "4.2 out of 5 stars, 48 reviews."
-                            import re
-                            rating_match = re.search(r'(\d+\.?\d*)\s+out of 5 stars', review_details_str)
-                            review_count_match = re.search(r'(\d+)\s+reviews', review_details_str)
-                            
-                            rating = rating_match.group(1) if rating_match else "0"
-                            review_count = review_count_match.group(1) if review_count_match else "0"
-                            
-                            record['review_details'] = {
-                                'Overall Rating': f"{rating}/5 ({review_count} reviews)",
-                                'AI Summary': f"User rating: {rating}/5 stars based on {review_count} reviews. This laptop has received positive feedback from users.",
-                                'User Feedback': "Based on user reviews and ratings."
-                            }
-                        else:
-                            record['review_details'] = {}
-            except:
-                record['review_details'] = {}
-            
+        if pd.notna(row['cpu_family']):
+            processor = f"{row['cpu_vendor']} {row['cpu_family']}"
+            if pd.notna(row['cpu_generation']):
+                processor += f" (gen {int(row['cpu_generation'])})"
+            summaries['processor'] = processor
         
-        result = clean_nan_values(records)
-        return result
+        if pd.notna(row['ram_gb']) and pd.notna(row['max_ram_gb']):
+            summaries['memory'] = f"{row['ram_gb']:g}GB (up to {row['max_ram_gb']:g}GB)"
+        elif pd.notna(row['max_ram_gb']):
+            summaries['memory'] = f"Up to {row['max_ram_gb']:g}GB"
+        
+        if pd.notna(row['ssd_gb']):
+            size = f"{row['ssd_gb'] / 1024:g}TB" if row['ssd_gb'] >= 1024 else f"{row['ssd_gb']:g}GB"
+            summaries['storage'] = f"Up to {size} SSD"
+        
+        if pd.notna(row['screen_in']):
+            display = f'{row["screen_in"]:g}"'
+            if pd.notna(row['res_width']):
+                display += f" {int(row['res_width'])}x{int(row['res_height'])}"
+            summaries['display'] = display
+        
+        return summaries
     
     def get_laptop_by_id(self, laptop_id: int) -> Optional[Dict]:
         """Get a specific laptop by ID"""
         if self.df is None or self.df.empty:
             return None
         
-        try:
-            laptop = self.df.iloc[laptop_id].to_dict()
-            return laptop
-        except IndexError:
-            return None
+        row = self.row_for_id(laptop_id)
+        return self.catalog.raw_record(row) if row is not None else None
     
-    def search_laptops(self, query: str, filters: Dict = None) -> List[Dict]:
-        """Search laptops by query and filters"""
-        if self.df is None or self.df.empty:
+    def get_laptops_by_ids(self, laptop_ids: Iterable[int]) -> Tuple[List[Laptop], List[int]]:
+        """Mapped records for several laptop ids in request order (repeats dropped), and the unknown ids"""
+        rows, missing, seen = [], [], set()
+        for laptop_id in laptop_ids:
+            if laptop_id in seen:
+                continue
+            seen.add(laptop_id)
+            row = self.rows_by_id.get(laptop_id)
+            if row is None:
+                missing.append(laptop_id)
+            else:
+                rows.append(row)
+        return self.get_laptop_records(rows), missing
+    
+    def fuzzy_match(self, query: str, match_all: bool = True, limit: Optional[int] = None) -> List[int]:
+        """Row indices matching a possibly misspelled query, best match first"""
+        if self.fuzzy_index is None:
             return []
+        return [row for row, _ in self.fuzzy_index.search(query, match_all=match_all, limit=limit)]
+    
+    def search_laptops(self, query: str, filters: Dict = None, fuzzy: bool = False, sort_by: str = 'relevance',
+                       sort_order: str = 'desc', offset: int = 0, limit: Optional[int] = None) -> Tuple[List[Laptop], int]:
+        """Search laptops by query and filters; returns one page of matches and the total match count.
         
-        results = self.df.copy()
+        The text match and filters run per brand partition (a brand filter skips the other
+        brands); fuzzy matches keep their match-quality order. Any other `sort_by` is a spec
+        feature, read off its presorted index (see services/sort_index.py).
+        """
+        if self.df is None or self.df.empty:
+            return [], 0
+        
+        filters = filters or {}
+        # Typo-tolerant name search, ranked by match quality
+        if query and fuzzy:
+            matched = set(self.catalog_partitions.search(None, filters).tolist())
+            rows = np.array([row for row in self.fuzzy_match(query) if row in matched], dtype=np.int64)
+        else:
+            rows = self.catalog_partitions.search(query, filters)
         
-        # Text search across relevant columns
-        if query:
-            search_columns = ['Brand', 'Model', 'Processor', 'Operating System', 'Graphics', 'Memory (RAM)', 'Storage', 'Display']
-            mask = pd.Series([False] * len(results))
+        page = self.sort_index.sort(rows, sort_by, sort_order, offset=offset, limit=limit)
+        return self.catalog.laptops(page.tolist()), len(rows)
+    
+    def get_filter_options(self) -> Dict[str, List[str]]:
+        """Get the distinct values offered by the explore filters (computed once per catalog load)"""
+        if self._filter_options is None:
+            laptops = self.get_all_laptops()
             
-            for col in search_columns:
-                if col in results.columns:
-                    mask |= results[col].astype(str).str.contains(query, case=False, na=False)
+            def distinct(key: str) -> List[str]:
+                return sorted({laptop.get(key) for laptop in laptops if laptop.get(key)})
             
-            results = results[mask]
-        
-        # Apply filters
-        if filters:
-            for key, value in filters.items():
-                if key in results.columns and value:
-                    if isinstance(value, list):
-                        results = results[results[key].isin(value)]
-                    else:
-                        results = results[results[key].astype(str).str.contains(str(value), case=False, na=False)]
-        
-        return results.to_dict('records')
+            self._filter_options = {
+                "brands": distinct('Brand'),
+                "processors": distinct('Processor'),
+                "memory": distinct('Memory (RAM)'),
+                "storage": distinct('Storage'),
+                "displays": distinct('Display')
+            }
+        return self._filter_options
+    
+    def get_facet_counts(self, selections: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Get per-value counts for every facet given the currently selected facet values"""
+        if self.facets is None:
+            return {'total': 0, 'facets': {}}
+        return self.facets.counts(selections)
+    
+    def get_suggestions(self, prefix: str, limit: int = 10) -> List[str]:
+        """Get autocomplete suggestions for a search-box prefix"""
+        if self.suggestions is None:
+            return []
+        return self.suggestions.suggest(prefix, limit)
     
     def get_brands(self) -> List[str]:
         """Get unique brands"""
@@ -346,3 +515,16 @@ class DataService:
 
 # Global instance
 data_service = DataService()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Record the catalog's current prices and availability; run once after every catalog update"
+    )
+    parser.parse_args()
+    data_service.record_prices()
+    data_service.record_availability()
+    print(f"Recorded {len(data_service.laptop_keys)} laptops in {data_service.price_history.root} "
+          f"and {data_service.availability.root}")
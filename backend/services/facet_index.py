@@ -0,0 +1,141 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Bitmap indexes over the categorical catalog fields.
+
+Each facet value owns a bitset (a Python int, bit i = catalog row i), so
+filters are bitwise AND/OR and counts are popcounts, with no row scans.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from services.spec_parser import parse_os_families
+
+UNKNOWN = 'Unknown'
+
+RAM_TIERS = [(8, 'Up to 8GB'), (16, 'Up to 16GB'), (32, 'Up to 32GB'), (64, 'Up to 64GB')]
+RAM_TOP_TIER = 'Over 64GB'
+STORAGE_TIERS = [(256, 'Up to 256GB'), (512, 'Up to 512GB'), (1024, 'Up to 1TB'), (2048, 'Up to 2TB')]
+STORAGE_TOP_TIER = 'Over 2TB'
+
+
+def bits_from_mask(mask: np.ndarray) -> int:
+    """Pack a boolean row mask into an int bitset (bit i = row i)"""
+    if len(mask) == 0:
+        return 0
+    return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+
+def mask_from_bits(bits: int, size: int) -> np.ndarray:
+    """Unpack an int bitset into a boolean row mask of the given length"""
+    raw = np.frombuffer(bits.to_bytes((size + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder='little', count=size).astype(bool)
+
+
+def tier_label(value: float, tiers: Sequence, top_tier: str) -> str:
+    """Bucket a numeric spec into a labelled tier"""
+    if value is None or np.isnan(value):
+        return UNKNOWN
+    for limit, label in tiers:
+        if value <= limit:
+            return label
+    return top_tier
+
+
+class FacetIndex:
+    """Per-value bitsets for a set of categorical facets"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.all_bits = (1 << size) - 1
+        self.bitmaps: Dict[str, Dict[str, int]] = {}
+
+    def add_facet(self, name: str, row_values: Iterable[Any]):
+        """Index a facet; each row value may be a single label or a list of labels"""
+        rows_by_value: Dict[str, List[int]] = {}
+        for row, value in enumerate(row_values):
+            labels = value if isinstance(value, (list, tuple, set)) else [value]
+            for label in labels:
+                rows_by_value.setdefault(str(label), []).append(row)
+
+        bitmaps = {}
+        for label, rows in rows_by_value.items():
+            mask = np.zeros(self.size, dtype=bool)
+            mask[rows] = True
+            bitmaps[label] = bits_from_mask(mask)
+        self.bitmaps[name] = bitmaps
+
+    @property
+    def facets(self) -> List[str]:
+        return list(self.bitmaps)
+
+    def selection_bits(self, selections: Dict[str, List[str]], exclude: Optional[str] = None) -> int:
+        """AND across facets of the OR of the selected values within each facet"""
+        bits = self.all_bits
+        for facet, values in selections.items():
+            if facet == exclude or facet not in self.bitmaps or not values:
+                continue
+            facet_bits = 0
+            for value in values:
+                facet_bits |= self.bitmaps[facet].get(str(value), 0)
+            bits &= facet_bits
+        return bits
+
+    def rows(self, selections: Dict[str, List[str]]) -> np.ndarray:
+        """Row positions matching the selections"""
+        return np.flatnonzero(mask_from_bits(self.selection_bits(selections), self.size))
+
+    def counts(self, selections: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Count per facet value given the applied selections.
+
+        Each facet is counted against the selections on all *other* facets, so
+        the values of a facet stay selectable alongside each other (multi-select).
+        """
+        facets = {}
+        for facet, bitmaps in self.bitmaps.items():
+            base = self.selection_bits(selections, exclude=facet)
+            selected = {str(v) for v in selections.get(facet) or []}
+            values = [
+                {'value': value, 'count': (base & bits).bit_count(), 'selected': value in selected}
+                for value, bits in bitmaps.items()
+            ]
+            values.sort(key=lambda v: (-v['count'], v['value']))
+            facets[facet] = values
+
+        return {
+            'total': self.selection_bits(selections).bit_count(),
+            'facets': facets
+        }
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the bitsets"""
+        return sum((bits.bit_length() + 7) // 8 for bitmaps in self.bitmaps.values() for bits in bitmaps.values())
+
+
+def build_catalog_facets(df: pd.DataFrame, features: pd.DataFrame) -> FacetIndex:
+    """Build the catalog facet index from the raw rows and the parsed feature arrays"""
+    index = FacetIndex(len(df))
+    if df.empty:
+        return index
+
+    models = df['Model'] if 'Model' in df.columns else pd.Series([''] * len(df))
+    os_column = df['Operating System'] if 'Operating System' in df.columns else pd.Series([''] * len(df))
+
+    index.add_facet('brand', df['Brand'].fillna(UNKNOWN).astype(str))
+
+    processor_families = []
+    for vendor, family in zip(features['cpu_vendor'], features['cpu_family']):
+        processor_families.append(f"{vendor} {family}" if pd.notna(family) else UNKNOWN)
+    index.add_facet('processor_family', processor_families)
+
+    os_families = [parse_os_families(text, model) or [UNKNOWN] for text, model in zip(os_column, models)]
+    index.add_facet('os', os_families)
+
+    index.add_facet('ram_tier', [tier_label(v, RAM_TIERS, RAM_TOP_TIER) for v in features['ram_capacity_gb']])
+    index.add_facet('storage_tier', [tier_label(v, STORAGE_TIERS, STORAGE_TOP_TIER) for v in features['ssd_gb']])
+    index.add_facet('display_size', [f'{v:g}"' if pd.notna(v) else UNKNOWN for v in features['screen_in']])
+    return index
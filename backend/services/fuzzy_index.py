@@ -0,0 +1,195 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Typo-tolerant laptop lookup over a character trigram index.
+
+The distinct words of every laptop's name are indexed by their padded
+trigrams. A query word only has its edit distance computed against
+vocabulary words that share enough trigrams to possibly be within the
+allowed distance (each edit destroys at most a few trigrams) and whose
+length is close enough, so the expensive check touches a handful of words
+regardless of catalog size.
+"""
+
+import bisect
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.spec_parser import parse_os_families
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Words that carry no product information in free-text queries
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'best', 'can', 'compare', 'do', 'does', 'for', 'good', 'how', 'i', 'in', 'is', 'it',
+    'laptop', 'laptops', 'me', 'my', 'of', 'on', 'or', 'show', 'tell', 'than', 'that', 'the', 'to', 'vs',
+    'what', 'which', 'with', 'about', 'between', 'should', 'buy', 'get', 'want', 'need', 'any', 'some',
+))
+
+PREFIX_SIMILARITY = 0.9
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case alphanumeric words"""
+    return _TOKEN_RE.findall(str(text or '').lower())
+
+
+def trigrams(word: str) -> List[str]:
+    """Distinct trigrams of a word padded with two boundary markers on each side"""
+    padded = f"$${word}$$"
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+def max_edits(word: str) -> int:
+    """Allowed typos grow with word length; short words (e14, 450) must match exactly"""
+    if len(word) <= 3:
+        return 0
+    if len(word) <= 7:
+        return 1
+    return 2
+
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> Optional[int]:
+    """Edit distance (adjacent transpositions count as one edit), or None as soon as it must exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if before is not None and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return None
+        before, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+class FuzzyIndex:
+    """Trigram index over the words of each laptop's searchable name"""
+
+    def __init__(self):
+        self.size = 0
+        self.vocabulary: List[str] = []
+        self.word_ids: Dict[str, int] = {}
+        self.word_rows: List[np.ndarray] = []
+        self.idf = np.zeros(0, dtype=np.float64)
+        self.word_lengths = np.zeros(0, dtype=np.int32)
+        self.gram_words: Dict[str, np.ndarray] = {}
+
+    def build(self, documents: Sequence[str]):
+        """Index one text per catalog row; replaces any previous contents"""
+        self.size = len(documents)
+        rows_by_word: Dict[str, List[int]] = {}
+        for row, text in enumerate(documents):
+            for word in set(tokenize(text)):
+                rows_by_word.setdefault(word, []).append(row)
+
+        self.vocabulary = sorted(rows_by_word)
+        self.word_ids = {word: i for i, word in enumerate(self.vocabulary)}
+        self.word_rows = [np.array(rows_by_word[word], dtype=np.int64) for word in self.vocabulary]
+        self.word_lengths = np.array([len(word) for word in self.vocabulary], dtype=np.int32)
+        document_frequency = np.array([len(rows) for rows in self.word_rows], dtype=np.float64)
+        self.idf = np.log1p(self.size / np.maximum(document_frequency, 1.0))
+
+        grams: Dict[str, List[int]] = {}
+        for word_id, word in enumerate(self.vocabulary):
+            for gram in trigrams(word):
+                grams.setdefault(gram, []).append(word_id)
+        self.gram_words = {gram: np.array(ids, dtype=np.int32) for gram, ids in grams.items()}
+        return self
+
+    def _prefix_matches(self, word: str) -> List[int]:
+        """Vocabulary words that extend a partially typed word"""
+        start = bisect.bisect_left(self.vocabulary, word)
+        end = bisect.bisect_left(self.vocabulary, word + '\uffff', lo=start)
+        return list(range(start, end))
+
+    def match_word(self, word: str) -> Dict[int, float]:
+        """Vocabulary word id -> similarity in (0, 1] for one query word"""
+        matches: Dict[int, float] = {}
+        exact = self.word_ids.get(word)
+        if exact is not None:
+            matches[exact] = 1.0
+
+        if len(word) >= 3:
+            for word_id in self._prefix_matches(word):
+                matches.setdefault(word_id, PREFIX_SIMILARITY)
+
+        limit = max_edits(word)
+        if limit == 0 or not self.vocabulary:
+            return matches
+
+        # Count filter: an edit touches at most 3 trigrams (4 for a transposition), so a word
+        # within `limit` edits shares at least len(grams) - 4 * limit of them
+        query_grams = trigrams(word)
+        postings = [self.gram_words[g] for g in query_grams if g in self.gram_words]
+        if not postings:
+            return matches
+        shared = np.bincount(np.concatenate(postings), minlength=len(self.vocabulary))
+        required = max(1, len(query_grams) - 4 * limit)
+        candidates = np.flatnonzero(
+            (shared >= required) & (np.abs(self.word_lengths - len(word)) <= limit)
+        )
+
+        for word_id in candidates:
+            if word_id in matches:
+                continue
+            distance = bounded_edit_distance(word, self.vocabulary[word_id], limit)
+            if distance is not None:
+                matches[int(word_id)] = 1.0 - distance / (len(word) + 1)
+        return matches
+
+    def search(self, query: str, match_all: bool = True, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Rank catalog rows against a free-text query.
+
+        With match_all every informative query word has to match the row
+        (search box semantics); otherwise any match counts and rows are ranked
+        by the IDF-weighted similarity of the words they match (chat retrieval).
+        """
+        words = [w for w in dict.fromkeys(tokenize(query)) if w not in STOPWORDS]
+        if not words or self.size == 0:
+            return []
+
+        scores = np.zeros(self.size, dtype=np.float64)
+        matched = np.zeros(self.size, dtype=np.int32)
+        for word in words:
+            word_scores = np.zeros(self.size, dtype=np.float64)
+            for word_id, similarity in self.match_word(word).items():
+                rows = self.word_rows[word_id]
+                word_scores[rows] = np.maximum(word_scores[rows], similarity * self.idf[word_id])
+            scores += word_scores
+            matched += word_scores > 0
+
+        keep = matched == len(words) if match_all else matched > 0
+        rows = np.flatnonzero(keep)
+        rows = rows[np.argsort(-scores[rows], kind='stable')]
+        if limit is not None:
+            rows = rows[:limit]
+        return [(int(row), round(float(scores[row]), 4)) for row in rows]
+
+
+def build_catalog_fuzzy_index(df: pd.DataFrame, features: pd.DataFrame) -> FuzzyIndex:
+    """Index brand, model, processor family and OS family words for every catalog row"""
+    index = FuzzyIndex()
+    if df.empty:
+        return index.build([])
+
+    models = df['Model'] if 'Model' in df.columns else pd.Series([''] * len(df))
+    os_column = df['Operating System'] if 'Operating System' in df.columns else pd.Series([''] * len(df))
+
+    documents = []
+    for row, (brand, model) in enumerate(zip(df['Brand'], models)):
+        parts = [str(brand), str(model)]
+        vendor, family = features['cpu_vendor'].iloc[row], features['cpu_family'].iloc[row]
+        if pd.notna(family):
+            parts.append(f"{vendor} {family}")
+        parts.extend(parse_os_families(os_column.iloc[row], model))
+        documents.append(' '.join(parts))
+    return index.build(documents)
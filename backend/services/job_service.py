@@ -0,0 +1,145 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from services.job_store import create_job_store
+from services.admission import llm_admission
+
+# Job lifecycle states
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+FINISHED_STATES = (SUCCEEDED, FAILED)
+
+
+class JobQueueFullError(Exception):
+    """Raised when the number of unfinished jobs has reached the configured bound"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Job queue is full")
+        self.retry_after = retry_after
+
+
+class JobService:
+    """Runs slow LLM calls on a bounded worker pool and keeps their results for a while"""
+
+    def __init__(self, store=None, max_workers: int = None, max_pending: int = None, ttl: int = None,
+                 admission=None):
+        self.store = store if store is not None else create_job_store()
+        # Handlers hold one of the admission controller's slots while they run, like interactive requests
+        self.admission = admission
+        self.max_workers = max_workers or int(os.getenv('LLM_JOB_WORKERS', '4'))
+        self.max_pending = max_pending or int(os.getenv('LLM_JOB_MAX_PENDING', '100'))
+        self.ttl = ttl or int(os.getenv('LLM_JOB_TTL_SECONDS', '3600'))
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._executor = None
+        # Unfinished jobs of this process only: jobs run on the worker that accepted them, so
+        # with a shared (Redis) store and N API workers up to N * max_pending can be unfinished
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any]], Any]):
+        """Register the function that executes jobs of a kind; it receives the job payload"""
+        self.handlers[kind] = handler
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='llm-job')
+        return self._executor
+
+    def _save(self, job: Dict[str, Any]):
+        self.store.put(job, self.ttl)
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a job and return its initial record immediately"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFullError(retry_after=self.retry_after())
+            self._pending += 1
+
+        job = {
+            'job_id': uuid.uuid4().hex,
+            'kind': kind,
+            'status': QUEUED,
+            'payload': payload,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None
+        }
+        self._save(job)
+        snapshot = dict(job)
+        try:
+            self._pool().submit(self._run, job)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return snapshot
+
+    def _run(self, job: Dict[str, Any]):
+        try:
+            if self.admission is not None:
+                self.admission.acquire_blocking()
+            job['status'] = RUNNING
+            job['started_at'] = time.time()
+            self._save(job)
+
+            try:
+                job['result'] = self.handlers[job['kind']](job['payload'])
+            finally:
+                if self.admission is not None:
+                    self.admission.release(time.time() - job['started_at'])
+            job['status'] = SUCCEEDED
+        except Exception as e:
+            job['status'] = FAILED
+            job['error'] = str(e)
+        finally:
+            job['finished_at'] = time.time()
+            self._save(job)
+            with self._lock:
+                self._pending -= 1
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current job record, or None if unknown or expired"""
+        return self.store.get(job_id)
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def retry_after(self) -> int:
+        """Rough seconds until a worker frees up, used for Retry-After when the queue is full"""
+        return max(1, int(self._pending / max(1, self.max_workers)) * 5)
+
+    @staticmethod
+    def public_view(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Job record as returned by the API"""
+        def iso(ts):
+            return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(ts)) if ts else None
+
+        return {
+            'job_id': job['job_id'],
+            'kind': job['kind'],
+            'status': job['status'],
+            'created_at': iso(job.get('created_at')),
+            'started_at': iso(job.get('started_at')),
+            'finished_at': iso(job.get('finished_at')),
+            'result': job.get('result'),
+            'error': job.get('error')
+        }
+
+# Global instance
+job_service = JobService(admission=llm_admission)
@@ -0,0 +1,94 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Job state storage with expiry.
+
+InMemoryJobStore keeps everything in the API process (and doubles as the
+local stand-in for tests); RedisJobStore uses the compose Redis so that any
+API worker can answer a status poll.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is optional outside docker
+    redis = None
+
+
+class InMemoryJobStore:
+    """Thread-safe dict of job records with per-record TTL"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float):
+        expired = [job_id for job_id, expires in self._expires.items() if expires <= now]
+        for job_id in expired:
+            self._jobs.pop(job_id, None)
+            self._expires.pop(job_id, None)
+
+    def put(self, job: Dict[str, Any], ttl: int):
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            self._jobs[job['job_id']] = dict(job)
+            self._expires[job['job_id']] = now + ttl
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._purge(time.time())
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def delete(self, job_id: str):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._expires.pop(job_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._purge(time.time())
+            return len(self._jobs)
+
+
+class RedisJobStore:
+    """Job records as JSON strings under SETEX keys"""
+
+    def __init__(self, client, prefix: str = 'laptop-assistant:job:'):
+        self.client = client
+        self.prefix = prefix
+
+    def put(self, job: Dict[str, Any], ttl: int):
+        self.client.setex(self.prefix + job['job_id'], ttl, json.dumps(job, default=str))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.get(self.prefix + job_id)
+        return json.loads(raw) if raw else None
+
+    def delete(self, job_id: str):
+        self.client.delete(self.prefix + job_id)
+
+
+def create_job_store():
+    """Use Redis when JOB_STORE=redis and it is reachable, otherwise keep jobs in process"""
+    backend = os.getenv('JOB_STORE', 'memory').lower()
+    if backend == 'redis':
+        url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+        if redis is None:
+            print("Warning: JOB_STORE=redis but the redis package is not installed; using in-memory job store")
+        else:
+            try:
+                client = redis.Redis.from_url(url, socket_timeout=2)
+                client.ping()
+                return RedisJobStore(client)
+            except Exception as e:
+                print(f"Warning: could not connect to Redis at {url} ({e}); using in-memory job store")
+    return InMemoryJobStore()
@@ -0,0 +1,332 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Query log and LLM answer cache.
+
+Chat questions are normalized (case, punctuation, "$1,000" -> "$1000") and
+counted in a small JSON log next to the catalog. Counts are buffered in
+memory and merged into the file under a file lock, so every API worker
+contributes; the file keeps only the most frequent QUERY_LOG_MAX_ENTRIES
+queries.
+
+Answers are cached per catalog version. Answers computed while serving live
+in a bounded in-process LRU; answers computed by the warm-up job are
+written to `answers.json`, which every worker picks up on its next lookup.
+The warm-up job answers the top queries of the log for the current catalog
+version, within a time budget and a fixed number of concurrent LLM calls.
+Each of its calls is charged to the chat rate limit and holds an admission
+slot, like a background job, so warming never crowds out live requests.
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows; files are then only serialized per process
+    fcntl = None
+
+# Longer questions are too specific to be asked again verbatim
+MAX_QUERY_CHARS = 300
+
+# Rate limiter client the warm-up job's LLM calls are charged to
+WARM_CLIENT = 'llm-cache-warm'
+
+_THOUSANDS_RE = re.compile(r'(?<=\d),(?=\d{3}\b)')
+_PUNCTUATION_RE = re.compile(r"[^\w$%.+/-]+")
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a chat question, used as the log and cache key"""
+    text = _THOUSANDS_RE.sub('', str(query).lower())
+    text = _PUNCTUATION_RE.sub(' ', text)
+    return ' '.join(word.strip('.') for word in text.split() if word.strip('.'))
+
+
+def _write_json(path: str, payload: Dict[str, Any]):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+class _FileLock:
+    """Exclusive flock on a side file; non-blocking mode reports whether it was acquired"""
+
+    def __init__(self, path: str, blocking: bool = True):
+        self.path = path
+        self.blocking = blocking
+        self.acquired = False
+        self._file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._file = open(self.path, 'w')
+        if fcntl is None:
+            self.acquired = True
+            return self
+        try:
+            fcntl.flock(self._file, fcntl.LOCK_EX if self.blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self.acquired = True
+        except BlockingIOError:
+            self.acquired = False
+        return self
+
+    def __exit__(self, *exc):
+        self._file.close()
+
+
+class QueryLog:
+    """Frequency counts of normalized chat queries, shared by all workers through one JSON file"""
+
+    def __init__(self, path: str, max_entries: int = None, flush_seconds: float = None):
+        self.path = path
+        self.max_entries = max_entries or int(os.getenv('QUERY_LOG_MAX_ENTRIES', '5000'))
+        self.flush_seconds = flush_seconds if flush_seconds is not None else float(
+            os.getenv('QUERY_LOG_FLUSH_SECONDS', '30'))
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._last_flush = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, query: str):
+        key = normalize_query(query)
+        if not key or len(key) > MAX_QUERY_CHARS:
+            return
+        with self._lock:
+            entry = self._pending.setdefault(key, {'count': 0})
+            entry['count'] += 1
+            entry['query'] = str(query).strip()
+            entry['last_seen'] = int(time.time())
+            due = time.time() - self._last_flush >= self.flush_seconds
+        if due:
+            self.flush()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('queries', {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not read query log {self.path}: {e}")
+            return {}
+
+    def flush(self):
+        """Merge the buffered counts into the log file"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.time()
+        if not pending:
+            return
+        try:
+            with _FileLock(self.path + '.lock'):
+                queries = self._read()
+                for key, entry in pending.items():
+                    merged = queries.setdefault(key, {'count': 0})
+                    merged['count'] += entry['count']
+                    merged['query'] = entry['query']
+                    merged['last_seen'] = max(merged.get('last_seen', 0), entry['last_seen'])
+                if len(queries) > self.max_entries:
+                    keep = sorted(queries, key=lambda k: (queries[k]['count'], queries[k]['last_seen']),
+                                  reverse=True)[:self.max_entries]
+                    queries = {key: queries[key] for key in keep}
+                _write_json(self.path, {'queries': queries})
+        except OSError as e:
+            print(f"Warning: could not write query log {self.path}: {e}")
+
+    def top(self, limit: int) -> List[Dict[str, Any]]:
+        """Most frequent queries first: [{'key', 'query', 'count', 'last_seen'}, ...]"""
+        self.flush()
+        queries = self._read()
+        keys = sorted(queries, key=lambda k: (queries[k]['count'], queries[k].get('last_seen', 0)),
+                      reverse=True)[:limit]
+        return [{'key': key, **queries[key]} for key in keys]
+
+
+class AnswerCache:
+    """Chat answers keyed by (catalog version, normalized query)"""
+
+    def __init__(self, cache_dir: str, max_entries: int = None):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries or int(os.getenv('LLM_CACHE_MAX_ENTRIES', '1000'))
+        self._memory: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._warm: Dict[str, Any] = {}
+        self._warm_mtime = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def warm_path(self) -> str:
+        return os.path.join(self.cache_dir, 'answers.json')
+
+    def warm_answers(self, catalog_version: str) -> Dict[str, Dict[str, Any]]:
+        """Answers the warm-up job wrote for this catalog version (re-read when the file changes)"""
+        try:
+            mtime = os.stat(self.warm_path).st_mtime_ns
+        except OSError:
+            return {}
+        if mtime != self._warm_mtime:
+            try:
+                with open(self.warm_path, 'r', encoding='utf-8') as f:
+                    warm = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: could not read warm answer cache {self.warm_path}: {e}")
+                warm = {}
+            with self._lock:
+                self._warm, self._warm_mtime = warm, mtime
+        if self._warm.get('catalog_version') != catalog_version:
+            return {}
+        return self._warm.get('answers', {})
+
+    def get(self, catalog_version: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            answer = self._memory.get((catalog_version, key))
+            if answer is not None:
+                self._memory.move_to_end((catalog_version, key))
+        if answer is None:
+            answer = self.warm_answers(catalog_version).get(key)
+        with self._lock:
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return answer
+
+    def put(self, catalog_version: str, key: str, answer: Dict[str, Any]):
+        with self._lock:
+            self._memory[(catalog_version, key)] = answer
+            self._memory.move_to_end((catalog_version, key))
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def write_warm(self, catalog_version: str, answers: Dict[str, Dict[str, Any]]):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        _write_json(self.warm_path, {
+            'catalog_version': catalog_version,
+            'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'answers': answers
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            warm = self._warm.get('answers', {})
+            return {'entries': len(self._memory), 'max_entries': self.max_entries, 'warm_entries': len(warm),
+                    'warm_catalog_version': self._warm.get('catalog_version'), 'hits': self.hits,
+                    'misses': self.misses}
+
+
+# Returned for a query that could not get a rate limit token within the budget
+_OVER_BUDGET = object()
+
+
+def warm_answer_cache(cache: AnswerCache, query_log: QueryLog, catalog_version: str,
+                      answer: Callable[[str], Optional[Dict[str, Any]]], top_n: int = None,
+                      budget_seconds: float = None, concurrency: int = None, admission=None,
+                      rate_limiter=None) -> Dict[str, Any]:
+    """Answer the log's top queries for `catalog_version` and publish them as the warm cache.
+
+    Answers already warm for this version are kept, so after a catalog change
+    everything is recomputed and otherwise only newly popular queries are. No new
+    query is started once `budget_seconds` have passed; `answer` returns None when
+    the LLM is unavailable, which stops the run. Only one process warms at a time.
+
+    With a `rate_limiter`, each call first waits for a WARM_CLIENT token (a query
+    whose token would come after the budget is left for the next run); with an
+    `admission` controller it then holds a slot while it runs, as background jobs do.
+    """
+    top_n = top_n or int(os.getenv('LLM_CACHE_WARM_TOP_N', '50'))
+    budget_seconds = budget_seconds if budget_seconds is not None else float(
+        os.getenv('LLM_CACHE_WARM_BUDGET_SECONDS', '300'))
+    concurrency = max(1, concurrency or int(os.getenv('LLM_CACHE_WARM_CONCURRENCY', '4')))
+
+    started = time.time()
+    deadline = started + budget_seconds
+
+    def gated_answer(query: str):
+        if rate_limiter is not None:
+            while True:
+                granted, wait = rate_limiter.check(WARM_CLIENT)
+                if granted:
+                    break
+                if time.time() + wait >= deadline:
+                    return _OVER_BUDGET
+                time.sleep(wait)
+        if admission is None:
+            return answer(query)
+        admission.acquire_blocking()
+        called = time.time()
+        try:
+            return answer(query)
+        finally:
+            admission.release(time.time() - called)
+    with _FileLock(os.path.join(cache.cache_dir, 'warm.lock'), blocking=False) as lock:
+        if not lock.acquired:
+            return {'skipped': 'another warm-up is running'}
+
+        top = query_log.top(top_n)
+        previous = cache.warm_answers(catalog_version)
+        answers = {entry['key']: previous[entry['key']] for entry in top if entry['key'] in previous}
+        todo = [entry for entry in top if entry['key'] not in answers]
+
+        computed = failed = 0
+        unavailable = False
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            running = {}
+            while todo or running:
+                while todo and len(running) < concurrency and not unavailable and time.time() < deadline:
+                    entry = todo.pop(0)
+                    running[executor.submit(gated_answer, entry['query'])] = entry
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    entry = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"Warning: warming {entry['query']!r} failed: {e}")
+                        failed += 1
+                        continue
+                    if result is None:
+                        unavailable = True
+                    elif result is not _OVER_BUDGET:
+                        answers[entry['key']] = result
+                        computed += 1
+
+        cache.write_warm(catalog_version, answers)
+        return {
+            'catalog_version': catalog_version,
+            'queries': len(top),
+            'reused': len(answers) - computed,
+            'computed': computed,
+            'failed': failed,
+            'remaining': len(top) - len(answers),
+            'llm_unavailable': unavailable,
+            'seconds': round(time.time() - started, 3)
+        }
+
+
+if __name__ == "__main__":
+    from services.llm_service import llm_service
+
+    parser = argparse.ArgumentParser(description="Pre-compute LLM answers for the most frequent chat queries")
+    parser.add_argument('--top', type=int, default=None, help="Number of top queries to answer (default 50)")
+    parser.add_argument('--budget-seconds', type=float, default=None, help="Stop starting new queries after this long")
+    parser.add_argument('--concurrency', type=int, default=None, help="Concurrent LLM calls (default 4)")
+    parser.add_argument('--list', action='store_true', help="Only print the top queries")
+    args = parser.parse_args()
+
+    if args.list:
+        for entry in llm_service.query_log.top(args.top or 50):
+            print(f"{entry['count']:6d}  {entry['query']}")
+    else:
+        print(llm_service.warm_cache(args.top, args.budget_seconds, args.concurrency))
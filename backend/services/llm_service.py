@@ -3,16 +3,45 @@
 # Unauthorized copying, distribution, or use is strictly prohibited.
 
 import os
+import re
+import time
+import math
 import requests
 import json
 from typing import Dict, List, Any, Optional
 from services.data_service import data_service
+from services.recommendation_service import recommendation_service
+from services.circuit_breaker import CircuitBreaker
+from services.semantic_index import semantic_index
+from services.session_store import record_turn
+from services.llm_cache import AnswerCache, QueryLog, normalize_query, warm_answer_cache
+from services.admission import llm_admission, llm_rate_limiter
+
+DEGRADED_NOTICE = "The AI assistant is temporarily unavailable, so this answer was generated from catalog data."
+
+_BUDGET_RE = re.compile(r'(?:under|below|less than|up to|within|max(?:imum)?|budget(?: of)?|<)\s*\$?\s*([\d,]+(?:\.\d+)?)\s*(k\b)?', re.IGNORECASE)
+# Minimum cosine similarity for a semantic match to count as relevant
+SEMANTIC_MATCH_THRESHOLD = 0.25
+
+_RAM_RE = re.compile(r'(\d+)\s*gb\s*(?:of\s*)?(?:ram|memory)', re.IGNORECASE)
 
 class LLMService:
     def __init__(self):
         self.api_key = os.getenv('DEEPSEEK_API_KEY')
         self.base_url = "https://api.deepseek.com/v1"
         self.model = "deepseek-chat"
+        self.timeout = float(os.getenv('LLM_TIMEOUT_SECONDS', '20'))
+        data_dir = os.path.dirname(data_service.data_path)
+        self.query_log = QueryLog(os.getenv('QUERY_LOG_PATH') or os.path.join(data_dir, 'query_log.json'))
+        self.answer_cache = AnswerCache(os.getenv('LLM_CACHE_DIR') or os.path.join(data_dir, 'llm_cache'))
+        self.breaker = CircuitBreaker(
+            failure_rate=float(os.getenv('LLM_BREAKER_FAILURE_RATE', '0.5')),
+            window=int(os.getenv('LLM_BREAKER_WINDOW', '20')),
+            min_calls=int(os.getenv('LLM_BREAKER_MIN_CALLS', '5')),
+            slow_call_seconds=float(os.getenv('LLM_BREAKER_SLOW_CALL_SECONDS', '15')),
+            open_seconds=float(os.getenv('LLM_BREAKER_OPEN_SECONDS', '30')),
+            half_open_probes=int(os.getenv('LLM_BREAKER_HALF_OPEN_PROBES', '1'))
+        )
         
         # Debug info (can be removed in production)
         # print(f"DEBUG: API Key found: {bool(self.api_key)}")
@@ -22,11 +51,15 @@ class LLMService:
             print("Warning: DEEPSEEK_API_KEY not found in environment variables")
     
     def _make_request(self, messages: List[Dict], temperature: float = 0.7, max_tokens: int = 1000) -> Optional[str]:
-        """Make a request to DeepSeek API"""
+        """Make a request to DeepSeek API; None when the API is unavailable (callers fall back to local answers)"""
         # print(f"DEBUG: Making request with API key: {bool(self.api_key)}")
         
         if not self.api_key:
-            return "Error: API key not configured"
+            return None
+        
+        # Fail fast while the circuit is open
+        if not self.breaker.allow():
+            return None
         
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -40,36 +73,126 @@ class LLMService:
             "max_tokens": max_tokens
         }
         
+        started = time.monotonic()
         try:
             # print(f"DEBUG: Making request to {self.base_url}/chat/completions")
-            response = requests.post(f"{self.base_url}/chat/completions", headers=headers, json=data)
+            response = requests.post(f"{self.base_url}/chat/completions", headers=headers, json=data, timeout=self.timeout)
             # print(f"DEBUG: Response status: {response.status_code}")
             response.raise_for_status()
             
             result = response.json()
-            return result['choices'][0]['message']['content']
+            content = result['choices'][0]['message']['content']
+            self.breaker.record(True, time.monotonic() - started)
+            return content
         except Exception as e:
+            self.breaker.record(False, time.monotonic() - started)
             print(f"DEBUG: Request failed with error: {str(e)}")
-            return f"Error: {str(e)}"
+            return None
+    
+    def chat_query(self, user_query: str, context: str = "", laptops: List[Dict] = None,
+                   session: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Handle chat queries about laptops (pass `laptops` to reuse one catalog snapshot across calls).
+        
+        With a `session` (see services.session_store), follow-up questions reuse the laptops
+        retrieved earlier in the conversation, the LLM gets full details only for laptops it has
+        not seen yet, and the session is updated in place with this turn.
+        
+        Every query is counted in the query log. Opening questions without extra context are
+        answered from the answer cache when possible.
+        """
+        self.query_log.record(user_query)
+        cacheable = not context and not (session and session['turn_count'])
+        cache_key = normalize_query(user_query)
+        
+        cached = self.answer_cache.get(data_service.catalog_version, cache_key) if cacheable else None
+        if cached is not None:
+            result = {
+                "query": user_query,
+                "response": cached["response"],
+                "context_used": cached["context_used"],
+                "timestamp": "2024-01-01T00:00:00Z",
+                "degraded": False,
+                "cached": True
+            }
+            retrieved_keys, sent_keys = cached["laptop_keys"], cached["sent_keys"]
+        else:
+            result, retrieved_keys, sent_keys = self._answer_chat(user_query, context, laptops, session)
+            result["cached"] = False
+            if cacheable and not result["degraded"]:
+                self.answer_cache.put(data_service.catalog_version, cache_key,
+                                      self._cache_entry(result, retrieved_keys, sent_keys))
+        
+        if session is not None:
+            record_turn(session, user_query, result["response"], retrieved_keys,
+                        [] if result["degraded"] else sent_keys)
+        return result
+    
+    def warm_cache(self, top_n: int = None, budget_seconds: float = None, concurrency: int = None) -> Dict[str, Any]:
+        """Pre-compute answers to the most frequent logged queries for the current catalog version"""
+        def answer(query):
+            result, retrieved_keys, sent_keys = self._answer_chat(query)
+            return None if result["degraded"] else self._cache_entry(result, retrieved_keys, sent_keys)
+        
+        return warm_answer_cache(self.answer_cache, self.query_log, data_service.catalog_version, answer,
+                                 top_n=top_n, budget_seconds=budget_seconds, concurrency=concurrency,
+                                 admission=llm_admission, rate_limiter=llm_rate_limiter)
+    
+    def cache_is_warm(self) -> bool:
+        """Whether the warm-up job has published answers for the current catalog version"""
+        return bool(self.answer_cache.warm_answers(data_service.catalog_version))
+    
+    @staticmethod
+    def _cache_entry(result: Dict[str, Any], retrieved_keys: List[str], sent_keys: List[str]) -> Dict[str, Any]:
+        return {
+            "response": result["response"],
+            "context_used": result["context_used"],
+            "laptop_keys": retrieved_keys,
+            "sent_keys": sent_keys
+        }
     
-    def chat_query(self, user_query: str, context: str = "") -> Dict[str, Any]:
-        """Handle chat queries about laptops"""
+    def _answer_chat(self, user_query: str, context: str = "", laptops: List[Dict] = None,
+                     session: Dict[str, Any] = None):
+        """Retrieve, prompt and answer one chat query: (result, retrieved laptop keys, keys sent in full)"""
         
         # Get relevant laptop data for context
-        laptops = data_service.get_all_laptops()
-        
-        # Search for specific laptop models mentioned in the query
-        relevant_laptops = self._find_relevant_laptops(user_query, laptops)
-        
-        # If no specific laptops found, use first 5 as fallback
-        if not relevant_laptops:
-            relevant_laptops = laptops[:5]
+        if laptops is None:
+            laptops = data_service.get_all_laptops()
+        
+        carried_laptops = []
+        if session and session['laptop_keys']:
+            carried_laptops = [laptops[row] for row in data_service.rows_for_keys(session['laptop_keys'])
+                               if row < len(laptops)]
+        
+        if carried_laptops:
+            # Follow-up: only a laptop named outright replaces the conversation's laptops
+            named_laptops = self._named_laptops(user_query, laptops) or carried_laptops
+            relevant_laptops = named_laptops[:10]
         else:
-            # Limit to avoid token limits while ensuring we include relevant ones
-            relevant_laptops = relevant_laptops[:10]
+            # Search for specific laptop models mentioned in the query
+            relevant_laptops = self._find_relevant_laptops(user_query, laptops)
+            named_laptops = list(relevant_laptops)
+            
+            # If no specific laptops found, use first 5 as fallback
+            if not relevant_laptops:
+                relevant_laptops = laptops[:5]
+            else:
+                # Limit to avoid token limits while ensuring we include relevant ones
+                relevant_laptops = relevant_laptops[:10]
+        
+        # Full details only for laptops the LLM has not been given in this session
+        sent_keys = set(session['sent_keys']) if session else set()
+        relevant_keys = [laptop.key for laptop in relevant_laptops]
+        new_laptops = [laptop for laptop, key in zip(relevant_laptops, relevant_keys) if key not in sent_keys]
+        known_laptops = {laptop.row: laptop for laptop in carried_laptops + relevant_laptops
+                         if laptop.key in sent_keys}
         
         # Create context from relevant laptop data
-        laptop_context = self._create_laptop_context(relevant_laptops)
+        laptop_context = self._create_laptop_context(new_laptops)
+        if known_laptops:
+            known_lines = []
+            for row, laptop in known_laptops.items():
+                known_lines.extend(self._laptop_facts(row, laptop))
+            laptop_context += "\nLaptops already discussed in this conversation:\n" + "\n".join(known_lines)
         
         system_prompt = f"""You are a laptop expert assistant specializing in business laptops from Lenovo and HP. 
 
@@ -102,26 +225,38 @@ EXAMPLES OF GOOD FORMATTING:
 
 Answer user questions about laptops, specifications, comparisons, and recommendations."""
 
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_query}
-        ]
+        messages = [{"role": "system", "content": system_prompt}]
+        if session and session['summary']:
+            messages.append({"role": "system", "content": f"Earlier in this conversation:\n{session['summary']}"})
+        if context:
+            messages.append({"role": "system", "content": f"Additional context from the user:\n{context}"})
+        if session:
+            messages.extend(session['turns'])
+        messages.append({"role": "user", "content": user_query})
         
         response = self._make_request(messages, temperature=0.7, max_tokens=300)
         # print(f"DEBUG: Got response: {response[:100]}...")
         
-        # Clean up the response
-        cleaned_response = self._clean_response(response)
+        degraded = response is None
+        if degraded:
+            cleaned_response = self._fallback_chat_answer(user_query, named_laptops)
+        else:
+            # Clean up the response
+            cleaned_response = self._clean_response(response)
         
         result = {
             "query": user_query,
             "response": cleaned_response,
             "context_used": laptop_context[:200] + "..." if len(laptop_context) > 200 else laptop_context,
-            "timestamp": "2024-01-01T00:00:00Z"
+            "timestamp": "2024-01-01T00:00:00Z",
+            "degraded": degraded
         }
         
+        # Only retrieved laptops carry over to later turns, not the generic first-five fallback
+        retrieved_keys = [laptop.key for laptop in named_laptops[:10]]
+        
         # print(f"DEBUG: Returning result with response type: {type(response)}")
-        return result
+        return result, retrieved_keys, relevant_keys
     
     def get_recommendations(self, constraints: Dict[str, Any]) -> Dict[str, Any]:
         """Get laptop recommendations based on user constraints"""
@@ -171,13 +306,147 @@ Keep each recommendation concise but informative."""
         
         response = self._make_request(messages, temperature=0.8, max_tokens=1500)
         
+        degraded = response is None
+        if degraded:
+            response = self._fallback_recommendations(constraints)
+        
         return {
             "constraints": constraints,
             "recommendations": response,
             "laptops_considered": len(filtered_laptops),
-            "timestamp": "2024-01-01T00:00:00Z"
+            "timestamp": "2024-01-01T00:00:00Z",
+            "degraded": degraded
+        }
+    
+    def compare_laptops(self, laptop_ids: List[int]) -> Dict[str, Any]:
+        """Compare multiple laptops by id"""
+        # Get laptop details
+        laptops = []
+        for laptop_id in laptop_ids:
+            laptop = data_service.get_laptop_by_id(laptop_id)
+            if laptop:
+                # Convert all values to strings to avoid JSON serialization issues
+                safe_laptop = {}
+                for key, value in laptop.items():
+                    if value is not None:
+                        if isinstance(value, (int, float)):
+                            # Handle special float values that aren't JSON compliant
+                            if str(value) in ['inf', '-inf', 'nan']:
+                                safe_laptop[key] = str(value)
+                            else:
+                                safe_laptop[key] = value
+                        else:
+                            safe_laptop[key] = str(value)
+                    else:
+                        safe_laptop[key] = None
+                laptops.append(safe_laptop)
+        
+        if len(laptops) < 2:
+            raise LookupError("Could not find enough laptops for comparison")
+        
+        # Create comparison context
+        comparison_context = "Compare these laptops:\n"
+        for i, laptop in enumerate(laptops):
+            comparison_context += f"Laptop {i+1}: {laptop.get('Brand', '')} {laptop.get('Model', '')}\n"
+            comparison_context += f"Processor: {laptop.get('Processor', '')}\n"
+            comparison_context += f"Memory: {laptop.get('Memory (RAM)', '')}\n"
+            comparison_context += f"Storage: {laptop.get('Storage', '')}\n"
+            comparison_context += f"Display: {laptop.get('Display', '')}\n"
+            comparison_context += f"Price: {laptop.get('Price Details', '')}\n"
+            comparison_context += "---\n"
+        
+        # Use LLM to generate comparison
+        comparison_query = f"Please provide a detailed comparison of these laptops, highlighting key differences, pros and cons, and which would be best for different use cases: {comparison_context}"
+        
+        response, _, _ = self._answer_chat(comparison_query)
+        comparison = response["response"]
+        if response["degraded"]:
+            comparison = self._fallback_comparison(laptop_ids)
+        
+        return {
+            "laptops": laptops,
+            "comparison": comparison,
+            "laptop_ids": laptop_ids,
+            "degraded": response["degraded"]
         }
     
+    def _laptop_facts(self, row: int, laptop: Dict) -> List[str]:
+        """Title line plus spec/rating bullets for the laptop at `row`, formatted like the LLM answers"""
+        price = data_service.feature_array('price')[row]
+        rating = data_service.feature_array('rating')[row]
+        title = f"{laptop.get('brand', laptop.get('Brand', ''))} {laptop.get('model', laptop.get('Model', ''))}"
+        lines = [f"**{title}{f' - ${price:,.0f}' if not math.isnan(price) else ''}**"]
+        specs = [laptop.get(key) for key in ('processor', 'memory', 'storage', 'display') if laptop.get(key)]
+        if specs:
+            lines.append(f"  - {', '.join(specs)}")
+        if not math.isnan(rating):
+            lines.append(f"  - Rated {rating:.1f}/5")
+        return lines
+    
+    def _parse_query_constraints(self, user_query: str) -> Dict[str, Any]:
+        """Pull a budget, brand and RAM requirement out of a free-text question"""
+        constraints = {}
+        query_lower = user_query.lower()
+        for brand in data_service.get_brands():
+            if re.search(rf'\b{re.escape(brand.lower())}\b', query_lower):
+                constraints['brand'] = brand
+                break
+        budget = _BUDGET_RE.search(user_query)
+        if budget:
+            amount = float(budget.group(1).replace(',', ''))
+            amount = amount * 1000 if budget.group(2) else amount
+            constraints['max_price'] = int(amount) if amount.is_integer() else amount
+        ram = _RAM_RE.search(user_query)
+        if ram:
+            constraints['min_memory'] = f"{ram.group(1)}GB"
+        return constraints
+    
+    def _fallback_chat_answer(self, user_query: str, named_laptops: List[Dict]) -> str:
+        """Deterministic answer from catalog facts, used while the LLM is unavailable"""
+        lines = [DEGRADED_NOTICE, ""]
+        constraints = self._parse_query_constraints(user_query)
+        
+        # Named laptops answer the question unless it also asks for a budget or spec
+        if named_laptops and not {'max_price', 'min_memory'} & set(constraints):
+            lines.append("**Laptops matching your question:**")
+            for laptop in named_laptops[:5]:
+                lines.extend(self._laptop_facts(laptop.row, laptop))
+            return "\n".join(lines)
+        
+        recommendations = recommendation_service.get_constraint_based_recommendations(constraints)[:5] if constraints else []
+        if not recommendations:
+            recommendations = recommendation_service.get_trending_laptops(limit=5)
+            lines.append("**Popular laptops in our catalog:**")
+        else:
+            lines.append(f"**Top matches for: {self._format_constraints(constraints).replace(chr(10), ', ')}**")
+        for rec in recommendations:
+            lines.extend(self._laptop_facts(data_service.row_for_id(rec['laptop_id']), rec))
+        return "\n".join(lines)
+    
+    def _fallback_recommendations(self, constraints: Dict[str, Any]) -> str:
+        """Deterministic recommendations from the local scorer, used while the LLM is unavailable"""
+        recommendations = recommendation_service.get_constraint_based_recommendations(constraints)[:5]
+        if not recommendations:
+            return f"{DEGRADED_NOTICE}\n\nNo laptops in the catalog match these constraints."
+        
+        lines = [DEGRADED_NOTICE, "", "**Top Recommendations:**", ""]
+        for rank, rec in enumerate(recommendations, 1):
+            facts = self._laptop_facts(data_service.row_for_id(rec['laptop_id']), rec)
+            lines.append(f"**{rank}. {facts[0].strip('*')}**")
+            lines.extend(facts[1:])
+            if rec.get('match_reasons'):
+                lines.append(f"  - Why it fits: {'; '.join(rec['match_reasons'])}")
+            lines.append("")
+        return "\n".join(lines).rstrip()
+    
+    def _fallback_comparison(self, laptop_ids: List[int]) -> str:
+        """Side-by-side catalog facts, used while the LLM is unavailable"""
+        records, _ = data_service.get_laptops_by_ids(laptop_ids)
+        lines = [DEGRADED_NOTICE, ""]
+        for laptop in records:
+            lines.extend(self._laptop_facts(laptop.row, laptop))
+        return "\n".join(lines)
+    
     def _create_laptop_context(self, laptops: List[Dict]) -> str:
         """Create a text context from laptop data"""
         context_parts = []
@@ -301,6 +570,24 @@ Keep each recommendation concise but informative."""
 
     def _find_relevant_laptops(self, user_query: str, laptops: List[Dict]) -> List[Dict]:
         """Find laptops relevant to the user query"""
+        unique_laptops = self._named_laptops(user_query, laptops)
+        
+        # Nothing named exactly: tolerate typos such as "thinkpd e14" or "probok 450"
+        if not unique_laptops:
+            for row in data_service.fuzzy_match(user_query, match_all=False, limit=10):
+                if row < len(laptops):
+                    unique_laptops.append(laptops[row])
+        
+        # Still nothing: match descriptions such as "light laptop for travel" by meaning
+        if not unique_laptops:
+            for row, score in semantic_index.search(user_query, 5):
+                if score >= SEMANTIC_MATCH_THRESHOLD and row < len(laptops):
+                    unique_laptops.append(laptops[row])
+        
+        return unique_laptops
+    
+    def _named_laptops(self, user_query: str, laptops: List[Dict]) -> List[Dict]:
+        """Laptops whose brand and model are mentioned in the query"""
         query_lower = user_query.lower()
         relevant_laptops = []
         
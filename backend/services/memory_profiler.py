@@ -0,0 +1,389 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Memory diagnostics built on tracemalloc.
+
+Tracing is off by default, so it costs nothing until an admin starts it
+(or the worker was launched with PYTHONTRACEMALLOC set). While tracing:
+
+- a baseline snapshot is kept and any later snapshot can be diffed
+  against it, grouped by line, file or full traceback;
+- a fraction of API requests is sampled: a snapshot is taken before the
+  request and after its response has been sent, and the call sites that
+  still hold memory are summed per endpoint, together with the request's
+  peak traced memory. Only one request is sampled at a time and the
+  snapshots run on the event loop, so keep the sample rate low under load.
+
+Sizes of resident structures are measured by walking the object graph,
+with numpy, pandas and scipy.sparse containers sized from their buffers.
+Every worker process traces its own heap; responses carry the pid.
+"""
+
+import os
+import random
+import sys
+import sysconfig
+import threading
+import time
+import tracemalloc
+import types
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Frames of the profiler itself and of the import machinery are noise in every diff
+_IGNORED_FILES = (tracemalloc.__file__, __file__, '<frozen importlib._bootstrap>',
+                  '<frozen importlib._bootstrap_external>', '<unknown>')
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_STDLIB_DIR = sysconfig.get_paths()['stdlib']
+# Call sites kept per endpoint between reports
+MAX_ENDPOINT_SITES = 200
+# Objects visited per structure before sizing gives up and reports a lower bound
+MAX_SIZEOF_OBJECTS = 2_000_000
+
+# Objects that belong to the program rather than to a data structure
+_OPAQUE_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+                 types.CodeType, types.FrameType, type(threading.Lock()), threading.Thread, Executor)
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(_BACKEND_DIR + os.sep):
+        return os.path.relpath(filename, _BACKEND_DIR)
+    # Library code: keep the module path below site-packages or the standard library
+    marker = 'site-packages' + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    if filename.startswith(_STDLIB_DIR + os.sep):
+        return os.path.relpath(filename, _STDLIB_DIR)
+    return filename
+
+
+def _site(frame: tracemalloc.Frame) -> str:
+    return f"{_short_path(frame.filename)}:{frame.lineno}"
+
+
+def process_memory() -> Dict[str, Optional[int]]:
+    """Current and peak resident set size of this process in bytes"""
+    rss = None
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    rss = int(line.split()[1]) * 1024
+                    break
+    except OSError:
+        pass
+    max_rss = None
+    try:
+        import resource
+        # Kilobytes on Linux, bytes on macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        max_rss = max_rss if sys.platform == 'darwin' else max_rss * 1024
+    except ImportError:  # pragma: no cover - Windows
+        pass
+    return {'rss_bytes': rss, 'max_rss_bytes': max_rss}
+
+
+class _SizedValues:
+    """Stand-in for column values deep_sizeof cannot walk (extension arrays): a precomputed size"""
+
+    __slots__ = ('nbytes',)
+
+    def __init__(self, nbytes: int):
+        self.nbytes = nbytes
+
+
+def _series_values(series: pd.Series) -> Any:
+    """The numpy array behind a Series (a view, so it leads to the shared buffer), or its size"""
+    if isinstance(series.dtype, np.dtype):
+        return series.to_numpy()
+    return _SizedValues(int(series.memory_usage(deep=True, index=False)))
+
+
+def deep_sizeof(obj: Any, seen: set = None, max_objects: int = MAX_SIZEOF_OBJECTS) -> Dict[str, Any]:
+    """Heap bytes reachable from `obj`: {'bytes', 'mapped_bytes', 'objects', 'truncated'}.
+
+    Objects already in `seen` are not counted again, so sizing several
+    structures with one set attributes shared data to the first. Memory-mapped
+    arrays are reported as `mapped_bytes`; their pages are file backed.
+    """
+    seen = set() if seen is None else seen
+    total = mapped = objects = 0
+    stack = [obj]
+    while stack:
+        if objects >= max_objects:
+            return {'bytes': total, 'mapped_bytes': mapped, 'objects': objects, 'truncated': True}
+        item = stack.pop()
+        if id(item) in seen or item is None or isinstance(item, _OPAQUE_TYPES):
+            continue
+        seen.add(id(item))
+        objects += 1
+
+        if isinstance(item, np.ndarray):
+            if isinstance(item, np.memmap) or isinstance(item.base, np.memmap):
+                mapped += item.nbytes
+            elif item.base is not None:
+                # A view: the buffer belongs to its base
+                total += sys.getsizeof(item)
+                stack.append(item.base)
+            else:
+                total += sys.getsizeof(item)
+                if item.dtype == object:
+                    stack.extend(item.ravel().tolist())
+            continue
+        if isinstance(item, pd.DataFrame):
+            # Column by column, so buffers also viewed from elsewhere (e.g. the laptop records) count once
+            total += int(item.index.memory_usage(deep=True))
+            stack.extend(_series_values(column) for _, column in item.items())
+            continue
+        if isinstance(item, pd.Series):
+            total += int(item.index.memory_usage(deep=True))
+            stack.append(_series_values(item))
+            continue
+        if isinstance(item, pd.Index):
+            total += int(item.memory_usage(deep=True))
+            continue
+        if isinstance(item, _SizedValues):
+            total += item.nbytes
+            continue
+        if hasattr(item, 'indptr') and hasattr(item, 'indices') and hasattr(item, 'data'):
+            # scipy.sparse compressed matrix
+            total += sys.getsizeof(item) + item.data.nbytes + item.indices.nbytes + item.indptr.nbytes
+            continue
+
+        total += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, bytearray, int, float, complex, bool)):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            stack.extend(item)
+        else:
+            attributes = getattr(item, '__dict__', None)
+            if attributes is not None:
+                stack.append(attributes)
+            for name in getattr(type(item), '__slots__', ()):
+                stack.append(getattr(item, name, None))
+    return {'bytes': total, 'mapped_bytes': mapped, 'objects': objects, 'truncated': False}
+
+
+def structure_sizes(structures: Iterable[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+    """deep_sizeof of each named structure, largest first; shared data counts towards the earlier name"""
+    seen = set()
+    sizes = []
+    for name, obj in structures:
+        started = time.perf_counter()
+        size = deep_sizeof(obj, seen)
+        sizes.append({'name': name, 'type': type(obj).__name__, **size,
+                      'seconds': round(time.perf_counter() - started, 4)})
+    return sorted(sizes, key=lambda entry: entry['bytes'], reverse=True)
+
+
+class MemoryProfiler:
+    """tracemalloc control, baseline diffs and per-endpoint allocation sampling for one process"""
+
+    def __init__(self, sample_rate: float = None):
+        self.sample_rate = sample_rate if sample_rate is not None else float(
+            os.getenv('MEMORY_PROFILER_SAMPLE_RATE', '0.1'))
+        self.baseline = None
+        self.baseline_at = None
+        self.endpoints: Dict[str, Dict[str, Any]] = {}
+        self._sampling = False
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = None, sample_rate: float = None) -> Dict[str, Any]:
+        """Start tracing (if needed), take a fresh baseline and clear the endpoint samples"""
+        frames = frames or int(os.getenv('MEMORY_PROFILER_FRAMES', '10'))
+        if tracemalloc.is_tracing() and tracemalloc.get_traceback_limit() != frames:
+            tracemalloc.stop()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        with self._lock:
+            self.endpoints = {}
+        self.take_baseline()
+        return self.status()
+
+    def stop(self) -> Dict[str, Any]:
+        tracemalloc.stop()
+        with self._lock:
+            self.baseline = self.baseline_at = None
+            self.endpoints = {}
+        return self.status()
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES])
+
+    def take_baseline(self):
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing; start the profiler first")
+        snapshot = self._snapshot()
+        with self._lock:
+            self.baseline, self.baseline_at = snapshot, time.time()
+
+    def status(self) -> Dict[str, Any]:
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            'pid': os.getpid(),
+            'tracing': tracing,
+            'frames': tracemalloc.get_traceback_limit() if tracing else None,
+            'sample_rate': self.sample_rate,
+            'traced_bytes': current,
+            'traced_peak_bytes': peak,
+            'tracemalloc_overhead_bytes': tracemalloc.get_tracemalloc_memory() if tracing else 0,
+            'baseline_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self.baseline_at))
+            if self.baseline_at else None,
+            'sampled_endpoints': len(self.endpoints),
+            **process_memory()
+        }
+
+    def diff(self, top: int = 20, group_by: str = 'lineno') -> Dict[str, Any]:
+        """Allocation growth since the baseline, largest first"""
+        if group_by not in ('lineno', 'filename', 'traceback'):
+            raise ValueError("group_by must be 'lineno', 'filename' or 'traceback'")
+        if self.baseline is None:
+            raise RuntimeError("No baseline snapshot; start the profiler first")
+        snapshot = self._snapshot()
+        stats = snapshot.compare_to(self.baseline, group_by)
+        entries = []
+        for stat in stats[:top]:
+            entry = {'site': _site(stat.traceback[-1]), 'size_diff': stat.size_diff, 'size': stat.size,
+                     'count_diff': stat.count_diff, 'count': stat.count}
+            if group_by == 'filename':
+                entry['site'] = _short_path(stat.traceback[-1].filename)
+            elif group_by == 'traceback':
+                # Most recent call first
+                entry['traceback'] = [_site(frame) for frame in reversed(stat.traceback)]
+            entries.append(entry)
+        return {
+            'pid': os.getpid(),
+            'group_by': group_by,
+            'since': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self.baseline_at)),
+            'total_size_diff': sum(stat.size_diff for stat in stats),
+            'total_size': sum(stat.size for stat in stats),
+            'sites': entries
+        }
+
+    def _begin_sample(self) -> bool:
+        if not tracemalloc.is_tracing() or random.random() >= self.sample_rate:
+            return False
+        with self._lock:
+            if self._sampling:
+                return False
+            self._sampling = True
+        return True
+
+    def _record_sample(self, endpoint: str, before: tracemalloc.Snapshot, start_bytes: int):
+        after = self._snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        stats = after.compare_to(before, 'lineno')
+        with self._lock:
+            entry = self.endpoints.setdefault(endpoint, {
+                'samples': 0, 'retained_bytes': 0, 'peak_bytes_max': 0, 'peak_bytes_total': 0, 'sites': {}})
+            entry['samples'] += 1
+            entry['retained_bytes'] += sum(stat.size_diff for stat in stats)
+            entry['peak_bytes_max'] = max(entry['peak_bytes_max'], peak - start_bytes)
+            entry['peak_bytes_total'] += peak - start_bytes
+            sites = entry['sites']
+            for stat in stats:
+                if stat.size_diff <= 0:
+                    continue
+                site = sites.setdefault(_site(stat.traceback[-1]), [0, 0])
+                site[0] += stat.size_diff
+                site[1] += stat.count_diff
+            if len(sites) > MAX_ENDPOINT_SITES:
+                keep = sorted(sites, key=lambda key: sites[key][0], reverse=True)[:MAX_ENDPOINT_SITES]
+                entry['sites'] = {key: sites[key] for key in keep}
+
+    def endpoint_report(self, top: int = 10) -> Dict[str, Any]:
+        """Sampled endpoints by retained bytes, each with its top call sites"""
+        with self._lock:
+            endpoints = []
+            for endpoint, entry in self.endpoints.items():
+                sites = sorted(entry['sites'].items(), key=lambda item: item[1][0], reverse=True)[:top]
+                endpoints.append({
+                    'endpoint': endpoint,
+                    'samples': entry['samples'],
+                    'retained_bytes': entry['retained_bytes'],
+                    'retained_bytes_per_request': entry['retained_bytes'] // entry['samples'],
+                    'peak_bytes_max': entry['peak_bytes_max'],
+                    'peak_bytes_per_request': entry['peak_bytes_total'] // entry['samples'],
+                    'sites': [{'site': site, 'size_diff': size, 'count_diff': count}
+                              for site, (size, count) in sites]
+                })
+        endpoints.sort(key=lambda entry: entry['retained_bytes'], reverse=True)
+        return {'pid': os.getpid(), 'sample_rate': self.sample_rate, 'endpoints': endpoints}
+
+
+def _endpoint_name(scope: Dict[str, Any]) -> str:
+    """'GET /api/v1/explore/{laptop_id}' - the route template, so ids don't split the stats"""
+    route = scope.get('route')
+    path = getattr(route, 'path', None)
+    if path is None and scope.get('endpoint') is not None and scope.get('app') is not None:
+        for candidate in getattr(scope['app'], 'routes', []):
+            if getattr(candidate, 'endpoint', None) is scope['endpoint']:
+                path = candidate.path
+                break
+    return f"{scope.get('method', '')} {path or scope['path']}"
+
+
+class MemoryProfilerMiddleware:
+    """ASGI middleware that samples requests into the profiler while tracemalloc is tracing"""
+
+    def __init__(self, app, profiler: MemoryProfiler = None, exclude_prefixes: Tuple[str, ...] = ()):
+        self.app = app
+        self.profiler = profiler or memory_profiler
+        self.exclude_prefixes = exclude_prefixes
+
+    async def __call__(self, scope, receive, send):
+        if (scope['type'] != 'http' or scope['path'].startswith(self.exclude_prefixes)
+                or not self.profiler._begin_sample()):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = self.profiler
+        before = profiler._snapshot()
+        tracemalloc.reset_peak()
+        start_bytes, _ = tracemalloc.get_traced_memory()
+        finished = False
+
+        def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            try:
+                if tracemalloc.is_tracing():
+                    profiler._record_sample(_endpoint_name(scope), before, start_bytes)
+            finally:
+                profiler._sampling = False
+
+        async def profiled_send(message):
+            await send(message)
+            if message['type'] == 'http.response.start':
+                # Streams stay open for minutes; attribute only the work before the first event
+                headers = dict(message.get('headers') or [])
+                if headers.get(b'content-type', b'').startswith(b'text/event-stream'):
+                    finish()
+
+        try:
+            await self.app(scope, receive, profiled_send)
+        finally:
+            # After the app returns, so the sent response body is no longer counted as retained
+            finish()
+
+
+# Global instance
+memory_profiler = MemoryProfiler()
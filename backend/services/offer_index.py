@@ -0,0 +1,177 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Offers parsed once at load time, with a discount-sorted index.
+
+Every laptop's current price, reference ("was") price, instant savings,
+rewards value and promo lines are parsed from `Price Details` and
+`Promos / Offers` when the catalog loads. Laptops with any deal are kept in
+arrays presorted by deal percentage (largest first), plus one presorted row
+array per brand, so "biggest deals" and "deals in brand X" are slices and
+"deals under $N" is one vectorized mask over the presorted prices.
+"""
+
+import ast
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.helpers import is_missing, parse_price
+
+ORIGINAL_PRICE_KEYS = ('Original Price', 'Was Price', 'List Price', 'Regular Price')
+
+_REWARDS_AMOUNT_RE = re.compile(r'Earn\s*\$(\d[\d,]*(?:\.\d+)?)\s*in\s*Rewards', re.IGNORECASE)
+_REWARDS_PERCENT_RE = re.compile(r'(\d+(?:\.\d+)?)\s*%\s*back', re.IGNORECASE)
+# Instant savings on the laptop itself, not "Save $30 on select printers"
+_SAVE_RE = re.compile(r'\bSave\s*\$(\d[\d,]*(?:\.\d+)?)(?!\d|,|\.\d|\s+on\s+select)', re.IGNORECASE)
+
+
+def _amount(text: str) -> float:
+    return float(text.replace(',', ''))
+
+
+def parse_price_details(raw: Any) -> Dict[str, Optional[float]]:
+    """Current and original price from a plain price string or a dict literal"""
+    details = raw
+    if isinstance(raw, str) and raw.strip().startswith('{'):
+        try:
+            details = ast.literal_eval(raw.strip())
+        except (ValueError, SyntaxError):
+            details = raw
+
+    original = None
+    if isinstance(details, dict):
+        for key in ORIGINAL_PRICE_KEYS:
+            original = parse_price(details.get(key))
+            if original is not None:
+                break
+    return {'current': parse_price(details), 'original': original}
+
+
+def parse_promos(raw: Any) -> List[str]:
+    """Promo lines from the scraped offers text (or a list literal)"""
+    if is_missing(raw):
+        return []
+    text = str(raw).strip()
+    if text.startswith('['):
+        try:
+            return [str(item).strip() for item in ast.literal_eval(text) if str(item).strip()]
+        except (ValueError, SyntaxError):
+            pass
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def promo_value(promos: Sequence[str], price: Optional[float]) -> Dict[str, float]:
+    """Cash value of rewards and instant savings mentioned in the promo lines"""
+    rewards = 0.0
+    savings = 0.0
+    for promo in promos:
+        for match in _REWARDS_AMOUNT_RE.finditer(promo):
+            rewards += _amount(match.group(1))
+        if price:
+            for match in _REWARDS_PERCENT_RE.finditer(promo):
+                rewards += price * float(match.group(1)) / 100
+        for match in _SAVE_RE.finditer(promo):
+            savings += _amount(match.group(1))
+    return {'rewards': rewards, 'savings': savings}
+
+
+def parse_offer(price_details: Any, promos_text: Any, reference_price: float = None) -> Dict[str, Any]:
+    """Parsed offer of one laptop.
+
+    The original price is the catalog's own when present, else the highest recently
+    recorded price (`reference_price`) if it is above the current one.
+    """
+    prices = parse_price_details(price_details)
+    current = prices['current']
+    original = prices['original']
+    if original is None and reference_price is not None and not np.isnan(reference_price):
+        original = float(reference_price)
+    if current is None or original is None or original <= current:
+        original = None
+
+    promos = parse_promos(promos_text)
+    value = promo_value(promos, current)
+    price_cut = original - current if original is not None else 0.0
+    deal_value = price_cut + value['savings'] + value['rewards']
+    list_price = original if original is not None else (current or 0) + value['savings']
+    return {
+        'current_price': current,
+        'original_price': original,
+        'price_cut': round(price_cut, 2),
+        'savings': round(value['savings'], 2),
+        'rewards': round(value['rewards'], 2),
+        'deal_value': round(deal_value, 2),
+        'deal_pct': round(deal_value / list_price * 100, 2) if list_price else 0.0,
+        'promos': promos
+    }
+
+
+class OfferIndex:
+    """Parsed offers for every row plus deal rows presorted by deal percentage"""
+
+    def __init__(self, offers: List[Dict[str, Any]], brands: Sequence[str]):
+        self.offers = offers
+        deal_pct = np.array([offer['deal_pct'] for offer in offers], dtype=np.float64)
+        prices = np.array([offer['current_price'] or np.nan for offer in offers], dtype=np.float64)
+        has_deal = (deal_pct > 0) & ~np.isnan(prices)
+
+        # Largest deal first, cheaper laptop first on ties
+        rows = np.flatnonzero(has_deal)
+        self.rows = rows[np.lexsort((prices[rows], -deal_pct[rows]))]
+        self.deal_pct = deal_pct[self.rows]
+        self.prices = prices[self.rows]
+
+        # The per-brand subsequences keep the global order
+        self.by_brand: Dict[str, np.ndarray] = {}
+        brand_keys = np.array([str(brand).strip().lower() for brand in brands], dtype=object)
+        for brand in pd.unique(brand_keys[self.rows]) if len(self.rows) else []:
+            self.by_brand[brand] = np.flatnonzero(brand_keys[self.rows] == brand)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def offer(self, row: int) -> Dict[str, Any]:
+        return self.offers[row]
+
+    def query(self, brand: str = None, max_price: float = None, min_discount: float = None,
+              limit: int = 20) -> List[int]:
+        """Catalog rows of the best deals, optionally within a brand / under a price / above a discount"""
+        if brand:
+            positions = self.by_brand.get(brand.strip().lower())
+            if positions is None:
+                return []
+        else:
+            positions = None
+
+        if min_discount is not None:
+            # deal_pct is sorted descending, so the qualifying deals are a prefix
+            cutoff = int(np.searchsorted(-self.deal_pct, -min_discount, side='right'))
+            positions = np.arange(cutoff) if positions is None else positions[positions < cutoff]
+
+        if max_price is not None:
+            prices = self.prices if positions is None else self.prices[positions]
+            hits = np.flatnonzero(prices <= max_price)[:limit]
+            positions = hits if positions is None else positions[hits]
+        elif positions is None:
+            positions = np.arange(min(limit, len(self.rows)))
+
+        return self.rows[positions[:limit]].tolist()
+
+
+def build_catalog_offers(df: pd.DataFrame, reference_prices: Sequence[float] = None) -> OfferIndex:
+    """Parse every row's offer and build the deal index"""
+    if df.empty:
+        return OfferIndex([], [])
+    if reference_prices is None:
+        reference_prices = [None] * len(df)
+    price_column = df['Price Details'] if 'Price Details' in df.columns else [None] * len(df)
+    promo_column = df['Promos / Offers'] if 'Promos / Offers' in df.columns else [None] * len(df)
+    offers = [
+        parse_offer(price, promos, reference)
+        for price, promos, reference in zip(price_column, promo_column, reference_prices)
+    ]
+    return OfferIndex(offers, df['Brand'].fillna('') if 'Brand' in df.columns else [''] * len(df))
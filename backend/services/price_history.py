@@ -0,0 +1,350 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Append-only price history: (laptop, timestamp, price) observations.
+
+Observations are partitioned by calendar month (UTC). Each partition is a
+directory of three fixed-width column files (int32 laptop id, int64 epoch
+seconds, float32 price) that only ever grow; readers memory-map them, so a
+query touches only the partitions its time range overlaps. Laptop ids index
+an append-only registry of content-derived laptop keys, which keeps history
+attached to a laptop when rows move in the catalog CSV.
+
+Range queries, downsampling and percentage changes are numpy reductions over
+the mapped columns.
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows; appends are then only serialized per process
+    fcntl = None
+
+# Monthly partition directories are named YYYY-MM
+_PARTITION_RE = re.compile(r'\d{4}-\d{2}')
+
+COLUMNS = (('ids', np.int32), ('ts', np.int64), ('price', np.float32))
+
+BUCKET_SECONDS = {
+    'hour': 3600,
+    'day': 86400,
+    'week': 7 * 86400,
+    'month': 30 * 86400,
+}
+
+
+def partition_name(ts: int) -> str:
+    return time.strftime('%Y-%m', time.gmtime(int(ts)))
+
+
+def partition_bounds(name: str) -> Tuple[int, int]:
+    """[start, end) epoch seconds of a monthly partition"""
+    year, month = (int(part) for part in name.split('-'))
+    start = datetime(year, month, 1, tzinfo=timezone.utc)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def last_per_id(ids: np.ndarray, ts: np.ndarray, prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(unique ids, their latest timestamp, price at that timestamp)"""
+    order = np.lexsort((ts, ids))
+    ids, ts, prices = ids[order], ts[order], prices[order]
+    last = np.flatnonzero(np.r_[ids[1:] != ids[:-1], True])
+    return ids[last], ts[last], prices[last]
+
+
+def first_per_id(ids: np.ndarray, ts: np.ndarray, prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(unique ids, their earliest timestamp, price at that timestamp)"""
+    order = np.lexsort((ts, ids))
+    ids, ts, prices = ids[order], ts[order], prices[order]
+    first = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    return ids[first], ts[first], prices[first]
+
+
+def downsample(ts: np.ndarray, prices: np.ndarray, bucket_seconds: int) -> Dict[str, np.ndarray]:
+    """Min/max/avg/last/count of time-ordered observations per fixed-width bucket"""
+    if len(ts) == 0:
+        return {key: np.array([]) for key in ('start', 'min', 'max', 'avg', 'last', 'count')}
+    buckets = ts // bucket_seconds
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(ts)]
+    counts = ends - starts
+    values = prices.astype(np.float64)
+    return {
+        'start': buckets[starts] * bucket_seconds,
+        'min': np.minimum.reduceat(values, starts),
+        'max': np.maximum.reduceat(values, starts),
+        'avg': np.add.reduceat(values, starts) / counts,
+        'last': values[ends - 1],
+        'count': counts
+    }
+
+
+class PriceHistoryStore:
+    """Month-partitioned, memory-mapped, append-only store of price observations"""
+
+    def __init__(self, root: str, min_interval_seconds: int = None):
+        self.root = root
+        # An unchanged price is re-recorded at most this often
+        self.min_interval_seconds = min_interval_seconds if min_interval_seconds is not None else int(
+            float(os.getenv('PRICE_HISTORY_MIN_INTERVAL_HOURS', '24')) * 3600
+        )
+        self.keys: List[str] = []
+        self.key_ids: Dict[str, int] = {}
+        self._maps: Dict[str, Tuple[int, Tuple[np.ndarray, ...]]] = {}
+        self._lock = threading.Lock()
+        self._load_registry()
+
+    @property
+    def registry_path(self) -> str:
+        return os.path.join(self.root, 'laptops.json')
+
+    def _load_registry(self):
+        try:
+            with open(self.registry_path, 'r', encoding='utf-8') as f:
+                self.keys = json.load(f)['keys']
+        except FileNotFoundError:
+            self.keys = []
+        self.key_ids = {key: i for i, key in enumerate(self.keys)}
+
+    def _save_registry(self):
+        tmp_path = self.registry_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'keys': self.keys}, f)
+        os.replace(tmp_path, self.registry_path)
+
+    def ids_for(self, keys: Sequence[str]) -> np.ndarray:
+        """Registry ids for laptop keys (-1 where the laptop has no history)"""
+        return np.array([self.key_ids.get(key, -1) for key in keys], dtype=np.int32)
+
+    def partitions(self, start: int = None, end: int = None) -> List[str]:
+        """Partition names overlapping [start, end], oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        names = []
+        for name in sorted(os.listdir(self.root)):
+            if not _PARTITION_RE.fullmatch(name) or not os.path.isdir(os.path.join(self.root, name)):
+                continue
+            lower, upper = partition_bounds(name)
+            if (start is None or upper > start) and (end is None or lower <= end):
+                names.append(name)
+        return names
+
+    def _columns(self, name: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Memory-mapped (ids, ts, prices) of a partition, trimmed to its complete rows"""
+        paths = [os.path.join(self.root, name, column) for column, _ in COLUMNS]
+        rows = min(
+            os.path.getsize(path) // np.dtype(dtype).itemsize if os.path.exists(path) else 0
+            for path, (_, dtype) in zip(paths, COLUMNS)
+        )
+        cached = self._maps.get(name)
+        if cached and cached[0] == rows:
+            return cached[1]
+        if rows == 0:
+            columns = tuple(np.empty(0, dtype=dtype) for _, dtype in COLUMNS)
+        else:
+            columns = tuple(np.memmap(path, dtype=dtype, mode='r', shape=(rows,))
+                            for path, (_, dtype) in zip(paths, COLUMNS))
+        self._maps[name] = (rows, columns)
+        return columns
+
+    def observations(self, ids: Sequence[int] = None, start: int = None,
+                     end: int = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(ids, ts, prices) in [start, end] for the given laptops (all when None), time-ordered"""
+        wanted = None if ids is None else np.asarray(ids, dtype=np.int32)
+        parts = []
+        for name in self.partitions(start, end):
+            part_ids, part_ts, part_prices = self._columns(name)
+            mask = np.ones(len(part_ids), dtype=bool)
+            if start is not None:
+                mask &= part_ts >= start
+            if end is not None:
+                mask &= part_ts <= end
+            if wanted is not None:
+                mask &= np.isin(part_ids, wanted)
+            parts.append((part_ids[mask], part_ts[mask], part_prices[mask]))
+
+        if not parts:
+            return tuple(np.empty(0, dtype=dtype) for _, dtype in COLUMNS)
+        all_ids, all_ts, all_prices = (np.concatenate(column) for column in zip(*parts))
+        order = np.argsort(all_ts, kind='stable')
+        return all_ids[order], all_ts[order], all_prices[order]
+
+    def as_of(self, ids: Sequence[int], ts: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamp, price) of each laptop's last observation at or before ts; NaN price if none"""
+        ids = np.asarray(ids, dtype=np.int32)
+        found_ts = np.full(len(ids), -1, dtype=np.int64)
+        found_prices = np.full(len(ids), np.nan, dtype=np.float64)
+        missing = ids >= 0
+
+        # Newest partitions first; stop once every laptop has been seen
+        for name in reversed(self.partitions(None, ts)):
+            if not missing.any():
+                break
+            part_ids, part_ts, part_prices = self._columns(name)
+            mask = np.isin(part_ids, ids[missing])
+            if ts is not None:
+                mask &= part_ts <= ts
+            if not mask.any():
+                continue
+            seen_ids, seen_ts, seen_prices = last_per_id(part_ids[mask], part_ts[mask], part_prices[mask])
+            pos = np.searchsorted(seen_ids, ids)
+            pos = np.minimum(pos, len(seen_ids) - 1)
+            hit = missing & (seen_ids[pos] == ids)
+            found_ts[hit] = seen_ts[pos[hit]]
+            found_prices[hit] = seen_prices[pos[hit]]
+            missing &= ~hit
+        return found_ts, found_prices
+
+    @staticmethod
+    def _truncate_to_complete_rows(directory: str) -> int:
+        """Cut every column file of a partition back to the rows all of them hold.
+
+        A crash between the column writes of an append leaves some files longer
+        than others; appending after those tails would misalign every later row.
+        Called with the store lock held.
+        """
+        paths = [(os.path.join(directory, column), np.dtype(dtype).itemsize) for column, dtype in COLUMNS]
+        rows = min(os.path.getsize(path) // itemsize if os.path.exists(path) else 0 for path, itemsize in paths)
+        for path, itemsize in paths:
+            if os.path.exists(path) and os.path.getsize(path) != rows * itemsize:
+                os.truncate(path, rows * itemsize)
+        return rows
+
+    def append(self, keys: Sequence[str], prices: Sequence[float], ts: int = None) -> int:
+        """Record current prices; skips unknown prices and unchanged ones seen within the min interval"""
+        ts = int(time.time()) if ts is None else int(ts)
+        prices = np.asarray(prices, dtype=np.float64)
+        known = ~np.isnan(prices) & (prices > 0)
+        if not known.any():
+            return 0
+
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock, open(os.path.join(self.root, '.lock'), 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Another process may have registered laptops or appended since we last looked
+            self._load_registry()
+
+            new_keys = [key for key, ok in zip(keys, known) if ok and key not in self.key_ids]
+            for key in dict.fromkeys(new_keys):
+                self.key_ids[key] = len(self.keys)
+                self.keys.append(key)
+            if new_keys:
+                self._save_registry()
+
+            ids = self.ids_for(keys)
+            last_ts, last_prices = self.as_of(ids)
+            unchanged = np.isclose(last_prices, prices.astype(np.float32), rtol=0, atol=0.005)
+            recent = (last_ts >= 0) & (ts - last_ts < self.min_interval_seconds)
+            record = known & ~(unchanged & recent)
+            if not record.any():
+                return 0
+
+            directory = os.path.join(self.root, partition_name(ts))
+            os.makedirs(directory, exist_ok=True)
+            self._truncate_to_complete_rows(directory)
+            values = (ids[record], np.full(int(record.sum()), ts, dtype=np.int64), prices[record])
+            for (column, dtype), data in zip(COLUMNS, values):
+                with open(os.path.join(directory, column), 'ab') as f:
+                    f.write(np.ascontiguousarray(data, dtype=dtype).tobytes())
+            return int(record.sum())
+
+    def history(self, key: str, start: int = None, end: int = None, bucket: str = 'day') -> Dict[str, Any]:
+        """Downsampled price series of one laptop"""
+        laptop = self.key_ids.get(key, -1)
+        if laptop < 0:
+            return {'points': [], 'observations': 0}
+        _, ts, prices = self.observations([laptop], start, end)
+        series = downsample(ts, prices, BUCKET_SECONDS[bucket])
+        points = [
+            {
+                'start': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(int(series['start'][i]))),
+                'min': round(float(series['min'][i]), 2),
+                'max': round(float(series['max'][i]), 2),
+                'avg': round(float(series['avg'][i]), 2),
+                'last': round(float(series['last'][i]), 2),
+                'count': int(series['count'][i])
+            }
+            for i in range(len(series['start']))
+        ]
+        return {'points': points, 'observations': int(len(ts))}
+
+    def max_price(self, keys: Sequence[str], start: int, end: int = None) -> np.ndarray:
+        """Highest recorded price of each laptop in [start, end]; NaN where none"""
+        ids = self.ids_for(keys)
+        highest = np.full(len(ids), np.nan, dtype=np.float64)
+        obs_ids, _, prices = self.observations(ids[ids >= 0], start, end)
+        if len(obs_ids) == 0:
+            return highest
+
+        order = np.argsort(obs_ids, kind='stable')
+        obs_ids, prices = obs_ids[order], prices[order].astype(np.float64)
+        starts = np.flatnonzero(np.r_[True, obs_ids[1:] != obs_ids[:-1]])
+        seen_ids, maxima = obs_ids[starts], np.maximum.reduceat(prices, starts)
+        pos = np.minimum(np.searchsorted(seen_ids, ids), len(seen_ids) - 1)
+        hit = (ids >= 0) & (seen_ids[pos] == ids)
+        highest[hit] = maxima[pos[hit]]
+        return highest
+
+    def pct_change(self, keys: Sequence[str], start: int, end: int = None) -> Dict[str, np.ndarray]:
+        """Price change between `start` and `end` for many laptops at once.
+
+        The starting price is the last observation at or before `start` (or the first
+        one inside the window for laptops first seen later); the end price is the last
+        observation at or before `end`. NaN where a laptop has no history.
+        """
+        ids = self.ids_for(keys)
+        _, end_prices = self.as_of(ids, end)
+        _, base_prices = self.as_of(ids, start)
+
+        late = np.isnan(base_prices) & (ids >= 0)
+        if late.any():
+            window_ids, window_ts, window_prices = self.observations(ids[late], start, end)
+            if len(window_ids):
+                seen_ids, _, seen_prices = first_per_id(window_ids, window_ts, window_prices)
+                pos = np.minimum(np.searchsorted(seen_ids, ids), len(seen_ids) - 1)
+                hit = late & (seen_ids[pos] == ids)
+                base_prices[hit] = seen_prices[pos[hit]]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            change = (end_prices - base_prices) / base_prices * 100
+        return {'start_price': base_prices, 'current_price': end_prices, 'change_pct': change}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the price history store on synthetic data")
+    parser.add_argument('root', help="Empty directory for the synthetic store")
+    parser.add_argument('--laptops', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=3 * 365)
+    args = parser.parse_args()
+
+    store = PriceHistoryStore(args.root, min_interval_seconds=0)
+    keys = [f"laptop-{i}" for i in range(args.laptops)]
+    rng = np.random.default_rng(0)
+    prices = rng.uniform(300, 3000, args.laptops)
+    day0 = int(time.time()) - args.days * 86400
+
+    started = time.time()
+    for day in range(args.days):
+        prices *= rng.normal(1, 0.01, args.laptops)
+        store.append(keys, prices, day0 + day * 86400)
+    print(f"appended {args.laptops * args.days} observations in {time.time() - started:.2f}s")
+
+    started = time.time()
+    store.history(keys[0], bucket='week')
+    print(f"one laptop, {args.days} days, weekly buckets: {(time.time() - started) * 1000:.1f} ms")
+    started = time.time()
+    store.pct_change(keys, day0 + (args.days - 30) * 86400)
+    print(f"30-day change for {args.laptops} laptops: {(time.time() - started) * 1000:.1f} ms")
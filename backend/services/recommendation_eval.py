@@ -0,0 +1,401 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Exact-vs-approximate evaluation of content-based recommendations.
+
+`RecommendationService.get_content_based_recommendations` (exact cosine
+similarity over the TF-IDF vectors) is the ground truth. Candidate similarity
+searches are built over the same vectors and asked the same queries; each is
+scored against the truth on
+
+- recall@k: share of the true top k found. A returned laptop counts when its
+  exact similarity reaches the k-th true similarity, so picking a different
+  one of several tied laptops is not a miss;
+- ndcg@k: exact similarities of the returned laptops as graded relevance,
+  normalised by the true top k;
+- overlap@k: share of the true top-k laptop ids returned (ties not excused);
+
+next to query latency, build time, peak build memory and index size. The
+report marks the operating points no other candidate beats on recall, p50
+latency and index size at once.
+
+Catalogs are the real CSV and synthetic ones of any size, whose rows mix the
+columns of random real rows (brand/model/price from one, each spec column
+from another) so they have realistic, mostly distinct vectors.
+
+    python -m services.recommendation_eval --scales 10000 50000 --json report.json
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+from sklearn.random_projection import SparseRandomProjection
+
+from services.catalog_partitions import top_k
+from services.memory_profiler import deep_sizeof
+from services.skyline import skyline
+
+DEFAULT_KS = (5, 10)
+DEFAULT_CANDIDATES = ('exact', 'svd:64', 'svd:64:4', 'srp:256:4', 'ivf:auto:4', 'ivf:auto:16')
+
+# Catalog columns a synthetic row takes from the same source row; every other column is drawn separately
+SYNTHETIC_ROW_COLUMNS = ('Brand', 'Model', 'Price Details', 'Availability', 'Promos / Offers', 'Review Details')
+
+# Similarities this close count as tied
+TIE_TOLERANCE = 1e-9
+
+
+class Candidate:
+    """A similarity search over L2-normalised catalog vectors.
+
+    Subclasses implement `build` and `query`; `query` returns catalog rows,
+    most similar first, without the query row itself.
+    """
+
+    name = 'candidate'
+
+    def build(self, vectors: sparse.csr_matrix):
+        raise NotImplementedError
+
+    def query(self, row: int, k: int) -> np.ndarray:
+        raise NotImplementedError
+
+
+class ExactCandidate(Candidate):
+    """One sparse matrix-vector product over the whole catalog"""
+
+    name = 'exact'
+
+    def build(self, vectors: sparse.csr_matrix):
+        self.vectors = vectors
+
+    def query(self, row: int, k: int) -> np.ndarray:
+        scores = np.asarray((self.vectors @ self.vectors[row].T).todense()).ravel().astype(np.float64)
+        scores[row] = -np.inf
+        rows = np.arange(len(scores))
+        if k < len(scores):
+            # Partition first so only about k rows are sorted; ties at the cut are kept for top_k
+            cut = np.partition(scores, len(scores) - k)[len(scores) - k]
+            keep = scores >= cut
+            rows, scores = rows[keep], scores[keep]
+        return top_k(rows, scores, k)[0]
+
+
+class DenseCandidate(Candidate):
+    """Nearest neighbours in a dense low-dimensional projection of the vectors.
+
+    With `rerank` > 1 the projection only shortlists k * rerank laptops, which
+    are then ordered by their exact similarity.
+    """
+
+    def __init__(self, dims: int, rerank: int = 1):
+        self.dims = dims
+        self.rerank = rerank
+        self.vectors = None
+
+    def project(self, vectors: sparse.csr_matrix) -> np.ndarray:
+        raise NotImplementedError
+
+    def build(self, vectors: sparse.csr_matrix):
+        self.embedding = normalize(self.project(vectors)).astype(np.float32)
+        self.vectors = vectors if self.rerank > 1 else None
+
+    def query(self, row: int, k: int) -> np.ndarray:
+        scores = (self.embedding @ self.embedding[row]).astype(np.float64)
+        scores[row] = -np.inf
+        shortlist = min(len(scores) - 1, k * self.rerank)
+        rows = np.argpartition(-scores, shortlist)[:shortlist] if shortlist < len(scores) else np.arange(len(scores))
+        if self.vectors is None:
+            return top_k(rows, scores[rows], k)[0]
+        exact = np.asarray((self.vectors[rows] @ self.vectors[row].T).todense()).ravel().astype(np.float64)
+        return top_k(rows, exact, k)[0]
+
+
+class SVDCandidate(DenseCandidate):
+    """Truncated SVD (latent semantic analysis) of the TF-IDF vectors"""
+
+    @property
+    def name(self):
+        return f"svd:{self.dims}" + (f":{self.rerank}" if self.rerank > 1 else '')
+
+    def project(self, vectors: sparse.csr_matrix) -> np.ndarray:
+        dims = max(1, min(self.dims, vectors.shape[1] - 1, vectors.shape[0] - 1))
+        return TruncatedSVD(n_components=dims, random_state=0).fit_transform(vectors)
+
+
+class ProjectionCandidate(DenseCandidate):
+    """Sparse random projection of the TF-IDF vectors (no fitting)"""
+
+    @property
+    def name(self):
+        return f"srp:{self.dims}" + (f":{self.rerank}" if self.rerank > 1 else '')
+
+    def project(self, vectors: sparse.csr_matrix) -> np.ndarray:
+        projection = SparseRandomProjection(n_components=self.dims, dense_output=True, random_state=0)
+        return projection.fit_transform(vectors)
+
+
+class IVFCandidate(Candidate):
+    """Inverted file: k-means clusters of the vectors; a query scores the rows of its `probes` nearest clusters"""
+
+    def __init__(self, lists: Optional[int] = None, probes: int = 4):
+        self.lists = lists
+        self.probes = probes
+
+    @property
+    def name(self):
+        return f"ivf:{self.lists or 'auto'}:{self.probes}"
+
+    def build(self, vectors: sparse.csr_matrix):
+        n = vectors.shape[0]
+        lists = max(1, min(n, self.lists or int(math.sqrt(n))))
+        kmeans = MiniBatchKMeans(n_clusters=lists, random_state=0, n_init=3, batch_size=2048)
+        assignment = kmeans.fit_predict(vectors)
+        self.vectors = vectors
+        self.centroids = normalize(kmeans.cluster_centers_).astype(np.float32)
+        self.assignment = assignment.astype(np.int32)
+        order = np.argsort(assignment, kind='stable')
+        bounds = np.searchsorted(assignment[order], np.arange(lists + 1))
+        self.members = [order[bounds[i]:bounds[i + 1]] for i in range(lists)]
+
+    def query(self, row: int, k: int) -> np.ndarray:
+        vector = self.vectors[row]
+        centroid_scores = np.asarray(vector @ self.centroids.T).ravel()
+        # The row's own cluster plus the nearest others
+        probed = np.argsort(-centroid_scores, kind='stable')[:self.probes]
+        if self.assignment[row] not in probed:
+            probed = np.r_[self.assignment[row], probed[:-1]]
+        rows = np.concatenate([self.members[i] for i in probed])
+        rows = rows[rows != row]
+        scores = np.asarray((self.vectors[rows] @ vector.T).todense()).ravel().astype(np.float64)
+        return top_k(rows, scores, k)[0]
+
+
+def parse_candidate(spec: str) -> Candidate:
+    """exact | svd:DIMS[:RERANK] | srp:DIMS[:RERANK] | ivf:LISTS|auto[:PROBES]"""
+    kind, *params = spec.split(':')
+    try:
+        if kind == 'exact' and not params:
+            return ExactCandidate()
+        if kind in ('svd', 'srp') and 1 <= len(params) <= 2:
+            cls = SVDCandidate if kind == 'svd' else ProjectionCandidate
+            return cls(int(params[0]), int(params[1]) if len(params) > 1 else 1)
+        if kind == 'ivf' and len(params) <= 2:
+            lists = None if not params or params[0] == 'auto' else int(params[0])
+            return IVFCandidate(lists, int(params[1]) if len(params) > 1 else 4)
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid candidate {spec!r}; expected {parse_candidate.__doc__}")
+
+
+def _dcg(gains: np.ndarray) -> float:
+    return float(np.sum(gains / np.log2(np.arange(2, len(gains) + 2))))
+
+
+def score_ranking(rows: np.ndarray, exact: np.ndarray, truth_rows: np.ndarray, truth_scores: np.ndarray,
+                  k: int) -> Dict[str, float]:
+    """recall, ndcg and overlap at k of one ranking; `exact` holds the true similarity of each row in `rows`"""
+    wanted = min(k, len(truth_rows))
+    if wanted == 0:
+        return {'recall': 1.0, 'ndcg': 1.0, 'overlap': 1.0}
+    rows, exact = rows[:k], exact[:k]
+    threshold = truth_scores[wanted - 1] - TIE_TOLERANCE
+    recall = min(1.0, np.count_nonzero(exact >= threshold) / wanted)
+    ideal = _dcg(np.clip(truth_scores[:wanted], 0, None))
+    ndcg = _dcg(np.clip(exact, 0, None)) / ideal if ideal > 0 else 1.0
+    overlap = len(set(rows.tolist()) & set(truth_rows[:wanted].tolist())) / wanted
+    return {'recall': recall, 'ndcg': min(1.0, ndcg), 'overlap': overlap}
+
+
+def _latency(seconds: Sequence[float]) -> Dict[str, float]:
+    ms = np.asarray(seconds) * 1000
+    return {'p50_ms': float(np.percentile(ms, 50)), 'p95_ms': float(np.percentile(ms, 95)),
+            'mean_ms': float(ms.mean())}
+
+
+def ground_truth(service: Any, rows: Sequence[int], k: int) -> Tuple[List[Tuple[np.ndarray, np.ndarray]], List[float]]:
+    """The service's top k (rows, similarities) for every query row, and the time each call took"""
+    catalog = service.data_service
+    truth, seconds = [], []
+    for row in rows:
+        started = time.perf_counter()
+        recommendations = service.get_content_based_recommendations(catalog.laptop_ids[row], k)
+        seconds.append(time.perf_counter() - started)
+        truth.append((np.array([catalog.row_for_id(r['laptop_id']) for r in recommendations], dtype=np.int64),
+                      np.array([r['similarity_score'] for r in recommendations], dtype=np.float64)))
+    return truth, seconds
+
+
+def evaluate_candidate(candidate: Candidate, vectors: sparse.csr_matrix, queries: Sequence[int],
+                       truth: List[Tuple[np.ndarray, np.ndarray]], ks: Sequence[int]) -> Dict[str, Any]:
+    """Build the candidate (timed, then again under tracemalloc for peak memory) and score its answers"""
+    started = time.perf_counter()
+    candidate.build(vectors)
+    build_seconds = time.perf_counter() - started
+    index_bytes = deep_sizeof(candidate)['bytes']
+
+    tracemalloc.start()
+    type(candidate).build(candidate, vectors)
+    _, build_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    k_max = max(ks)
+    seconds, results = [], []
+    for row in queries:
+        started = time.perf_counter()
+        rows = candidate.query(row, k_max)
+        seconds.append(time.perf_counter() - started)
+        results.append(rows)
+
+    metrics = {k: {'recall': [], 'ndcg': [], 'overlap': []} for k in ks}
+    for row, rows, (truth_rows, truth_scores) in zip(queries, results, truth):
+        exact = np.asarray((vectors[rows] @ vectors[row].T).todense()).ravel().astype(np.float64) \
+            if len(rows) else np.empty(0)
+        for k in ks:
+            for name, value in score_ranking(rows, exact, truth_rows, truth_scores, k).items():
+                metrics[k][name].append(value)
+
+    return {
+        'candidate': candidate.name,
+        'build_seconds': round(build_seconds, 4),
+        'build_peak_bytes': int(build_peak),
+        'index_bytes': int(index_bytes),
+        **{key: round(value, 4) for key, value in _latency(seconds).items()},
+        'metrics': {str(k): {name: round(float(np.mean(values)), 4) for name, values in by_name.items()}
+                    for k, by_name in metrics.items()}
+    }
+
+
+def evaluate(service: Any, candidates: Sequence[Candidate], ks: Sequence[int] = DEFAULT_KS,
+             queries: int = 200, seed: int = 0) -> Dict[str, Any]:
+    """Score every candidate against the service's exact recommendations on `queries` random laptops"""
+    vectors = service.tfidf_matrix
+    if vectors is None or vectors.shape[0] < 2:
+        raise ValueError("The catalog has no similarity vectors to evaluate")
+    n = vectors.shape[0]
+    rng = np.random.default_rng(seed)
+    query_rows = np.sort(rng.choice(n, size=min(queries, n), replace=False)).tolist()
+
+    k_max = max(ks)
+    truth, seconds = ground_truth(service, query_rows, k_max)
+    reference = {
+        'candidate': 'service',
+        'build_seconds': None,
+        'build_peak_bytes': None,
+        'index_bytes': int(deep_sizeof(vectors)['bytes']),
+        **{key: round(value, 4) for key, value in _latency(seconds).items()},
+        'metrics': {str(k): {'recall': 1.0, 'ndcg': 1.0, 'overlap': 1.0} for k in ks}
+    }
+    results = [reference] + [evaluate_candidate(c, vectors, query_rows, truth, ks) for c in candidates]
+
+    # Operating points: candidates not beaten on recall@k_max, p50 latency and index size together
+    for result in results:
+        result['operating_point'] = False
+    if len(results) > 1:
+        points = np.array([[r['metrics'][str(k_max)]['recall'], r['p50_ms'], r['index_bytes']] for r in results[1:]])
+        for i in skyline(points, [True, False, False]).tolist():
+            results[i + 1]['operating_point'] = True
+
+    return {
+        'rows': n,
+        'features': vectors.shape[1],
+        'queries': len(query_rows),
+        'ks': list(ks),
+        'results': results
+    }
+
+
+def format_report(name: str, report: Dict[str, Any]) -> str:
+    """Plain-text table of one catalog's results; '*' marks operating points"""
+    ks = report['ks']
+    header = f"{'candidate':<16}{'build s':>9}{'peak MB':>9}{'index MB':>10}{'p50 ms':>9}{'p95 ms':>9}"
+    header += ''.join(f"{'R@' + str(k):>8}{'NDCG@' + str(k):>9}{'O@' + str(k):>8}" for k in ks)
+    lines = [f"{name}: {report['rows']} laptops, {report['features']} TF-IDF features, "
+             f"{report['queries']} queries", header]
+
+    def number(value, scale=1.0, digits=2):
+        return '-' if value is None else f"{value / scale:.{digits}f}"
+
+    for r in report['results']:
+        line = f"{('*' if r['operating_point'] else ' ') + r['candidate']:<16}"
+        line += f"{number(r['build_seconds']):>9}{number(r['build_peak_bytes'], 2**20, 1):>9}"
+        line += f"{number(r['index_bytes'], 2**20, 1):>10}{number(r['p50_ms'], digits=3):>9}"
+        line += f"{number(r['p95_ms'], digits=3):>9}"
+        for k in ks:
+            m = r['metrics'][str(k)]
+            line += f"{m['recall']:>8.3f}{m['ndcg']:>9.3f}{m['overlap']:>8.3f}"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def _write_mixed_catalog(source: str, target: str, rows: int, seed: int = 0):
+    """Synthetic catalog of `rows` rows, each mixing columns of random real rows"""
+    df = pd.read_csv(source, dtype=object)
+    rng = np.random.default_rng(seed)
+    base = df.iloc[rng.integers(0, len(df), rows)].reset_index(drop=True)
+    for column in df.columns:
+        if column not in SYNTHETIC_ROW_COLUMNS:
+            base[column] = df[column].to_numpy()[rng.integers(0, len(df), rows)]
+    base.to_csv(target, index=False)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'processed',
+                                'laptop_info_cleaned.csv')
+    parser = argparse.ArgumentParser(description="Compare approximate content-based recommendations with the exact service")
+    parser.add_argument('--catalog', default=default_path, help="Real catalog CSV (also the source of synthetic rows)")
+    parser.add_argument('--scales', type=int, nargs='*', default=[10000, 50000],
+                        help="Rows of each synthetic catalog")
+    parser.add_argument('--candidates', nargs='+', default=list(DEFAULT_CANDIDATES), help=parse_candidate.__doc__)
+    parser.add_argument('--k', type=int, nargs='+', default=list(DEFAULT_KS))
+    parser.add_argument('--queries', type=int, default=200, help="Query laptops per catalog")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', default=None, help="Also write the full report as JSON to this path")
+    args = parser.parse_args()
+    # Reject a bad candidate spec before loading any catalog
+    for spec in args.candidates:
+        parse_candidate(spec)
+
+    # Catalog loads record prices and availability; keep the harness's out of the real data directory
+    workdir = tempfile.mkdtemp()
+    os.environ['PRICE_HISTORY_DIR'] = os.path.join(workdir, 'price_history')
+    os.environ['AVAILABILITY_DIR'] = os.path.join(workdir, 'availability')
+    from services.data_service import DataService
+    from services.recommendation_service import RecommendationService
+
+    catalogs = [('real', args.catalog)]
+    for scale in args.scales:
+        path = os.path.join(workdir, f'synthetic_{scale}.csv')
+        _write_mixed_catalog(args.catalog, path, scale, args.seed)
+        catalogs.append((f'synthetic-{scale}', path))
+
+    reports = {}
+    for name, path in catalogs:
+        started = time.perf_counter()
+        service = RecommendationService(DataService(path, record=False))
+        setup_seconds = time.perf_counter() - started
+        candidates = [parse_candidate(spec) for spec in args.candidates]
+        reports[name] = evaluate(service, candidates, args.k, args.queries, args.seed)
+        reports[name]['setup_seconds'] = round(setup_seconds, 3)
+        service.data_service.catalog_partitions.close()
+        print(format_report(name, reports[name]))
+        print(f"(catalog load and TF-IDF fit: {setup_seconds:.1f}s)\n")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+        print(f"Report written to {args.json}")
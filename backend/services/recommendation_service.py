@@ -6,19 +6,39 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Any, Optional
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from services.data_service import data_service
+from services.spec_parser import parse_capacity_gb
+from services.skyline import skyline
 import ast
 
+# Criteria available to the Pareto frontier: feature column -> True when larger is better
+FRONTIER_CRITERIA = {
+    'price': False,
+    'rating': True,
+    'review_count': True,
+    'ram_capacity_gb': True,
+    'ssd_gb': True,
+    'screen_in': True,
+    'res_width': True,
+    'weight_kg': False,
+    'battery_wh': True,
+    'cpu_generation': True,
+}
+DEFAULT_FRONTIER_CRITERIA = ['price', 'rating', 'ram_capacity_gb', 'ssd_gb', 'battery_wh']
+
 class RecommendationService:
-    def __init__(self):
-        self.data_service = data_service
+    def __init__(self, service=None):
+        # Another DataService (e.g. a synthetic catalog in the evaluation harness) instead of the shared one
+        self.data_service = service if service is not None else data_service
         self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
-        self.similarity_matrix = None
+        self.tfidf_matrix = None
         self._build_similarity_matrix()
     
     def _build_similarity_matrix(self):
-        """Build similarity matrix for content-based recommendations"""
+        """Build the TF-IDF vectors for content-based recommendations and hand them to the catalog partitions.
+        
+        Rows are L2-normalized, so a dot product is the cosine similarity; no n x n matrix is kept.
+        """
         laptops = self.data_service.get_all_laptops()
         if not laptops:
             return
@@ -51,39 +71,35 @@ class RecommendationService:
         
         # Create TF-IDF matrix
         try:
-            tfidf_matrix = self.vectorizer.fit_transform(laptop_features)
-            self.similarity_matrix = cosine_similarity(tfidf_matrix)
+            self.tfidf_matrix = self.vectorizer.fit_transform(laptop_features).tocsr()
+            self.data_service.catalog_partitions.set_vectors(self.tfidf_matrix)
         except Exception as e:
             print(f"Error building similarity matrix: {e}")
-            self.similarity_matrix = None
+            self.tfidf_matrix = None
     
     def get_content_based_recommendations(self, laptop_id: int, num_recommendations: int = 5) -> List[Dict]:
         """Get content-based recommendations for a laptop"""
-        if self.similarity_matrix is None:
-            return []
-        
-        laptops = self.data_service.get_all_laptops()
-        if laptop_id >= len(laptops):
+        row = self.data_service.row_for_id(laptop_id)
+        if self.tfidf_matrix is None or row is None or row >= self.tfidf_matrix.shape[0]:
             return []
         
-        # Get similarity scores for the given laptop
-        similarity_scores = self.similarity_matrix[laptop_id]
-        
-        # Get top similar laptops (excluding the laptop itself)
-        similar_indices = np.argsort(similarity_scores)[::-1][1:num_recommendations+1]
+        # Top similar laptops across the partitions (excluding the laptop itself)
+        similar_indices, similarity_scores = self.data_service.catalog_partitions.similar(
+            self.tfidf_matrix[row], num_recommendations, exclude_row=row
+        )
+        laptops = self.data_service.get_laptop_records(similar_indices.tolist())
         
         recommendations = []
-        for idx in similar_indices:
-            laptop = laptops[idx]
+        for score, laptop in zip(similarity_scores, laptops):
             recommendations.append({
-                'laptop_id': idx,
-                'similarity_score': float(similarity_scores[idx]),
+                'laptop_id': laptop['laptop_id'],
+                'similarity_score': float(score),
                 'brand': laptop.get('Brand', ''),
                 'model': laptop.get('Model', ''),
-                'processor': laptop.get('Processor', ''),
-                'memory': laptop.get('Memory (RAM)', ''),
-                'storage': laptop.get('Storage', ''),
-                'display': laptop.get('Display', ''),
+                'processor': laptop.get('processor', ''),
+                'memory': laptop.get('memory', ''),
+                'storage': laptop.get('storage', ''),
+                'display': laptop.get('display', ''),
                 'price_details': laptop.get('Price Details', ''),
                 'review_summary': self._extract_review_summary(laptop)
             })
@@ -92,28 +108,16 @@ class RecommendationService:
     
     def get_constraint_based_recommendations(self, constraints: Dict[str, Any]) -> List[Dict]:
         """Get recommendations based on user constraints"""
-        print(f"DEBUG: Received constraints: {constraints}")
-        laptops = self.data_service.get_all_laptops()
-        print(f"DEBUG: Total laptops loaded: {len(laptops)}")
-        scored_laptops = []
-        
-        for i, laptop in enumerate(laptops):
-            # First check if laptop meets hard constraints (like max_price)
-            if self._meets_hard_constraints(laptop, constraints):
-                score = self._calculate_constraint_score(laptop, constraints)
-                if score > 0:
-                    scored_laptops.append({
-                        'laptop_id': i,
-                        'score': score,
-                        'laptop': laptop
-                    })
-        
-        # Sort by score and return top recommendations
-        scored_laptops.sort(key=lambda x: x['score'], reverse=True)
-        print(f"DEBUG: Laptops that passed hard constraints: {len(scored_laptops)}")
+        # Top 10, scattered over the brand partitions; ties keep catalog order
+        top_indices, scores = self.data_service.catalog_partitions.top_constraint_matches(constraints, 10)
+        laptops = self.data_service.get_laptop_records(top_indices.tolist())
+        scored_laptops = [
+            {'laptop_id': laptop['laptop_id'], 'score': float(score), 'laptop': laptop}
+            for score, laptop in zip(scores, laptops)
+        ]
         
         recommendations = []
-        for item in scored_laptops[:10]:  # Top 10
+        for item in scored_laptops:
             laptop = item['laptop']
             
             # Use the already parsed price_details from data service
@@ -128,14 +132,8 @@ class RecommendationService:
             except:
                 availability = {}
             
-            # Parse promos
-            promos = []
-            try:
-                promos_str = laptop.get('Promos / Offers', '[]')
-                if isinstance(promos_str, str):
-                    promos = ast.literal_eval(promos_str)
-            except:
-                promos = []
+            # Promo lines parsed at load time
+            promos = self.data_service.offers.offer(laptop.row)['promos']
             
             # Clean up NaN values for JSON serialization
             def clean_value(value):
@@ -150,10 +148,10 @@ class RecommendationService:
                 'match_score': clean_value(item['score']),
                 'brand': clean_value(laptop.get('Brand', '')),
                 'model': clean_value(laptop.get('Model', '')),
-                'processor': clean_value(laptop.get('Processor', '')),
-                'memory': clean_value(laptop.get('Memory (RAM)', '')),
-                'storage': clean_value(laptop.get('Storage', '')),
-                'display': clean_value(laptop.get('Display', '')),
+                'processor': clean_value(laptop.get('processor', '')),
+                'memory': clean_value(laptop.get('memory', '')),
+                'storage': clean_value(laptop.get('storage', '')),
+                'display': clean_value(laptop.get('display', '')),
                 'price_details': price_details,  # Now an object
                 'availability': availability,    # Now an object
                 'promos': promos,                # Now a list
@@ -163,12 +161,65 @@ class RecommendationService:
         
         return recommendations
     
+    def get_pareto_frontier(self, filters: Dict[str, Any] = None, criteria: List[str] = None,
+                            limit: Optional[int] = None) -> Dict[str, Any]:
+        """Get the laptops no other laptop beats on every criterion (the skyline of the filtered subset)"""
+        filters = filters or {}
+        criteria = criteria or DEFAULT_FRONTIER_CRITERIA
+        unknown = [c for c in criteria if c not in FRONTIER_CRITERIA]
+        if unknown:
+            raise ValueError(f"Unknown criteria: {', '.join(unknown)}. Available: {', '.join(FRONTIER_CRITERIA)}")
+        
+        df = self.data_service.df
+        features = self.data_service.features
+        if df is None or df.empty:
+            return {'frontier': [], 'criteria': criteria, 'candidates': 0, 'frontier_size': 0}
+        
+        # Only priced laptops can be compared on value
+        prices = features['price'].to_numpy()
+        mask = self.data_service.feature_mask(filters) & ~np.isnan(prices)
+        if filters.get('brand'):
+            brands = df['Brand'].astype(str).str.lower()
+            mask &= brands.str.contains(str(filters['brand']).lower(), regex=False).to_numpy()
+        subset = np.flatnonzero(mask)
+        
+        values = np.column_stack([features[c].to_numpy(dtype=np.float64)[subset] for c in criteria])
+        frontier = subset[skyline(values, [FRONTIER_CRITERIA[c] for c in criteria])]
+        frontier = frontier[np.argsort(prices[frontier], kind='stable')]  # Cheapest first
+        
+        shown = frontier[:limit] if limit else frontier
+        items = []
+        for index, laptop in zip(shown, self.data_service.get_laptop_records(shown.tolist())):
+            criteria_values = {}
+            for c in criteria:
+                value = features[c].iat[index]
+                criteria_values[c] = None if pd.isna(value) else round(float(value), 2)
+            items.append({
+                'laptop_id': laptop['laptop_id'],
+                'brand': laptop.get('Brand', ''),
+                'model': laptop.get('Model', ''),
+                'processor': laptop.get('processor', ''),
+                'memory': laptop.get('memory', ''),
+                'storage': laptop.get('storage', ''),
+                'display': laptop.get('display', ''),
+                'price_details': laptop.get('price_details', {}),
+                'review_summary': self._extract_review_summary(laptop),
+                'criteria': criteria_values
+            })
+        
+        return {
+            'frontier': items,
+            'criteria': criteria,
+            'candidates': int(len(subset)),
+            'frontier_size': int(len(frontier))
+        }
+    
     def get_trending_laptops(self, limit: int = 5) -> List[Dict]:
         """Get trending laptops based on ratings and review counts"""
         laptops = self.data_service.get_all_laptops()
         trending = []
         
-        for i, laptop in enumerate(laptops):
+        for laptop in laptops:
             try:
                 review_detail = laptop.get('Review Details', '{}')
                 if isinstance(review_detail, str):
@@ -191,13 +242,13 @@ class RecommendationService:
                     trending_score = rating * np.log(review_count + 1)
                     
                     trending.append({
-                        'laptop_id': i,
+                        'laptop_id': laptop['laptop_id'],
                         'trending_score': trending_score,
                         'rating': rating,
                         'review_count': review_count,
                         'brand': laptop.get('Brand', ''),
                         'model': laptop.get('Model', ''),
-                        'processor': laptop.get('Processor', ''),
+                        'processor': laptop.get('processor', ''),
                         'price_details': laptop.get('Price Details', ''),
                         'review_summary': self._extract_review_summary(laptop)
                     })
@@ -208,115 +259,6 @@ class RecommendationService:
         trending.sort(key=lambda x: x['trending_score'], reverse=True)
         return trending[:limit]
     
-    def _calculate_constraint_score(self, laptop: Dict, constraints: Dict[str, Any]) -> float:
-        """Calculate how well a laptop matches the given constraints"""
-        score = 0.0
-        
-        # Brand preference
-        brand_value = constraints.get('brand') or constraints.get('brand')
-        if brand_value:
-            if brand_value.lower() in laptop.get('Brand', '').lower():
-                score += 10
-        
-        # Price constraint
-        max_price_value = constraints.get('max_price') or constraints.get('maxPrice')
-        if max_price_value:
-            try:
-                # Use the already parsed price_details from data service
-                price_dict = laptop.get('price_details', {})
-                current_price = price_dict.get('Current Price', 'Not Available')
-                if current_price != 'Not Available':
-                    price_str = str(current_price).replace('$', '').replace(',', '')
-                    if price_str.replace('.', '').isdigit():
-                        price = float(price_str)
-                        max_price = float(max_price_value)
-                        if price <= max_price:
-                            # Higher score for lower prices (better value)
-                            price_score = max(0, 10 - (price / max_price) * 5)
-                            score += price_score
-            except:
-                pass
-        
-        # Rating constraint
-        min_rating_value = constraints.get('min_rating') or constraints.get('minRating')
-        if min_rating_value:
-            try:
-                # Use the already parsed review_details from data service
-                review_dict = laptop.get('review_details', {})
-                rating_str = review_dict.get('Overall Rating', '0/5')
-                rating = float(rating_str.split('/')[0])
-                min_rating = float(min_rating_value)
-                if rating >= min_rating:
-                    score += rating * 2  # Higher rating = higher score
-            except:
-                pass
-        
-        # Processor preference
-        processor_value = constraints.get('processor_type') or constraints.get('processorType')
-        if processor_value:
-            processor = laptop.get('Processor', '').lower()
-            if processor_value.lower() in processor:
-                score += 5
-        
-        # Memory preference
-        if 'min_memory' in constraints and constraints['min_memory']:
-            memory = laptop.get('Memory (RAM)', '')
-            if constraints['min_memory'].lower() in memory.lower():
-                score += 3
-        
-        # Storage preference
-        if 'storage_type' in constraints and constraints['storage_type']:
-            storage = laptop.get('Storage', '').lower()
-            if constraints['storage_type'].lower() in storage:
-                score += 3
-        
-        return score
-    
-    def _meets_hard_constraints(self, laptop: Dict, constraints: Dict[str, Any]) -> bool:
-        """Check if laptop meets hard constraints (must be met, not just scored)"""
-        
-        # Price constraint - must be within budget
-        max_price_value = constraints.get('max_price') or constraints.get('maxPrice')
-        if max_price_value:
-            try:
-                price_dict = laptop.get('price_details', {})
-                current_price = price_dict.get('Current Price', 'Not Available')
-                print(f"DEBUG: Laptop {laptop.get('Brand', '')} {laptop.get('Model', '')} - Price: {current_price}")
-                
-                if current_price != 'Not Available':
-                    price_str = str(current_price).replace('$', '').replace(',', '')
-                    if price_str.replace('.', '').isdigit():
-                        price = float(price_str)
-                        max_price = float(max_price_value)
-                        print(f"DEBUG: Comparing price {price} vs max_price {max_price}")
-                        if price > max_price:
-                            print(f"DEBUG: Excluding laptop - price {price} > max_price {max_price}")
-                            return False
-                    else:
-                        print(f"DEBUG: Price string '{price_str}' is not numeric")
-                else:
-                    print(f"DEBUG: Price is 'Not Available'")
-            except Exception as e:
-                print(f"DEBUG: Price parsing error: {e}")
-                # If price parsing fails, exclude the laptop
-                return False
-        
-        # Rating constraint - must meet minimum rating
-        min_rating_value = constraints.get('min_rating') or constraints.get('minRating')
-        if min_rating_value:
-            try:
-                review_dict = laptop.get('review_details', {})
-                rating_str = review_dict.get('Overall Rating', '0/5')
-                rating = float(rating_str.split('/')[0])
-                min_rating = float(min_rating_value)
-                if rating < min_rating:
-                    return False
-            except:
-                # If rating parsing fails, exclude the laptop
-                return False
-        
-        return True
-    
     def _extract_review_summary(self, laptop: Dict) -> str:
         """Extract review summary from laptop data"""
         try:
@@ -361,6 +303,11 @@ class RecommendationService:
             except:
                 pass
         
+        if constraints.get('min_memory'):
+            capacity = self.data_service.features['ram_capacity_gb'].iat[laptop.row]
+            if pd.notna(capacity) and capacity >= parse_capacity_gb(constraints['min_memory']):
+                reasons.append(f"Supports up to {capacity:g}GB RAM")
+        
         return reasons
 
 # Global instance
@@ -0,0 +1,197 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from services.aspect_extractor import LEXICON_VERSION, extract_aspects, extract_batch
+from services.data_service import data_service
+from utils.helpers import catalog_laptop_keys, is_missing, parse_review_details, text_hash
+
+INDEX_FORMAT_VERSION = 1
+
+
+class ReviewThemeService:
+    """Per-laptop, per-aspect index built offline from review text"""
+
+    def __init__(self, index_path: str = None):
+        if index_path is None:
+            index_path = os.getenv('REVIEW_THEME_INDEX_PATH') or os.path.join(
+                os.path.dirname(data_service.data_path), 'review_theme_index.json'
+            )
+
+        self.index_path = index_path
+        self.parallel_threshold = int(os.getenv('REVIEW_THEME_PARALLEL_THRESHOLD', '200'))
+        self.batch_size = int(os.getenv('REVIEW_THEME_BATCH_SIZE', '64'))
+        self.index = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _review_text(record: Dict[str, Any]) -> str:
+        """Collect the free text (AI Summary + User Feedback) for one product"""
+        details = parse_review_details(record.get('Review Details'))
+        parts = []
+        for key in ('AI Summary', 'User Feedback'):
+            value = record.get(key) if not is_missing(record.get(key)) else details.get(key)
+            if not is_missing(value):
+                parts.append(str(value))
+        return '\n'.join(parts)
+
+    def _empty_index(self) -> Dict[str, Any]:
+        return {'format': INDEX_FORMAT_VERSION, 'lexicon': LEXICON_VERSION, 'built_at': None, 'products': {}}
+
+    def load_index(self) -> Dict[str, Any]:
+        """Load the persisted index, discarding it if it was built with another lexicon"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('format') == INDEX_FORMAT_VERSION and index.get('lexicon') == LEXICON_VERSION:
+                return index
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading review theme index: {e}")
+        return self._empty_index()
+
+    def _save_index(self, index: Dict[str, Any]):
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, separators=(',', ':'))
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Warning: could not persist review theme index to {self.index_path}: {e}")
+
+    def _extract(self, work: List[Tuple[str, str]], workers: Optional[int]) -> Dict[str, Dict]:
+        """Run aspect extraction inline for small jobs and across a process pool for large ones"""
+        if len(work) < self.parallel_threshold or workers == 1:
+            return {key: extract_aspects(text) for key, text in work}
+
+        batches = [work[i:i + self.batch_size] for i in range(0, len(work), self.batch_size)]
+        results = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for batch_result in pool.map(extract_batch, batches):
+                results.update(batch_result)
+        return results
+
+    def build_index(self, df: pd.DataFrame = None, incremental: bool = True,
+                    workers: Optional[int] = None) -> Dict[str, Any]:
+        """Build (or incrementally refresh) the aspect index and persist it"""
+        if df is None:
+            df = data_service.df
+        if df is None or df.empty:
+            return {'products': 0, 'processed': 0, 'removed': 0}
+
+        started = time.time()
+        previous = self.load_index() if incremental else self._empty_index()
+        products = {}
+        work = []
+
+        # Row-unique keys: configurations of one model are separate products
+        keys = catalog_laptop_keys(df)
+        for key, record in zip(keys, df.to_dict('records')):
+            text = self._review_text(record)
+            digest = text_hash(text)
+
+            cached = previous['products'].get(key)
+            if cached and cached.get('text_hash') == digest:
+                products[key] = cached
+                continue
+
+            products[key] = {
+                'brand': record.get('Brand', ''),
+                'model': record.get('Model', ''),
+                'text_hash': digest,
+                'aspects': {}
+            }
+            if text:
+                work.append((key, text))
+
+        for key, aspects in self._extract(work, workers).items():
+            products[key]['aspects'] = aspects
+
+        index = self._empty_index()
+        index['built_at'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        index['products'] = products
+        self._save_index(index)
+        self.index = index
+
+        return {
+            'products': len(products),
+            'processed': len(work),
+            'removed': len(set(previous['products']) - set(products)),
+            'seconds': round(time.time() - started, 3)
+        }
+
+    def ensure_index(self) -> Dict[str, Any]:
+        """Return the in-memory index, loading or incrementally building it on first use.
+
+        Blocking: the API builds it at startup, off the event loop.
+        """
+        if self.index is None:
+            with self._lock:
+                if self.index is None:
+                    self.build_index(incremental=True)
+        return self.index
+
+    def get_top_themes(self, brand: str = "all", limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Aggregate aspect mentions across products, optionally for a single brand"""
+        index = self.ensure_index()
+        brand_filter = None if not brand or brand.lower() == 'all' else brand.lower()
+
+        totals: Dict[str, Dict[str, int]] = {}
+        for product in index['products'].values():
+            if brand_filter and str(product.get('brand', '')).lower() != brand_filter:
+                continue
+            for theme, counts in product['aspects'].items():
+                agg = totals.setdefault(theme, {'mentions': 0, 'positive': 0, 'negative': 0, 'neutral': 0, 'products': 0})
+                for field in ('mentions', 'positive', 'negative', 'neutral'):
+                    agg[field] += counts.get(field, 0)
+                agg['products'] += 1
+
+        themes = []
+        for theme, agg in totals.items():
+            # Map the positive share onto the 1-5 scale used by the dashboard
+            polar = agg['positive'] + agg['negative']
+            positive_share = agg['positive'] / polar if polar else 0.5
+            sentiment_score = round(1 + 4 * positive_share, 1)
+            if sentiment_score >= 3.5:
+                sentiment = 'positive'
+            elif sentiment_score <= 2.5:
+                sentiment = 'negative'
+            else:
+                sentiment = 'neutral'
+
+            themes.append({
+                'theme': theme,
+                'count': agg['mentions'],
+                'sentiment': sentiment,
+                'sentiment_score': sentiment_score,
+                'positive_mentions': agg['positive'],
+                'negative_mentions': agg['negative'],
+                'laptops': agg['products']
+            })
+
+        themes.sort(key=lambda t: (t['count'], t['sentiment_score']), reverse=True)
+        return themes[:limit] if limit else themes
+
+# Global instance
+review_theme_service = ReviewThemeService()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the review aspect/theme index")
+    parser.add_argument('--full', action='store_true', help="Reprocess every product instead of only changed ones")
+    parser.add_argument('--workers', type=int, default=None, help="Process pool size (default: CPU count)")
+    args = parser.parse_args()
+
+    stats = review_theme_service.build_index(incremental=not args.full, workers=args.workers)
+    print(f"Review theme index written to {review_theme_service.index_path}: {stats}")
@@ -0,0 +1,343 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Latent-semantic index (TF-IDF + TruncatedSVD) for natural-language laptop search.
+
+Each laptop becomes one document (name, parsed spec summary, spec text,
+review summaries and a few plain-language tags derived from the feature
+arrays, e.g. "lightweight" or "long battery life"). Documents are embedded
+with LSA, L2-normalized and stored as a contiguous float32 .npy file that is
+memory-mapped at query time, so cosine similarity is a dot product. Everything
+runs locally; nothing is downloaded.
+
+The query-side model is persisted as plain data (vocabulary JSON, IDF weights
+and SVD components as .npy) and reassembled on load, so loading an index
+never unpickles anything from the data directory.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+from services.data_service import data_service
+from utils.helpers import is_missing, parse_review_details, text_hash
+
+INDEX_FORMAT_VERSION = 2
+
+# TF-IDF settings; the persisted vocabulary and IDF weights are only valid with these
+NGRAM_RANGE = (1, 2)
+STOP_WORDS = 'english'
+
+# Raw spec columns that describe what a laptop is like
+SPEC_TEXT_COLUMNS = ('Processor', 'Operating System', 'Graphics', 'Display', 'Battery',
+                     'Dimensions & Weight', 'Case / Chassis', 'Input Devices', 'Audio')
+MAX_SPEC_CHARS = 2000
+
+# Rows scored per block, bounding the temporary score matrix
+SCORE_BLOCK_ROWS = 65536
+
+
+def feature_tags(features: pd.Series) -> List[str]:
+    """Plain-language descriptors for the numeric specs users ask about"""
+    tags = []
+    weight = features.get('weight_kg')
+    if pd.notna(weight):
+        if weight <= 1.4:
+            tags.append('lightweight light portable thin travel ultraportable')
+        elif weight >= 2.2:
+            tags.append('heavy desktop replacement')
+    battery = features.get('battery_wh')
+    if pd.notna(battery) and battery >= 60:
+        tags.append('long battery life all day battery')
+    screen = features.get('screen_in')
+    if pd.notna(screen):
+        if screen >= 16:
+            tags.append('large screen big display')
+        elif screen <= 13.5:
+            tags.append('compact small screen portable')
+    width = features.get('res_width')
+    if pd.notna(width) and width >= 2560:
+        tags.append('high resolution sharp display')
+    ram = features.get('ram_capacity_gb')
+    if pd.notna(ram) and ram >= 32:
+        tags.append('lots of memory multitasking workstation')
+    price = features.get('price')
+    if pd.notna(price):
+        if price <= 800:
+            tags.append('cheap affordable budget')
+        elif price >= 2000:
+            tags.append('premium high end')
+    return tags
+
+
+def laptop_document(record: Dict[str, Any], summary: Dict[str, Optional[str]], features: pd.Series) -> str:
+    """Text that represents one laptop in the semantic index"""
+    parts = [str(record.get('Brand', '')), str(record.get('Model', ''))]
+    parts.extend(value for value in summary.values() if value)
+    for column in SPEC_TEXT_COLUMNS:
+        value = record.get(column)
+        if not is_missing(value):
+            parts.append(str(value)[:MAX_SPEC_CHARS])
+
+    details = parse_review_details(record.get('Review Details'))
+    for key in ('AI Summary', 'User Feedback'):
+        value = record.get(key) if not is_missing(record.get(key)) else details.get(key)
+        if not is_missing(value):
+            parts.append(str(value))
+
+    parts.extend(feature_tags(features))
+    return '\n'.join(parts)
+
+
+def top_k(vectors: np.ndarray, queries: np.ndarray, k: int,
+          block_rows: int = SCORE_BLOCK_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+    """Best k rows of `vectors` for each query row by dot product, scanning vectors in blocks.
+
+    Returns (indices, scores), both shaped (n_queries, min(k, n_rows)), best first.
+    """
+    n_rows = vectors.shape[0]
+    k = min(k, n_rows)
+    best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+    best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+
+    for start in range(0, n_rows, block_rows):
+        block = np.asarray(vectors[start:start + block_rows])
+        scores = queries @ block.T
+        if scores.shape[1] > k:
+            part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            scores = np.take_along_axis(scores, part, axis=1)
+            rows = part + start
+        else:
+            rows = np.broadcast_to(np.arange(start, start + scores.shape[1]), scores.shape)
+
+        # Merge with the running best
+        merged_scores = np.concatenate([best_scores, scores], axis=1)
+        merged_rows = np.concatenate([best_rows, rows], axis=1)
+        if merged_scores.shape[1] > k:
+            keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+            merged_scores = np.take_along_axis(merged_scores, keep, axis=1)
+            merged_rows = np.take_along_axis(merged_rows, keep, axis=1)
+        best_scores, best_rows = merged_scores, merged_rows
+
+    order = np.argsort(-best_scores, axis=1, kind='stable')
+    return np.take_along_axis(best_rows, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+
+class LSAModel:
+    """Query embedding of a fitted index: n-gram counts -> sublinear TF-IDF -> SVD projection.
+
+    Equivalent to the fitted TfidfVectorizer + TruncatedSVD transform, rebuilt
+    from the vocabulary, IDF weights and SVD components alone.
+    """
+
+    def __init__(self, vocabulary: Sequence[str], idf: np.ndarray, components: np.ndarray):
+        self.vocabulary = list(vocabulary)
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.components = np.asarray(components, dtype=np.float32)
+        self.counter = CountVectorizer(vocabulary={term: i for i, term in enumerate(self.vocabulary)},
+                                       stop_words=STOP_WORDS, ngram_range=NGRAM_RANGE, dtype=np.float32)
+
+    @classmethod
+    def from_fitted(cls, vectorizer: TfidfVectorizer, svd: TruncatedSVD) -> 'LSAModel':
+        vocabulary = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+        return cls(vocabulary, vectorizer.idf_, svd.components_)
+
+    def transform(self, texts: Sequence[str]) -> np.ndarray:
+        counts = self.counter.transform(list(texts)).tocsr()
+        counts.data = np.log(counts.data) + 1
+        tfidf = normalize(counts.multiply(self.idf).tocsr())
+        return np.asarray(tfidf @ self.components.T, dtype=np.float32)
+
+
+class SemanticIndex:
+    """Offline-built LSA index persisted as model arrays, a float32 vector file and a manifest"""
+
+    def __init__(self, index_dir: str = None, dimensions: int = None):
+        if index_dir is None:
+            index_dir = os.getenv('SEMANTIC_INDEX_DIR') or os.path.join(
+                os.path.dirname(data_service.data_path), 'semantic_index'
+            )
+
+        self.index_dir = index_dir
+        self.dimensions = dimensions or int(os.getenv('SEMANTIC_INDEX_DIMENSIONS', '128'))
+        self.model = None
+        self.vectors = None
+        self.manifest = None
+        self._lock = threading.Lock()
+
+    @property
+    def vocabulary_path(self) -> str:
+        return os.path.join(self.index_dir, 'vocabulary.json')
+
+    @property
+    def idf_path(self) -> str:
+        return os.path.join(self.index_dir, 'idf.npy')
+
+    @property
+    def components_path(self) -> str:
+        return os.path.join(self.index_dir, 'components.npy')
+
+    @property
+    def vectors_path(self) -> str:
+        return os.path.join(self.index_dir, 'vectors.npy')
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.index_dir, 'manifest.json')
+
+    @staticmethod
+    def catalog_documents(df: pd.DataFrame = None) -> List[str]:
+        if df is None:
+            df = data_service.df
+        summaries = data_service.spec_summaries
+        features = data_service.features
+        return [
+            laptop_document(record, summaries[i] if i < len(summaries) else {}, features.iloc[i])
+            for i, record in enumerate(df.to_dict('records'))
+        ]
+
+    def build(self, documents: Sequence[str] = None) -> Dict[str, Any]:
+        """Fit TF-IDF + SVD over the catalog and write the index files.
+
+        If the index directory is not writable the index is still used from memory.
+        """
+        started = time.time()
+        if documents is None:
+            documents = self.catalog_documents()
+        if not documents:
+            raise ValueError("No documents to index")
+
+        vectorizer = TfidfVectorizer(stop_words=STOP_WORDS, sublinear_tf=True, ngram_range=NGRAM_RANGE,
+                                     max_features=50000, dtype=np.float32)
+        tfidf = vectorizer.fit_transform(documents)
+
+        # SVD rank is bounded by the matrix shape
+        components = max(1, min(self.dimensions, tfidf.shape[0] - 1, tfidf.shape[1] - 1))
+        svd = TruncatedSVD(n_components=components, random_state=0)
+        vectors = svd.fit_transform(tfidf).astype(np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+        model = LSAModel.from_fitted(vectorizer, svd)
+        manifest = {
+            'format': INDEX_FORMAT_VERSION,
+            'catalog_hash': text_hash(*documents),
+            'rows': len(documents),
+            'dimensions': components,
+            'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        }
+        self.model, self.manifest, self.vectors = model, manifest, np.ascontiguousarray(vectors)
+        try:
+            self._save(model, vectors, manifest)
+            self.vectors = np.load(self.vectors_path, mmap_mode='r')
+        except OSError as e:
+            print(f"Warning: could not persist semantic index to {self.index_dir}: {e}")
+        return {**manifest, 'seconds': round(time.time() - started, 3)}
+
+    def _save(self, model: LSAModel, vectors: np.ndarray, manifest: Dict[str, Any]):
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(self.vocabulary_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(model.vocabulary, f)
+        np.save(self.idf_path + '.tmp.npy', model.idf)
+        np.save(self.components_path + '.tmp.npy', model.components)
+        np.save(self.vectors_path + '.tmp.npy', np.ascontiguousarray(vectors))
+        with open(self.manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        # Manifest last: a crash mid-way leaves the previous manifest, whose catalog hash no longer matches
+        os.replace(self.vocabulary_path + '.tmp', self.vocabulary_path)
+        os.replace(self.idf_path + '.tmp.npy', self.idf_path)
+        os.replace(self.components_path + '.tmp.npy', self.components_path)
+        os.replace(self.vectors_path + '.tmp.npy', self.vectors_path)
+        os.replace(self.manifest_path + '.tmp', self.manifest_path)
+        # Indexes of format 1 kept the model as a pickle
+        legacy = os.path.join(self.index_dir, 'model.pkl')
+        if os.path.exists(legacy):
+            os.remove(legacy)
+
+    def load(self, catalog_hash: str = None) -> bool:
+        """Load a persisted index; False if missing, unreadable or built from another catalog"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('format') != INDEX_FORMAT_VERSION:
+                return False
+            if catalog_hash is not None and manifest.get('catalog_hash') != catalog_hash:
+                return False
+            with open(self.vocabulary_path, 'r', encoding='utf-8') as f:
+                vocabulary = json.load(f)
+            # Plain arrays only; allow_pickle stays off
+            model = LSAModel(vocabulary, np.load(self.idf_path), np.load(self.components_path))
+            vectors = np.load(self.vectors_path, mmap_mode='r')
+            if len(model.idf) != len(vocabulary) or model.components.shape != (vectors.shape[1], len(vocabulary)):
+                raise ValueError("index files do not match each other")
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Error loading semantic index: {e}")
+            return False
+
+        self.model, self.manifest, self.vectors = model, manifest, vectors
+        return True
+
+    def ensure_index(self):
+        """Load the persisted index for the current catalog, building it if needed.
+
+        Blocking: the API calls it at startup, off the event loop.
+        """
+        if self.vectors is None:
+            with self._lock:
+                if self.vectors is None:
+                    documents = self.catalog_documents()
+                    if not self.load(text_hash(*documents)):
+                        self.build(documents)
+        return self.vectors
+
+    def embed(self, queries: Sequence[str]) -> np.ndarray:
+        """L2-normalized float32 query vectors"""
+        vectors = self.model.transform(queries)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    def search_many(self, queries: Sequence[str], limit: int = 10) -> List[List[Tuple[int, float]]]:
+        """[(row, cosine score), ...] per query, best first; queries with no known terms get []"""
+        vectors = self.ensure_index()
+        if vectors is None or not queries:
+            return [[] for _ in queries]
+
+        query_vectors = self.embed(queries)
+        known = np.linalg.norm(query_vectors, axis=1) > 0.5
+        rows, scores = top_k(vectors, query_vectors, limit)
+        return [
+            [(int(r), round(float(s), 4)) for r, s in zip(rows[i], scores[i])] if known[i] else []
+            for i in range(len(queries))
+        ]
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[int, float]]:
+        return self.search_many([query], limit)[0]
+
+# Global instance
+semantic_index = SemanticIndex()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the semantic (LSA) laptop search index")
+    parser.add_argument('--dimensions', type=int, default=None, help="SVD dimensions (default 128)")
+    parser.add_argument('--query', action='append', default=[], help="Run a test query after building")
+    args = parser.parse_args()
+
+    if args.dimensions:
+        semantic_index.dimensions = args.dimensions
+    stats = semantic_index.build()
+    print(f"Semantic index written to {semantic_index.index_dir}: {stats}")
+    for query, results in zip(args.query, semantic_index.search_many(args.query, 5)):
+        print(f"\n{query}")
+        for row, score in results:
+            print(f"  {score:.3f}  {data_service.df.iloc[row]['Brand']} {data_service.df.iloc[row]['Model']}")
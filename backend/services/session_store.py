@@ -0,0 +1,193 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Server-side chat sessions.
+
+A session is a small JSON-able dict: the laptops retrieved so far (as stable
+laptop keys), which of them the LLM has already been given full details for,
+the last few turns verbatim and a rolling summary that older turns are
+folded into. Every field is capped, so a session never outgrows a few KB.
+
+InMemorySessionStore is an LRU bounded by session count with a sliding TTL;
+RedisSessionStore shares sessions across API workers using SETEX/GETEX.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is optional outside docker
+    redis = None
+
+MAX_TURNS = int(os.getenv('CHAT_SESSION_TURNS', '4'))
+MAX_LAPTOPS = 10
+TURN_CHARS = 1000
+SUMMARY_CHARS = 1200
+SUMMARY_LINE_CHARS = 160
+
+
+def new_session() -> Dict[str, Any]:
+    now = time.time()
+    return {
+        'session_id': uuid.uuid4().hex,
+        'laptop_keys': [],
+        'sent_keys': [],
+        'summary': '',
+        'turns': [],
+        'turn_count': 0,
+        'created_at': now,
+        'updated_at': now
+    }
+
+
+def _clip(text: str, limit: int) -> str:
+    text = ' '.join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + '...'
+
+
+def record_turn(session: Dict[str, Any], query: str, answer: str, laptop_keys: List[str],
+                sent_keys: List[str], max_turns: int = None):
+    """Add one question/answer pair, folding turns beyond `max_turns` into the summary"""
+    max_turns = max_turns or MAX_TURNS
+    session['turns'].append({'role': 'user', 'content': str(query)[:TURN_CHARS]})
+    session['turns'].append({'role': 'assistant', 'content': str(answer)[:TURN_CHARS]})
+
+    summary_lines = [line for line in session['summary'].split('\n') if line]
+    while len(session['turns']) > 2 * max_turns:
+        user, assistant = session['turns'].pop(0), session['turns'].pop(0)
+        first_line = next((line for line in assistant['content'].splitlines() if line.strip()), '')
+        summary_lines.append(f"- Q: {_clip(user['content'], SUMMARY_LINE_CHARS)} | "
+                             f"A: {_clip(first_line, SUMMARY_LINE_CHARS)}")
+    # Oldest summary lines go first once the summary is full
+    while summary_lines and len('\n'.join(summary_lines)) > SUMMARY_CHARS:
+        summary_lines.pop(0)
+    session['summary'] = '\n'.join(summary_lines)
+
+    # Most recently discussed laptops first
+    session['laptop_keys'] = list(dict.fromkeys(list(laptop_keys) + session['laptop_keys']))[:MAX_LAPTOPS]
+    session['sent_keys'] = [key for key in dict.fromkeys(session['sent_keys'] + list(sent_keys))
+                            if key in session['laptop_keys']]
+    session['turn_count'] += 1
+    session['updated_at'] = time.time()
+
+
+def public_view(session: Dict[str, Any]) -> Dict[str, Any]:
+    """Session state as returned by the API"""
+    def iso(ts):
+        return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(ts)) if ts else None
+
+    return {
+        'session_id': session['session_id'],
+        'laptop_keys': session['laptop_keys'],
+        'summary': session['summary'],
+        'turns': session['turns'],
+        'turn_count': session['turn_count'],
+        'created_at': iso(session.get('created_at')),
+        'updated_at': iso(session.get('updated_at'))
+    }
+
+
+class InMemorySessionStore:
+    """LRU of sessions bounded by count, each expiring `ttl` seconds after its last use"""
+
+    def __init__(self, max_sessions: int, ttl: int):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._expires: Dict[str, float] = {}
+        self.evicted = 0
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float):
+        # Least recently used first, so expired sessions sit at the front
+        while self._sessions:
+            session_id = next(iter(self._sessions))
+            if self._expires[session_id] > now:
+                break
+            self._sessions.popitem(last=False)
+            del self._expires[session_id]
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            self._sessions.move_to_end(session_id)
+            self._expires[session_id] = now + self.ttl
+            return json.loads(json.dumps(session))
+
+    def put(self, session: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            session_id = session['session_id']
+            self._sessions[session_id] = json.loads(json.dumps(session))
+            self._sessions.move_to_end(session_id)
+            self._expires[session_id] = now + self.ttl
+            while len(self._sessions) > self.max_sessions:
+                evicted, _ = self._sessions.popitem(last=False)
+                del self._expires[evicted]
+                self.evicted += 1
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            self._expires.pop(session_id, None)
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._purge(time.time())
+            return {'backend': 'memory', 'sessions': len(self._sessions), 'max_sessions': self.max_sessions,
+                    'evicted': self.evicted, 'ttl_seconds': self.ttl}
+
+
+class RedisSessionStore:
+    """Sessions as JSON strings with a sliding TTL; Redis' maxmemory policy bounds the total"""
+
+    def __init__(self, client, ttl: int, prefix: str = 'laptop-assistant:session:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.getex(self.prefix + session_id, ex=self.ttl)
+        return json.loads(raw) if raw else None
+
+    def put(self, session: Dict[str, Any]):
+        self.client.setex(self.prefix + session['session_id'], self.ttl, json.dumps(session))
+
+    def delete(self, session_id: str) -> bool:
+        return bool(self.client.delete(self.prefix + session_id))
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': 'redis', 'ttl_seconds': self.ttl}
+
+
+def create_session_store():
+    """Use Redis when SESSION_STORE=redis and it is reachable, otherwise keep sessions in process"""
+    ttl = int(os.getenv('CHAT_SESSION_TTL_SECONDS', '1800'))
+    backend = os.getenv('SESSION_STORE', 'memory').lower()
+    if backend == 'redis':
+        url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+        if redis is None:
+            print("Warning: SESSION_STORE=redis but the redis package is not installed; using in-memory sessions")
+        else:
+            try:
+                client = redis.Redis.from_url(url, socket_timeout=2)
+                client.ping()
+                return RedisSessionStore(client, ttl)
+            except Exception as e:
+                print(f"Warning: could not connect to Redis at {url} ({e}); using in-memory sessions")
+    return InMemorySessionStore(int(os.getenv('CHAT_SESSION_MAX', '5000')), ttl)
+
+# Global instance
+session_store = create_session_store()
@@ -0,0 +1,110 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Vectorized skyline (Pareto frontier) computation.
+
+Implements Sort-Filter-Skyline: points are presorted by a strictly monotone
+score so a point can only be dominated by points that come before it, then
+processed in blocks with numpy comparisons. After each block the new skyline
+points prune every remaining point they dominate, so the candidate set
+shrinks quickly and the cost is roughly O(n * |skyline|) rather than a full
+O(n^2) pairwise scan. Two-dimensional inputs use an O(n log n) sweep.
+"""
+
+import warnings
+from typing import Sequence
+
+import numpy as np
+
+# Upper bound on the number of booleans materialized per dominance comparison
+MAX_COMPARISON_CELLS = 4_000_000
+
+
+def _dominated_by(window: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """For each point, whether any row of window dominates it (all <=, at least one <)"""
+    if len(window) == 0 or len(points) == 0:
+        return np.zeros(len(points), dtype=bool)
+    less_equal = (window[:, None, :] <= points[None, :, :]).all(axis=2)
+    strictly_less = (window[:, None, :] < points[None, :, :]).any(axis=2)
+    return (less_equal & strictly_less).any(axis=0)
+
+
+def _skyline_2d(values: np.ndarray) -> np.ndarray:
+    """Exact O(n log n) sweep for two dimensions"""
+    order = np.lexsort((values[:, 1], values[:, 0]))
+    x, y = values[order, 0], values[order, 1]
+
+    # Best y among points with a strictly smaller x
+    group_start = np.r_[True, x[1:] != x[:-1]]
+    running_min = np.minimum.accumulate(y)
+    prev_min = np.r_[np.inf, running_min[:-1]]
+    group_ids = np.cumsum(group_start) - 1
+    prev_group_min = prev_min[np.flatnonzero(group_start)][group_ids]
+
+    # Within an x group the first (lowest y) point dominates higher-y points
+    group_best_y = y[np.flatnonzero(group_start)][group_ids]
+    keep = (y < prev_group_min) & (y == group_best_y)
+    return np.sort(order[keep])
+
+
+def skyline(values: np.ndarray, maximize: Sequence[bool] = None, block_size: int = 256) -> np.ndarray:
+    """Return the row indices of the Pareto-optimal rows of an (n, d) array.
+
+    By default every dimension is minimized; pass maximize[j] = True for
+    dimensions where larger is better. NaN is treated as the worst possible value.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim != 2:
+        raise ValueError("values must be a 2-D array")
+    n, dims = values.shape
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # Normalize so that every dimension is minimized and lies in [0, 1], NaN -> 2 (worst)
+    data = values.copy()
+    if maximize is not None:
+        flip = np.asarray(maximize, dtype=bool)
+        data[:, flip] = -data[:, flip]
+    with warnings.catch_warnings():
+        # All-NaN columns are expected when a spec is unknown for the whole subset
+        warnings.simplefilter('ignore', RuntimeWarning)
+        low = np.nanmin(data, axis=0)
+        span = np.nanmax(data, axis=0) - low
+    low = np.where(np.isnan(low), 0.0, low)
+    span = np.where(np.isnan(span) | (span == 0), 1.0, span)
+    data = (data - low) / span
+    data[np.isnan(data)] = 2.0
+
+    if dims == 1:
+        return np.flatnonzero(data[:, 0] == data[:, 0].min())
+    if dims == 2:
+        return _skyline_2d(data)
+
+    # Presort by the (strictly monotone) sum so dominators always come first
+    order = np.argsort(data.sum(axis=1), kind='stable')
+    remaining = data[order]
+    remaining_rows = order
+
+    skyline_rows = []
+    while len(remaining):
+        block = remaining[:block_size]
+        block_rows = remaining_rows[:block_size]
+
+        # Everything left has already been filtered against earlier skyline points,
+        # so only points earlier in the block can still dominate a block point
+        kept = ~_dominated_by(block, block)
+        new_points = block[kept]
+        skyline_rows.append(block_rows[kept])
+
+        # Drop every remaining point the new skyline points dominate, in bounded chunks
+        rest = remaining[block_size:]
+        rest_rows = remaining_rows[block_size:]
+        chunk = max(1, MAX_COMPARISON_CELLS // max(1, len(new_points) * dims))
+        survivors = np.ones(len(rest), dtype=bool)
+        for begin in range(0, len(rest), chunk):
+            survivors[begin:begin + chunk] = ~_dominated_by(new_points, rest[begin:begin + chunk])
+        remaining = rest[survivors]
+        remaining_rows = rest_rows[survivors]
+
+    return np.sort(np.concatenate(skyline_rows))
@@ -0,0 +1,104 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Presorted secondary indexes for sorting search results.
+
+For every sortable feature the catalog rows are argsorted once at load
+time, ascending and descending, with unknown (NaN) values last and ties in
+catalog order. A sorted page of a filtered result is then read off the
+index: walk the presorted rows and keep those set in the result's row
+bitmap until the page is full, so a top-N page costs about N / selectivity
+steps and never sorts the result set. Small results, where walking would
+touch mostly non-matching rows, are instead ordered by each row's position
+in the index (a sort of the matches only).
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# sort_by values and the feature arrays they sort on
+SORT_FIELDS = ('price', 'rating', 'review_count', 'ram_capacity_gb', 'ssd_gb', 'screen_in', 'weight_kg',
+               'battery_wh', 'cpu_generation', 'res_width')
+SORT_ORDERS = ('asc', 'desc')
+RELEVANCE = 'relevance'
+
+# Results matching less than this fraction of the catalog are sorted by rank instead of walked
+WALK_MIN_SELECTIVITY = 0.02
+# Presorted rows tested per step of a walk; doubles every step
+WALK_CHUNK = 256
+
+
+class SortIndex:
+    """Row order and per-row rank of one feature in one direction"""
+
+    __slots__ = ('order', 'rank')
+
+    def __init__(self, values: np.ndarray, descending: bool):
+        rows = np.arange(len(values))
+        known = ~np.isnan(values)
+        keys = np.where(known, -values if descending else values, 0)
+        # lexsort sorts by the last key first: unknown last, then value, then catalog order
+        self.order = np.lexsort((rows, keys, ~known)).astype(np.int32)
+        self.rank = np.empty(len(values), dtype=np.int32)
+        self.rank[self.order] = np.arange(len(values), dtype=np.int32)
+
+    def page(self, rows: np.ndarray, mask: np.ndarray, offset: int, limit: Optional[int]) -> np.ndarray:
+        """rows[offset:offset + limit] in index order; `mask` is the bitmap of `rows`"""
+        end = len(rows) if limit is None else min(len(rows), offset + limit)
+        if offset >= end:
+            return np.empty(0, dtype=np.int64)
+        if end == len(rows) or len(rows) < WALK_MIN_SELECTIVITY * len(self.order):
+            # The whole result is needed, or it is too sparse to walk: sort just the matches
+            ordered = rows[np.argsort(self.rank[rows], kind='stable')]
+            return ordered[offset:end].astype(np.int64)
+
+        hits = []
+        found = 0
+        start, chunk = 0, WALK_CHUNK
+        while found < end and start < len(self.order):
+            block = self.order[start:start + chunk]
+            block = block[mask[block]]
+            hits.append(block)
+            found += len(block)
+            start += chunk
+            chunk *= 2
+        return np.concatenate(hits)[offset:end].astype(np.int64)
+
+
+class CatalogSortIndex:
+    """Ascending and descending SortIndex per sortable feature"""
+
+    def __init__(self, features: pd.DataFrame, fields: Sequence[str] = SORT_FIELDS):
+        self.size = len(features)
+        self.indexes: Dict[Tuple[str, str], SortIndex] = {}
+        for field in fields:
+            if field not in features.columns:
+                continue
+            values = features[field].to_numpy(dtype=np.float64, na_value=np.nan)
+            self.indexes[(field, 'asc')] = SortIndex(values, descending=False)
+            self.indexes[(field, 'desc')] = SortIndex(values, descending=True)
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(field for field, _ in self.indexes))
+
+    def sort(self, rows: np.ndarray, sort_by: str, sort_order: str = 'desc', offset: int = 0,
+             limit: Optional[int] = None) -> np.ndarray:
+        """One page of `rows` ordered by a feature; relevance keeps the order of `rows`"""
+        rows = np.asarray(rows, dtype=np.int64)
+        if sort_by in (None, RELEVANCE):
+            return rows[offset:None if limit is None else offset + limit]
+        index = self.indexes.get((sort_by, sort_order))
+        if index is None:
+            raise ValueError(f"Cannot sort by {sort_by!r} {sort_order!r}")
+        mask = np.zeros(self.size, dtype=bool)
+        mask[rows] = True
+        return index.page(rows, mask, offset, limit)
+
+
+def build_catalog_sort_index(features: pd.DataFrame) -> CatalogSortIndex:
+    """Presort the catalog rows on every sortable feature"""
+    return CatalogSortIndex(features)
@@ -0,0 +1,242 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Turn the free-text spec columns into typed numeric feature columns.
+
+Every parser returns NaN / None when a value cannot be determined, so the
+resulting arrays can be range-filtered with plain numpy comparisons.
+"""
+
+import math
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.helpers import is_missing, parse_price, parse_rating, parse_review_count, parse_review_details
+
+NAN = float('nan')
+
+# Numeric feature columns and their dtypes
+NUMERIC_FEATURES = {
+    'price': np.float64,
+    'rating': np.float32,
+    'review_count': np.int32,
+    'ram_gb': np.float32,
+    'max_ram_gb': np.float32,
+    'ssd_gb': np.float32,
+    'screen_in': np.float32,
+    'res_width': np.float32,
+    'res_height': np.float32,
+    'weight_kg': np.float32,
+    'battery_wh': np.float32,
+    'cpu_generation': np.float32,
+}
+
+CATEGORICAL_FEATURES = ('cpu_vendor', 'cpu_family')
+
+# Raw catalog columns the feature parsers read
+SOURCE_COLUMNS = ('Model', 'Review Details', 'Memory (RAM)', 'Display', 'Processor', 'Price Details',
+                  'Storage', 'Dimensions & Weight', 'Battery')
+
+_CAPACITY_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(TB|GB)\b', re.IGNORECASE)
+_SOLDERED_RE = re.compile(r'(\d+)\s*GB\s*soldered', re.IGNORECASE)
+_MAX_RAM_RE = re.compile(r'(?:Maximum|Up to)\s*:?\s*(\d+)\s*GB', re.IGNORECASE)
+_INCHES_RE = re.compile(r'(\d{2}(?:\.\d)?)\s*(?:"|″|ʺ|”|-?\s*inch\b)', re.IGNORECASE)
+_RESOLUTION_RE = re.compile(r'(\d{3,4})\s*x\s*(\d{3,4})', re.IGNORECASE)
+_KG_RE = re.compile(r'(\d+(?:\.\d+)?)\s*kg\b', re.IGNORECASE)
+_LB_RE = re.compile(r'(\d+(?:\.\d+)?)\s*lbs?\b', re.IGNORECASE)
+_WH_RE = re.compile(r'(\d+(?:\.\d+)?)\s*Wh', re.IGNORECASE)
+_INTEL_GEN_RE = re.compile(r'(\d{1,2})\s*th\s*Gen', re.IGNORECASE)
+_INTEL_MODEL_RE = re.compile(r'\bi\s*[3579]\s*-\s*(\d{4,5})', re.IGNORECASE)
+_CORE_ULTRA_RE = re.compile(r'Ultra\s*[579]\s*(\d)\d{2}', re.IGNORECASE)
+_INTEL_CORE_RE = re.compile(r'\bcore\W*(?:i\s*[3579]|ultra)\b')
+_RYZEN_RE = re.compile(r'Ryzen\W*(?:AI\s*)?[3579]\s*(?:PRO\s*)?(\d)\d{3}', re.IGNORECASE)
+
+
+def _text(value: Any) -> str:
+    return '' if is_missing(value) else str(value)
+
+
+def _capacities_gb(text: str) -> List[float]:
+    """All "512GB" / "1TB" style capacities in a string, in GB"""
+    values = []
+    for number, unit in _CAPACITY_RE.findall(text):
+        size = float(number)
+        values.append(size * 1024 if unit.upper() == 'TB' else size)
+    return values
+
+
+def parse_memory(text: Any) -> Tuple[float, float]:
+    """"Memory (RAM)" -> (base RAM GB, maximum RAM GB)"""
+    text = _text(text)
+    if not text:
+        return NAN, NAN
+
+    soldered = [float(v) for v in _SOLDERED_RE.findall(text)]
+    maximums = [float(v) for v in _MAX_RAM_RE.findall(text)]
+    base = min(soldered) if soldered else NAN
+    max_ram = max(maximums) if maximums else NAN
+    if math.isnan(max_ram):
+        capacities = _capacities_gb(text)
+        max_ram = max(capacities) if capacities else NAN
+    return base, max_ram
+
+
+def parse_storage(text: Any) -> float:
+    """"Storage" -> largest SSD offering in GB"""
+    capacities = [c for c in _capacities_gb(_text(text)) if c >= 64]
+    return max(capacities) if capacities else NAN
+
+
+def parse_display(text: Any, model: Any = None) -> Tuple[float, float, float]:
+    """"Display" (falling back to the model name) -> (inches, max width px, max height px)"""
+    text = _text(text)
+    inches = [float(v) for v in _INCHES_RE.findall(text)]
+    if not inches:
+        inches = [float(v) for v in _INCHES_RE.findall(_text(model))]
+    screen = max(inches) if inches else NAN
+
+    resolutions = [(int(w), int(h)) for w, h in _RESOLUTION_RE.findall(text)]
+    if resolutions:
+        width, height = max(resolutions, key=lambda r: r[0] * r[1])
+        return screen, float(width), float(height)
+    return screen, NAN, NAN
+
+
+def parse_weight(text: Any) -> float:
+    """"Dimensions & Weight" -> lightest configuration in kg"""
+    text = _text(text)
+    weight_text = text[text.lower().find('weight'):] if 'weight' in text.lower() else text
+    kilos = [float(v) for v in _KG_RE.findall(weight_text)]
+    if kilos:
+        return min(kilos)
+    pounds = [float(v) for v in _LB_RE.findall(weight_text)]
+    return round(min(pounds) * 0.45359237, 2) if pounds else NAN
+
+
+def parse_battery(text: Any) -> float:
+    """"Battery" -> largest battery option in Wh"""
+    values = [float(v) for v in _WH_RE.findall(_text(text))]
+    return max(values) if values else NAN
+
+
+def parse_processor(text: Any, model: Any = None) -> Tuple[Optional[str], Optional[str], float]:
+    """"Processor" (falling back to the model name) -> (vendor, family, generation)"""
+    text = _text(text)
+    haystack = f"{text} {_text(model)}"
+    lower = haystack.lower()
+
+    if 'ryzen' in lower or 'amd' in lower or re.search(r'\bG\d+a\b', haystack):
+        vendor = 'AMD'
+    elif 'snapdragon' in lower or 'qualcomm' in lower or re.search(r'\bG\d+q\b', haystack):
+        vendor = 'Qualcomm'
+    elif 'intel' in lower or _INTEL_CORE_RE.search(lower) or re.search(r'\bG\d+i\b', haystack):
+        # A bare "core" is not Intel: Apple and Qualcomm chips are described as "8-core" etc.
+        vendor = 'Intel'
+    elif 'apple' in lower or re.search(r'\bM[1-4]\b', haystack):
+        vendor = 'Apple'
+    else:
+        vendor = None
+
+    family = None
+    generations: List[float] = []
+    if vendor == 'Intel':
+        if 'ultra' in lower:
+            family = 'Core Ultra'
+            generations = [float(g) for g in _CORE_ULTRA_RE.findall(text)]
+        elif re.search(r'core\W*i\s*[3579]', lower):
+            family = 'Core i'
+            generations = [float(g) for g in _INTEL_GEN_RE.findall(text)]
+            generations += [float(m[:2]) if len(m) == 5 or m.startswith('1') else float(m[0])
+                            for m in _INTEL_MODEL_RE.findall(text)]
+        elif 'pentium' in lower or 'celeron' in lower:
+            family = 'Pentium/Celeron'
+        else:
+            family = 'Core'
+    elif vendor == 'AMD':
+        family = 'Ryzen'
+        generations = [float(g) for g in _RYZEN_RE.findall(text)]
+    elif vendor == 'Qualcomm':
+        family = 'Snapdragon'
+    elif vendor == 'Apple':
+        family = 'Apple Silicon'
+
+    generation = max(generations) if generations else NAN
+    return vendor, family, generation
+
+
+def parse_os_families(text: Any, model: Any = None) -> List[str]:
+    """"Operating System" (falling back to the model name) -> OS families offered, e.g. ["Windows", "Linux"]"""
+    lower = f"{_text(text)} {_text(model)}".lower()
+    families = []
+    if 'windows' in lower:
+        families.append('Windows')
+    if 'chrome' in lower:
+        families.append('ChromeOS')
+    if 'ubuntu' in lower or 'linux' in lower:
+        families.append('Linux')
+    if 'freedos' in lower or 'no preload' in lower:
+        families.append('No OS / FreeDOS')
+    if 'macos' in lower or 'mac os' in lower:
+        families.append('macOS')
+    return families
+
+
+def extract_record_features(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Typed feature values for one raw catalog row"""
+    model = record.get('Model')
+    review_details = parse_review_details(record.get('Review Details'))
+    ram_gb, max_ram_gb = parse_memory(record.get('Memory (RAM)'))
+    screen_in, res_width, res_height = parse_display(record.get('Display'), model)
+    cpu_vendor, cpu_family, cpu_generation = parse_processor(record.get('Processor'), model)
+    rating = parse_rating(review_details)
+    price = parse_price(record.get('Price Details'))
+
+    return {
+        'price': NAN if price is None else price,
+        'rating': NAN if rating is None else rating,
+        'review_count': parse_review_count(review_details),
+        'ram_gb': ram_gb,
+        'max_ram_gb': max_ram_gb,
+        'ssd_gb': parse_storage(record.get('Storage')),
+        'screen_in': screen_in,
+        'res_width': res_width,
+        'res_height': res_height,
+        'weight_kg': parse_weight(record.get('Dimensions & Weight')),
+        'battery_wh': parse_battery(record.get('Battery')),
+        'cpu_generation': cpu_generation,
+        'cpu_vendor': cpu_vendor,
+        'cpu_family': cpu_family,
+    }
+
+
+def extract_spec_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Build the typed feature table for a raw catalog DataFrame (same index, one column per feature)"""
+    # Only the columns the parsers read, zipped straight from the arrays (to_dict boxes every cell)
+    source = [column for column in SOURCE_COLUMNS if column in df.columns]
+    rows = [
+        extract_record_features(dict(zip(source, values)))
+        for values in zip(*(df[column].to_numpy(dtype=object) for column in source))
+    ] if source else [extract_record_features({}) for _ in range(len(df))]
+    columns = {}
+    for name, dtype in NUMERIC_FEATURES.items():
+        columns[name] = np.array([row[name] for row in rows], dtype=dtype)
+    for name in CATEGORICAL_FEATURES:
+        columns[name] = pd.Categorical([row[name] for row in rows])
+    return pd.DataFrame(columns, index=df.index)
+
+
+def parse_capacity_gb(value: Any) -> float:
+    """Parse a user supplied size such as "16gb", "1TB" or 16 into GB"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    capacities = _capacities_gb(_text(value))
+    if capacities:
+        return capacities[0]
+    try:
+        return float(re.sub(r'[^\d.]', '', _text(value)))
+    except ValueError:
+        return NAN
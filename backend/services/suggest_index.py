@@ -0,0 +1,224 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+"""Sorted-array prefix index for search-box autocomplete.
+
+Every suggestion phrase (brand, model name, processor family, OS family) is
+indexed under each of its word starts, so "e14" finds "ThinkPad E14 Gen 5".
+Keys are kept in one sorted list and a prefix lookup is two binary searches;
+ranking only partially orders the matching range. Results for very short
+prefixes, whose key ranges are large, are computed once at build time.
+"""
+
+import argparse
+import bisect
+import math
+import re
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from services.spec_parser import parse_os_families
+
+MAX_SUGGESTIONS = 20
+
+# Prefixes up to this length get their results precomputed
+PRECOMPUTED_PREFIX_LENGTH = 2
+
+# Longer prefixes whose key range exceeds this are memoized after the first lookup
+MEMO_RANGE_THRESHOLD = 2048
+MEMO_MAX_ENTRIES = 4096
+
+_WORD_START_RE = re.compile(r'\w+')
+_QUOTES_RE = re.compile(r'[″ʺ”“]')
+_SPACES_RE = re.compile(r'\s+')
+
+
+def normalize(text: Any) -> str:
+    """Lower-case, unify inch marks and collapse whitespace"""
+    text = _QUOTES_RE.sub('"', str(text or ''))
+    return _SPACES_RE.sub(' ', text).strip().lower()
+
+
+def popularity(rating: float, review_count: float) -> float:
+    """Ranking weight for one laptop: well reviewed and much reviewed laptops first"""
+    rating = 0.0 if rating is None or math.isnan(rating) else float(rating)
+    review_count = 0.0 if review_count is None or math.isnan(review_count) else float(review_count)
+    return 1.0 + rating * math.log1p(review_count)
+
+
+class SuggestIndex:
+    """Prefix -> ranked suggestion phrases"""
+
+    def __init__(self):
+        self.phrases: List[str] = []
+        self.scores = np.zeros(0, dtype=np.float64)
+        self.keys: List[str] = []
+        self.key_phrases = np.zeros(0, dtype=np.int32)
+        self.key_ranks = np.zeros(0, dtype=np.int64)
+        self._precomputed: Dict[str, List[str]] = {}
+        self._memo: Dict[str, List[str]] = {}
+
+    def build(self, weighted_phrases: Dict[str, float]):
+        """Index {phrase: score}; replaces any previous contents"""
+        self.phrases = list(weighted_phrases)
+        self.scores = np.array([weighted_phrases[p] for p in self.phrases], dtype=np.float64)
+
+        entries = set()
+        for phrase_id, phrase in enumerate(self.phrases):
+            text = normalize(phrase)
+            for match in _WORD_START_RE.finditer(text):
+                entries.add((text[match.start():], phrase_id))
+        entries = sorted(entries)
+        self.keys = [key for key, _ in entries]
+        self.key_phrases = np.array([phrase_id for _, phrase_id in entries], dtype=np.int32)
+
+        # Rank order of every phrase: higher score, then shorter, then alphabetical
+        order = sorted(range(len(self.phrases)), key=lambda i: (-self.scores[i], len(self.phrases[i]), self.phrases[i]))
+        rank = np.empty(len(self.phrases), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        self.key_ranks = rank[self.key_phrases]
+
+        self._memo = {}
+        self._precomputed = {}
+        prefixes = {key[:length] for key in self.keys for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1)}
+        for prefix in prefixes:
+            self._precomputed[prefix] = self._lookup(*self._key_range(prefix), MAX_SUGGESTIONS)
+        return self
+
+    def _key_range(self, prefix: str):
+        start = bisect.bisect_left(self.keys, prefix)
+        return start, bisect.bisect_left(self.keys, prefix + '\uffff', lo=start)
+
+    def _lookup(self, start: int, end: int, limit: int) -> List[str]:
+        """Top `limit` distinct phrases for the key range [start, end)"""
+        if start == end:
+            return []
+
+        ranks = self.key_ranks[start:end]
+        phrase_ids = self.key_phrases[start:end]
+        # A phrase can appear under several matching word starts, so over-select before deduplicating
+        take = limit
+        while True:
+            if len(ranks) > take:
+                top = np.argpartition(ranks, take - 1)[:take]
+                candidates = top[np.argsort(ranks[top], kind='stable')]
+            else:
+                candidates = np.argsort(ranks, kind='stable')
+
+            results = []
+            seen = set()
+            for position in candidates:
+                phrase_id = int(phrase_ids[position])
+                if phrase_id not in seen:
+                    seen.add(phrase_id)
+                    results.append(self.phrases[phrase_id])
+                    if len(results) == limit:
+                        return results
+            if len(candidates) == len(ranks):
+                return results
+            take *= 2
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """Best ranked phrases having a word that starts with the prefix"""
+        prefix = normalize(prefix)
+        limit = max(0, min(limit, MAX_SUGGESTIONS))
+        if not prefix or not limit:
+            return []
+        if prefix in self._precomputed:
+            return self._precomputed[prefix][:limit]
+        if prefix in self._memo:
+            return self._memo[prefix][:limit]
+
+        start, end = self._key_range(prefix)
+        if end - start <= MEMO_RANGE_THRESHOLD:
+            return self._lookup(start, end, limit)
+
+        results = self._lookup(start, end, MAX_SUGGESTIONS)
+        if len(self._memo) >= MEMO_MAX_ENTRIES:
+            self._memo.clear()
+        self._memo[prefix] = results
+        return results[:limit]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+def build_catalog_suggestions(df: pd.DataFrame, features: pd.DataFrame) -> SuggestIndex:
+    """Build the suggestion index from the raw rows and the parsed feature arrays"""
+    index = SuggestIndex()
+    if df.empty:
+        return index.build({})
+
+    weights = [popularity(r, c) for r, c in zip(features['rating'], features['review_count'])]
+    models = df['Model'] if 'Model' in df.columns else pd.Series([''] * len(df))
+    os_column = df['Operating System'] if 'Operating System' in df.columns else pd.Series([''] * len(df))
+
+    # Broad phrases (brands, families) accumulate the popularity of all their laptops
+    phrases: Dict[str, float] = {}
+    for row, (brand, model) in enumerate(zip(df['Brand'], models)):
+        weight = weights[row]
+        for phrase in (brand, model):
+            if isinstance(phrase, str) and phrase.strip():
+                phrases[phrase.strip()] = phrases.get(phrase.strip(), 0.0) + weight
+
+        vendor, family = features['cpu_vendor'].iloc[row], features['cpu_family'].iloc[row]
+        if pd.notna(family):
+            phrase = f"{vendor} {family}"
+            phrases[phrase] = phrases.get(phrase, 0.0) + weight
+
+        for phrase in parse_os_families(os_column.iloc[row], model):
+            phrases[phrase] = phrases.get(phrase, 0.0) + weight
+
+    return index.build(phrases)
+
+
+def benchmark(index: SuggestIndex, phrases: List[str], limit: int = 10) -> Dict[str, Any]:
+    """Replay typing every phrase one keystroke at a time and time each lookup"""
+    timings = []
+    for phrase in phrases:
+        text = normalize(phrase)
+        for end in range(1, len(text) + 1):
+            started = time.perf_counter()
+            index.suggest(text[:end], limit)
+            timings.append(time.perf_counter() - started)
+
+    timings = np.array(timings) * 1e6
+    return {
+        'keystrokes': len(timings),
+        'index_keys': len(index),
+        'mean_us': round(float(timings.mean()), 1) if len(timings) else 0.0,
+        'p50_us': round(float(np.percentile(timings, 50)), 1) if len(timings) else 0.0,
+        'p99_us': round(float(np.percentile(timings, 99)), 1) if len(timings) else 0.0,
+        'max_us': round(float(timings.max()), 1) if len(timings) else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    from services.data_service import data_service
+
+    parser = argparse.ArgumentParser(description="Benchmark autocomplete lookups at keystroke rate")
+    parser.add_argument('--scale', type=int, default=1,
+                        help="Replicate the catalog this many times with distinct model names")
+    args = parser.parse_args()
+
+    df, features = data_service.df, data_service.features
+    if args.scale > 1:
+        copies = []
+        for copy in range(args.scale):
+            part = df.copy()
+            part['Model'] = part['Model'].astype(str) + f" V{copy}"
+            copies.append(part)
+        df = pd.concat(copies, ignore_index=True)
+        features = pd.concat([features] * args.scale, ignore_index=True)
+
+    started = time.perf_counter()
+    index = build_catalog_suggestions(df, features)
+    build_seconds = time.perf_counter() - started
+
+    sample = df['Model'].astype(str).sample(min(len(df), 500), random_state=0).tolist()
+    stats = benchmark(index, sample)
+    print(f"Built index over {len(df)} laptops in {build_seconds:.3f}s: {stats}")
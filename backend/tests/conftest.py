@@ -0,0 +1,55 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import os
+import shutil
+import sys
+
+import pytest
+
+# The backend imports its packages top-level (services, utils, ...), as app.py does
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+CATALOG_PATH = os.path.join(BACKEND_DIR, '..', 'data', 'processed', 'laptop_info_cleaned.csv')
+
+
+def load_catalog(path: str):
+    """(DataFrame, feature table) of a catalog CSV, prepared the way DataService loads it"""
+    from services.catalog_ingest import ingest_catalog
+
+    df, features, _ = ingest_catalog(path)
+    features['ram_capacity_gb'] = features['max_ram_gb'].fillna(features['ram_gb'])
+    return df, features
+
+
+@pytest.fixture(scope='session')
+def catalog():
+    """The shipped catalog"""
+    if not os.path.exists(CATALOG_PATH):
+        pytest.skip("catalog CSV not found")
+    return load_catalog(CATALOG_PATH)
+
+
+@pytest.fixture(scope='session')
+def large_catalog(tmp_path_factory):
+    """The shipped catalog repeated to 3000 rows"""
+    from services.catalog_ingest import _write_synthetic_catalog
+
+    if not os.path.exists(CATALOG_PATH):
+        pytest.skip("catalog CSV not found")
+    path = str(tmp_path_factory.mktemp('catalog') / 'catalog.csv')
+    _write_synthetic_catalog(CATALOG_PATH, path, 3000)
+    return load_catalog(path)
+
+
+@pytest.fixture
+def catalog_csv(tmp_path):
+    """A private copy of the shipped catalog CSV, so stores derived from its location land in tmp_path"""
+    if not os.path.exists(CATALOG_PATH):
+        pytest.skip("catalog CSV not found")
+    path = tmp_path / 'catalog.csv'
+    shutil.copyfile(CATALOG_PATH, path)
+    return str(path)
@@ -0,0 +1,215 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from services import admission
+from services.admission import AdmissionController, RateLimiter, TokenBucket
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=2.0, capacity=3)
+    t0 = bucket.updated
+    assert [bucket.try_acquire(t0)[0] for _ in range(3)] == [True, True, True]
+    granted, wait = bucket.try_acquire(t0)
+    assert not granted and wait == pytest.approx(0.5)
+    granted, wait = bucket.try_acquire(t0 + 0.25)
+    assert not granted and wait == pytest.approx(0.25)
+    assert bucket.try_acquire(t0 + 0.5)[0]
+    # A long idle period refills only up to capacity
+    assert [bucket.try_acquire(t0 + 100)[0] for _ in range(4)] == [True, True, True, False]
+
+
+def test_rate_limiter_is_per_client():
+    limiter = RateLimiter(client_per_minute=1, client_burst=2, global_per_minute=600, global_burst=100)
+    assert [limiter.check('a')[0] for _ in range(3)] == [True, True, False]
+    assert limiter.check('b')[0]
+
+
+def test_global_bucket_refunds_the_client_token():
+    limiter = RateLimiter(client_per_minute=1, client_burst=2, global_per_minute=1, global_burst=1)
+    assert limiter.check('a')[0]
+    assert not limiter.check('b')[0]
+    # b's own bucket was not charged for the globally rejected call
+    assert limiter.clients['b'].tokens == pytest.approx(2, abs=0.01)
+
+
+def test_admission_sheds_when_the_queue_is_full():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=0, max_wait=1)
+        await controller.acquire()
+        with pytest.raises(HTTPException) as rejected:
+            await controller.acquire()
+        assert rejected.value.status_code == 503
+        assert int(rejected.value.headers['Retry-After']) >= 1
+        assert controller.shed == 1
+
+    asyncio.run(scenario())
+
+
+def test_admission_times_out_waiting():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=1, max_wait=0.05)
+        await controller.acquire()
+        with pytest.raises(HTTPException) as rejected:
+            await controller.acquire()
+        assert rejected.value.status_code == 503
+        assert controller.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_released_slot_goes_to_the_oldest_waiter():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=2, max_wait=1)
+        await controller.acquire()
+        admitted = []
+
+        async def wait(name):
+            await controller.acquire()
+            admitted.append(name)
+
+        first = asyncio.create_task(wait('first'))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(wait('second'))
+        await asyncio.sleep(0)
+        assert controller.waiting == 2
+
+        controller.release(0.1)
+        await first
+        assert admitted == ['first'] and controller.active == 1
+        controller.release(0.1)
+        await second
+        controller.release(0.1)
+        assert admitted == ['first', 'second']
+        assert controller.active == 0 and controller.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_background_work_shares_the_slots():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, max_wait=1)
+    controller.acquire_blocking()
+    acquired = threading.Event()
+
+    def job():
+        controller.acquire_blocking()
+        acquired.set()
+
+    thread = threading.Thread(target=job)
+    thread.start()
+    time.sleep(0.05)
+    assert not acquired.is_set() and controller.background_waiting == 1
+    controller.release(0.1)
+    assert acquired.wait(1)
+    thread.join()
+    assert controller.active == 1
+    controller.release(0.1)
+    assert controller.active == 0
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(admission, 'llm_rate_limiter',
+                        RateLimiter(client_per_minute=1, client_burst=2, global_per_minute=600, global_burst=100))
+    monkeypatch.setattr(admission, 'llm_admission', AdmissionController(max_concurrent=1, max_queue=0, max_wait=1))
+
+    app = FastAPI()
+
+    @app.get('/llm', dependencies=[Depends(admission.rate_limit_llm)])
+    async def llm(_=Depends(admission.admit_llm)):
+        return {'ok': True}
+
+    return TestClient(app)
+
+
+def test_rate_limit_returns_429(client):
+    assert client.get('/llm').status_code == 200
+    assert client.get('/llm').status_code == 200
+    response = client.get('/llm')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+
+def test_admission_returns_503_at_capacity(client):
+    # Every slot is held by another request
+    admission.llm_admission.active = admission.llm_admission.max_concurrent
+    response = client.get('/llm')
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
+    admission.llm_admission.active = 0
+    assert client.get('/llm').status_code == 200
+    assert admission.llm_admission.active == 0
+
+
+def test_cancelled_request_keeps_its_slot_until_the_call_returns():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=0, max_wait=1)
+        started, finish = threading.Event(), threading.Event()
+
+        def llm_call():
+            started.set()
+            finish.wait(5)
+            return 'answer'
+
+        async def request():
+            slot = await controller.admit()
+            try:
+                return await slot.run(llm_call)
+            finally:
+                slot.close()
+
+        task = asyncio.create_task(request())
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        # The client goes away while the LLM call is still running
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert controller.active == 1
+        with pytest.raises(HTTPException) as rejected:
+            await controller.acquire()
+        assert rejected.value.status_code == 503
+
+        finish.set()
+        while controller.active:
+            await asyncio.sleep(0.01)
+        slot = await controller.admit()
+        assert await slot.run(lambda: 'next') == 'next'
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_slot_without_a_call_is_freed_on_close():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=0, max_wait=1)
+        slot = await controller.admit()
+        slot.close()
+        slot.close()
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_failed_call_frees_its_slot():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=0, max_wait=1)
+        slot = await controller.admit()
+
+        def fail():
+            raise RuntimeError("upstream down")
+
+        with pytest.raises(RuntimeError):
+            await slot.run(fail)
+        slot.close()
+        assert controller.active == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,129 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import json
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services.availability_feed import NOT_LISTED, AvailabilityStore, normalize_status
+
+
+def test_normalize_status():
+    assert normalize_status("{'status': 'in stock'}") == 'In stock'
+    assert normalize_status('  Not   Available ') == 'Not Available'
+    assert normalize_status('-') == 'Unknown'
+    assert normalize_status(None) == 'Unknown'
+
+
+def test_stores_share_one_log(tmp_path):
+    first, second = AvailabilityStore(str(tmp_path)), AvailabilityStore(str(tmp_path))
+    assert first.sync(['a', 'b'], ['Available', 'Available']) == 2
+    # The second store picks up the first one's changes before writing its own
+    assert second.sync(['a', 'b'], ['Available', 'Sold Out']) == 1
+    assert second.version == 3
+
+    first.refresh()
+    assert first.version == 3
+    assert [(c['version'], c['laptop_key'], c['status'], c['previous']) for c in first.changes_since(0)] == [
+        (1, 'a', 'Available', None), (2, 'b', 'Available', None), (3, 'b', 'Sold Out', 'Available')
+    ]
+    assert [c['version'] for c in first.changes_since(1, limit=1)] == [2]
+    assert first.changes_since(3) == []
+
+
+def test_resync_without_changes_writes_nothing(tmp_path):
+    store = AvailabilityStore(str(tmp_path))
+    store.sync(['a', 'b'], ['Available', 'Sold Out'])
+    size = os.path.getsize(store.log_path)
+    assert store.sync(['a', 'b'], ['Available', 'Sold Out']) == 0
+    assert AvailabilityStore(str(tmp_path)).sync(['b', 'a'], ['Sold Out', 'Available']) == 0
+    assert os.path.getsize(store.log_path) == size
+
+
+def test_drop_missing_marks_laptops_not_listed(tmp_path):
+    store = AvailabilityStore(str(tmp_path))
+    store.sync(['a', 'b'], ['Available', 'Available'])
+    assert store.sync(['a'], ['Available'], drop_missing=False) == 0
+    assert store.sync(['a'], ['Available']) == 1
+    assert store.status('b')['status'] == NOT_LISTED
+    # Already delisted: nothing more to record
+    assert store.sync(['a'], ['Available']) == 0
+    # A relisted laptop comes back
+    assert store.sync(['a', 'b'], ['Available', 'Available']) == 1
+    assert store.status('b')['status'] == 'Available'
+
+
+def test_partial_last_line_is_read_once_complete(tmp_path):
+    writer, reader = AvailabilityStore(str(tmp_path)), AvailabilityStore(str(tmp_path))
+    writer.sync(['a'], ['Available'])
+    line = json.dumps({'version': 2, 'laptop_key': 'a', 'status': 'Sold Out', 'previous': 'Available',
+                       'updated_at': None})
+    # A writer is half way through its append
+    with open(writer.log_path, 'a', encoding='utf-8') as f:
+        f.write(line[:20])
+    reader.refresh()
+    assert reader.version == 1
+
+    with open(writer.log_path, 'a', encoding='utf-8') as f:
+        f.write(line[20:] + '\n')
+    reader.refresh()
+    assert reader.version == 2 and reader.status('a')['status'] == 'Sold Out'
+    reader.refresh()
+    assert len(reader.changes) == 2
+
+
+def test_unknown_laptop_status():
+    assert AvailabilityStore('/nonexistent').status('x') == {
+        'version': 0, 'laptop_key': 'x', 'status': 'Unknown', 'updated_at': None
+    }
+
+
+@pytest.fixture
+def service(catalog_csv, tmp_path, monkeypatch):
+    from services.data_service import DataService
+
+    monkeypatch.delenv('AVAILABILITY_DIR', raising=False)
+    monkeypatch.delenv('PRICE_HISTORY_DIR', raising=False)
+    monkeypatch.delenv('CATALOG_RECORD_ON_LOAD', raising=False)
+    return DataService(catalog_csv)
+
+
+def test_loading_the_catalog_is_read_only(service, tmp_path):
+    assert not os.path.exists(tmp_path / 'availability')
+    availability = service.get_availability()
+    assert availability['version'] == 0
+    assert [record['status'] for record in availability['availability']] == service.catalog_statuses
+    assert {record['version'] for record in availability['availability']} == {0}
+
+
+def test_change_stream_sends_only_later_versions(service, monkeypatch):
+    from api import explore
+
+    service.record_availability()
+    recorded = service.availability.version
+    assert recorded == len(service.laptop_keys)
+    service.availability.sync(service.laptop_keys[:2], ['Sold Out', 'Sold Out'], drop_missing=False)
+
+    monkeypatch.setattr(explore, 'data_service', service)
+    monkeypatch.setattr(explore, 'AVAILABILITY_STREAM_POLL_SECONDS', 0.01)
+    monkeypatch.setattr(explore, 'AVAILABILITY_STREAM_TIMEOUT_SECONDS', 0)
+    app = FastAPI()
+    app.include_router(explore.router, prefix='/explore')
+    client = TestClient(app)
+
+    events = client.get('/explore/availability/changes', params={'since': recorded}).text.split('\n\n')
+    assert events[0].startswith(f"id: {recorded + 2}\nevent: changes\n")
+    payload = json.loads(events[0].split('data: ', 1)[1])
+    assert [change['version'] for change in payload['changes']] == [recorded + 1, recorded + 2]
+    assert [change['laptop_id'] for change in payload['changes']] == service.laptop_ids[:2]
+    assert events[1].startswith('event: timeout')
+
+    # Resuming from the last event id sends nothing old
+    events = client.get('/explore/availability/changes', headers={'Last-Event-ID': str(recorded + 2)}).text
+    assert 'event: changes' not in events
+
+    assert 'event: reset' in client.get('/explore/availability/changes', params={'since': recorded + 10}).text
@@ -0,0 +1,129 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import io
+import json
+import math
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services import catalog_export
+from services.catalog_export import CatalogExport, negotiate_format, pa
+
+needs_arrow = pytest.mark.skipif(pa is None, reason="Arrow export requires pyarrow")
+
+
+@pytest.mark.parametrize('accept, expected', [
+    (None, 'ndjson'),
+    ('', 'ndjson'),
+    ('application/x-ndjson', 'ndjson'),
+    ('Application/X-NDJSON', 'ndjson'),
+    ('application/json', 'ndjson'),
+    ('application/jsonl', 'ndjson'),
+    pytest.param('application/vnd.apache.arrow.stream', 'arrow', marks=needs_arrow),
+    # Highest q wins, whatever the order
+    pytest.param('application/x-ndjson;q=0.5, application/vnd.apache.arrow.stream', 'arrow', marks=needs_arrow),
+    ('application/vnd.apache.arrow.stream; q=0.2, application/json;q=0.9', 'ndjson'),
+    # Equal q: the first listed wins
+    pytest.param('application/vnd.apache.arrow.stream, application/x-ndjson', 'arrow', marks=needs_arrow),
+    ('text/html, */*;q=0.1', 'ndjson'),
+    ('application/*', 'ndjson'),
+    pytest.param('text/html;q=1, application/vnd.apache.arrow.stream;q=0.3, */*;q=0.1', 'arrow', marks=needs_arrow),
+    # Nothing acceptable: 406
+    ('text/html', None),
+    ('text/*', None),
+    ('application/vnd.apache.arrow.file', None),
+    ('application/x-ndjson;q=0', None),
+    ('application/x-ndjson;q=high', None),
+])
+def test_negotiate_format(accept, expected):
+    assert negotiate_format(accept) == expected
+
+
+def test_arrow_is_not_offered_without_pyarrow(monkeypatch):
+    monkeypatch.setattr(catalog_export, 'pa', None)
+    assert negotiate_format('application/vnd.apache.arrow.stream') is None
+    assert negotiate_format('application/vnd.apache.arrow.stream, */*;q=0.1') == 'ndjson'
+
+
+def plain(value):
+    """Cell value as NDJSON would carry it"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+
+def ndjson_rows(chunks):
+    return [json.loads(line) for line in b''.join(chunks).decode('utf-8').splitlines() if line]
+
+
+def arrow_rows(chunks):
+    table = pa.ipc.open_stream(io.BytesIO(b''.join(chunks))).read_all()
+    return [{key: plain(value) for key, value in row.items()} for row in table.to_pylist()], table
+
+
+@needs_arrow
+@pytest.mark.parametrize('batch_rows', [1, 10, 67, 1000])
+def test_ndjson_and_arrow_carry_the_same_rows(catalog, batch_rows):
+    df, features = catalog
+    ids = list(range(5000, 5000 + len(df)))
+    export = CatalogExport(df, features, ids, batch_rows=batch_rows)
+    from_ndjson = ndjson_rows(export.ndjson())
+    from_arrow, table = arrow_rows(export.arrow())
+
+    assert len(from_ndjson) == len(from_arrow) == len(df)
+    assert table.num_rows == len(df)
+    assert [row['laptop_id'] for row in from_arrow] == ids
+    for json_row, arrow_row in zip(from_ndjson, from_arrow):
+        assert list(json_row) == list(arrow_row)
+        for key, value in json_row.items():
+            if isinstance(value, float):
+                assert arrow_row[key] == pytest.approx(value)
+            else:
+                assert arrow_row[key] == value
+    # Raw columns come through untouched
+    assert [row['Model'] for row in from_arrow] == [plain(value) for value in df['Model']]
+    assert from_ndjson[0]['price'] == pytest.approx(features['price'].iloc[0])
+
+
+@needs_arrow
+def test_empty_catalog_exports_no_rows(catalog):
+    df, features = catalog
+    export = CatalogExport(df.iloc[:0], features.iloc[:0], [])
+    assert ndjson_rows(export.ndjson()) == []
+    rows, table = arrow_rows(export.arrow())
+    assert rows == [] and 'laptop_id' in table.schema.names
+
+
+@pytest.fixture
+def client(catalog, monkeypatch):
+    from api import explore
+
+    df, features = catalog
+
+    monkeypatch.setattr(explore, 'data_service',
+                        SimpleNamespace(df=df, features=features, laptop_ids=list(range(len(df)))))
+    app = FastAPI()
+    app.include_router(explore.router, prefix='/explore')
+    return TestClient(app)
+
+
+@needs_arrow
+def test_export_route_negotiates(client, catalog):
+    df, _ = catalog
+    response = client.get('/explore/export', headers={'Accept': 'application/vnd.apache.arrow.stream'})
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/vnd.apache.arrow.stream'
+    assert response.headers['x-catalog-rows'] == str(len(df)) and response.headers['vary'] == 'Accept'
+    assert arrow_rows([response.content])[1].num_rows == len(df)
+
+    response = client.get('/explore/export', headers={'Accept': 'text/html'}, params={'format': 'ndjson'})
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert len(ndjson_rows([response.content])) == len(df)
+
+    for accept in ('text/html', 'application/vnd.apache.arrow.file'):
+        assert client.get('/explore/export', headers={'Accept': accept}).status_code == 406
@@ -0,0 +1,81 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import numpy as np
+import pytest
+
+from services.catalog_partitions import CatalogPartitions, catalog_columns, range_mask, score_constraints, top_k
+from utils.helpers import catalog_laptop_keys
+
+QUERIES = [
+    {'brand': 'lenovo', 'max_price': 1500, 'min_rating': 4},
+    {'processor_type': 'intel', 'min_memory': '16gb', 'max_price': 2000},
+    {'max_price': 900},
+    {'min_rating': 4.5, 'storage_type': 'ssd'},
+    {'brand': 'apple', 'min_ram_gb': 16},
+    {'processor_type': 'amd', 'max_weight_kg': 1.5},
+]
+
+
+@pytest.fixture(scope='module')
+def partitioned(large_catalog):
+    df, features = large_catalog
+    # The synthetic rows repeat brand/model, so key by row to spread them over hash slices
+    keys = catalog_laptop_keys(df.assign(Model=df['Model'].astype(str) + df.index.astype(str)))
+    partitions = CatalogPartitions(df, features, keys, max_rows=100, workers=0)
+    yield df, features, partitions
+    partitions.close()
+
+
+def full_catalog_top_k(df, features, constraints, k):
+    columns = catalog_columns(df, features)
+    scores, eligible = score_constraints(columns, constraints)
+    hits = np.flatnonzero(eligible & (scores > 0))
+    return top_k(hits.astype(np.int64), scores[hits], k)
+
+
+def test_large_brands_are_split(partitioned):
+    _, _, partitions = partitioned
+    assert len(partitions.partitions) > len({p.brand for p in partitions.partitions})
+    assert all(len(p) <= 200 for p in partitions.partitions)
+    rows = np.sort(np.concatenate([p.rows for p in partitions.partitions]))
+    assert np.array_equal(rows, np.arange(partitions.rows))
+
+
+@pytest.mark.parametrize('constraints', QUERIES)
+@pytest.mark.parametrize('k', [1, 5, 50])
+def test_scatter_gather_matches_full_catalog_top_k(partitioned, constraints, k):
+    df, features, partitions = partitioned
+    rows, scores = partitions.top_constraint_matches(constraints, k)
+    expected_rows, expected_scores = full_catalog_top_k(df, features, constraints, k)
+    assert rows.tolist() == expected_rows.tolist()
+    assert np.allclose(scores, expected_scores)
+
+
+@pytest.mark.parametrize('text, filters', [
+    ('thinkpad', {'min_ram_gb': 16}),
+    (None, {'brand': 'hp', 'max_price': 1200}),
+    ('intel', {}),
+])
+def test_search_matches_full_catalog_filter(partitioned, text, filters):
+    df, features, partitions = partitioned
+    columns = catalog_columns(df, features)
+    mask = range_mask(columns, filters)
+    if text:
+        mask &= np.array([text in value for value in columns['search_text']])
+    if filters.get('brand'):
+        mask &= np.array([filters['brand'] in value for value in columns['text_brand']])
+    assert partitions.search(text, filters).tolist() == np.flatnonzero(mask).tolist()
+
+
+def test_process_pool_gives_the_same_answer(large_catalog):
+    df, features = large_catalog
+    keys = catalog_laptop_keys(df.assign(Model=df['Model'].astype(str) + df.index.astype(str)))
+    partitions = CatalogPartitions(df, features, keys, max_rows=500, workers=2, parallel_min_rows=1)
+    try:
+        for constraints in QUERIES[:2]:
+            rows, _ = partitions.top_constraint_matches(constraints, 10)
+            assert rows.tolist() == full_catalog_top_k(df, features, constraints, 10)[0].tolist()
+    finally:
+        partitions.close()
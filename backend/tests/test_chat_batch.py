@@ -0,0 +1,110 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import asyncio
+import json
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from api import chat
+from models.schemas import BatchChatRequest, ChatRequest
+from services.admission import AdmissionController, RateLimiter
+
+
+def answer(query, context, laptops):
+    return {'response': f"answer to {query}", 'degraded': False, 'cached': False}
+
+
+@pytest.fixture
+def lane(monkeypatch):
+    controller = AdmissionController(max_concurrent=2, max_queue=100, max_wait=5)
+    monkeypatch.setattr(chat, 'llm_admission', controller)
+    monkeypatch.setattr(chat, 'llm_rate_limiter',
+                        RateLimiter(client_per_minute=6000, client_burst=100, global_per_minute=6000, global_burst=100))
+    return controller
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(chat.router, prefix='/chat')
+    return TestClient(app)
+
+
+def lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def batch(count: int, parallelism: int = 4) -> BatchChatRequest:
+    return BatchChatRequest(queries=[ChatRequest(query=f"query {i}") for i in range(count)], parallelism=parallelism)
+
+
+def test_each_query_is_charged_to_the_rate_limit(monkeypatch, lane, client):
+    monkeypatch.setattr(chat, 'llm_rate_limiter',
+                        RateLimiter(client_per_minute=1, client_burst=3, global_per_minute=6000, global_burst=100))
+    monkeypatch.setattr(chat.llm_service, 'chat_query', answer)
+
+    results = lines(client.post('/chat/batch', json=batch(5).model_dump()))
+    items, summary = results[:-1], results[-1]
+    assert summary['done'] and summary['count'] == 5 and summary['failed'] == 2
+    assert sum(item['success'] for item in items) == 3
+    limited = [item for item in items if not item['success']]
+    assert {item['status_code'] for item in limited} == {429}
+    assert all(int(item['retry_after']) >= 1 for item in limited)
+
+    # The budget is spent: the next batch is refused item by item
+    results = lines(client.post('/chat/batch', json=batch(2).model_dump()))
+    assert [item['status_code'] for item in results[:-1]] == [429, 429]
+    assert lane.active == 0
+
+
+def test_abandoned_batch_holds_its_slots_until_the_calls_return(monkeypatch, lane):
+    finish = threading.Event()
+    calls = []
+
+    def slow_answer(query, context, laptops):
+        calls.append(query)
+        finish.wait(5)
+        return answer(query, context, laptops)
+
+    monkeypatch.setattr(chat.llm_service, 'chat_query', slow_answer)
+    http_request = Request({'type': 'http', 'headers': [], 'client': ('10.0.0.1', 1234)})
+
+    async def scenario():
+        response = await chat.chat_batch(batch(20), http_request)
+        reader = asyncio.create_task(response.body_iterator.__anext__())
+        while lane.active < lane.max_concurrent:
+            await asyncio.sleep(0.01)
+
+        # The client disconnects: the stream is cancelled with two LLM calls in flight
+        reader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await reader
+        await asyncio.sleep(0.05)
+        assert lane.active == lane.max_concurrent
+        assert len(calls) == 2
+
+        # A new batch has to wait for those calls instead of piling onto the lane
+        second = asyncio.create_task(chat.chat_batch(batch(3), http_request))
+        response = await second
+        collected = asyncio.create_task(collect(response.body_iterator))
+        await asyncio.sleep(0.1)
+        assert lane.active <= lane.max_concurrent
+        assert lane.waiting > 0 and len(calls) == 2
+
+        finish.set()
+        results = await collected
+        assert [item['success'] for item in results[:-1]] == [True, True, True]
+        while lane.active:
+            await asyncio.sleep(0.01)
+
+    async def collect(body):
+        return [json.loads(line) async for line in body]
+
+    asyncio.run(scenario())
+    assert lane.active == 0 and lane.waiting == 0
@@ -0,0 +1,83 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import pytest
+
+from services import circuit_breaker
+from services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def make_breaker(**kwargs) -> CircuitBreaker:
+    options = dict(failure_rate=0.5, window=4, min_calls=4, slow_call_seconds=10, open_seconds=30, half_open_probes=1)
+    options.update(kwargs)
+    return CircuitBreaker(**options)
+
+
+def test_opens_at_the_failure_rate(clock):
+    breaker = make_breaker()
+    for success in (False, True, False):
+        assert breaker.allow()
+        breaker.record(success, 1)
+    # Below min_calls nothing trips
+    assert breaker.state == CLOSED
+    breaker.record(True, 1)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_slow_calls_count_as_failures(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(True, 11)
+    assert breaker.state == OPEN
+
+
+def test_healthy_window_stays_closed(clock):
+    breaker = make_breaker(window=4)
+    for success in (False, True, True, True, False, True, True):
+        breaker.record(success, 1)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_success_closes(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False, 1)
+    clock[0] += 29
+    assert not breaker.allow()
+    clock[0] += 1
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record(True, 1)
+    assert breaker.state == CLOSED
+    assert breaker.stats()['recent_calls'] == 0
+    assert breaker.allow()
+
+
+def test_half_open_probe_failure_reopens(clock):
+    breaker = make_breaker(half_open_probes=2)
+    for _ in range(4):
+        breaker.record(False, 1)
+    clock[0] += 30
+    assert breaker.allow() and breaker.allow()
+    breaker.record(True, 1)
+    assert breaker.state == HALF_OPEN
+    breaker.record(False, 1)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    # The open period restarts from the failed probe
+    clock[0] += 29
+    assert not breaker.allow()
+    clock[0] += 1
+    assert breaker.allow()
@@ -0,0 +1,58 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services.data_service import DataService
+
+
+@pytest.fixture
+def service(catalog_csv, monkeypatch):
+    for name in ('AVAILABILITY_DIR', 'PRICE_HISTORY_DIR', 'CATALOG_RECORD_ON_LOAD'):
+        monkeypatch.delenv(name, raising=False)
+    return DataService(catalog_csv)
+
+
+@pytest.fixture
+def client(service, monkeypatch):
+    from api import explore
+
+    monkeypatch.setattr(explore, 'data_service', service)
+    app = FastAPI()
+    app.include_router(explore.router, prefix='/explore')
+    return TestClient(app)
+
+
+def test_unknown_and_negative_ids_are_not_found(service, client):
+    known = service.laptop_ids[0]
+    assert client.get(f'/explore/{known}').status_code == 200
+    for laptop_id in (-1, -known, max(service.laptop_ids) + 1, 2 ** 48):
+        assert client.get(f'/explore/{laptop_id}').status_code == 404
+        assert client.get(f'/explore/{laptop_id}/specifications').status_code == 404
+
+
+def test_batch_reports_unknown_and_negative_ids_missing(service, client):
+    known = service.laptop_ids[:2]
+    response = client.get('/explore/batch', params={'ids': f"{known[1]},-1,{known[0]},-{known[0]},7"})
+    assert response.status_code == 200
+    data = response.json()['data']
+    assert [laptop['laptop_id'] for laptop in data['laptops']] == [known[1], known[0]]
+    assert data['missing'] == [-1, -known[0], 7]
+    assert client.get('/explore/batch', params={'ids': '-1,abc'}).status_code == 422
+
+
+def test_reordered_catalog_keeps_every_id(service, catalog_csv, tmp_path):
+    df = pd.read_csv(catalog_csv, dtype=object, keep_default_na=False)
+    shuffled = str(tmp_path / 'shuffled.csv')
+    df.sample(frac=1, random_state=3).to_csv(shuffled, index=False)
+    reordered = DataService(shuffled)
+
+    assert sorted(reordered.laptop_ids) == sorted(service.laptop_ids)
+    for laptop_id in service.laptop_ids:
+        before = service.get_laptop_by_id(laptop_id)
+        after = reordered.get_laptop_by_id(laptop_id)
+        assert (after['Brand'], after['Model'], after['Processor']) == (before['Brand'], before['Model'], before['Processor'])
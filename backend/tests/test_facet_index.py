@@ -0,0 +1,86 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.facet_index import FacetIndex, bits_from_mask, build_catalog_facets, mask_from_bits
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(7)
+    n = 500
+    return pd.DataFrame({
+        'brand': rng.choice(['Lenovo', 'HP', 'Dell', 'Apple', 'Asus'], n),
+        'ram': rng.choice(['8GB', '16GB', '32GB'], n),
+        'os': [list(rng.choice(['Windows', 'Linux', 'ChromeOS'], rng.integers(1, 3), replace=False))
+               for _ in range(n)],
+    })
+
+
+def index_for(frame: pd.DataFrame) -> FacetIndex:
+    index = FacetIndex(len(frame))
+    for column in frame.columns:
+        index.add_facet(column, frame[column])
+    return index
+
+
+def matches(frame: pd.DataFrame, selections, exclude=None) -> pd.Series:
+    mask = pd.Series(True, index=frame.index)
+    for facet, values in selections.items():
+        if facet == exclude or not values:
+            continue
+        column = frame[facet]
+        if column.map(lambda v: isinstance(v, list)).any():
+            mask &= column.map(lambda labels: any(label in values for label in labels))
+        else:
+            mask &= column.isin(values)
+    return mask
+
+
+def groupby_counts(frame: pd.DataFrame, facet: str, selections) -> dict:
+    rows = frame[matches(frame, selections, exclude=facet)]
+    return rows.explode(facet).groupby(facet).size().to_dict()
+
+
+@pytest.mark.parametrize('selections', [
+    {},
+    {'brand': ['Lenovo']},
+    {'brand': ['Lenovo', 'HP'], 'ram': ['16GB']},
+    {'os': ['Linux'], 'ram': ['8GB', '32GB']},
+    {'brand': ['Apple'], 'os': ['ChromeOS', 'Windows'], 'ram': ['16GB']},
+])
+def test_counts_match_pandas_groupby(frame, selections):
+    index = index_for(frame)
+    counts = index.counts(selections)
+
+    assert counts['total'] == int(matches(frame, selections).sum())
+    for facet in frame.columns:
+        got = {v['value']: v['count'] for v in counts['facets'][facet] if v['count']}
+        assert got == groupby_counts(frame, facet, selections)
+        assert {v['value'] for v in counts['facets'][facet] if v['selected']} == set(selections.get(facet, []))
+
+
+def test_rows_match_pandas_filter(frame):
+    index = index_for(frame)
+    selections = {'brand': ['Dell', 'Asus'], 'os': ['Windows']}
+    assert index.rows(selections).tolist() == np.flatnonzero(matches(frame, selections)).tolist()
+
+
+def test_bitset_round_trip():
+    rng = np.random.default_rng(3)
+    for size in (0, 1, 7, 8, 9, 1000):
+        mask = rng.random(size) < 0.3
+        assert np.array_equal(mask_from_bits(bits_from_mask(mask), size), mask)
+
+
+def test_catalog_brand_counts(catalog):
+    df, features = catalog
+    counts = build_catalog_facets(df, features).counts({})
+    got = {v['value']: v['count'] for v in counts['facets']['brand']}
+    brands = df['Brand'].fillna('Unknown').astype(str)
+    assert got == brands.groupby(brands).size().to_dict()
+    assert counts['total'] == len(df)
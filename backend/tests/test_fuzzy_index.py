@@ -0,0 +1,88 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import itertools
+
+import numpy as np
+import pytest
+
+from services.fuzzy_index import FuzzyIndex, bounded_edit_distance, build_catalog_fuzzy_index, max_edits, trigrams
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Reference optimal-string-alignment distance (adjacent transposition = one edit)"""
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[-1][-1]
+
+
+def random_words(rng, count, alphabet='abcde', max_length=7):
+    return [''.join(rng.choice(list(alphabet), rng.integers(0, max_length + 1))) for _ in range(count)]
+
+
+@pytest.mark.parametrize('limit', [0, 1, 2, 3])
+def test_bounded_edit_distance_matches_reference(limit):
+    rng = np.random.default_rng(limit)
+    words = random_words(rng, 60)
+    for a, b in itertools.product(words, words[:30]):
+        expected = edit_distance(a, b)
+        assert bounded_edit_distance(a, b, limit) == (expected if expected <= limit else None)
+
+
+def test_transposition_is_one_edit():
+    assert bounded_edit_distance('thinkpad', 'thinkpda', 2) == 1
+    assert bounded_edit_distance('lenovo', 'lneovo', 1) == 1
+
+
+def test_trigrams_are_padded_and_distinct():
+    assert trigrams('ab') == ['$$a', '$ab', 'ab$', 'b$$']
+    assert trigrams('aaaa') == ['$$a', '$aa', 'aaa', 'aa$', 'a$$']
+
+
+def test_match_word_finds_every_word_within_the_edit_budget():
+    # The trigram count filter must never drop a word that is within max_edits
+    rng = np.random.default_rng(11)
+    vocabulary = sorted(set(random_words(rng, 400, alphabet='abcdefg', max_length=10)) - {''})
+    index = FuzzyIndex().build(vocabulary)
+    for query in random_words(rng, 150, alphabet='abcdefg', max_length=10):
+        if not query:
+            continue
+        found = index.match_word(query)
+        limit = max_edits(query)
+        for word_id, word in enumerate(index.vocabulary):
+            distance = edit_distance(query, word)
+            if distance <= limit:
+                assert word_id in found, (query, word)
+                if distance > 0:
+                    assert found[word_id] >= 1.0 - distance / (len(query) + 1)
+
+
+def test_short_words_match_exactly():
+    index = FuzzyIndex().build(['lenovo e14', 'lenovo e15'])
+    assert [row for row, _ in index.search('e14')] == [0]
+    assert index.search('e13') == []
+
+
+def test_search_tolerates_typos():
+    index = FuzzyIndex().build(['Lenovo ThinkPad X1 Carbon', 'HP EliteBook 840', 'Dell XPS 13'])
+    assert [row for row, _ in index.search('lenvo thinkpda')] == [0]
+    assert [row for row, _ in index.search('elitbook')] == [1]
+    # match_all: every informative word has to match
+    assert index.search('thinkpad elitebook') == []
+    assert {row for row, _ in index.search('thinkpad elitebook', match_all=False)} == {0, 1}
+
+
+def test_catalog_brand_typo_finds_the_brand(catalog):
+    df, features = catalog
+    index = build_catalog_fuzzy_index(df, features)
+    rows = {row for row, _ in index.search('lenvo')}
+    assert rows == set(np.flatnonzero(df['Brand'].str.lower() == 'lenovo'))
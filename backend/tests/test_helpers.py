@@ -0,0 +1,70 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import hashlib
+
+import pandas as pd
+
+from utils.helpers import catalog_laptop_ids, catalog_laptop_keys, laptop_key, LAPTOP_KEY_COLUMNS
+
+
+def test_ids_do_not_depend_on_row_order():
+    keys = catalog_laptop_keys(pd.DataFrame({'Brand': ['Lenovo', 'HP', 'Dell', 'Apple'],
+                                             'Model': ['X1 Carbon', 'EliteBook 840', 'XPS 13', 'Air']}))
+    ids = dict(zip(keys, catalog_laptop_ids(keys)))
+    reversed_keys = keys[::-1]
+    assert dict(zip(reversed_keys, catalog_laptop_ids(reversed_keys))) == ids
+    # Adding a laptop leaves the others alone
+    more = ['new-key'] + keys
+    assert dict(zip(more, catalog_laptop_ids(more)))[keys[0]] == ids[keys[0]]
+
+
+def test_ids_fit_in_a_javascript_number():
+    ids = catalog_laptop_ids([f"key-{i}" for i in range(1000)])
+    assert all(0 <= laptop_id < 2 ** 48 <= 2 ** 53 for laptop_id in ids)
+
+
+def test_colliding_keys_get_distinct_ids():
+    # The same key twice is a guaranteed hash collision; the second one is re-hashed with a counter
+    first, second = catalog_laptop_ids(['lenovo|x1', 'lenovo|x1'])
+    assert first != second
+    salted = int.from_bytes(hashlib.blake2b(b'lenovo|x1#1', digest_size=6).digest(), 'big')
+    assert second == salted
+
+
+def test_configurations_of_one_model_get_distinct_keys():
+    df = pd.DataFrame({
+        'Brand': ['HP', 'hp ', 'HP', 'HP'],
+        'Model': ['Envy 13', 'envy  13', 'Envy 13', 'Envy 15'],
+        'Memory (RAM)': ['8GB DDR4', '8gb ddr4', '16GB DDR4', '-'],
+        'Storage': ['512GB SSD', '512GB SSD', '512GB SSD', None],
+    })
+    keys = catalog_laptop_keys(df)
+    # Specs tell configurations apart; case and spacing do not
+    assert keys[2] != keys[0] and keys[1] == f"{keys[0]}-2"
+    assert len(set(keys)) == 4
+    # A laptop without spec cells keeps its brand-and-model key
+    assert keys[3] == laptop_key('HP', 'Envy 15')
+
+
+def test_reordering_the_catalog_keeps_every_id(catalog):
+    df, _ = catalog
+    keys = catalog_laptop_keys(df)
+    ids = dict(zip(keys, catalog_laptop_ids(keys)))
+    shuffled = df.sample(frac=1, random_state=7)
+    shuffled_ids = catalog_laptop_ids(catalog_laptop_keys(shuffled))
+    rows = {row: laptop_id for row, laptop_id in zip(shuffled.index, shuffled_ids)}
+    duplicated = df.duplicated(LAPTOP_KEY_COLUMNS, keep=False)
+    # Rows identical in every key column are interchangeable, so only their set of ids is kept
+    assert {rows[row] for row in df.index[duplicated]} == {ids[keys[row]] for row in range(len(df)) if duplicated.iloc[row]}
+    assert all(rows[row] == ids[keys[position]]
+               for position, row in enumerate(df.index) if not duplicated.iloc[position])
+
+
+def test_catalog_ids_are_unique(catalog):
+    df, _ = catalog
+    keys = catalog_laptop_keys(df)
+    ids = catalog_laptop_ids(keys)
+    assert len(set(keys)) == len(keys) == len(set(ids))
+    assert catalog_laptop_ids(keys) == ids
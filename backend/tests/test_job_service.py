@@ -0,0 +1,156 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import json
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import chat
+from services import admission
+from services.admission import AdmissionController, RateLimiter
+from services.job_service import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueueFullError, JobService
+from services.job_store import InMemoryJobStore
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def gate():
+    gate = threading.Event()
+    yield gate
+    # Let any blocked worker finish so the pool can shut down
+    gate.set()
+
+
+def blocking_service(gate, **kwargs):
+    service = JobService(store=InMemoryJobStore(), **kwargs)
+    service.register('echo', lambda payload: gate.wait(2) and {'echo': payload['value']})
+    return service
+
+
+def test_status_moves_from_queued_to_running_to_succeeded(gate):
+    controller = AdmissionController(max_concurrent=1, max_queue=0, max_wait=1)
+    service = blocking_service(gate, max_workers=1, admission=controller)
+    # An interactive call holds the only slot, so the job waits in the queue
+    controller.acquire_blocking()
+    job = service.submit('echo', {'value': 1})
+    assert job['status'] == QUEUED
+    time.sleep(0.05)
+    assert service.get(job['job_id'])['status'] == QUEUED and service.pending() == 1
+
+    controller.release(0.1)
+    wait_for(lambda: service.get(job['job_id'])['status'] == RUNNING)
+    assert service.get(job['job_id'])['started_at'] is not None
+    gate.set()
+    wait_for(lambda: service.get(job['job_id'])['status'] == SUCCEEDED)
+    finished = service.get(job['job_id'])
+    assert finished['result'] == {'echo': 1} and finished['error'] is None
+    assert finished['finished_at'] >= finished['started_at']
+    assert service.pending() == 0 and controller.active == 0
+
+
+def test_failures_are_captured():
+    controller = AdmissionController(max_concurrent=1, max_queue=0, max_wait=1)
+    service = JobService(store=InMemoryJobStore(), max_workers=1, admission=controller)
+
+    def fail(payload):
+        raise ValueError("LLM said no")
+
+    service.register('fail', fail)
+    job = service.submit('fail', {})
+    wait_for(lambda: service.get(job['job_id'])['status'] == FAILED)
+    failed = service.get(job['job_id'])
+    assert failed['error'] == "LLM said no" and failed['result'] is None
+    assert service.pending() == 0 and controller.active == 0
+    with pytest.raises(ValueError):
+        service.submit('unknown', {})
+
+
+def test_pending_limit(gate):
+    service = blocking_service(gate, max_workers=1, max_pending=2)
+    service.submit('echo', {'value': 1})
+    service.submit('echo', {'value': 2})
+    with pytest.raises(JobQueueFullError) as error:
+        service.submit('echo', {'value': 3})
+    assert error.value.retry_after >= 1
+    gate.set()
+    wait_for(lambda: service.pending() == 0)
+    service.submit('echo', {'value': 4})
+
+
+def test_records_expire_after_the_ttl():
+    store = InMemoryJobStore()
+    store.put({'job_id': 'short'}, 0.05)
+    store.put({'job_id': 'long'}, 60)
+    assert store.get('short') == {'job_id': 'short'} and len(store) == 2
+    time.sleep(0.1)
+    assert store.get('short') is None and store.get('long') == {'job_id': 'long'}
+    assert len(store) == 1
+    # Records are copies; changing one does not change the store
+    store.get('long')['status'] = 'changed'
+    assert 'status' not in store.get('long')
+
+
+@pytest.fixture
+def jobs(gate, monkeypatch):
+    service = blocking_service(gate, max_workers=1, max_pending=1, ttl=60)
+    service.register('recommend', lambda payload: gate.wait(2) and {'constraints': payload['constraints']})
+    monkeypatch.setattr(chat, 'job_service', service)
+    monkeypatch.setattr(chat, 'JOB_STREAM_POLL_SECONDS', 0.01)
+    monkeypatch.setattr(admission, 'llm_rate_limiter',
+                        RateLimiter(client_per_minute=6000, client_burst=100, global_per_minute=6000, global_burst=100))
+    app = FastAPI()
+    app.include_router(chat.router, prefix='/chat')
+    return service, TestClient(app)
+
+
+def test_submission_is_refused_with_503_when_full(jobs):
+    _, client = jobs
+    accepted = client.post('/chat/jobs/recommend', json={'constraints': {'max_price': 1000}})
+    assert accepted.status_code == 202
+    data = accepted.json()['data']
+    assert data['status'] == QUEUED and data['events_url'] == f"/api/v1/chat/jobs/{data['job_id']}/events"
+
+    refused = client.post('/chat/jobs/recommend', json={'constraints': {'max_price': 900}})
+    assert refused.status_code == 503
+    assert int(refused.headers['Retry-After']) >= 1
+
+
+def test_job_routes_report_unknown_jobs(jobs):
+    _, client = jobs
+    assert client.get('/chat/jobs/nope').status_code == 404
+    assert client.get('/chat/jobs/nope/events').status_code == 404
+
+
+def test_event_stream_sends_status_then_result(jobs, gate):
+    service, client = jobs
+    job_id = client.post('/chat/jobs/recommend', json={'constraints': {'max_price': 1000}}).json()['data']['job_id']
+    wait_for(lambda: service.get(job_id)['status'] == RUNNING)
+    threading.Timer(0.1, gate.set).start()
+
+    events = [event for event in client.get(f'/chat/jobs/{job_id}/events').text.split('\n\n') if event]
+    names = [event.split('\n')[0] for event in events]
+    assert names == ['event: status', 'event: result']
+    status = json.loads(events[0].split('data: ', 1)[1])
+    assert status['status'] == RUNNING and set(status) == {'job_id', 'kind', 'status', 'started_at'}
+    result = json.loads(events[1].split('data: ', 1)[1])
+    assert result['status'] == SUCCEEDED and result['result'] == {'constraints': {'max_price': 1000}}
+    assert client.get(f'/chat/jobs/{job_id}').json()['data']['status'] == SUCCEEDED
+
+
+def test_event_stream_reports_expired_jobs(jobs, gate):
+    service, client = jobs
+    job_id = client.post('/chat/jobs/recommend', json={'constraints': {}}).json()['data']['job_id']
+    threading.Timer(0.1, lambda: service.store.delete(job_id)).start()
+    events = client.get(f'/chat/jobs/{job_id}/events').text
+    assert events.endswith('event: expired\ndata: {}\n\n')
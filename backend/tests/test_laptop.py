@@ -0,0 +1,140 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import ast
+import json
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.laptop import LaptopCatalog
+from services.data_service import DataService
+from utils.helpers import is_missing, parse_review_details
+
+
+def clean(value):
+    if isinstance(value, dict):
+        return {key: clean(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [clean(item) for item in value]
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    return value
+
+
+def dict_record(record: dict, laptop_id: int, summaries: dict) -> dict:
+    """The record dict DataService built per row before records became views"""
+    record = dict(record)
+    record['laptop_id'] = laptop_id
+    if 'Brand' not in record:
+        record['Brand'] = 'Unknown'
+    model = record.get('Model', '')
+    model = '' if is_missing(model) else str(model)
+    if is_missing(record.get('Processor')):
+        record['Processor'] = ('AMD Ryzen (varies by model)' if 'AMD' in model else
+                               'Intel Core (varies by model)' if 'Intel' in model else 'Intel Core i5')
+    if 'ThinkPad' in model or 'ProBook' in model:
+        defaults = {'Memory (RAM)': '8GB DDR4 (upgradeable)', 'Storage': '256GB SSD (upgradeable)',
+                    'Display': '14" FHD IPS'}
+    else:
+        defaults = {'Memory (RAM)': '8GB DDR4', 'Storage': '256GB SSD', 'Display': '14" FHD'}
+    for column, default in defaults.items():
+        if is_missing(record.get(column)):
+            record[column] = default
+    record.setdefault('Operating System', 'Windows 11')
+    record.setdefault('Graphics', 'Integrated')
+    record['processor'] = summaries['processor'] or record['Processor']
+    record['memory'] = summaries['memory'] or record['Memory (RAM)']
+    record['storage'] = summaries['storage'] or record['Storage']
+    record['display'] = summaries['display'] or record['Display']
+    record['brand'] = record['Brand']
+    record['model'] = record.get('Model', 'Unknown')
+    price = record.get('Price Details', '{"Current Price": "0"}')
+    try:
+        record['price_details'] = ast.literal_eval(price)
+    except Exception:
+        record['price_details'] = {"Current Price": price} if price and price != '-' else {"Current Price": "0"}
+    record['review_details'] = parse_review_details(record.get('Review Details', '{"Overall Rating": "0"}'))
+    return clean(record)
+
+
+def build(df: pd.DataFrame, summaries=None):
+    summaries = summaries or [{'processor': None, 'memory': None, 'storage': None, 'display': None}] * len(df)
+    ids = [1000 + row for row in range(len(df))]
+    catalog = LaptopCatalog(df, summaries, [f"key-{row}" for row in range(len(df))], ids)
+    expected = [dict_record(record, laptop_id, summary)
+                for record, laptop_id, summary in zip(df.to_dict('records'), ids, summaries)]
+    return catalog, expected
+
+
+@pytest.fixture(scope='module')
+def shipped(catalog):
+    df, features = catalog
+    summaries = [DataService._spec_summary(row) for _, row in features.iterrows()]
+    return build(df, summaries)
+
+
+def test_records_match_the_dict_records(shipped):
+    catalog, expected = shipped
+    for row, record in enumerate(expected):
+        laptop = catalog.laptop(row)
+        assert laptop.to_dict() == record
+        # Iteration order is the dict's field order
+        assert list(laptop) == list(record)
+        assert len(laptop) == len(record)
+        assert dict(laptop.items()) == record
+
+
+def test_to_dict_is_json_ready(shipped):
+    catalog, _ = shipped
+    json.dumps([catalog.laptop(row).to_dict() for row in range(catalog.size)], allow_nan=False)
+
+
+def test_missing_columns_get_defaults_and_numbers_are_unboxed():
+    df = pd.DataFrame({
+        'Model': ['ThinkPad E14', 'Victus AMD 15', None],
+        'Memory (RAM)': ['16GB', '-', np.nan],
+        'Rating': [4.5, np.nan, 3.0],
+        'Reviews': np.array([10, 20, 30], dtype=np.int64),
+    })
+    catalog, expected = build(df)
+    assert [catalog.laptop(row).to_dict() for row in range(3)] == expected
+    laptop = catalog.laptop(1)
+    assert laptop['Brand'] == 'Unknown' and laptop['Processor'] == 'AMD Ryzen (varies by model)'
+    assert laptop['Rating'] is None and type(laptop['Reviews']) is int
+    assert catalog.laptop(0)['Memory (RAM)'] == '16GB'
+    assert catalog.laptop(2)['model'] is None
+    assert catalog.raw_record(1) == {'Model': 'Victus AMD 15', 'Memory (RAM)': '-', 'Rating': None, 'Reviews': 20}
+
+
+def test_get_set_and_delete_like_a_dict(shipped):
+    catalog, expected = shipped
+    laptop, record = catalog.laptop(0), dict(expected[0])
+    assert laptop.get('Brand') == record.get('Brand')
+    assert laptop.get('no such field', 'fallback') == record.get('no such field', 'fallback')
+    assert ('laptop_id' in laptop) and ('no such field' not in laptop)
+    with pytest.raises(KeyError):
+        laptop['no such field']
+
+    # Assigned fields live on the view, after the catalog fields
+    laptop['semantic_score'] = record['semantic_score'] = 0.5
+    laptop['brand'] = record['brand'] = 'Overridden'
+    assert laptop.to_dict() == record and list(laptop) == list(record)
+    assert catalog.laptop(0)['brand'] == expected[0]['brand']
+    del laptop['semantic_score']
+    del record['semantic_score']
+    assert 'semantic_score' not in laptop and len(laptop) == len(record)
+    with pytest.raises(KeyError):
+        del laptop['Model']
+
+
+def test_views_do_not_copy_the_columns(shipped, catalog):
+    catalog_records, _ = shipped
+    df, _ = catalog
+    for column, values in catalog_records.arrays.items():
+        assert np.shares_memory(values, df[column].to_numpy())
+    with pytest.raises(IndexError):
+        catalog_records.laptop(catalog_records.size)
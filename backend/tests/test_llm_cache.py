@@ -0,0 +1,170 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import json
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from services.admission import AdmissionController, RateLimiter
+from services.llm_cache import AnswerCache, QueryLog, normalize_query, warm_answer_cache
+
+
+def test_normalize_query():
+    assert normalize_query("Best laptop under $1,000?") == 'best laptop under $1000'
+    assert normalize_query("  BEST   laptop, under $1000!! ") == 'best laptop under $1000'
+    assert normalize_query("16GB RAM... i7/i9 + 4K display.") == '16gb ram i7/i9 + 4k display'
+    assert normalize_query("1,5 and 10,000") == '1 5 and 10000'
+    assert normalize_query("?!") == ''
+
+
+def test_query_log_counts_normalized_queries(tmp_path):
+    log = QueryLog(str(tmp_path / 'log.json'), flush_seconds=3600)
+    for query in ("Best laptop under $1,000?", "best laptop under $1000", "Thin and light"):
+        log.record(query)
+    log.record('')
+    log.record('x' * 400)
+    top = log.top(5)
+    assert [(entry['key'], entry['count']) for entry in top] == [('best laptop under $1000', 2), ('thin and light', 1)]
+    # The last spelling seen is what the warm-up job asks
+    assert top[0]['query'] == 'best laptop under $1000'
+
+
+def test_query_log_keeps_the_most_frequent(tmp_path):
+    log = QueryLog(str(tmp_path / 'log.json'), max_entries=2, flush_seconds=3600)
+    for query, count in (('a', 3), ('b', 1), ('c', 2)):
+        for _ in range(count):
+            log.record(query)
+    log.flush()
+    assert [entry['key'] for entry in log.top(10)] == ['a', 'c']
+
+
+def _record_and_flush(path, rounds):
+    log = QueryLog(path, flush_seconds=3600)
+    for _ in range(rounds):
+        log.record('gaming laptop')
+        log.record('student laptop')
+        log.flush()
+
+
+def test_query_log_flushes_from_many_processes(tmp_path):
+    path = str(tmp_path / 'log.json')
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=_record_and_flush, args=(path, 25)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+    counts = {entry['key']: entry['count'] for entry in QueryLog(path).top(10)}
+    assert counts == {'gaming laptop': 100, 'student laptop': 100}
+
+
+def test_answer_cache_is_keyed_by_catalog_version(tmp_path):
+    cache = AnswerCache(str(tmp_path), max_entries=2)
+    cache.put('v1', 'q', {'response': 'one'})
+    assert cache.get('v1', 'q') == {'response': 'one'}
+    assert cache.get('v2', 'q') is None
+    cache.put('v2', 'q', {'response': 'two'})
+    cache.get('v1', 'q')
+    # v2 is now the least recently used and is evicted first
+    cache.put('v1', 'other', {'response': 'three'})
+    assert cache.get('v2', 'q') is None and cache.get('v1', 'q') == {'response': 'one'}
+    assert cache.stats()['hits'] == 3
+
+
+def test_warm_answers_are_shared_per_catalog_version(tmp_path):
+    writer, reader = AnswerCache(str(tmp_path)), AnswerCache(str(tmp_path))
+    writer.write_warm('v1', {'q': {'response': 'warm'}})
+    assert reader.get('v1', 'q') == {'response': 'warm'}
+    assert reader.get('v2', 'q') is None
+    writer.write_warm('v2', {'q': {'response': 'newer'}})
+    assert reader.get('v1', 'q') is None
+    assert reader.get('v2', 'q') == {'response': 'newer'}
+
+
+@pytest.fixture
+def logged(tmp_path):
+    log = QueryLog(str(tmp_path / 'log.json'), flush_seconds=3600)
+    for rank in range(8):
+        for _ in range(10 - rank):
+            log.record(f"query {rank}")
+    return log
+
+
+def test_warm_up_reuses_answers_for_the_same_version(tmp_path, logged):
+    cache = AnswerCache(str(tmp_path / 'cache'))
+    asked = []
+    answer = lambda query: asked.append(query) or {'response': query}
+
+    report = warm_answer_cache(cache, logged, 'v1', answer, top_n=3, budget_seconds=60, concurrency=2)
+    assert (report['computed'], report['reused'], report['remaining']) == (3, 0, 0)
+    assert sorted(asked) == ['query 0', 'query 1', 'query 2']
+
+    asked.clear()
+    report = warm_answer_cache(cache, logged, 'v1', answer, top_n=4, budget_seconds=60, concurrency=2)
+    assert (report['computed'], report['reused']) == (1, 3) and asked == ['query 3']
+    # A new catalog version recomputes everything
+    report = warm_answer_cache(cache, logged, 'v2', answer, top_n=4, budget_seconds=60, concurrency=2)
+    assert report['computed'] == 4
+    assert set(cache.warm_answers('v2')) == {f"query {rank}" for rank in range(4)}
+
+
+def test_warm_up_respects_concurrency_and_budget(tmp_path, logged):
+    cache = AnswerCache(str(tmp_path / 'cache'))
+    lock = threading.Lock()
+    running = peak = 0
+
+    def answer(query):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.2)
+        with lock:
+            running -= 1
+        return {'response': query}
+
+    report = warm_answer_cache(cache, logged, 'v1', answer, top_n=8, budget_seconds=0.3, concurrency=2)
+    assert peak == 2
+    # Two rounds start within the budget; the rest wait for the next run
+    assert report['computed'] == 4 and report['remaining'] == 4
+    assert len(cache.warm_answers('v1')) == 4
+
+
+def test_warm_up_stops_when_the_llm_is_unavailable(tmp_path, logged):
+    cache = AnswerCache(str(tmp_path / 'cache'))
+    report = warm_answer_cache(cache, logged, 'v1', lambda query: None, top_n=8, budget_seconds=60, concurrency=1)
+    assert report['llm_unavailable'] and report['computed'] == 0 and report['remaining'] == 8
+
+
+def test_warm_up_holds_admission_slots(tmp_path, logged):
+    cache = AnswerCache(str(tmp_path / 'cache'))
+    admission = AdmissionController(max_concurrent=1, max_queue=0, max_wait=1)
+    seen = []
+
+    def answer(query):
+        seen.append(admission.active)
+        time.sleep(0.01)
+        return {'response': query}
+
+    report = warm_answer_cache(cache, logged, 'v1', answer, top_n=6, budget_seconds=60, concurrency=4,
+                               admission=admission)
+    assert report['computed'] == 6
+    # Four warm threads, but only the one slot: every call ran alone
+    assert seen == [1] * 6 and admission.active == 0
+
+
+def test_warm_up_is_rate_limited(tmp_path, logged):
+    cache = AnswerCache(str(tmp_path / 'cache'))
+    limiter = RateLimiter(client_per_minute=0.001, client_burst=2, global_per_minute=0.001, global_burst=10)
+    started = time.time()
+    report = warm_answer_cache(cache, logged, 'v1', lambda query: {'response': query}, top_n=5,
+                               budget_seconds=5, concurrency=2, rate_limiter=limiter)
+    # Two tokens; the next would come long after the budget, so the run ends instead of waiting
+    assert report['computed'] == 2 and report['remaining'] == 3
+    assert time.time() - started < 1
+    assert limiter.global_bucket.tokens == pytest.approx(8, abs=0.01)
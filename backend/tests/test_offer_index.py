@@ -0,0 +1,103 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import numpy as np
+import pytest
+
+from services.offer_index import OfferIndex, build_catalog_offers, parse_offer, parse_promos, promo_value
+
+
+@pytest.mark.parametrize('promo, rewards, savings', [
+    ("Save $30 on select printers", 0, 0),
+    ("Save $30 on select printers and accessories", 0, 0),
+    ("3% back in HP Rewards", 30, 0),
+    ("1.5% back", 15, 0),
+    ("Earn $25 in Rewards", 25, 0),
+    ("Earn $1,000 in rewards", 1000, 0),
+    ("Save $150", 0, 150),
+    ("Save $1,200.50 instantly", 0, 1200.5),
+    ("Save $100 on this PC. Save $30 on select printers", 0, 100),
+    ("Free shipping", 0, 0),
+])
+def test_promo_value(promo, rewards, savings):
+    assert promo_value([promo], 1000.0) == {'rewards': rewards, 'savings': savings}
+
+
+def test_percent_rewards_need_a_price():
+    assert promo_value(["3% back in HP Rewards"], None) == {'rewards': 0.0, 'savings': 0.0}
+
+
+@pytest.mark.parametrize('price, promos, reference, expected', [
+    # The catalog's own original price, with rewards; the printer offer is not a saving
+    ("{'Current Price': '$899.99', 'Original Price': '$1,099.99'}",
+     "3% back in HP Rewards\nSave $30 on select printers", None,
+     {'current_price': 899.99, 'original_price': 1099.99, 'price_cut': 200.0, 'savings': 0.0, 'rewards': 27.0,
+      'deal_value': 227.0, 'deal_pct': 20.64}),
+    # A recorded higher price stands in for the missing original
+    ("$500.00", "Save $50", 600.0,
+     {'current_price': 500.0, 'original_price': 600.0, 'price_cut': 100.0, 'savings': 50.0, 'rewards': 0.0,
+      'deal_value': 150.0, 'deal_pct': 25.0}),
+    # A lower recorded price is not a discount
+    ("$500.00", "-", 450.0,
+     {'current_price': 500.0, 'original_price': None, 'price_cut': 0.0, 'savings': 0.0, 'rewards': 0.0,
+      'deal_value': 0.0, 'deal_pct': 0.0}),
+    # Instant savings are measured against the pre-savings price
+    ("$500.00", "['Save $50', 'Earn $10 in Rewards']", float('nan'),
+     {'current_price': 500.0, 'original_price': None, 'price_cut': 0.0, 'savings': 50.0, 'rewards': 10.0,
+      'deal_value': 60.0, 'deal_pct': 10.91}),
+    ("$272.00", "3% back in HP Rewards", None,
+     {'current_price': 272.0, 'original_price': None, 'price_cut': 0.0, 'savings': 0.0, 'rewards': 8.16,
+      'deal_value': 8.16, 'deal_pct': 3.0}),
+])
+def test_parse_offer(price, promos, reference, expected):
+    offer = parse_offer(price, promos, reference)
+    assert {key: offer[key] for key in expected} == expected
+    assert offer['promos'] == parse_promos(promos)
+
+
+def test_parse_promos():
+    assert parse_promos("-") == [] and parse_promos(None) == []
+    assert parse_promos(" Save $50 \n\n Free shipping ") == ['Save $50', 'Free shipping']
+    assert parse_promos("['Save $50', '']") == ['Save $50']
+
+
+@pytest.fixture(scope='module')
+def offers():
+    rng = np.random.default_rng(11)
+    size = 3000
+    brands = rng.choice(['HP', 'Lenovo', ' hp', 'Dell', 'Apple'], size)
+    offers = []
+    for row in range(size):
+        price = None if rng.random() < 0.05 else float(rng.integers(20, 300) * 10)
+        # Rounded so deal ties are common
+        deal_pct = 0.0 if rng.random() < 0.3 else float(rng.integers(1, 30))
+        offers.append({'current_price': price, 'deal_pct': deal_pct})
+    return OfferIndex(offers, brands), brands
+
+
+def brute_force(offers, brands, brand=None, max_price=None, min_discount=None, limit=20):
+    rows = [row for row, offer in enumerate(offers)
+            if offer['deal_pct'] > 0 and offer['current_price'] is not None
+            and (brand is None or brands[row].strip().lower() == brand.strip().lower())
+            and (max_price is None or offer['current_price'] <= max_price)
+            and (min_discount is None or offer['deal_pct'] >= min_discount)]
+    return sorted(rows, key=lambda row: (-offers[row]['deal_pct'], offers[row]['current_price'], row))[:limit]
+
+
+@pytest.mark.parametrize('brand', [None, 'HP', 'lenovo ', 'Apple', 'Acer'])
+@pytest.mark.parametrize('max_price', [None, 250.0, 1500.0])
+@pytest.mark.parametrize('min_discount', [None, 0.5, 10.0, 29.0, 40.0])
+@pytest.mark.parametrize('limit', [1, 20, 5000])
+def test_query_matches_brute_force(offers, brand, max_price, min_discount, limit):
+    index, brands = offers
+    expected = brute_force(index.offers, brands, brand, max_price, min_discount, limit)
+    assert index.query(brand=brand, max_price=max_price, min_discount=min_discount, limit=limit) == expected
+
+
+def test_catalog_offers(catalog):
+    df, _ = catalog
+    index = build_catalog_offers(df)
+    assert len(index.offers) == len(df)
+    assert index.query(limit=len(df)) == brute_force(index.offers, list(df['Brand'].fillna('')), limit=len(df))
+    assert len(build_catalog_offers(df.iloc[:0])) == 0
@@ -0,0 +1,130 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from services.price_history import PriceHistoryStore, partition_name
+
+DAY = 86400
+START = int(datetime(2024, 1, 10, tzinfo=timezone.utc).timestamp())
+KEYS = [f"laptop-{i}" for i in range(20)]
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    """A store with ~4 months of random daily prices, and the same observations as a list"""
+    rng = np.random.default_rng(1)
+    store = PriceHistoryStore(str(tmp_path), min_interval_seconds=0)
+    observations = []
+    for day in range(0, 120, 3):
+        ts = START + day * DAY
+        prices = np.round(rng.uniform(300, 3000, len(KEYS)), 2)
+        # Some laptops are unpriced on some days, and the last five only appear after a month
+        prices[rng.random(len(KEYS)) < 0.2] = np.nan
+        if day < 30:
+            prices[-5:] = np.nan
+        store.append(KEYS, prices, ts)
+        observations += [(key, ts, np.float32(price)) for key, price in zip(KEYS, prices) if not np.isnan(price)]
+    return store, observations
+
+
+def reference_as_of(observations, key, ts):
+    seen = [(t, price) for k, t, price in observations if k == key and (ts is None or t <= ts)]
+    return max(seen)[1] if seen else np.nan
+
+
+def reference_first_within(observations, key, start, end):
+    seen = [(t, price) for k, t, price in observations if k == key and start <= t <= end]
+    return min(seen)[1] if seen else np.nan
+
+
+def test_months_are_separate_partitions(recorded):
+    store, _ = recorded
+    assert store.partitions() == ['2024-01', '2024-02', '2024-03', '2024-04', '2024-05']
+    assert store.partitions(START + 40 * DAY, START + 60 * DAY) == ['2024-02', '2024-03']
+
+
+@pytest.mark.parametrize('offset_days', [-1, 0, 1, 20, 22, 45, 89, 200])
+def test_as_of_is_the_last_price_at_or_before(recorded, offset_days):
+    store, observations = recorded
+    ts = START + offset_days * DAY
+    _, prices = store.as_of(store.ids_for(KEYS), ts)
+    expected = [reference_as_of(observations, key, ts) for key in KEYS]
+    assert np.allclose(prices, expected, equal_nan=True)
+
+
+def test_as_of_without_a_timestamp_is_the_latest(recorded):
+    store, observations = recorded
+    found_ts, prices = store.as_of(store.ids_for(KEYS + ['unknown']))
+    assert np.allclose(prices[:-1], [reference_as_of(observations, key, None) for key in KEYS])
+    assert np.isnan(prices[-1]) and found_ts[-1] == -1
+
+
+@pytest.mark.parametrize('start_day, end_day', [(0, 60), (10, 100), (45, 46), (100, 200)])
+def test_pct_change(recorded, start_day, end_day):
+    store, observations = recorded
+    start, end = START + start_day * DAY, START + end_day * DAY
+    result = store.pct_change(KEYS + ['unknown'], start, end)
+
+    for i, key in enumerate(KEYS):
+        base = reference_as_of(observations, key, start)
+        if np.isnan(base):
+            # First seen after the window opened: the first price inside the window
+            base = reference_first_within(observations, key, start, end)
+        current = reference_as_of(observations, key, end)
+        assert result['start_price'][i] == pytest.approx(base, nan_ok=True)
+        assert result['current_price'][i] == pytest.approx(current, nan_ok=True)
+        assert result['change_pct'][i] == pytest.approx((current - base) / base * 100, nan_ok=True, rel=1e-6)
+    assert np.isnan(result['change_pct'][-1])
+
+
+def test_unchanged_prices_are_not_rerecorded_within_the_interval(tmp_path):
+    store = PriceHistoryStore(str(tmp_path), min_interval_seconds=DAY)
+    assert store.append(['a', 'b'], [100.0, 200.0], START) == 2
+    assert store.append(['a', 'b'], [100.0, 250.0], START + 3600) == 1
+    # a is a day old now, b only 23 hours
+    assert store.append(['a', 'b'], [100.0, 250.0], START + DAY) == 1
+    assert store.append(['a', 'b'], [100.0, 250.0], START + DAY + 3600) == 1
+    assert store.append(['a', 'b'], [np.nan, 0], START + 2 * DAY) == 0
+
+
+def test_append_after_a_torn_write_keeps_columns_aligned(tmp_path):
+    store = PriceHistoryStore(str(tmp_path), min_interval_seconds=0)
+    store.append(['a', 'b'], [100.0, 200.0], START)
+    # A crash after writing only the ids of the next append
+    directory = os.path.join(str(tmp_path), partition_name(START))
+    with open(os.path.join(directory, 'ids'), 'ab') as f:
+        f.write(np.array([0, 1], dtype=np.int32).tobytes())
+
+    store.append(['a', 'b'], [110.0, 190.0], START + DAY)
+    _, prices = store.as_of(store.ids_for(['a', 'b']))
+    assert prices.tolist() == [110.0, 190.0]
+    ids, ts, _ = store.observations()
+    assert len(ids) == len(ts) == 4
+
+
+def test_partitions_skip_foreign_directories(tmp_path):
+    store = PriceHistoryStore(str(tmp_path), min_interval_seconds=0)
+    store.append(['a'], [100.0], START)
+    for name in ('backup', '2024-1', 'lost+found'):
+        os.makedirs(os.path.join(str(tmp_path), name))
+    assert store.partitions() == ['2024-01']
+    assert store.as_of(store.ids_for(['a']))[1].tolist() == [100.0]
+
+
+def test_loading_the_catalog_does_not_record_prices(catalog_csv, tmp_path, monkeypatch):
+    from services.data_service import DataService
+
+    monkeypatch.delenv('PRICE_HISTORY_DIR', raising=False)
+    monkeypatch.delenv('CATALOG_RECORD_ON_LOAD', raising=False)
+    DataService(catalog_csv)
+    assert not os.path.exists(tmp_path / 'price_history')
+
+    service = DataService(catalog_csv, record=True)
+    ids, _, _ = service.price_history.observations()
+    assert len(ids) == int(np.count_nonzero(~np.isnan(service.feature_array('price'))))
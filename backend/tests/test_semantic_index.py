@@ -0,0 +1,92 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import json
+
+import numpy as np
+import pytest
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from services.semantic_index import NGRAM_RANGE, STOP_WORDS, LSAModel, SemanticIndex, laptop_document, top_k
+from utils.helpers import text_hash
+
+QUERIES = ['lightweight laptop with long battery life', 'gaming laptop rtx graphics',
+           'cheap chromebook for students', 'no known words here qwxz']
+
+
+@pytest.fixture(scope='module')
+def vectors():
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(size=(1000, 16)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize('block_rows', [7, 100, 999, 1000, 4096])
+@pytest.mark.parametrize('k', [1, 10, 37, 1000, 2000])
+def test_top_k_matches_argsort(vectors, block_rows, k):
+    rng = np.random.default_rng(k)
+    queries = rng.normal(size=(5, 16)).astype(np.float32)
+    rows, scores = top_k(vectors, queries, k, block_rows=block_rows)
+
+    all_scores = queries @ vectors.T
+    expected = np.argsort(-all_scores, axis=1, kind='stable')[:, :min(k, len(vectors))]
+    assert rows.shape == scores.shape == expected.shape
+    np.testing.assert_array_equal(rows, expected)
+    np.testing.assert_allclose(scores, np.take_along_axis(all_scores, expected, axis=1), rtol=1e-5)
+
+
+def test_top_k_reads_memory_mapped_vectors(vectors, tmp_path):
+    path = str(tmp_path / 'vectors.npy')
+    np.save(path, vectors)
+    queries = vectors[[5, 500]]
+    rows, _ = top_k(np.load(path, mmap_mode='r'), queries, 3, block_rows=64)
+    # Each vector is its own best match
+    assert rows[:, 0].tolist() == [5, 500]
+
+
+@pytest.fixture(scope='module')
+def documents(catalog):
+    df, features = catalog
+    return [laptop_document(record, {}, features.iloc[row]) for row, record in enumerate(df.to_dict('records'))]
+
+
+def test_lsa_model_matches_the_fitted_pipeline(documents):
+    vectorizer = TfidfVectorizer(stop_words=STOP_WORDS, sublinear_tf=True, ngram_range=NGRAM_RANGE,
+                                 max_features=50000, dtype=np.float32)
+    tfidf = vectorizer.fit_transform(documents)
+    svd = TruncatedSVD(n_components=16, random_state=0).fit(tfidf)
+    model = LSAModel.from_fitted(vectorizer, svd)
+
+    texts = QUERIES + documents[:10]
+    expected = svd.transform(vectorizer.transform(texts))
+    np.testing.assert_allclose(model.transform(texts), expected, rtol=1e-4, atol=1e-5)
+
+
+def test_load_checks_the_catalog_hash(documents, tmp_path):
+    built = SemanticIndex(index_dir=str(tmp_path), dimensions=16)
+    built.build(documents)
+    results = built.search_many(QUERIES, 5)
+    assert results[-1] == [] and all(results[:-1])
+
+    loaded = SemanticIndex(index_dir=str(tmp_path), dimensions=16)
+    assert not loaded.load(text_hash(*documents[:-1]))
+    assert loaded.vectors is None
+    assert loaded.load(text_hash(*documents))
+    assert loaded.manifest['rows'] == len(documents)
+    assert loaded.search_many(QUERIES, 5) == results
+
+
+def test_load_rejects_other_formats_and_missing_files(documents, tmp_path):
+    assert not SemanticIndex(index_dir=str(tmp_path / 'missing')).load()
+
+    SemanticIndex(index_dir=str(tmp_path), dimensions=16).build(documents)
+    manifest_path = tmp_path / 'manifest.json'
+    manifest = json.loads(manifest_path.read_text())
+    manifest_path.write_text(json.dumps({**manifest, 'format': manifest['format'] - 1}))
+    assert not SemanticIndex(index_dir=str(tmp_path)).load()
+
+    manifest_path.write_text(json.dumps(manifest))
+    np.save(tmp_path / 'idf.npy', np.ones(3, dtype=np.float32))
+    assert not SemanticIndex(index_dir=str(tmp_path)).load()
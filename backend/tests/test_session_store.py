@@ -0,0 +1,112 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import json
+import time
+
+from services.session_store import (MAX_LAPTOPS, SUMMARY_CHARS, InMemorySessionStore, RedisSessionStore,
+                                    new_session, public_view, record_turn)
+
+
+def session(turns=0):
+    session = new_session()
+    for turn in range(turns):
+        record_turn(session, f"question {turn}", f"answer {turn}\nmore detail", [f"key-{turn}"], [])
+    return session
+
+
+def test_lru_evicts_the_least_recently_used():
+    store = InMemorySessionStore(max_sessions=2, ttl=60)
+    first, second, third = session(), session(), session()
+    store.put(first)
+    store.put(second)
+    # Reading the first one makes the second the least recently used
+    assert store.get(first['session_id']) is not None
+    store.put(third)
+    assert store.get(second['session_id']) is None
+    assert store.get(first['session_id']) is not None and store.get(third['session_id']) is not None
+    assert store.stats()['evicted'] == 1 and store.stats()['sessions'] == 2
+
+
+def test_sessions_expire_after_the_ttl_unless_used():
+    store = InMemorySessionStore(max_sessions=10, ttl=0.3)
+    idle, active = session(), session()
+    store.put(idle)
+    store.put(active)
+    for _ in range(5):
+        time.sleep(0.1)
+        # Every read slides the expiry forward
+        assert store.get(active['session_id']) is not None
+    assert store.get(idle['session_id']) is None
+    assert store.stats()['sessions'] == 1
+
+
+def test_stored_sessions_are_copies():
+    store = InMemorySessionStore(max_sessions=10, ttl=60)
+    original = session(1)
+    store.put(original)
+    original['summary'] = 'changed'
+    loaded = store.get(original['session_id'])
+    loaded['turns'].clear()
+    assert store.get(original['session_id'])['summary'] == ''
+    assert len(store.get(original['session_id'])['turns']) == 2
+    assert store.delete(original['session_id']) and not store.delete(original['session_id'])
+
+
+def test_long_histories_are_compacted():
+    long = new_session()
+    for turn in range(40):
+        record_turn(long, f"question {turn} " + 'x' * 2000, f"answer {turn}\nsecond line", [f"key-{turn}"],
+                    [f"key-{turn}"], max_turns=3)
+    assert long['turn_count'] == 40
+    # Only the last three question/answer pairs are kept verbatim, each capped
+    assert [turn['content'][:11] for turn in long['turns'][::2]] == ['question 37', 'question 38', 'question 39']
+    assert all(len(turn['content']) <= 1000 for turn in long['turns'])
+    # Older turns live on in the summary, newest last, within its cap
+    summary = long['summary'].split('\n')
+    assert len(long['summary']) <= SUMMARY_CHARS
+    assert summary[-1].startswith('- Q: question 36') and summary[-1].endswith('| A: answer 36')
+    assert not any('question 0 ' in line for line in summary)
+    # Most recent laptops first; the LLM has seen details only for laptops still tracked
+    assert long['laptop_keys'] == [f"key-{turn}" for turn in range(39, 39 - MAX_LAPTOPS, -1)]
+    assert set(long['sent_keys']) == set(long['laptop_keys'])
+    assert len(json.dumps(long)) < 8000
+    assert public_view(long)['turn_count'] == 40
+
+
+class FakeRedis:
+    """The few Redis commands RedisSessionStore uses, with expiry times recorded instead of enforced"""
+
+    def __init__(self):
+        self.values = {}
+        self.expiry = {}
+        self.calls = []
+
+    def setex(self, key, ttl, value):
+        self.calls.append(('setex', key, ttl))
+        self.values[key], self.expiry[key] = value, ttl
+
+    def getex(self, key, ex=None):
+        self.calls.append(('getex', key, ex))
+        if key in self.values and ex is not None:
+            self.expiry[key] = ex
+        return self.values.get(key)
+
+    def delete(self, key):
+        self.expiry.pop(key, None)
+        return 1 if self.values.pop(key, None) is not None else 0
+
+
+def test_redis_reads_refresh_the_ttl():
+    client = FakeRedis()
+    store = RedisSessionStore(client, ttl=1800, prefix='test:')
+    stored = session(1)
+    store.put(stored)
+    key = f"test:{stored['session_id']}"
+    client.expiry[key] = 5
+    assert store.get(stored['session_id']) == stored
+    assert client.calls == [('setex', key, 1800), ('getex', key, 1800)]
+    assert client.expiry[key] == 1800
+    assert store.get('missing') is None
+    assert store.delete(stored['session_id']) and not store.delete(stored['session_id'])
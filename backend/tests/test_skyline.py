@@ -0,0 +1,59 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import numpy as np
+import pytest
+
+from services.skyline import skyline
+
+
+def brute_force_skyline(values: np.ndarray, maximize=None) -> np.ndarray:
+    """O(n^2) reference: NaN is worse than any known value, equal points don't dominate each other"""
+    data = np.asarray(values, dtype=np.float64).copy()
+    if maximize is not None:
+        flip = np.asarray(maximize, dtype=bool)
+        data[:, flip] = -data[:, flip]
+    data[np.isnan(data)] = np.inf
+    keep = []
+    for i, point in enumerate(data):
+        dominated = ((data <= point).all(axis=1) & (data < point).any(axis=1)).any()
+        if not dominated:
+            keep.append(i)
+    return np.array(keep, dtype=np.int64)
+
+
+@pytest.mark.parametrize('dims', [1, 2, 3, 4])
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_brute_force_with_nan(dims, seed):
+    rng = np.random.default_rng(seed)
+    # Few distinct values so ties are common
+    values = rng.integers(0, 6, size=(300, dims)).astype(np.float64)
+    values[rng.random(values.shape) < 0.15] = np.nan
+    maximize = [bool(j % 2) for j in range(dims)]
+
+    expected = brute_force_skyline(values, maximize)
+    assert np.array_equal(skyline(values, maximize, block_size=16), expected)
+    assert np.array_equal(skyline(values, maximize), expected)
+
+
+def test_nan_never_beats_a_known_value():
+    values = np.array([[1.0, np.nan], [1.0, 5.0], [2.0, 1.0]])
+    # Row 0 is unknown on the second dimension, so row 1 dominates it
+    assert skyline(values).tolist() == [1, 2]
+
+
+def test_all_nan_column_is_ignored():
+    values = np.array([[1.0, np.nan, 3.0], [2.0, np.nan, 1.0], [3.0, np.nan, 4.0]])
+    assert skyline(values).tolist() == [0, 1]
+
+
+def test_identical_points_are_all_kept():
+    values = np.array([[1.0, 2.0, 3.0]] * 3 + [[2.0, 3.0, 4.0]])
+    assert skyline(values).tolist() == [0, 1, 2]
+
+
+def test_empty_and_invalid_input():
+    assert skyline(np.zeros((0, 3))).tolist() == []
+    with pytest.raises(ValueError):
+        skyline(np.zeros(3))
@@ -0,0 +1,56 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.sort_index import CatalogSortIndex
+
+SIZE = 20000
+
+
+@pytest.fixture(scope='module')
+def values():
+    rng = np.random.default_rng(5)
+    # Rounded so ties are common, with unknowns mixed in
+    data = np.round(rng.normal(1000, 300, SIZE), -1)
+    data[rng.random(SIZE) < 0.1] = np.nan
+    return data
+
+
+@pytest.fixture(scope='module')
+def index(values):
+    return CatalogSortIndex(pd.DataFrame({'price': values}), fields=('price',))
+
+
+def reference_order(values: np.ndarray, rows: np.ndarray, descending: bool) -> np.ndarray:
+    """Stable argsort of the selected rows: NaN last, ties in catalog order"""
+    keys = -values[rows] if descending else values[rows].copy()
+    keys[np.isnan(keys)] = np.inf
+    return rows[np.argsort(keys, kind='stable')]
+
+
+@pytest.mark.parametrize('selectivity', [0.001, 0.01, 0.02, 0.05, 0.3, 1.0])
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_page_matches_argsort(index, values, selectivity, order):
+    rng = np.random.default_rng(int(selectivity * 1000))
+    rows = np.flatnonzero(rng.random(SIZE) < selectivity)
+    expected = reference_order(values, rows, order == 'desc')
+
+    for offset, limit in [(0, 10), (0, 50), (40, 20), (len(rows) - 5, 10), (0, None), (len(rows) + 1, 10)]:
+        offset = max(0, offset)
+        page = index.sort(rows, 'price', order, offset, limit)
+        end = None if limit is None else offset + limit
+        assert page.tolist() == expected[offset:end].tolist()
+
+
+def test_relevance_keeps_the_given_order(index):
+    rows = np.array([5, 3, 9, 1])
+    assert index.sort(rows, 'relevance', offset=1, limit=2).tolist() == [3, 9]
+
+
+def test_unknown_field_is_rejected(index):
+    with pytest.raises(ValueError):
+        index.sort(np.arange(10), 'weight_kg', 'asc')
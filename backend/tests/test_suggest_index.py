@@ -0,0 +1,99 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import re
+
+import numpy as np
+import pytest
+
+from services import suggest_index
+from services.suggest_index import MAX_SUGGESTIONS, SuggestIndex, build_catalog_suggestions, normalize, popularity
+
+
+def brute_force(weighted_phrases, prefix, limit):
+    prefix = normalize(prefix)
+    matches = [phrase for phrase in weighted_phrases
+               if any(normalize(phrase)[match.start():].startswith(prefix)
+                      for match in re.finditer(r'\w+', normalize(phrase)))]
+    return sorted(matches, key=lambda phrase: (-weighted_phrases[phrase], len(phrase), phrase))[:limit]
+
+
+@pytest.fixture(scope='module')
+def weighted_phrases():
+    rng = np.random.default_rng(9)
+    words = ['ThinkPad', 'ThinkBook', 'Yoga', 'IdeaPad', 'Legion', 'Pavilion', 'Envy', 'Spectre', 'Laptop',
+             'Gaming', 'Pro', 'Plus', 'Slim', 'Gen', 'OLED', '14"', '16″']
+    phrases = {}
+    for number in range(3000):
+        name = ' '.join(rng.choice(words, rng.integers(1, 4))) + f" {rng.choice(['E', 'X', 'T'])}{number}"
+        # Rounded so ranking ties (broken by length, then text) are common
+        phrases[name] = float(rng.integers(0, 20))
+    return phrases
+
+
+@pytest.fixture(scope='module')
+def index(weighted_phrases):
+    return SuggestIndex().build(weighted_phrases)
+
+
+@pytest.mark.parametrize('prefix', ['t', 'th', 'thi', 'think', 'thinkpad', 'yoga pro', 'laptop', 'e1', 'x29',
+                                    'gen e', '14"', '16"', 'ThinkPad  ', 'zzz', 'pro plus', 't2999'])
+@pytest.mark.parametrize('limit', [1, 5, 20])
+def test_suggest_matches_brute_force(index, weighted_phrases, prefix, limit):
+    assert index.suggest(prefix, limit) == brute_force(weighted_phrases, prefix, limit)
+
+
+def test_word_starts_inside_phrases():
+    index = SuggestIndex().build({'ThinkPad E14 Gen 5': 3.0, 'ThinkPad X1 Carbon': 5.0, 'HP EliteBook': 1.0})
+    assert index.suggest('e14') == ['ThinkPad E14 Gen 5']
+    assert index.suggest('thinkpad') == ['ThinkPad X1 Carbon', 'ThinkPad E14 Gen 5']
+    assert index.suggest('e') == ['ThinkPad E14 Gen 5', 'HP EliteBook']
+    # Only word starts match, not the middle of a word
+    assert index.suggest('arbon') == []
+    assert index.suggest('') == [] and index.suggest('thinkpad', 0) == []
+    assert len(index.suggest('t', 100)) == 2
+
+
+def test_short_prefixes_are_precomputed(index, weighted_phrases):
+    assert 'th' in index._precomputed and 'thi' not in index._precomputed
+    assert all(len(prefix) <= suggest_index.PRECOMPUTED_PREFIX_LENGTH for prefix in index._precomputed)
+    assert index._precomputed['th'] == brute_force(weighted_phrases, 'th', MAX_SUGGESTIONS)
+
+
+def test_wide_prefixes_are_memoized(index, weighted_phrases, monkeypatch):
+    monkeypatch.setattr(suggest_index, 'MEMO_RANGE_THRESHOLD', 100)
+    index._memo.clear()
+    start, end = index._key_range('thi')
+    assert end - start > 100
+    assert index.suggest('thi', 3) == brute_force(weighted_phrases, 'thi', 3)
+    # The full result is kept, so a larger limit is served from the memo too
+    assert index._memo['thi'] == brute_force(weighted_phrases, 'thi', MAX_SUGGESTIONS)
+    assert index.suggest('thi', 20) == index._memo['thi']
+
+    # Narrow ranges are cheap and not memoized
+    index.suggest('t2999')
+    assert 't2999' not in index._memo
+
+    monkeypatch.setattr(suggest_index, 'MEMO_MAX_ENTRIES', 1)
+    index.suggest('thin')
+    assert list(index._memo) == ['thin']
+
+
+def test_rebuild_drops_cached_results(index):
+    index = SuggestIndex().build({'ThinkPad': 1.0})
+    index._memo['thinkpad'] = ['stale']
+    index.build({'Yoga': 1.0})
+    assert index._memo == {} and index.suggest('th') == [] and index.suggest('y') == ['Yoga']
+
+
+def test_catalog_suggestions(catalog):
+    df, features = catalog
+    index = build_catalog_suggestions(df, features)
+    brands = df['Brand'].dropna().str.strip()
+    top_brand = brands.value_counts().index[0]
+    assert top_brand in index.suggest(top_brand[:2], 20)
+    model = df['Model'].iloc[0].strip()
+    assert model in index.suggest(model, 20)
+    assert popularity(float('nan'), 10) == 1.0 and popularity(4.0, 0) == 1.0
+    assert len(build_catalog_suggestions(df.iloc[:0], features.iloc[:0])) == 0
@@ -0,0 +1,165 @@
+# Copyright (c) 2025 Bhagya Dissanayake
+# All rights reserved. This code is proprietary and confidential.
+# Unauthorized copying, distribution, or use is strictly prohibited.
+
+import ast
+import hashlib
+import json
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+# Keys that appear inside the scraped "Review Details" blobs, in scrape order
+REVIEW_DETAIL_KEYS = ['Overall Rating', 'Star Breakdown', 'AI Summary', 'User Feedback']
+
+_STAR_RATING_RE = re.compile(r'(\d+\.?\d*)\s+out of 5 stars')
+_REVIEW_COUNT_RE = re.compile(r'(\d+)\s+reviews', re.IGNORECASE)
+
+
+def is_missing(value: Any) -> bool:
+    """Return True for empty cells, NaN and the '-' placeholder used by the scrapers"""
+    if value is None:
+        return True
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return True
+    return isinstance(value, str) and value.strip() in ('', '-')
+
+
+# Columns identifying a laptop: brand and model, plus the specs telling configurations apart
+LAPTOP_KEY_COLUMNS = ['Brand', 'Model', 'Processor', 'Memory (RAM)', 'Storage', 'Display']
+
+
+def _key_part(value: Any) -> str:
+    return '' if is_missing(value) else ' '.join(str(value).lower().split())
+
+
+def laptop_key(brand: Any, model: Any, *specs: Any) -> str:
+    """Content-derived key for a laptop that does not change when rows move in the CSV.
+
+    Missing trailing specs are dropped, so a laptop without spec cells keeps its
+    brand-and-model key.
+    """
+    parts = [_key_part(value) for value in (brand, model, *specs)]
+    while len(parts) > 2 and not parts[-1]:
+        parts.pop()
+    return hashlib.blake2b('|'.join(parts).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def catalog_laptop_keys(df: Any) -> List[str]:
+    """laptop_key for every catalog row, from the LAPTOP_KEY_COLUMNS it has. Configurations
+    of one model differ in their specs; only rows identical in every key column are told
+    apart by order of appearance."""
+    size = len(df)
+    columns = [df[column] if column in df else [None] * size for column in LAPTOP_KEY_COLUMNS]
+    keys = []
+    seen = {}
+    for values in zip(*columns):
+        key = laptop_key(*values)
+        seen[key] = seen.get(key, 0) + 1
+        keys.append(key if seen[key] == 1 else f"{key}-{seen[key]}")
+    return keys
+
+
+def catalog_laptop_ids(keys: Iterable[str]) -> List[int]:
+    """Stable numeric laptop_id for every laptop_key: 48 bits of its hash, so ids survive
+    rows moving in the CSV and stay exact as JavaScript numbers. The rare colliding key is
+    re-hashed with a counter."""
+    ids = []
+    taken = set()
+    for key in keys:
+        salt = 0
+        while True:
+            text = key if salt == 0 else f"{key}#{salt}"
+            laptop_id = int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=6).digest(), 'big')
+            if laptop_id not in taken:
+                break
+            salt += 1
+        taken.add(laptop_id)
+        ids.append(laptop_id)
+    return ids
+
+
+def text_hash(*parts: Any) -> str:
+    """Short stable hash of one or more text fragments"""
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        digest.update(str(part if part is not None else '').encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+def parse_review_details(raw: Any) -> Dict[str, str]:
+    """Parse a scraped "Review Details" cell into a dict.
+
+    Handles well-formed JSON, Python dict literals, the half-quoted blobs the
+    scraper sometimes writes (e.g. an unquoted "AI Summary" value) and the
+    plain "4.2 out of 5 stars, 48 reviews." format.
+    """
+    if isinstance(raw, dict):
+        return raw
+    if is_missing(raw):
+        return {}
+
+    text = str(raw).strip()
+    for parser in (json.loads, ast.literal_eval):
+        try:
+            parsed = parser(text)
+            if isinstance(parsed, dict):
+                return parsed
+        except Exception:
+            continue
+
+    if 'out of 5 stars' in text:
+        rating_match = _STAR_RATING_RE.search(text)
+        count_match = _REVIEW_COUNT_RE.search(text)
+        rating = rating_match.group(1) if rating_match else "0"
+        review_count = count_match.group(1) if count_match else "0"
+        return {'Overall Rating': f"{rating}/5 ({review_count} reviews)"}
+
+    # Fall back to slicing the blob on the known keys
+    positions = []
+    for key in REVIEW_DETAIL_KEYS:
+        index = text.find(f'"{key}"')
+        if index >= 0:
+            positions.append((index, key))
+    positions.sort()
+
+    result = {}
+    for i, (start, key) in enumerate(positions):
+        value_start = text.find(':', start + len(key) + 2) + 1
+        value_end = positions[i + 1][0] if i + 1 < len(positions) else len(text)
+        value = text[value_start:value_end].strip().rstrip('}').strip().rstrip(',').strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+            value = value[1:-1]
+        result[key] = value.strip()
+    return result
+
+
+def parse_rating(review_details: Dict[str, Any]) -> Optional[float]:
+    """Extract the numeric rating from a parsed review dict ("4.5/5 (116 reviews)" -> 4.5)"""
+    rating_str = str(review_details.get('Overall Rating', '') or '')
+    try:
+        rating = float(rating_str.split('/')[0])
+        return rating if rating > 0 else None
+    except ValueError:
+        return None
+
+
+def parse_review_count(review_details: Dict[str, Any]) -> int:
+    """Extract the review count from a parsed review dict ("4.5/5 (116 reviews)" -> 116)"""
+    match = _REVIEW_COUNT_RE.search(str(review_details.get('Overall Rating', '') or ''))
+    return int(match.group(1)) if match else 0
+
+
+def parse_price(raw: Any) -> Optional[float]:
+    """Parse "$2,229.00" (or a dict holding "Current Price") into a float"""
+    if isinstance(raw, dict):
+        raw = raw.get('Current Price')
+    if is_missing(raw):
+        return None
+    price_str = str(raw).strip().replace('$', '').replace(',', '')
+    try:
+        price = float(price_str)
+    except ValueError:
+        return None
+    return price if price > 0 else None
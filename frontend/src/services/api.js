@@ -63,6 +63,7 @@ export const exploreAPI = {
   getAvailability: () => api.get('/explore/availability'),
   search: (params) => api.get('/explore/search', { params }),
   getById: (id) => api.get(`/explore/${id}`),
+  getBatch: (ids) => api.get('/explore/batch', { params: { ids: ids.join(',') } }),
   getSpecifications: (id) => api.get(`/explore/${id}/specifications`),
 };
 